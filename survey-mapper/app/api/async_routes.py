@@ -1,32 +1,50 @@
 import os
 import time
+import asyncio
 import mimetypes
 import zipfile
 import tempfile
-import sqlite3
 import logging
 import pandas as pd
 import uuid
 import re
+import shutil
+import json
 from enum import Enum
 from logging.handlers import RotatingFileHandler
 from datetime import datetime
-from io import BytesIO
+from contextlib import asynccontextmanager
 from pathlib import Path as FSPath
-from typing import Annotated, List, Dict, Union, Optional
+from typing import Annotated, List, Dict, Tuple, Union, Optional
 from dotenv import load_dotenv
-from fastapi import APIRouter, FastAPI, HTTPException, UploadFile, File, Query, Body, BackgroundTasks
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi import APIRouter, FastAPI, HTTPException, UploadFile, File, Query, Body, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
 from threading import Event, Lock
 
 # Local imports
 from app.utils import helpers
-from app.api.file_access.file_access import save_upload_to_temp_excel, zip_directory
-from app.custom_logging.custom_logger import build_job_logger, collect_logs_grouped_all, filter_logs_by_level
+from app.api.status_paging import STATUS_PAGE_DEFAULT, STATUS_PAGE_MAX, list_jobs_page
+from app.api.file_access.file_access import UploadTooLargeError, stream_upload_to_file, zip_directory
+from app.custom_logging.custom_logger import (
+    add_job_log_handler,
+    build_job_logger,
+    close_job_logger,
+    collect_logs_grouped_all,
+    count_logs_grouped_all,
+    filter_logs_by_fields,
+    filter_log_counts_by_level,
+    filter_logs_by_level,
+    flush_job_logger,
+    remove_job_log_handler,
+)
 from app.dbconnector.database_connector import DatabaseConnector
 from app.api.survey_audit.survey_mapper_class import SurveyMapper
+from app.api.survey_audit.export_manifest import MANIFEST_FILENAME, ExportManifest
+from app.api.survey_audit.feature_collection_formats import result_extensions, survey_output_format
 from app.models.response_models import (
     JobStatus,
+    LogCounts,
     ErrorResponse,
     HealthResponse,
     JobQueuedResponse,
@@ -34,6 +52,20 @@ from app.models.response_models import (
     LogsByLevel
 )
 from app.custom_logging.fail_fast_logger import FailFastLogWatcher
+from app.job_management.job_executor import JobExecutor, QueueFullError
+from app.job_management.job_dispatcher import JobDispatcher
+from app.job_management.gdb_cache import ExtractedGdbCache, NoGdbInZipError
+from app.job_management.job_backend import JOB_FIELDS, get_job_backend
+from app.job_management.job_retention import JobRetention
+from app.job_management.shared_storage import check_shared_storage, uses_shared_job_store
+from app.job_management.job_store import connection as job_db
+from app.job_management.job_events import JobEventLogHandler, JobEventWriter, events_path, read_events
+from app.job_management.result_cache import (
+    ResultCache,
+    compute_cache_key,
+    hash_config,
+    hash_file,
+)
 from app.config_loading.settings import get_settings, refresh_settings
 from app.config_loading.config_loader import get_config
 from app.config_loading.zip_registry_single import (
@@ -65,7 +97,24 @@ ZipNameParam = Annotated[
     ),
 ]
 
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # A job queue shared with other nodes is only usable when they all see the same job files
+    check_shared_storage(get_settings())
+    # Re-queue jobs orphaned by the last shutdown and start feeding the worker pool
+    JOB_DISPATCHER.start()
+    _evict_result_cache()
+    await run_in_threadpool(_evict_gdb_cache)
+    maintenance = asyncio.create_task(_maintenance_loop())
+    yield
+    maintenance.cancel()
+    # Stop worker processes with the API so no orphans keep arcpy locks.
+    # Jobs still running keep their lease and are recovered on the next start.
+    JOB_DISPATCHER.stop()
+    JOB_EXECUTOR.shutdown(wait=False)
+
 app = FastAPI(
+    lifespan=lifespan,
     title="GeoInfo Processor API (Async)",
     description="Asynchronous job execution for geoprocessing tasks.",
     version="1.0.0",
@@ -92,10 +141,18 @@ load_dotenv()
 # Choose an output base dir. Prefer env var else OS temp dir.
 OUTPUT_BASE_DIR = FSPath(os.getenv("OUTPUT_DIR", '../../../output'))
 OUTPUT_BASE_DIR.mkdir(parents=True, exist_ok=True)
+# Uploads of queued jobs (<UPLOAD_ROOT>/<job_id>); on the shared volume when the job store is shared
+UPLOAD_ROOT = get_settings().JOB_UPLOAD_DIR or tempfile.gettempdir()
 RESULTS_ZIP_FOLDER = "results"
 RESULTS_ZIP_FILENAME = "results.zip"
 
+# /events stream: how often the job's event log and status are checked, and the keep-alive interval
+EVENTS_POLL_SECONDS = 0.5
+EVENTS_HEARTBEAT_SECONDS = 15
+FINISHED_STATUSES = ("complete", "failed", "canceled")
+
 # Global state for running and cancelling jobs
+# Values are cancel events shared with the worker process running the job
 RUNNING_JOBS: dict[str, Event] = {}
 JOBS_LOCK = Lock()
 
@@ -114,52 +171,58 @@ if not app_logger.handlers:
     app_fh.setFormatter(fmt)
     app_logger.addHandler(app_fh)
 
-# SQLite database for job tracking
-# This is a simple file-based database to track job statuses
+# Worker pool that runs run_survey_mapper outside of the API process.
+# Pool processes are only started on the first submitted job.
+# Waiting jobs live in the jobs table (see JOB_DISPATCHER), so the pool itself queues nothing.
+JOB_EXECUTOR = JobExecutor(
+    max_workers=get_settings().JOB_WORKERS,
+    max_queued=0,
+    retry_after=get_settings().JOB_RETRY_AFTER_SECONDS,
+    logger=app_logger,
+)
+
+# Settings that change the bytes of results.zip, so they are part of the result cache key.
+# EXPORT_WORKERS and EXPORT_ATTRIBUTE_READER only change how the same files are written.
+RESULT_CACHE_OUTPUT_SETTINGS = ("EXPORT_JSON_COMPACT",)
+
+# Finished results.zip files keyed by a hash of the job inputs
+RESULT_CACHE = ResultCache(
+    root=OUTPUT_BASE_DIR / "_result_cache",
+    max_bytes=get_settings().RESULT_CACHE_MAX_MB * 1024 * 1024,
+    max_age_seconds=get_settings().RESULT_CACHE_MAX_AGE_HOURS * 3600,
+    logger=app_logger,
+)
+
+# GDBs extracted from SINGLE_ZIP_DIR zips, shared by every job that uses the same zip
+GDB_CACHE = ExtractedGdbCache(
+    root=get_settings().GDB_CACHE_DIR or str(OUTPUT_BASE_DIR / "_gdb_cache"),
+    max_bytes=get_settings().GDB_CACHE_MAX_MB * 1024 * 1024,
+    logger=app_logger,
+)
+
+# Job tracking database
+# A local SQLite file (job_status.db) by default; set JOB_STORE_URL to share a Postgres job store between nodes
 # Near the top
 APP_ROOT = FSPath(os.getenv("APP_ROOT") or os.getcwd())
 DB_PATH = str((APP_ROOT / "job_status.db").resolve())
+JOB_BACKEND = get_job_backend(get_settings().JOB_STORE_URL or DB_PATH)
 
 
 def init_db():
-    """Initializes the SQLite job tracking database if it does not already exist."""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute(
-        """
-        CREATE TABLE IF NOT EXISTS jobs (
-            job_id TEXT PRIMARY KEY,
-            status TEXT,
-            created_at TEXT,
-            updated_at TEXT,
-            error TEXT,
-            output_dir TEXT,
-            result_zip_path TEXT
-        )
-        """
-    )
-    conn.commit()
-    conn.close()
+    """Creates or migrates the jobs table (with its queue columns, indexes and archive) if needed."""
+    JOB_BACKEND.init_schema()
 
 
 def update_status_safe(job_id: str, status: str, error: Optional[str] = None, retries: int = 6, backoff: float = 0.25) -> None:
     """
-    Update job status with retries and never raise. Uses its own short-lived connection.
+    Update job status with retries and never raise. With the SQLite backend the job store's writer
+    commits it, batched with any other status or heartbeat writes of this process; returns once it is committed.
     Retries on 'database is locked' and other transient errors.
     """
-    now_ = datetime.now().isoformat()
     attempt = 0
     while True:
         try:
-            conn = sqlite3.connect(DB_PATH, timeout=30)
-            try:
-                conn.execute(
-                    "UPDATE jobs SET status = ?, updated_at = ?, error = ? WHERE job_id = ?",
-                    (status, now_, error, job_id),
-                )
-                conn.commit()
-            finally:
-                conn.close()
+            JOB_BACKEND.update_status(job_id, status, error)
             return
         except Exception as e:
             attempt += 1
@@ -175,12 +238,9 @@ def update_status_safe(job_id: str, status: str, error: Optional[str] = None, re
 
 
 def drop_jobs_table():
-    """Drops SQLite job tracking jobs table if it exists."""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("DROP TABLE IF EXISTS jobs;")
-    conn.commit()
-    conn.close()
+    """Drops SQLite job tracking jobs table if it exists. (Local SQLite job store only.)"""
+    with job_db(DB_PATH) as conn:
+        conn.execute("DROP TABLE IF EXISTS jobs;")
 
 
 # Uncomment to reset DB during development
@@ -189,6 +249,46 @@ def drop_jobs_table():
 # Initialize the database
 init_db()
 
+# Uploads saved next to the staged job files so a re-queued job can reload them
+LUT_UPLOAD_FILENAME = "lut.xlsx"
+GRIDZONE_UPLOAD_STEM = "gridzones"
+
+
+def _start_claimed_job(job: Dict) -> None:
+    """ Submits a job claimed from the jobs table to the worker pool. Called by JOB_DISPATCHER. """
+    job_id = job["job_id"]
+    cancel_event = JOB_EXECUTOR.new_cancel_event()
+    with JOBS_LOCK:
+        RUNNING_JOBS[job_id] = cancel_event
+    try:
+        JOB_EXECUTOR.submit(job_id, run_queued_job, job_id, job["payload"], cancel_event, on_done=_on_job_done)
+    except QueueFullError:
+        # Pool filled up between claim and submit; hand the job back to the queue
+        with JOBS_LOCK:
+            RUNNING_JOBS.pop(job_id, None)
+        JOB_BACKEND.release_job(job_id, JOB_DISPATCHER.owner_id)
+
+
+# Durable queue dispatcher: claims queued rows from the jobs table when a worker is free
+# Archives old finished jobs and deletes their output and temp folders (see _maintenance_loop)
+JOB_RETENTION = JobRetention(
+    backend=JOB_BACKEND,
+    temp_root=UPLOAD_ROOT,
+    max_age_days=get_settings().JOB_RETENTION_DAYS,
+    max_output_bytes=get_settings().JOB_OUTPUT_MAX_MB * 1024 * 1024,
+    logger=app_logger,
+)
+
+JOB_DISPATCHER = JobDispatcher(
+    backend=JOB_BACKEND,
+    executor=JOB_EXECUTOR,
+    start_job=_start_claimed_job,
+    lease_seconds=get_settings().JOB_LEASE_SECONDS,
+    heartbeat_seconds=get_settings().JOB_HEARTBEAT_SECONDS,
+    max_attempts=get_settings().JOB_MAX_ATTEMPTS,
+    logger=app_logger,
+)
+
 
 # --------------------------------------------------------------
 #-------------------- Admin Docs Refresh -----------------------
@@ -264,15 +364,19 @@ def get_survey_types():
 
 @loaders_router.post("/process-async/", response_model=Union[JobQueuedResponse, ErrorResponse])
 async def process_data_async(
-    background_tasks: BackgroundTasks,
     survey_type: SurveyTypeParam = None,
     zip_name: ZipNameParam = None,
     alternate_name_excel_file: Optional[UploadFile] = File(None, description="Excel file with alternate names"),
     gridzone_excel_file: UploadFile = File(..., description="Excel file with Gridzones contained")
 ) -> Union[Dict[str, str], JSONResponse]:
     """
-    Accept files, stage them to temp folder, and queue background processing tasks.
+    Accept files, save them to a temp folder, and queue the job in the jobs table.
     Returns a job_id immediately. All exceptions are returned as JSON.
+    If the same zip, gridzone Excel, LUT and survey config were processed before, the job is
+    completed here with the cached results.zip and "complete" is returned, even when the queue is full.
+    Otherwise returns 429 with a Retry-After header when JOB_QUEUE_SIZE jobs are already waiting.
+    Reading the LUT and the GDB extraction run in the worker as the job's first step, while
+    /status shows "staging".
     Add an optional zip_name to select a .zip file from the server's zip directory for the given survey_type.
 
     Enhancement:
@@ -291,12 +395,12 @@ async def process_data_async(
         # Resolve chosen zip (explicit or newest)
         chosen_zip_name: Optional[ZipNameParam] = zip_name
         if not chosen_zip_name:
-            chosen_zip_name = latest_zip_name_single()
+            chosen_zip_name = await run_in_threadpool(latest_zip_name_single)
             if not chosen_zip_name:
                 return JSONResponse(status_code=400, content={"status": "error", "message": "No .zip files found in SINGLE_ZIP_DIR"})
 
         # Validate existence in the single directory
-        names = set(list_zip_files_single())
+        names = set(await run_in_threadpool(list_zip_files_single))
         if chosen_zip_name not in names:
             return JSONResponse(
                 status_code=422,
@@ -311,57 +415,58 @@ async def process_data_async(
 
         # Create job id and tmp folder
         job_id = str(uuid.uuid4())
-        tmpdir = os.path.join(tempfile.gettempdir(), job_id)
-        os.makedirs(tmpdir, exist_ok=True)
-        now = datetime.now().isoformat()
-
-        # Optional LUT
-        alternate_name_df = None
-        if alternate_name_excel_file is not None:
-            contents = await alternate_name_excel_file.read()
-            alternate_name_df = pd.read_excel(BytesIO(contents), sheet_name=0, engine='openpyxl')
-
-        # Gridzone Excel persisted
-        gridzone_excel_path: FSPath = await save_upload_to_temp_excel(gridzone_excel_file)
-
-        # Extract GDB from selected zip
-        gdb_extract_path = os.path.join(tmpdir, "gdb")
-        with zipfile.ZipFile(chosen_zip_path, "r") as zf:
-            zf.extractall(gdb_extract_path)
-        gdb_dirs = [d for d in os.listdir(gdb_extract_path) if d.lower().endswith(".gdb")]
-        if not gdb_dirs:
-            return JSONResponse(status_code=400, content={"status": "error", "message": f"No .gdb found inside {chosen_zip_name}."})
-        gdb_path = os.path.join(gdb_extract_path, gdb_dirs[0])
+        tmpdir = os.path.join(UPLOAD_ROOT, job_id)
+
+        # Uploads are only readable during the request, so stream them to disk in chunks.
+        # Their sha256 is taken on the way; parsing the LUT and GDB extraction happen in the job's staging step.
+        max_upload_bytes = get_settings().UPLOAD_MAX_MB * 1024 * 1024
+        gridzone_suffix = FSPath(gridzone_excel_file.filename or "").suffix or ".xlsx"
+        try:
+            gridzone_upload = await stream_upload_to_file(
+                gridzone_excel_file, FSPath(tmpdir) / f"{GRIDZONE_UPLOAD_STEM}{gridzone_suffix}", max_upload_bytes
+            )
+            lut_upload = None
+            if alternate_name_excel_file is not None:
+                lut_upload = await stream_upload_to_file(
+                    alternate_name_excel_file, FSPath(tmpdir) / LUT_UPLOAD_FILENAME, max_upload_bytes
+                )
+        except UploadTooLargeError as e:
+            await run_in_threadpool(shutil.rmtree, tmpdir, True)
+            return JSONResponse(status_code=413, content={"status": "error", "message": str(e)})
 
         # Output folder
-        output_dir = os.path.join("output", job_id)
-        os.makedirs(output_dir, exist_ok=True)
-
-        # Record job
-        with sqlite3.connect(DB_PATH) as conn:
-            conn.execute(
-                "INSERT INTO jobs (job_id, status, created_at, updated_at, error, output_dir) VALUES (?, ?, ?, ?, ?, ?)",
-                (job_id, "queued", now, now, None, output_dir),
+        output_dir = _job_output_dir(job_id)
+        payload = {
+            "lut_excel_path": str(lut_upload.path) if lut_upload else None,
+            "gridzone_excel_path": str(gridzone_upload.path),
+            "zip_path": chosen_zip_path,
+            "tmpdir": tmpdir,
+            "output_dir": output_dir,
+            "survey_type": survey_type,   # keep if config resolution still needs it
+            "division_code": division_code,
+        }
+
+        # Identical inputs already processed: hand back that result without queueing anything.
+        # The zip hash is memoized per process, so only a new zip is read here.
+        if get_settings().RESULT_CACHE_ENABLED:
+            zip_sha256 = await run_in_threadpool(hash_file, chosen_zip_path)
+            cache_key = await run_in_threadpool(
+                _job_cache_key, zip_sha256, gridzone_upload.sha256,
+                lut_upload.sha256 if lut_upload else None, survey_type, division_code,
             )
-            conn.commit()
+            hit = await run_in_threadpool(RESULT_CACHE.lookup, cache_key) if cache_key else None
+            if hit and await run_in_threadpool(_complete_job_from_cache, job_id, payload, hit):
+                return {"status": "complete", "job_id": job_id}
+            payload.update(zip_sha256=zip_sha256, cache_key=cache_key)
 
-        # Track cancel
-        cancel_event = Event()
-        with JOBS_LOCK:
-            RUNNING_JOBS[job_id] = cancel_event
+        # Reject if the job queue is full
+        if await run_in_threadpool(JOB_BACKEND.queued_count) >= get_settings().JOB_QUEUE_SIZE:
+            await run_in_threadpool(shutil.rmtree, tmpdir, True)
+            return _queue_full_response(get_settings().JOB_RETRY_AFTER_SECONDS)
 
-        # Queue worker
-        background_tasks.add_task(
-            run_survey_mapper,
-            job_id,
-            alternate_name_df,
-            str(gridzone_excel_path),
-            gdb_path,
-            output_dir,
-            survey_type,   # keep if config resolution still needs it
-            cancel_event,
-            division_code
-        )
+        # Record job in the durable queue; JOB_DISPATCHER hands it to a worker
+        await run_in_threadpool(JOB_BACKEND.enqueue_job, job_id, output_dir, payload)
+        JOB_DISPATCHER.notify()
 
         return {"status": "queued", "job_id": job_id}
 
@@ -370,6 +475,229 @@ async def process_data_async(
         return JSONResponse(status_code=500, content={"status": "error", "message": str(e)})
 
 
+def _job_output_dir(job_id: str) -> str:
+    """
+    Output folder recorded for a new job. With a shared job store it is the absolute folder under OUTPUT_DIR,
+    so the node that runs the job and the nodes that answer /status, /events and /download use the same path.
+    """
+    if uses_shared_job_store(get_settings()):
+        return str((OUTPUT_BASE_DIR / job_id).resolve())
+    return os.path.join("output", job_id)
+
+
+def _stage_job(job_id: str, payload: Dict, cancel_event: Event) -> Optional[Dict]:
+    """
+    First step of a job, run in the worker while the job shows "staging".
+    Reads the LUT, checks the result cache again (an identical job may have finished while this
+    one waited), and checks out the source GDB.
+    Returns the run_survey_mapper arguments, or None when the job already ended here.
+    """
+    output_dir = payload["output_dir"]
+    os.makedirs(output_dir, exist_ok=True)
+    job_logger = build_job_logger(job_id, output_dir)
+    update_status_safe(job_id=job_id, status="staging", error=None)
+    job_logger.info("Staging job inputs")
+
+    try:
+        lut_excel_path = payload.get("lut_excel_path")
+        alternate_name_df = pd.read_excel(lut_excel_path, sheet_name=0, engine="openpyxl") if lut_excel_path else None
+
+        # Key computed when the job was submitted; None when the result cache was off or the inputs cannot be pinned down
+        cache_key = payload.get("cache_key")
+        hit = RESULT_CACHE.lookup(cache_key) if cache_key else None
+        zip_dest = _copy_cached_zip(job_id, output_dir, hit) if hit else None
+        if zip_dest is not None:
+            _complete_from_cache(job_id, output_dir, zip_dest, hit)
+            shutil.rmtree(payload["tmpdir"], ignore_errors=True)
+            return None
+
+        # Identifies the source GDB version for the per-sheet cache
+        source_version = None
+        if get_settings().SHEET_CACHE_ENABLED:
+            source_version = payload.get("zip_sha256") or hash_file(payload["zip_path"])
+
+        if cancel_event.is_set():
+            update_status_safe(job_id=job_id, status="canceled", error="Canceled while staging")
+            job_logger.warning("Cancellation while staging")
+            return None
+
+        # Extract GDB from selected zip, or reuse the copy already extracted for an earlier job
+        gdb_extract_path = os.path.join(payload["tmpdir"], "gdb")
+        os.makedirs(gdb_extract_path, exist_ok=True)
+        if get_settings().GDB_CACHE_ENABLED:
+            gdb_path = GDB_CACHE.checkout(payload["zip_path"], job_id, gdb_extract_path)
+            _evict_gdb_cache()
+        else:
+            with zipfile.ZipFile(payload["zip_path"], "r") as zf:
+                zf.extractall(gdb_extract_path)
+            gdb_dirs = [d for d in os.listdir(gdb_extract_path) if d.lower().endswith(".gdb")]
+            if not gdb_dirs:
+                raise NoGdbInZipError(f"No .gdb found inside {os.path.basename(payload['zip_path'])}.")
+            gdb_path = os.path.join(gdb_extract_path, gdb_dirs[0])
+    except Exception as exc:
+        update_status_safe(job_id=job_id, status="failed", error=f"Staging failed: {exc}")
+        job_logger.exception("Staging failed")
+        return None
+
+    job_logger.info("Staging completed")
+    return {
+        **payload,
+        "alternate_name_df": alternate_name_df,
+        "gdb_path": gdb_path,
+        "cache_key": cache_key,
+        "source_version": source_version,
+    }
+
+
+def _job_cache_key(
+    zip_sha256: str,
+    gridzone_sha256: str,
+    lut_sha256: Optional[str],
+    survey_type: str,
+    division_code: Optional[str],
+) -> Optional[str]:
+    """
+    Result cache key for a job: hashes of the source zip, the gridzone and LUT uploads (taken while
+    they were streamed), the resolved survey config and the RESULT_CACHE_OUTPUT_SETTINGS.
+    Returns None when the inputs cannot be pinned down (LUT read from the database, config not loadable).
+    """
+    if lut_sha256 is None and os.getenv("USE_DATABASE", "false").lower() == "true":
+        return None
+    try:
+        return compute_cache_key(
+            zip=zip_sha256,
+            gridzones=gridzone_sha256,
+            lut=lut_sha256 or "none",
+            config=hash_config(get_config(survey_type).model_dump()),
+            settings=hash_config({name: getattr(get_settings(), name) for name in RESULT_CACHE_OUTPUT_SETTINGS}),
+            division_code=division_code or "",
+        )
+    except Exception as e:
+        app_logger.warning("Result cache key could not be computed: %s", e)
+        return None
+
+
+def _complete_job_from_cache(job_id: str, payload: Dict, hit: Dict) -> bool:
+    """
+    Records a submitted job that matches a result cache entry and completes it at once, in the API process.
+    Returns False, with nothing recorded, when the cached zip is gone (evicted since the lookup).
+    """
+    zip_dest = _copy_cached_zip(job_id, payload["output_dir"], hit)
+    if zip_dest is None:
+        return False
+    JOB_BACKEND.enqueue_job(job_id, payload["output_dir"], payload, status="staging")
+    try:
+        _complete_from_cache(job_id, payload["output_dir"], zip_dest, hit)
+    finally:
+        close_job_logger(logging.getLogger(f"survey_mapper.job.{job_id}"))
+        shutil.rmtree(payload["tmpdir"], ignore_errors=True)
+    return True
+
+
+def _copy_cached_zip(job_id: str, output_dir: str, hit: Dict) -> Optional[FSPath]:
+    """ Puts the cached results.zip of hit in output_dir. Returns its path, or None when the entry was evicted since the lookup. """
+    os.makedirs(output_dir, exist_ok=True)
+    zip_dest = FSPath(output_dir) / RESULTS_ZIP_FILENAME
+    try:
+        try:
+            # Same volume: a hard link costs nothing and the cache entry can still be evicted safely
+            os.link(hit["zip_path"], zip_dest)
+        except OSError:
+            shutil.copy2(hit["zip_path"], zip_dest)
+    except OSError as e:
+        app_logger.warning("Cached result %s could not be copied for job %s, processing it instead: %s", hit.get("key"), job_id, e)
+        return None
+    return zip_dest
+
+
+def _complete_from_cache(job_id: str, output_dir: str, zip_dest: FSPath, hit: Dict) -> None:
+    """ Marks job_id complete with zip_dest, the copy of the cached results.zip in its output_dir. """
+    update_status_safe(job_id=job_id, status="complete", error=None)
+    save_final_zip_location(job_id=job_id, zip_location=str(zip_dest))
+    job_logger = build_job_logger(job_id, output_dir)
+    job_logger.info(f"Inputs match job {hit.get('source_job_id')}; served its cached results.zip without reprocessing")
+    app_logger.info("Job %s served from result cache entry %s", job_id, hit.get("key"))
+
+
+def _store_result_in_cache(cache_key: str, job_id: str, zip_path: str, job_logger: logging.Logger) -> None:
+    """ Adds a finished results.zip to the result cache and trims the cache to its budget. """
+    if RESULT_CACHE.store(cache_key, zip_path, source_job_id=job_id):
+        job_logger.info("Result stored in the job result cache")
+    _evict_result_cache()
+
+
+def _sheet_cache_dir() -> Optional[str]:
+    """ Persistent per-sheet cache folder, or None when the sheet cache is disabled. """
+    if not get_settings().SHEET_CACHE_ENABLED:
+        return None
+    return str(FSPath(get_settings().SHEET_CACHE_DIR or OUTPUT_BASE_DIR / "_sheet_cache").resolve())
+
+
+def _evict_gdb_cache() -> None:
+    """ Trims the extracted-GDB cache, dropping references of jobs that are no longer active. """
+    try:
+        active = JOB_BACKEND.active_job_ids()
+        GDB_CACHE.evict(is_job_active=lambda job_id: job_id in active)
+    except Exception as e:
+        app_logger.warning("GDB cache eviction failed: %s", e)
+
+
+def _evict_result_cache() -> None:
+    try:
+        RESULT_CACHE.evict()
+    except Exception as e:
+        app_logger.warning("Result cache eviction failed: %s", e)
+
+
+def _run_maintenance() -> None:
+    """ Job retention (archive old jobs, delete their folders) and cache eviction. """
+    try:
+        JOB_RETENTION.run_once()
+    except Exception as e:
+        app_logger.warning("Job retention failed: %s", e)
+    _evict_result_cache()
+    _evict_gdb_cache()
+
+
+async def _maintenance_loop() -> None:
+    """ Background task started by lifespan: runs _run_maintenance every JOB_MAINTENANCE_MINUTES. """
+    while True:
+        await run_in_threadpool(_run_maintenance)
+        await asyncio.sleep(max(1, get_settings().JOB_MAINTENANCE_MINUTES) * 60)
+
+
+def _queue_full_response(retry_after: int) -> JSONResponse:
+    """ 429 response telling the client when to retry. """
+    return JSONResponse(
+        status_code=429,
+        content={"status": "error", "message": f"Job queue is full. Retry after {retry_after} seconds."},
+        headers={"Retry-After": str(retry_after)},
+    )
+
+
+def _on_job_done(job_id: str, exc: Optional[BaseException]) -> None:
+    """
+    Called in the API process when a job leaves the worker pool.
+    run_survey_mapper records its own final status, so exc is only set when the
+    worker itself failed (e.g. the process crashed). Such jobs go back on the queue
+    until JOB_MAX_ATTEMPTS is used up.
+    """
+    with JOBS_LOCK:
+        RUNNING_JOBS.pop(job_id, None)
+    try:
+        new_status = None
+        if exc is not None:
+            new_status = JOB_BACKEND.requeue_or_fail(job_id, f"Worker process failed: {exc!r}", get_settings().JOB_MAX_ATTEMPTS)
+            app_logger.error("Job %s failed in the worker pool: %r -> %s", job_id, exc, new_status)
+        else:
+            JOB_BACKEND.release_job(job_id, JOB_DISPATCHER.owner_id)
+        # A re-queued job still needs its extracted GDB
+        if new_status != "queued":
+            GDB_CACHE.release(job_id)
+    finally:
+        # A worker is free again
+        JOB_DISPATCHER.notify()
+
 # -------------------- Survey Loaders --------------------------
 # --------------------------------------------------------------
 
@@ -387,7 +715,7 @@ def download_zip(job_id: str):
         raise HTTPException(status_code=400, detail="Invalid job id")
 
     zip_path = OUTPUT_BASE_DIR / job_id / RESULTS_ZIP_FILENAME
-    if not zip_path:
+    if not zip_path.is_file():
         raise HTTPException(status_code=404, detail="ZIP file not found")
 
     media_type = mimetypes.guess_type(str(zip_path))[0] or "application/octet-stream"
@@ -406,24 +734,41 @@ def download_zip(job_id: str):
 # -------------------- Survey Status Checks --------------------
 @status_router.get("/status-all", response_model=List[JobStatus])
 def get_all_jobs(
+    response: Response,
     level: LogLevelFilter = Query(LogLevelFilter.all, description="Filter logs by level"),
+    limit: int = Query(STATUS_PAGE_DEFAULT, ge=1, le=STATUS_PAGE_MAX, description="Jobs per page, newest first"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header value of the previous page"),
+    status: Optional[List[str]] = Query(None, description="Only jobs with these statuses"),
+    created_from: Optional[datetime] = Query(None, description="Only jobs created at or after this time"),
+    created_to: Optional[datetime] = Query(None, description="Only jobs created before this time"),
+    summary: bool = Query(False, description="Return log counts per level instead of the log entries"),
+    stage: Optional[str] = Query(None, description="Only log entries of this stage, e.g. clip (JSON lines logs only)"),
+    feature_class: Optional[str] = Query(None, description="Only log entries for this feature class (JSON lines logs only)"),
 ) -> Union[List[JobStatus], JSONResponse]:
-    """ Return all jobs and statuses. """
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("SELECT job_id, status, created_at, updated_at, error, output_dir FROM jobs ORDER BY created_at DESC")
-    rows = cursor.fetchall()
-    conn.close()
+    """
+    Return jobs and statuses, newest first, one page at a time.
+    When more jobs match, the X-Next-Cursor response header holds the cursor for the next page.
+    With summary=true and no stage or feature_class filter, the log counts come from the job's log
+    index without loading any log entry.
+    """
+    rows = list_jobs_page(JOB_BACKEND, response, limit, cursor, status, created_from, created_to)
+    if isinstance(rows, JSONResponse):
+        return rows
 
-    logs_summary_filtered: Optional[LogsByLevel] = None
-    # filename = None
-    results_download_filepath = None
+    counts_only = summary and not stage and not feature_class
     results: List[JobStatus] = []
-    for job_id, status, created_at, updated_at, error, output_dir in rows:
+    for job in rows:
+        job_id, status_, created_at, updated_at, error, output_dir = (job[f] for f in JOB_FIELDS)
+        logs_summary_filtered: Optional[LogsByLevel] = None
+        logs_counts: Optional[LogCounts] = None
+        results_download_filepath = None
         if output_dir:
             try:
-                logs_all: LogsByLevel = collect_logs_grouped_all(output_dir)
-                logs_summary_filtered = filter_logs_by_level(logs_all, level)
+                if counts_only:
+                    logs_counts = filter_log_counts_by_level(count_logs_grouped_all(output_dir), level)
+                else:
+                    logs_all: LogsByLevel = collect_logs_grouped_all(output_dir)
+                    logs_summary_filtered = filter_logs_by_fields(filter_logs_by_level(logs_all, level), stage, feature_class)
                 results_download_filepath = f"/{output_dir}/{RESULTS_ZIP_FILENAME}"
             except Exception as e:
                 # Keep endpoint resilient - return a note rather than failing the request
@@ -433,21 +778,23 @@ def get_all_jobs(
                     pass
                 logs_summary_filtered = LogsByLevel(info=[], warning=[], error=[], note=f"Log collection error: {e}")
 
-
-        # results_download_file = None
-        # if status == "complete" and results_download_filepath is not None and FSPath(results_download_filepath).exists():
-        #     results_download_file = FileResponse(path=results_download_filepath, filename=filename, media_type="application/octet-stream")
+        if summary and logs_summary_filtered is not None:
+            logs_counts = LogCounts(
+                info=len(logs_summary_filtered.info),
+                warning=len(logs_summary_filtered.warning),
+                error=len(logs_summary_filtered.error),
+            )
 
         item: JobStatus = JobStatus(
             job_id=job_id,
-            status=status,
+            status=status_,
             created_at=created_at,
             updated_at=updated_at,
             error=error or None,
-            download_url=results_download_filepath if status == "complete" else None,
-            # download_url=results_download_file,
+            download_url=results_download_filepath if status_ == "complete" else None,
             # Preserve original behavior of hiding logs when there is no output_dir
-            logs_summary=logs_summary_filtered if output_dir else None,            
+            logs_summary=logs_summary_filtered if output_dir and not summary else None,
+            logs_counts=logs_counts,
         )
 
         results.append(item)
@@ -459,19 +806,19 @@ def get_all_jobs(
 def get_job_status(
     job_id: str,
     level: LogLevelFilter = Query(LogLevelFilter.all, description="Filter logs by level"),
+    stage: Optional[str] = Query(None, description="Only log entries of this stage, e.g. clip (JSON lines logs only)"),
+    feature_class: Optional[str] = Query(None, description="Only log entries for this feature class (JSON lines logs only)"),
 ) -> Union[JobStatus, JSONResponse]:
     """Return status and details for a specific job_id, with logs grouped and filtered by level."""
 
-    with sqlite3.connect(DB_PATH) as conn:
-        row = conn.execute(
-            "SELECT status, created_at, updated_at, error, output_dir FROM jobs WHERE job_id = ?",
-            (job_id,)
-        ).fetchone()
-
-    if not row:
+    # Jobs archived by job retention come back without output_dir: their folders are gone
+    job = JOB_BACKEND.get_job(job_id, include_archive=True)
+    if not job:
         raise HTTPException(status_code=404, detail={"status": "error", "message": "Job ID not found"})
 
-    status, created_at, updated_at, error_text, output_dir = row
+    status, created_at, updated_at, error_text, output_dir = (
+        job["status"], job["created_at"], job["updated_at"], job["error"], job["output_dir"]
+    )
 
     logs_summary_filtered: Optional[LogsByLevel] = None
     # filename = None
@@ -479,7 +826,7 @@ def get_job_status(
     if output_dir:
         try:
             logs_all: LogsByLevel = collect_logs_grouped_all(output_dir)
-            logs_summary_filtered = filter_logs_by_level(logs_all, level)
+            logs_summary_filtered = filter_logs_by_fields(filter_logs_by_level(logs_all, level), stage, feature_class)
             results_download_filepath = f"/{output_dir}/{RESULTS_ZIP_FILENAME}"
         except Exception as e:
             # Keep endpoint resilient - return a note rather than failing the request
@@ -507,6 +854,87 @@ def get_job_status(
     return resp
 
 
+@status_router.get("/events/{job_id}")
+async def stream_job_events(
+    job_id: str,
+    request: Request,
+    offset: Optional[int] = Query(None, ge=0, description="Resume after this event id. The Last-Event-ID header works too."),
+) -> StreamingResponse:
+    """
+    Server-Sent Events stream for one job: status changes, progress ("sheets", "clips", "export", "job")
+    and log lines as the job writes them. Event ids are byte offsets into the job's event log, so a client
+    reconnecting with Last-Event-ID (or ?offset=) resumes where it stopped.
+    The stream ends with an "end" event once the job has finished and every event was sent.
+    """
+    row = await run_in_threadpool(_job_status_row, job_id)
+    if not row:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    start = offset
+    if start is None:
+        try:
+            start = max(0, int(request.headers.get("last-event-id", 0)))
+        except ValueError:
+            start = 0
+
+    return StreamingResponse(
+        _job_event_stream(job_id, row[1], start, request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-store", "X-Accel-Buffering": "no"},
+    )
+
+
+def _job_status_row(job_id: str) -> Optional[Tuple[str, str]]:
+    """ (status, output_dir) of a job, or None if it is unknown. """
+    job = JOB_BACKEND.get_job(job_id)
+    return (job["status"], job["output_dir"]) if job else None
+
+
+def _sse(event: str, data: Dict, event_id: int) -> str:
+    return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def _job_event_stream(job_id: str, output_dir: str, offset: int, request: Request):
+    """
+    Yields SSE messages for a job until it finishes or the client goes away.
+    Each yield waits for the client to take the previous message, and the event log is read in
+    bounded pieces, so a slow client only slows its own stream.
+    """
+    path = events_path(output_dir or "")
+    last_status: Optional[str] = None
+    finished_polls = 0
+    last_sent = time.monotonic()
+    while True:
+        if await request.is_disconnected():
+            return
+
+        row = await run_in_threadpool(_job_status_row, job_id)
+        status = row[0] if row else None
+        if status != last_status:
+            last_status = status
+            last_sent = time.monotonic()
+            yield _sse("status", {"job_id": job_id, "status": status}, offset)
+
+        events, offset = await run_in_threadpool(read_events, path, offset)
+        for event_offset, event in events:
+            yield _sse(event.get("type", "message"), event, event_offset)
+        if events:
+            last_sent = time.monotonic()
+            continue  # more may be waiting; read again before sleeping
+
+        if status is None or status in FINISHED_STATUSES:
+            # One more poll after the job finishes picks up its last log lines
+            finished_polls += 1
+            if finished_polls > 1:
+                yield _sse("end", {"job_id": job_id, "status": status}, offset)
+                return
+
+        if time.monotonic() - last_sent >= EVENTS_HEARTBEAT_SECONDS:
+            last_sent = time.monotonic()
+            yield ": keep-alive\n\n"
+        await asyncio.sleep(EVENTS_POLL_SECONDS)
+
+
 @status_router.post("/cancel/{job_id}")
 def cancel_job(job_id: str) -> Dict[str, str]:
     """Signal a running or queued job to cancel. Returns 404 if the job is unknown."""
@@ -514,20 +942,17 @@ def cancel_job(job_id: str) -> Dict[str, str]:
         evnt = RUNNING_JOBS.get(job_id)
 
     if evnt is None:
+        # Still waiting in the queue - cancel it before a worker claims it
+        if JOB_BACKEND.cancel_queued_job(job_id):
+            return {"job_id": job_id, "status": "canceled", "message": "Queued job canceled"}
+
         # Job may be finished or unknown; reflect current DB state if present
-        with sqlite3.connect(DB_PATH) as conn:
-            row = conn.execute("SELECT status FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
-        if not row:
+        job = JOB_BACKEND.get_job(job_id)
+        if not job:
             raise HTTPException(status_code=404, detail="Job not found")
-        return {"job_id": job_id, "status": row[0], "message": "Job not running; no cancel needed"}
+        return {"job_id": job_id, "status": job["status"], "message": "Job not running; no cancel needed"}
 
-    now_ = datetime.now().isoformat()
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.execute(
-            "UPDATE jobs SET status = ?, updated_at = ? WHERE job_id = ? AND status IN ('queued','processing')",
-            ("cancelling", now_, job_id),
-        )
-        conn.commit()
+    JOB_BACKEND.mark_cancelling([job_id])
 
     evnt.set()
     return {"job_id": job_id, "status": "cancelling", "message": "Cancellation requested"}
@@ -544,12 +969,7 @@ def save_final_zip_location(job_id: str, zip_location: str) -> Dict[str, str]:
     Adjust column names if yours differ.
     """
     # 1) Check whether the job is known in DB
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.row_factory = sqlite3.Row
-        row = conn.execute(
-            "SELECT job_id, status, output_dir FROM jobs WHERE job_id = ?",
-            (job_id,),
-        ).fetchone()
+    row = JOB_BACKEND.get_job(job_id)
 
     if not row:
         raise HTTPException(status_code=404, detail="Job not found")
@@ -562,7 +982,7 @@ def save_final_zip_location(job_id: str, zip_location: str) -> Dict[str, str]:
     with JOBS_LOCK:
         running_ev = RUNNING_JOBS.get(job_id)
 
-    if running_ev is not None and status in ("queued", "processing", "cancelling"):
+    if running_ev is not None and status in ("queued", "staging", "processing", "cancelling"):
         raise HTTPException(status_code=409, detail="Job is not finished yet")
 
     # 3) Resolve the source ZIP
@@ -582,19 +1002,8 @@ def save_final_zip_location(job_id: str, zip_location: str) -> Dict[str, str]:
     dest_zip = FSPath(src_zip)
 
     # 7) Update DB
-    now_ = datetime.now().isoformat()
-    with sqlite3.connect(DB_PATH) as conn:
-        # If you track delivered_at or an output_zip_path, update them here
-        conn.execute(
-            """
-            UPDATE jobs
-               SET result_zip_path = ?,
-                   updated_at = ?
-             WHERE job_id = ?
-            """,
-            (str(dest_zip), now_, job_id),
-        )
-        conn.commit()
+    # If you track delivered_at or an output_zip_path, update them here
+    JOB_BACKEND.set_result_zip_path(job_id, str(dest_zip))
 
     return {
         "job_id": job_id,
@@ -608,22 +1017,18 @@ def save_final_zip_location(job_id: str, zip_location: str) -> Dict[str, str]:
 @status_router.post("/cancel-all")
 def cancel_all_jobs() -> Dict[str, Union[str, int, List[str]]]:
     """Signal all running or queued jobs to cancel."""
-    cancelled: List[str] = []
+    # Jobs still waiting in the queue are cancelled outright
+    cancelled: List[str] = JOB_BACKEND.cancel_all_queued_jobs()
+    running: List[str] = []
     with JOBS_LOCK:
         ids = list(RUNNING_JOBS.keys())
         for jid in ids:
             RUNNING_JOBS[jid].set()
-            cancelled.append(jid)
-
-    now_ = datetime.now().isoformat()
-    if cancelled:
-        with sqlite3.connect(DB_PATH) as conn:
-            for jid in cancelled:
-                conn.execute(
-                    "UPDATE jobs SET status = ?, updated_at = ? WHERE job_id = ? AND status IN ('queued','processing')",
-                    ("cancelling", now_, jid),
-                )
-            conn.commit()
+            running.append(jid)
+    cancelled.extend(running)
+
+    if running:
+        JOB_BACKEND.mark_cancelling(running)
 
     return {"status": "ok", "count": len(cancelled), "job_ids": cancelled}
 
@@ -635,6 +1040,54 @@ def health_check() -> Dict[str, str]:
 # -------------------- Survey Status Checks --------------------
 # --------------------------------------------------------------
 
+def _manifest_result_files(results_dir: FSPath, job_logger: logging.Logger) -> Optional[List[str]]:
+    """ Files listed in the export manifest of results_dir, or None to zip whatever is in the folder. """
+    manifest_path = results_dir / MANIFEST_FILENAME
+    if not manifest_path.exists():
+        return None
+    try:
+        return list(ExportManifest.load(str(manifest_path)).iter_results(str(results_dir)))
+    except Exception as e:
+        job_logger.warning("Could not read export manifest %s, zipping the whole folder: %s", manifest_path, e)
+        return None
+
+
+def run_queued_job(job_id: str, payload: Dict, cancel_event: Event) -> None:
+    """
+    Worker pool entry point for a job claimed from the jobs table.
+    Stages the inputs (see _stage_job), then runs run_survey_mapper with them.
+    """
+    # The job may have been cancelled between the claim and the worker starting.
+    # Record the final status here: _on_job_done only releases the lease, so nothing else would.
+    job = JOB_BACKEND.get_job(job_id)
+    if job and job["status"] == "cancelling":
+        update_status_safe(job_id=job_id, status="canceled", error="Canceled before the job started")
+        return
+    if job and job["status"] not in ("queued", "staging", "processing"):
+        return
+
+    try:
+        payload = _stage_job(job_id, payload, cancel_event)
+        if payload is None:
+            return
+
+        run_survey_mapper(
+            job_id,
+            payload["alternate_name_df"],
+            payload["gridzone_excel_path"],
+            payload["gdb_path"],
+            payload["output_dir"],
+            payload["survey_type"],
+            cancel_event,
+            payload.get("division_code"),
+            payload.get("cache_key"),
+            payload.get("source_version"),
+        )
+    finally:
+        # Worker processes outlive jobs: stop this job's log listener thread and close its files
+        close_job_logger(logging.getLogger(f"survey_mapper.job.{job_id}"))
+
+
 def run_survey_mapper(
     job_id: str,
     alternate_name_df: Union[pd.DataFrame, None],
@@ -643,27 +1096,40 @@ def run_survey_mapper(
     output_dir: str,
     survey_type: SurveyTypeParam,
     cancel_event: Event,
-    division_code: Union[str,None] = None
+    division_code: Union[str,None] = None,
+    cache_key: Optional[str] = None,
+    source_version: Optional[str] = None
 ) -> None:
     """
-    Background task. Calls GeoInfo Processor and custom tool methods which return result dicts.
+    Worker pool task. Calls GeoInfo Processor and custom tool methods which return result dicts.
     Job is marked failed if any step returns failed, False, or throws.
+    Runs in a JOB_EXECUTOR worker process, so every argument must be picklable.
     """
     job_logger = build_job_logger(job_id, output_dir)
 
+    # Mirror job log records and progress into the job's event log for /events/{job_id}
+    events = JobEventWriter(output_dir)
+    events_handler = JobEventLogHandler(events)
+    add_job_log_handler(job_logger, events_handler)
+
     # Discover the current log file path used by build_job_logger
     logs_dir = FSPath(output_dir) / "logs"
     latest_log = max(logs_dir.glob("log_*.txt"), key=lambda p: p.stat().st_mtime, default=None)
 
     # Initialize the fail fast logger to abort processing if any errors.
     watcher = FailFastLogWatcher(latest_log, poll_file=True)
-    job_logger.addHandler(watcher)
+    add_job_log_handler(job_logger, watcher)
 
     def _abort_if_error(prefix: str = "") -> bool:
         """ Check if any error are in the watched log files and abort processing. """
+        # The watcher and the log file are fed by the logger's listener thread; catch up first
+        flush_job_logger(job_logger)
         watcher.scan_file_once()
         if watcher.error_message:
             msg = f"{prefix}Fail-fast due to error in logs: {watcher.error_message}"
+            codes = [f"ERROR {e.code} ({e.file}:{e.line})" for e in watcher.arcgis_errors[:5]]
+            if codes:
+                msg = f"{msg} [ArcGIS: {', '.join(codes)}]"
             update_status_safe(job_id=job_id, status="failed", error=msg)
             job_logger.error(msg)
             return True
@@ -729,7 +1195,16 @@ def run_survey_mapper(
             gridzone_excel_path=gridzone_excel_path,
             logger=job_logger,
             alternate_name_df=alternate_name_df,
-            config_dict=cfg_dict
+            config_dict=cfg_dict,
+            sheet_workers=get_settings().SHEET_WORKERS,
+            clip_workers=get_settings().CLIP_WORKERS,
+            sheet_cache_dir=_sheet_cache_dir(),
+            sheet_cache_max_age_hours=get_settings().SHEET_CACHE_MAX_AGE_HOURS,
+            source_version=source_version,
+            progress=events.progress,
+            compact_json=get_settings().EXPORT_JSON_COMPACT,
+            export_workers=get_settings().EXPORT_WORKERS,
+            attribute_reader=get_settings().EXPORT_ATTRIBUTE_READER
         )
 
         # Step 1 - grid and clipping
@@ -739,6 +1214,7 @@ def run_survey_mapper(
             return
 
         job_logger.info("Step 1: process grid and clipping - start")
+        events.progress("job", 1, 3, "grid and clipping")
         step1 = processor._process_grid_sheet()
 
         # if _abort_if_error("after step1: "): return
@@ -763,6 +1239,7 @@ def run_survey_mapper(
             return
 
         job_logger.info("Step 2: export feature collections - start")
+        events.progress("job", 2, 3, "export feature collections")
         step2 = processor.export_feature_collections(input_folder=export_input_folder)
         if not isinstance(step2, dict):
             update_status_safe(job_id=job_id, status="failed", error="Internal error - export_feature_collections did not return a dict")
@@ -791,6 +1268,7 @@ def run_survey_mapper(
         output_base = FSPath(f"{output_dir}/{RESULTS_ZIP_FOLDER}")
         zip_dest = FSPath(f"{output_dir}/{RESULTS_ZIP_FILENAME}")
         job_logger.info("Step 3: zipping output from '%s' to '%s'", output_base, str(zip_dest))
+        events.progress("job", 3, 3, "zip results")
         
         if _abort_if_error("before zip: "): return
         try:
@@ -798,7 +1276,12 @@ def run_survey_mapper(
             job_logger.info("Clearing caches before zipping")
             helpers.clear_locks()
 
-            zip_directory(str(output_base), zip_dest)
+            zip_directory(
+                str(output_base),
+                zip_dest,
+                files=_manifest_result_files(output_base, job_logger),
+                include_exts=result_extensions(survey_output_format(cfg_dict)),
+            )
             job_logger.info("Zipping output completed: %s", str(zip_dest))
 
         except Exception as xc:
@@ -810,6 +1293,8 @@ def run_survey_mapper(
         job_logger.info("Zipping completed")
         update_status_safe(job_id=job_id, status="complete", error=None)
         save_final_zip_location(job_id=job_id, zip_location=str(zip_dest))
+        if cache_key:
+            _store_result_in_cache(cache_key, job_id, str(zip_dest), job_logger)
         job_logger.info("Job completed successfully")
 
     except Exception as exc:
@@ -819,6 +1304,10 @@ def run_survey_mapper(
         with JOBS_LOCK:
             RUNNING_JOBS.pop(job_id, None)
         job_logger.info("Job finalizer finished")
+        # Flush on completion so the log files, status readers and event stream see every record
+        remove_job_log_handler(job_logger, events_handler)
+        remove_job_log_handler(job_logger, watcher)
+        events.close()
 
 
 
@@ -1,30 +1,101 @@
+import hashlib
 import tempfile
 from pathlib import Path as FSPath
 import zipfile
 import os
 from pathlib import Path as FSPath
+from typing import Iterable, NamedTuple, Optional, Sequence
 from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+from app.api.survey_audit.feature_collection_formats import FEATURE_COLLECTION_EXTS
 
-async def save_upload_to_temp_excel(upload: UploadFile) -> FSPath:
+# Uploads are copied to disk in pieces of this size, so memory use does not grow with the file
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+# Files zipped by zip_directory when no include_exts are given
+DEFAULT_INCLUDE_EXTS = ('.lpkx', '.json', '.geodatabase', '.csv', '.txt')
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload is larger than the allowed maximum size."""
+
+
+class SavedUpload(NamedTuple):
+    path: FSPath
+    sha256: str
+    size: int
+
+
+async def stream_upload_to_file(
+    upload: UploadFile,
+    dest_path: FSPath,
+    max_bytes: Optional[int] = None,
+    chunk_size: int = UPLOAD_CHUNK_BYTES,
+) -> SavedUpload:
+    """ Copies an upload to dest_path in chunks, hashing it on the way.
+        Raises UploadTooLargeError (and removes the partial file) once more than max_bytes arrive.
+    """
+    dest_path = FSPath(dest_path)
+    if max_bytes is not None and upload.size is not None and upload.size > max_bytes:
+        raise UploadTooLargeError(f"{upload.filename} is larger than the {max_bytes // (1024 * 1024)} MB upload limit")
+
+    def _open():
+        dest_path.parent.mkdir(parents=True, exist_ok=True)
+        return open(dest_path, "wb")
+
+    h = hashlib.sha256()
+    size = 0
+
+    def _write(chunk: bytes) -> None:
+        h.update(chunk)
+        f.write(chunk)
+
+    # Disk writes run in the thread pool so the event loop keeps serving requests
+    f = await run_in_threadpool(_open)
+    try:
+        while True:
+            chunk = await upload.read(chunk_size)
+            if not chunk:
+                break
+            size += len(chunk)
+            if max_bytes is not None and size > max_bytes:
+                raise UploadTooLargeError(f"{upload.filename} is larger than the {max_bytes // (1024 * 1024)} MB upload limit")
+            await run_in_threadpool(_write, chunk)
+    except BaseException:
+        f.close()
+        dest_path.unlink(missing_ok=True)
+        raise
+    await run_in_threadpool(f.close)
+    return SavedUpload(dest_path, h.hexdigest(), size)
+
+
+async def save_upload_to_temp_excel(upload: UploadFile, max_bytes: Optional[int] = None) -> FSPath:
     """ Saves an uploaded Excel file to a temporary directory and returns the path.
         The file is saved with its original extension or .xlsx if no extension is provided.
     """
     suffix = FSPath(upload.filename).suffix or ".xlsx"  # type: ignore
-    temp_dir = FSPath(tempfile.mkdtemp(prefix="excel_upload_"))
-    temp_path = temp_dir / f"uploaded_excel{suffix}"
-    contents = await upload.read()
-    with open(temp_path, "wb") as f:
-        f.write(contents)
-    return temp_path
+    temp_dir = FSPath(await run_in_threadpool(tempfile.mkdtemp, prefix="excel_upload_"))
+    saved = await stream_upload_to_file(upload, temp_dir / f"uploaded_excel{suffix}", max_bytes)
+    return saved.path
 
 
-def zip_directory(src_dir: str, dest_zip: FSPath) -> FSPath:
+def zip_directory(
+    src_dir: str,
+    dest_zip: FSPath,
+    files: Optional[Iterable[str]] = None,
+    include_exts: Optional[Sequence[str]] = None
+) -> FSPath:
     """ Zips the contents of src_dir into a zip file at dest_zip.
-        Creates parent directories if they do not exist."""
+        Creates parent directories if they do not exist.
+        files (paths relative to src_dir, e.g. from the export manifest) are zipped instead of walking src_dir.
+        include_exts are the name endings of the files to zip, e.g. result_extensions() of the survey's
+        Feature Collection format; defaults to DEFAULT_INCLUDE_EXTS."""
     
+    # Feature Collections of these layers are left out, whatever their format
     excluded_shp_files = [
-        'NullRiser.json',
-        'InactiveRiser.json'
+        f"{layer}{ext}"
+        for layer in ('NullRiser', 'InactiveRiser')
+        for ext in FEATURE_COLLECTION_EXTS
     ]
 
     # # Assebmle a list of all filenames that end with '.lpkx' in the source directory
@@ -34,20 +105,33 @@ def zip_directory(src_dir: str, dest_zip: FSPath) -> FSPath:
     #         if name.endswith('.lpkx'):
     #             annotation_layer_names.append(name)
 
-    include_exts = ('.lpkx', '.json', '.geodatabase', '.csv', '.txt')  # only these
+    include_exts = tuple(ext.lower() for ext in (include_exts or DEFAULT_INCLUDE_EXTS))  # only these
+
+    if files is None:
+        files = (
+            os.path.relpath(os.path.join(root, name), src_dir)
+            for root, _, names in os.walk(src_dir)
+            for name in names
+        )
 
     dest_zip.parent.mkdir(parents=True, exist_ok=True)
     with zipfile.ZipFile(dest_zip, "w", compression=zipfile.ZIP_DEFLATED, allowZip64=True) as zf:
-        for root, dirs, files in os.walk(src_dir):
-            for name in files:
-                # Exclude files in excluded_files list
-                if name in excluded_shp_files:
-                    continue
-                # include only .lpkx, .json, .geodatabase
-                if not name.lower().endswith(include_exts):
-                    continue
-                abs_path = FSPath(root) / name
-                rel_path = os.path.relpath(abs_path, src_dir)
-                print(f"Zipping rel path: {rel_path} and abs path: {abs_path}")
-                zf.write(abs_path, arcname=str(rel_path))
+        for rel_path in files:
+            name = os.path.basename(rel_path)
+            # Exclude files in excluded_files list
+            if name in excluded_shp_files:
+                continue
+            # include only .lpkx, .json, .geodatabase, ...
+            if not name.lower().endswith(include_exts):
+                continue
+            # Only files inside src_dir
+            if os.path.isabs(rel_path) or rel_path.replace("\\", "/").startswith("../"):
+                continue
+            abs_path = FSPath(src_dir) / rel_path
+            if not abs_path.is_file():
+                continue
+            print(f"Zipping rel path: {rel_path} and abs path: {abs_path}")
+            # Compressing .gz files again only costs time
+            compress_type = zipfile.ZIP_STORED if name.lower().endswith(".gz") else zipfile.ZIP_DEFLATED
+            zf.write(abs_path, arcname=str(rel_path), compress_type=compress_type)
     return dest_zip
\ No newline at end of file
@@ -0,0 +1,61 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+
+from app.job_management.job_backend import JobBackend
+
+# /status-all page sizes
+STATUS_PAGE_DEFAULT = 100
+STATUS_PAGE_MAX = 1000
+
+
+def encode_status_cursor(created_at: str, job_id: str) -> str:
+    """ Opaque /status-all cursor pointing just past (created_at, job_id). """
+    return base64.urlsafe_b64encode(json.dumps([created_at, job_id]).encode("utf-8")).decode("ascii")
+
+
+def decode_status_cursor(cursor: str) -> Tuple[str, str]:
+    """ Inverse of encode_status_cursor. Raises ValueError on a malformed cursor. """
+    try:
+        created_at, job_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    return str(created_at), str(job_id)
+
+
+def list_jobs_page(
+    backend: JobBackend,
+    response: Response,
+    limit: int,
+    cursor: Optional[str] = None,
+    statuses: Optional[Sequence[str]] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+) -> Union[List[Dict[str, Any]], JSONResponse]:
+    """
+    One /status-all page of jobs, newest first. One row more than limit is read to find out whether
+    another page follows; if so, its cursor is set as the X-Next-Cursor header of response.
+    Returns a 400 response for a cursor that was not made by encode_status_cursor.
+    """
+    before: Optional[Tuple[str, str]] = None
+    if cursor:
+        try:
+            before = decode_status_cursor(cursor)
+        except ValueError:
+            return JSONResponse(status_code=400, content={"status": "error", "message": "Invalid cursor"})
+
+    rows = backend.list_jobs(
+        statuses=statuses,
+        created_from=created_from.isoformat() if created_from else None,
+        created_to=created_to.isoformat() if created_to else None,
+        before=before,
+        limit=limit + 1,
+    )
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = encode_status_cursor(rows[-1]["created_at"], rows[-1]["job_id"])
+    return rows
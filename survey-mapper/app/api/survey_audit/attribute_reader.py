@@ -0,0 +1,193 @@
+"""
+Attribute readers for the Feature Collection export.
+
+process_shapefile reads geometry with a SearchCursor and the attributes from an AttributeReader, which
+yields (oid, attributes) in cursor (OID) order.
+
+* NumPyAttributeReader pulls the attributes in bulk, a chunk of rows at a time, with
+  arcpy.da.FeatureClassToNumPyArray. Dates and nulls are converted a column at a time.
+* CursorAttributeReader is the pure-Python stand-in: one SearchCursor row at a time, as the export
+  used to do. It is used when a layer cannot be read into NumPy (e.g. GUID or blob fields).
+"""
+import datetime
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import arcpy
+import numpy as np
+
+# Names accepted by get_attribute_reader
+ATTRIBUTE_READERS: Sequence[str] = ("numpy", "cursor")
+
+# Rows per FeatureClassToNumPyArray call; bounds the memory held for attributes
+NUMPY_CHUNK_ROWS = 50_000
+
+# FeatureClassToNumPyArray cannot return nulls; these stand in for them and are turned back into None
+INT_NULL = np.iinfo(np.int32).min
+STR_NULL = "\x00"
+DATE_NULL = datetime.datetime(1, 1, 1)
+
+_INT_TYPES = ("Integer", "SmallInteger", "OID", "BigInteger")
+_FLOAT_TYPES = ("Double", "Single")
+_DATE_TYPES = ("Date",)
+
+
+class AttributeReaderError(RuntimeError):
+    """Raised when a reader cannot read a layer; the export falls back to CursorAttributeReader."""
+
+
+def epoch_millis(val: Any) -> int:
+    """ Milliseconds since 1970 of a date/datetime, as ArcGIS JSON stores dates. Naive values are local time. """
+    if not isinstance(val, datetime.datetime):
+        val = datetime.datetime(val.year, val.month, val.day)
+    try:
+        return int(val.timestamp() * 1000)
+    except (OSError, ValueError, OverflowError):
+        epoch = datetime.datetime(1970, 1, 1)
+        delta = val - epoch
+        return int(delta.total_seconds() * 1000)
+
+
+class AttributeReader(ABC):
+    """ Reads the attribute columns of a layer. field_types maps each field name to its arcpy field type. """
+
+    @abstractmethod
+    def iter_attributes(self, input_fc: str, field_types: Dict[str, str]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """ (oid, {field: value}) per row in OID order, dates as epoch milliseconds. """
+
+
+class CursorAttributeReader(AttributeReader):
+    """
+    One SearchCursor row at a time, converting values one by one.
+
+    Args:
+        search_cursor (Callable, optional): SearchCursor factory. Defaults to arcpy.da.SearchCursor.
+    """
+
+    def __init__(self, search_cursor: Optional[Callable[..., Any]] = None) -> None:
+        self.search_cursor = search_cursor
+
+    def iter_attributes(self, input_fc: str, field_types: Dict[str, str]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        names = list(field_types)
+        search_cursor = self.search_cursor or arcpy.da.SearchCursor
+        with search_cursor(input_fc, ["OID@"] + names) as cursor:
+            for row in cursor:
+                attr = {}
+                for name, val in zip(names, row[1:]):
+                    if isinstance(val, (datetime.date, datetime.datetime)):
+                        attr[name] = epoch_millis(val)
+                    else:
+                        attr[name] = val
+                yield row[0], attr
+
+
+class NumPyAttributeReader(AttributeReader):
+    """
+    Bulk reads with FeatureClassToNumPyArray, NUMPY_CHUNK_ROWS rows per call (selected by OID range).
+
+    Args:
+        to_numpy (Callable, optional): FeatureClassToNumPyArray-style function. Defaults to arcpy's.
+        chunk_rows (int): Rows read per call.
+    """
+
+    def __init__(self, to_numpy: Optional[Callable[..., np.ndarray]] = None, chunk_rows: int = NUMPY_CHUNK_ROWS) -> None:
+        self.to_numpy = to_numpy
+        self.chunk_rows = max(1, int(chunk_rows))
+
+    def iter_attributes(self, input_fc: str, field_types: Dict[str, str]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        to_numpy = self.to_numpy or arcpy.da.FeatureClassToNumPyArray
+        names = list(field_types)
+        null_values = {}
+        for name, kind in field_types.items():
+            if _null_value(kind) is not None:
+                null_values[name] = _null_value(kind)
+        try:
+            oids = np.sort(to_numpy(input_fc, ["OID@"])["OID@"])
+            oid_field = _oid_field_name(input_fc, field_types)
+        except Exception as e:
+            raise AttributeReaderError(f"Could not read object ids of {input_fc}: {e}") from e
+
+        for start in range(0, len(oids), self.chunk_rows):
+            low = int(oids[start])
+            high = int(oids[min(start + self.chunk_rows, len(oids)) - 1])
+            try:
+                arr = to_numpy(
+                    input_fc,
+                    ["OID@"] + names,
+                    where_clause=f"{oid_field} >= {low} AND {oid_field} <= {high}",
+                    null_value=null_values,
+                )
+            except Exception as e:
+                raise AttributeReaderError(f"Could not read attributes of {input_fc}: {e}") from e
+            oid_col = arr["OID@"]
+            if len(oid_col) > 1 and (oid_col[1:] < oid_col[:-1]).any():
+                arr = arr[np.argsort(oid_col, kind="stable")]
+            columns = [_column_values(arr[name], field_types[name]) for name in names]
+            for oid, values in zip(arr["OID@"].tolist(), zip(*columns)):
+                yield oid, dict(zip(names, values))
+
+
+def _null_value(kind: str) -> Any:
+    if kind in _INT_TYPES:
+        return INT_NULL
+    if kind in _FLOAT_TYPES:
+        return np.nan
+    if kind in _DATE_TYPES:
+        return DATE_NULL
+    if kind == "String":
+        return STR_NULL
+    return None
+
+
+def _oid_field_name(input_fc: str, field_types: Dict[str, str]) -> str:
+    for name, kind in field_types.items():
+        if kind == "OID":
+            return arcpy.AddFieldDelimiters(input_fc, name)
+    return arcpy.AddFieldDelimiters(input_fc, arcpy.Describe(input_fc).OIDFieldName)
+
+
+def _column_values(col: np.ndarray, kind: str) -> List[Any]:
+    """ One column as Python values with None for nulls, converted with array operations. """
+    if kind in _DATE_TYPES or np.issubdtype(col.dtype, np.datetime64):
+        return _date_column(col)
+    if kind in _FLOAT_TYPES or np.issubdtype(col.dtype, np.floating):
+        return _masked_list(col, np.isnan(col))
+    if np.issubdtype(col.dtype, np.integer):
+        return _masked_list(col, col == INT_NULL) if kind in _INT_TYPES and kind != "OID" else col.tolist()
+    if col.dtype.kind == "U":
+        return _masked_list(col, col == STR_NULL)
+    return col.tolist()
+
+
+def _masked_list(col: np.ndarray, null_mask: np.ndarray) -> List[Any]:
+    if not null_mask.any():
+        return col.tolist()
+    values = col.astype(object)
+    values[null_mask] = None
+    return values.tolist()
+
+
+def _date_column(col: np.ndarray) -> List[Any]:
+    """
+    Epoch milliseconds of a datetime64 column. Each distinct date is converted once with epoch_millis,
+    so local-time handling matches the cursor reader, and the results are spread back by index.
+    """
+    col = col.astype("datetime64[us]")
+    null_mask = np.isnat(col) | (col == np.datetime64(DATE_NULL, "us"))
+    out = np.full(len(col), None, dtype=object)
+    valid = ~null_mask
+    if valid.any():
+        unique, inverse = np.unique(col[valid], return_inverse=True)
+        millis = np.array([epoch_millis(value) for value in unique.astype(object)], dtype=object)
+        out[valid] = millis[inverse]
+    return out.tolist()
+
+
+def get_attribute_reader(name: str) -> AttributeReader:
+    """ Reader by name: "numpy" (bulk) or "cursor" (row by row). """
+    if name == "cursor":
+        return CursorAttributeReader()
+    if name == "numpy":
+        return NumPyAttributeReader()
+    raise ValueError(f"Unknown attribute reader: {name!r} (expected 'numpy' or 'cursor')")
+
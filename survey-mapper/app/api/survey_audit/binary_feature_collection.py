@@ -0,0 +1,339 @@
+"""
+Binary Feature Collection (.fcb): the layer of a Feature Collection JSON file in a compact, length-prefixed
+protobuf encoding. Coordinates are packed doubles, or zigzag varints when they are whole numbers
+(quantized, see geometry_encoding), and attributes follow the order of layerDefinition.fields instead of
+repeating the field names in every feature.
+
+The file is MAGIC followed by records, each a varint byte length and then one protobuf message:
+
+    message Header {                               // the first record
+      string layer_json = 1;                       // {"layerDefinition", "geometryType", "spatialReference", "transform"}
+    }
+    message Feature {                              // every later record
+      repeated Value attributes = 1;               // one per layerDefinition field, in order
+      Geometry geometry = 2;
+    }
+    message Value {                                // no field set = null
+      oneof value { string string_value = 1; double double_value = 2; sint64 int_value = 3; bool bool_value = 4; }
+    }
+    message Geometry {
+      uint32 type = 1;                             // 1 point (x, y), 2 paths, 3 rings
+      uint32 dims = 2;                             // values per vertex
+      repeated uint32 part_sizes = 3 [packed];     // vertices per path or ring
+      repeated double coords = 4 [packed];         // flattened coordinates
+      repeated sint64 int_coords = 5 [packed];     // flattened coordinates when all are whole numbers
+      bool has_spatial_reference = 6;             // the geometry carries the featureSet spatialReference
+    }
+
+read_binary_feature_collection turns a file back into the {"layers": [...]} dict of the JSON output.
+"""
+import json
+import os
+import struct
+from types import TracebackType
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple, Type
+
+from app.api.survey_audit.feature_collection_writer import TEMP_SUFFIX, get_json_dumps
+
+MAGIC = b"SMFC\x01"
+
+# Bytes buffered by the output file before each write
+WRITE_BUFFER_BYTES = 1024 * 1024
+
+_POINT, _PATHS, _RINGS = 1, 2, 3
+_PART_KEYS = {_PATHS: "paths", _RINGS: "rings"}
+_INT64_MIN, _INT64_MAX = -(1 << 63), (1 << 63) - 1
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _zigzag(value: int) -> int:
+    if not _INT64_MIN <= value <= _INT64_MAX:
+        raise ValueError(f"Integer {value} does not fit in 64 bits")
+    return value << 1 if value >= 0 else ((-value) << 1) - 1
+
+
+def _unzigzag(value: int) -> int:
+    return (value >> 1) ^ -(value & 1)
+
+
+def _write_bytes(out: bytearray, tag: int, data: bytes) -> None:
+    out.append(tag)
+    _write_varint(out, len(data))
+    out += data
+
+
+def _encode_value(value: Any) -> bytes:
+    if value is None:
+        return b""
+    if isinstance(value, bool):
+        return b"\x20\x01" if value else b"\x20\x00"
+    if isinstance(value, int):
+        out = bytearray(b"\x18")
+        _write_varint(out, _zigzag(value))
+        return bytes(out)
+    if isinstance(value, float):
+        return b"\x11" + struct.pack("<d", value)
+    if isinstance(value, str):
+        out = bytearray()
+        _write_bytes(out, 0x0A, value.encode("utf-8"))
+        return bytes(out)
+    raise TypeError(f"Cannot encode attribute value of type {type(value).__name__}")
+
+
+class BinaryFeatureCollectionWriter:
+    """
+    Writes a .fcb file one feature at a time; same interface as FeatureCollectionWriter.
+
+    Args:
+        output_path (str): File to write.
+        layer_definition (dict): The layer's layerDefinition; its fields set the attribute order.
+        geometry_type (str): featureSet geometryType, e.g. esriGeometryPolyline.
+        spatial_reference (dict): featureSet spatialReference.
+        compact (bool): Ignored; accepted so the writers are interchangeable.
+        transform (dict, optional): featureSet transform of quantized geometries.
+
+    As with FeatureCollectionWriter, the file is written to output_path + ".tmp" and replaces output_path only
+    when the with block exits without an exception.
+    """
+
+    def __init__(
+        self,
+        output_path: str,
+        layer_definition: Dict[str, Any],
+        geometry_type: str,
+        spatial_reference: Dict[str, Any],
+        compact: bool = True,
+        transform: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.output_path = output_path
+        self.temp_path = output_path + TEMP_SUFFIX
+        self.layer_definition = layer_definition
+        self.geometry_type = geometry_type
+        self.spatial_reference = spatial_reference
+        self.transform = transform
+        self.count = 0
+        self.field_names: List[str] = [f["name"] for f in layer_definition.get("fields", [])]
+        self._field_set = set(self.field_names)
+        self._file: Optional[BinaryIO] = None
+
+    def __enter__(self) -> "BinaryFeatureCollectionWriter":
+        self._file = open(self.temp_path, "wb", buffering=WRITE_BUFFER_BYTES)
+        header = {
+            "layerDefinition": self.layer_definition,
+            "geometryType": self.geometry_type,
+            "spatialReference": self.spatial_reference,
+        }
+        if self.transform is not None:
+            header["transform"] = self.transform
+        try:
+            self._file.write(MAGIC)
+            out = bytearray()
+            _write_bytes(out, 0x0A, get_json_dumps()(header, None).encode("utf-8"))
+            self._write_record(out)
+        except BaseException:
+            self._discard()
+            raise
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        if self._file is None:
+            return
+        if exc_type is not None:
+            self._discard()
+            return
+        try:
+            self._file.close()
+        except BaseException:
+            self._discard()
+            raise
+        self._file = None
+        os.replace(self.temp_path, self.output_path)
+
+    def _discard(self) -> None:
+        """ Closes and deletes the temporary file of a failed write. """
+        try:
+            self._file.close()
+        except OSError:
+            pass
+        self._file = None
+        try:
+            os.remove(self.temp_path)
+        except FileNotFoundError:
+            pass
+
+    def write_feature(self, attributes: Dict[str, Any], geometry: Dict[str, Any]) -> None:
+        """ Appends one feature. Attributes must be fields of the layerDefinition. """
+        unknown = [name for name in attributes if name not in self._field_set]
+        if unknown:
+            raise ValueError(f"Attributes {unknown} are not fields of the layer definition")
+        out = bytearray()
+        for name in self.field_names:
+            _write_bytes(out, 0x0A, _encode_value(attributes.get(name)))
+        _write_bytes(out, 0x12, self._encode_geometry(geometry))
+        self._write_record(out)
+        self.count += 1
+
+    def _write_record(self, message: bytearray) -> None:
+        prefix = bytearray()
+        _write_varint(prefix, len(message))
+        self._file.write(prefix)
+        self._file.write(message)
+
+    def _encode_geometry(self, geometry: Dict[str, Any]) -> bytes:
+        keys = set(geometry) - {"spatialReference"}
+        if keys == {"x", "y"}:
+            kind, parts = _POINT, [[[geometry["x"], geometry["y"]]]]
+        elif keys == {"paths"} or keys == {"rings"}:
+            kind = _PATHS if "paths" in keys else _RINGS
+            parts = geometry[_PART_KEYS[kind]]
+        else:
+            raise ValueError(f"Cannot encode geometry with keys {sorted(keys)}")
+
+        dims = len(parts[0][0]) if parts and parts[0] else 2
+        flat = [c for part in parts for vertex in part for c in vertex]
+        if len(flat) != dims * sum(len(part) for part in parts):
+            raise ValueError("Every vertex of a geometry must have the same number of values")
+
+        out = bytearray(b"\x08")
+        _write_varint(out, kind)
+        out.append(0x10)
+        _write_varint(out, dims)
+        if kind != _POINT:
+            sizes = bytearray()
+            for part in parts:
+                _write_varint(sizes, len(part))
+            _write_bytes(out, 0x1A, sizes)
+        if all(type(c) is int for c in flat):
+            coords = bytearray()
+            for c in flat:
+                _write_varint(coords, _zigzag(c))
+            _write_bytes(out, 0x2A, coords)
+        else:
+            _write_bytes(out, 0x22, struct.pack(f"<{len(flat)}d", *flat))
+        if "spatialReference" in geometry:
+            if geometry["spatialReference"] != self.spatial_reference:
+                raise ValueError("Geometry spatialReference differs from the featureSet spatialReference")
+            out += b"\x30\x01"
+        return bytes(out)
+
+
+def _read_varint(buf: bytes, pos: int) -> Tuple[int, int]:
+    result = shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _iter_fields(buf: bytes) -> Iterator[Tuple[int, Any]]:
+    """ (field number, value) of a message: ints for varints, bytes for fixed64 and length-delimited fields. """
+    pos = 0
+    while pos < len(buf):
+        key, pos = _read_varint(buf, pos)
+        wire_type = key & 7
+        if wire_type == 0:
+            value, pos = _read_varint(buf, pos)
+        elif wire_type == 1:
+            value, pos = buf[pos:pos + 8], pos + 8
+        elif wire_type == 2:
+            size, pos = _read_varint(buf, pos)
+            value, pos = buf[pos:pos + size], pos + size
+        else:
+            raise ValueError(f"Unsupported wire type {wire_type}")
+        yield key >> 3, value
+
+
+def _read_varints(buf: bytes) -> List[int]:
+    values, pos = [], 0
+    while pos < len(buf):
+        value, pos = _read_varint(buf, pos)
+        values.append(value)
+    return values
+
+
+def _decode_value(buf: bytes) -> Any:
+    for number, value in _iter_fields(buf):
+        if number == 1:
+            return value.decode("utf-8")
+        if number == 2:
+            return struct.unpack("<d", value)[0]
+        if number == 3:
+            return _unzigzag(value)
+        if number == 4:
+            return bool(value)
+    return None
+
+
+def _decode_geometry(buf: bytes, spatial_reference: Dict[str, Any]) -> Dict[str, Any]:
+    kind, dims, sizes, coords, has_sr = _POINT, 2, [], [], False
+    for number, value in _iter_fields(buf):
+        if number == 1:
+            kind = value
+        elif number == 2:
+            dims = value
+        elif number == 3:
+            sizes = _read_varints(value)
+        elif number == 4:
+            coords = list(struct.unpack(f"<{len(value) // 8}d", value))
+        elif number == 5:
+            coords = [_unzigzag(v) for v in _read_varints(value)]
+        elif number == 6:
+            has_sr = bool(value)
+    geometry: Dict[str, Any] = {"spatialReference": spatial_reference} if has_sr else {}
+    if kind == _POINT:
+        geometry["x"], geometry["y"] = coords[0], coords[1]
+        return geometry
+    parts, pos = [], 0
+    for size in sizes:
+        parts.append([coords[i:i + dims] for i in range(pos, pos + size * dims, dims)])
+        pos += size * dims
+    geometry[_PART_KEYS[kind]] = parts
+    return geometry
+
+
+def read_binary_feature_collection(path: str) -> Dict[str, Any]:
+    """ The {"layers": [{"layerDefinition", "featureSet"}]} dict of a .fcb file, as in the JSON output. """
+    with open(path, "rb") as f:
+        data = f.read()
+    if not data.startswith(MAGIC):
+        raise ValueError(f"{path} is not a binary Feature Collection file")
+    records, pos = [], len(MAGIC)
+    while pos < len(data):
+        size, pos = _read_varint(data, pos)
+        records.append(data[pos:pos + size])
+        pos += size
+    if not records:
+        raise ValueError(f"{path} has no header")
+
+    header = json.loads(dict(_iter_fields(records[0]))[1].decode("utf-8"))
+    field_names = [f["name"] for f in header["layerDefinition"].get("fields", [])]
+    spatial_reference = header["spatialReference"]
+    features = []
+    for record in records[1:]:
+        values, geometry = [], {}
+        for number, value in _iter_fields(record):
+            if number == 1:
+                values.append(_decode_value(value))
+            elif number == 2:
+                geometry = _decode_geometry(value, spatial_reference)
+        features.append({"attributes": dict(zip(field_names, values)), "geometry": geometry})
+
+    feature_set = {"geometryType": header["geometryType"], "spatialReference": spatial_reference}
+    if "transform" in header:
+        feature_set["transform"] = header["transform"]
+    feature_set["features"] = features
+    return {"layers": [{"layerDefinition": header["layerDefinition"], "featureSet": feature_set}]}
@@ -56,7 +56,10 @@ class ClipCounter:
             "note": note or "",
         })
 
-    
+    def extend(self, rows: List[Dict]) -> None:
+        """Append rows collected by another ClipCounter (e.g. from a per-sheet worker process)."""
+        self.rows.extend(rows)
+
     def write(self) -> Optional[str]:
         if not self.csv_path:
             return None
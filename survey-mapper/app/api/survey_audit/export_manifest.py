@@ -0,0 +1,179 @@
+"""
+Export manifest: one scan of the job folder shared by every export stage.
+
+RecursiveExportFeatureCollection scans its input folder once and takes the shapefiles and layer packages
+to convert from the manifest. The files it writes are added as they are produced, and the manifest is saved
+to results/export_manifest.json. zip_directory then zips exactly the files listed there, and downstream
+tools get an index of the result set (path, type, size, mtime, layer name).
+"""
+import json
+import os
+import time
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+
+from app.api.survey_audit.sheet_cache import SHAPEFILE_PART_EXTS
+
+MANIFEST_FILENAME = "export_manifest.json"
+MANIFEST_VERSION = 1
+
+# Entry type of each file extension; files of other types are not listed
+FILE_TYPES = {
+    ".shp": "shapefile",
+    ".lpkx": "layer_package",
+    ".json": "feature_collection",
+    ".json.gz": "feature_collection",
+    ".fcb": "feature_collection",
+    ".geodatabase": "mobile_geodatabase",
+    ".csv": "feature_counts",
+    ".txt": "log",
+}
+
+
+class ManifestEntry(NamedTuple):
+    """ One file. path is relative to the manifest root, with / separators. size of a shapefile includes its .dbf, .shx, ... parts. """
+    path: str
+    type: str
+    size: int
+    mtime: float
+    layer_name: str
+
+
+# Longest first, so "Mains.json.gz" is matched by ".json.gz" rather than by nothing at all
+_EXTS_LONGEST_FIRST = sorted(FILE_TYPES, key=len, reverse=True)
+
+
+def _listed_ext(name: str) -> Optional[str]:
+    lower = name.lower()
+    return next((ext for ext in _EXTS_LONGEST_FIRST if lower.endswith(ext)), None)
+
+
+def file_type(name: str) -> Optional[str]:
+    """ Manifest type of a file name, or None when it is not listed. """
+    ext = _listed_ext(name)
+    return FILE_TYPES[ext] if ext else None
+
+
+def _shapefile_stem(name: str) -> Optional[str]:
+    lower = name.lower()
+    for ext in SHAPEFILE_PART_EXTS:
+        if lower.endswith(ext):
+            return lower[: -len(ext)]
+    return None
+
+
+class ExportManifest:
+    """
+    Files of an export, split into sources (found by scan) and results (files the export wrote).
+
+    Args:
+        root (str): Folder the entry paths are relative to.
+    """
+
+    def __init__(self, root: str) -> None:
+        self.root = os.path.abspath(root)
+        self.sources: List[ManifestEntry] = []
+        self.results: List[ManifestEntry] = []
+
+    @classmethod
+    def scan(cls, root: str, results_dir: Optional[str] = None) -> "ExportManifest":
+        """
+        Walks root once. Files under results_dir become results; everything else of a known type is a source.
+        Walks with os.scandir, so sizes and mtimes come from the directory listing without extra stat calls on Windows.
+        """
+        manifest = cls(root)
+        results_dir = os.path.abspath(results_dir) if results_dir else None
+        pending = [manifest.root]
+        while pending:
+            folder = pending.pop()
+            try:
+                with os.scandir(folder) as it:
+                    dir_entries = sorted(it, key=lambda e: e.name)
+            except OSError:
+                continue
+            in_results = results_dir is not None and (folder == results_dir or folder.startswith(results_dir + os.sep))
+            part_sizes: Dict[str, int] = {}
+            found: List[ManifestEntry] = []
+            subfolders: List[str] = []
+            for entry in dir_entries:
+                if entry.is_dir(follow_symlinks=False):
+                    # A file geodatabase is a folder of internal files, not something to export
+                    if not entry.name.lower().endswith(".gdb"):
+                        subfolders.append(entry.path)
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                stem = _shapefile_stem(entry.name)
+                if stem is not None:
+                    part_sizes[stem] = part_sizes.get(stem, 0) + st.st_size
+                kind = file_type(entry.name)
+                if kind is not None:
+                    found.append(manifest._entry(entry.path, kind, st.st_size, st.st_mtime))
+            for item in found:
+                if item.type == "shapefile":
+                    item = item._replace(size=part_sizes.get(item.layer_name.lower(), item.size))
+                (manifest.results if in_results else manifest.sources).append(item)
+            # Depth first in name order, like os.walk
+            pending.extend(reversed(subfolders))
+        return manifest
+
+    def _entry(self, path: str, kind: str, size: int, mtime: float) -> ManifestEntry:
+        name = os.path.basename(path)
+        ext = _listed_ext(name)
+        layer_name = name[: -len(ext)] if ext else os.path.splitext(name)[0]
+        rel = os.path.relpath(os.path.abspath(path), self.root).replace("\\", "/")
+        return ManifestEntry(rel, kind, size, mtime, layer_name)
+
+    def source_paths(self, kind: str) -> List[str]:
+        """ Absolute paths of the sources of one type, in scan order. """
+        return [self.abspath(e) for e in self.sources if e.type == kind]
+
+    def abspath(self, entry: ManifestEntry) -> str:
+        return os.path.join(self.root, *entry.path.split("/"))
+
+    def add_result(self, path: str, kind: Optional[str] = None) -> Optional[ManifestEntry]:
+        """ Records a file the export wrote (replacing an earlier entry for the same path). Returns None if it does not exist. """
+        kind = kind or file_type(path) or "other"
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        entry = self._entry(path, kind, st.st_size, st.st_mtime)
+        self.results = [e for e in self.results if e.path != entry.path]
+        self.results.append(entry)
+        return entry
+
+    def iter_results(self, relative_to: str) -> Iterator[str]:
+        """ Paths of the results relative to relative_to (e.g. the results folder being zipped). """
+        base = os.path.abspath(relative_to)
+        for entry in self.results:
+            yield os.path.relpath(self.abspath(entry), base).replace("\\", "/")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": MANIFEST_VERSION,
+            "created_at": time.time(),
+            "root": self.root,
+            "sources": [e._asdict() for e in self.sources],
+            "results": [e._asdict() for e in self.results],
+        }
+
+    def write(self, path: str) -> str:
+        """ Saves the manifest as JSON; it lists itself among the results. """
+        self.results = [e for e in self.results if e.path != self._entry(path, "manifest", 0, 0).path]
+        self.results.append(self._entry(path, "manifest", 0, time.time()))
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> "ExportManifest":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        manifest = cls(data["root"])
+        manifest.sources = [ManifestEntry(**e) for e in data.get("sources", [])]
+        manifest.results = [ManifestEntry(**e) for e in data.get("results", [])]
+        return manifest
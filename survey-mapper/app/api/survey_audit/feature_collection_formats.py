@@ -0,0 +1,59 @@
+"""
+Output formats of the Feature Collection export, selected per survey type with the "format" option of the
+survey config's featureCollectionExport section:
+
+* json: plain Feature Collection JSON (.json), the default.
+* json.gz: the same JSON gzip-compressed (.json.gz).
+* binary: the length-prefixed protobuf encoding of binary_feature_collection (.fcb).
+"""
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+from app.api.survey_audit.binary_feature_collection import BinaryFeatureCollectionWriter
+from app.api.survey_audit.export_manifest import MANIFEST_FILENAME
+from app.api.survey_audit.feature_collection_writer import FeatureCollectionWriter, GzipFeatureCollectionWriter
+
+DEFAULT_FORMAT = "json"
+
+# Other files of the results folder that are zipped for download, whatever the format
+RESULT_EXTS: Tuple[str, ...] = (".lpkx", ".geodatabase", ".csv", ".txt")
+
+
+class OutputFormat(NamedTuple):
+    """ A format name, the extension of its files and its writer class. """
+    name: str
+    extension: str
+    writer: type
+
+
+OUTPUT_FORMATS: Dict[str, OutputFormat] = {
+    f.name: f
+    for f in (
+        OutputFormat("json", ".json", FeatureCollectionWriter),
+        OutputFormat("json.gz", ".json.gz", GzipFeatureCollectionWriter),
+        OutputFormat("binary", ".fcb", BinaryFeatureCollectionWriter),
+    )
+}
+
+# Extensions of every format, longest first so ".json.gz" is matched before ".json"
+FEATURE_COLLECTION_EXTS: Tuple[str, ...] = tuple(
+    sorted({f.extension for f in OUTPUT_FORMATS.values()}, key=len, reverse=True)
+)
+
+
+def get_output_format(name: Optional[str]) -> OutputFormat:
+    """ Format by name; None is the default (json). """
+    try:
+        return OUTPUT_FORMATS[name or DEFAULT_FORMAT]
+    except KeyError:
+        raise ValueError(f"Unknown Feature Collection format: {name!r} (expected one of {', '.join(OUTPUT_FORMATS)})") from None
+
+
+def survey_output_format(config: Optional[Dict[str, Any]]) -> OutputFormat:
+    """ Format selected in a survey config dict (featureCollectionExport.format). """
+    section = (config or {}).get("featureCollectionExport") or {}
+    return get_output_format(section.get("format"))
+
+
+def result_extensions(output_format: OutputFormat) -> Tuple[str, ...]:
+    """ Name endings of the result files zipped for download: the format's files, the manifest and RESULT_EXTS. """
+    return RESULT_EXTS + (output_format.extension, MANIFEST_FILENAME)
@@ -0,0 +1,176 @@
+"""
+Streaming writer for ArcGIS Online-style Feature Collection JSON.
+
+The layerDefinition is written first, then each feature as soon as it is read from the cursor, then the
+closing brackets, so memory use does not grow with the size of the layer. Uses ujson when it is installed
+and falls back to the standard library json module. GzipFeatureCollectionWriter writes the same JSON
+gzip-compressed (.json.gz).
+"""
+import gzip
+import json
+import os
+from types import TracebackType
+from typing import Any, Callable, Dict, Optional, TextIO, Type
+
+try:
+    import ujson as _ujson
+except ImportError:  # ujson is optional; json is always available
+    _ujson = None
+
+# Characters written per file.write call; features are buffered up to this size
+WRITE_BUFFER_CHARS = 1024 * 1024
+
+# gzip level of .json.gz output; 6 compresses nearly as well as 9 in a fraction of the time
+GZIP_LEVEL = 6
+
+# Suffix of the file written until the block exits cleanly and it replaces output_path
+TEMP_SUFFIX = ".tmp"
+
+
+def _stdlib_dumps(obj: Any, indent: Optional[int]) -> str:
+    if indent is None:
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+    return json.dumps(obj, indent=indent, ensure_ascii=False)
+
+
+def _ujson_dumps(obj: Any, indent: Optional[int]) -> str:
+    try:
+        return _ujson.dumps(obj, indent=indent or 0, ensure_ascii=False, escape_forward_slashes=False)
+    except (OverflowError, TypeError, ValueError):
+        # NaN/inf doubles or values ujson cannot encode; json writes them as before
+        return _stdlib_dumps(obj, indent)
+
+
+def get_json_dumps() -> Callable[[Any, Optional[int]], str]:
+    """ dumps(obj, indent) of the fastest available JSON encoder. """
+    return _ujson_dumps if _ujson is not None else _stdlib_dumps
+
+
+class FeatureCollectionWriter:
+    """
+    Writes {"layers": [{"layerDefinition": ..., "featureSet": {..., "features": [...]}}]} one feature at a time.
+
+    Args:
+        output_path (str): JSON file to write.
+        layer_definition (dict): The layer's layerDefinition (name, geometryType, extent, fields, ...).
+        geometry_type (str): featureSet geometryType, e.g. esriGeometryPolyline.
+        spatial_reference (dict): featureSet spatialReference, e.g. {"wkid": 102100, "latestWkid": 3857}.
+        compact (bool): No indentation or spaces. False writes indented JSON, as json.dump(indent=2) did.
+        transform (dict, optional): featureSet transform of quantized geometries (see geometry_encoding).
+
+    Use as a context manager. The JSON is written to output_path + ".tmp", which replaces output_path only when
+    the block exits without an exception; otherwise it is deleted, so output_path is never left half written.
+    """
+
+    def __init__(
+        self,
+        output_path: str,
+        layer_definition: Dict[str, Any],
+        geometry_type: str,
+        spatial_reference: Dict[str, Any],
+        compact: bool = True,
+        transform: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.output_path = output_path
+        self.temp_path = output_path + TEMP_SUFFIX
+        self.layer_definition = layer_definition
+        self.geometry_type = geometry_type
+        self.spatial_reference = spatial_reference
+        self.compact = compact
+        self.transform = transform
+        self.count = 0
+        self._dumps = get_json_dumps()
+        self._indent: Optional[int] = None if compact else 2
+        self._file: Optional[TextIO] = None
+        self._buffer: list = []
+        self._buffered = 0
+
+    def __enter__(self) -> "FeatureCollectionWriter":
+        self._file = self._open()
+        try:
+            self._file.write(self._header())
+        except BaseException:
+            self._discard()
+            raise
+        return self
+
+    def _open(self) -> TextIO:
+        return open(self.temp_path, "w", encoding="utf-8")
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        if self._file is None:
+            return
+        if exc_type is not None:
+            self._discard()
+            return
+        try:
+            self._flush()
+            self._file.write("]}}]}" if self.compact else "\n      ]\n    }\n  }]\n}\n")
+            self._file.close()
+        except BaseException:
+            self._discard()
+            raise
+        self._file = None
+        os.replace(self.temp_path, self.output_path)
+
+    def _discard(self) -> None:
+        """ Closes and deletes the temporary file of a failed write. """
+        try:
+            self._file.close()
+        except OSError:
+            pass
+        self._file = None
+        try:
+            os.remove(self.temp_path)
+        except FileNotFoundError:
+            pass
+
+    def write_feature(self, attributes: Dict[str, Any], geometry: Dict[str, Any]) -> None:
+        """ Appends one feature to the features array. """
+        text = self._dumps({"attributes": attributes, "geometry": geometry}, self._indent)
+        if self.compact:
+            text = text if self.count == 0 else "," + text
+        else:
+            text = ("\n" if self.count == 0 else ",\n") + "        " + text.replace("\n", "\n        ")
+        self.count += 1
+        self._buffer.append(text)
+        self._buffered += len(text)
+        if self._buffered >= WRITE_BUFFER_CHARS:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._buffer:
+            self._file.write("".join(self._buffer))
+            self._buffer = []
+            self._buffered = 0
+
+    def _header(self) -> str:
+        """ Everything up to and including the opening bracket of the features array. """
+        definition = self._dumps(self.layer_definition, self._indent)
+        geometry_type = self._dumps(self.geometry_type, None)
+        spatial_reference = self._dumps(self.spatial_reference, None)
+        transform = "" if self.transform is None else self._dumps(self.transform, None)
+        if self.compact:
+            transform = f'"transform":{transform},' if transform else ""
+            return (
+                f'{{"layers":[{{"layerDefinition":{definition},"featureSet":{{"geometryType":{geometry_type},'
+                f'"spatialReference":{spatial_reference},{transform}"features":['
+            )
+        transform = f'\n      "transform": {transform},' if transform else ""
+        definition = definition.replace("\n", "\n    ")
+        return (
+            f'{{\n  "layers": [{{\n    "layerDefinition": {definition},\n    "featureSet": {{\n'
+            f'      "geometryType": {geometry_type},\n      "spatialReference": {spatial_reference},{transform}\n      "features": ['
+        )
+
+
+class GzipFeatureCollectionWriter(FeatureCollectionWriter):
+    """ FeatureCollectionWriter that compresses the JSON with gzip as it is written (.json.gz). """
+
+    def _open(self) -> TextIO:
+        return gzip.open(self.temp_path, "wt", encoding="utf-8", compresslevel=GZIP_LEVEL)
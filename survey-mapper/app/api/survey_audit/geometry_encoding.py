@@ -0,0 +1,168 @@
+"""
+Coordinate options for the Feature Collection export, set in the survey config's featureCollectionExport section.
+
+* precision: decimal places kept for each coordinate (2 = centimetres in Web Mercator).
+* quantize_tolerance: ArcGIS-style quantization, as in a query with quantizationParameters. Coordinates become
+  integer steps of the tolerance from the upper left corner of the layer extent, and every vertex of a path or
+  ring after the first is a delta from the previous one. The featureSet carries the "transform" to decode them.
+* simplify_tolerance: vertices within this distance of the simplified line are dropped (Geometry.generalize)
+  before encoding.
+
+Tolerances are in the units of the output spatial reference (metres in Web Mercator). The top-level values apply
+to every layer; "layers" overrides them per output layer name, e.g. {"Mains": {"simplify_tolerance": 0.5}}.
+The section's "format" (see feature_collection_formats) is not a geometry option and is skipped here.
+"""
+import math
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+# Documentation keys in the config, e.g. "precision_DESCRIPTION"
+_DOC_SUFFIXES = ("_DESCRIPTION", "_DETAILS")
+
+# Keys of the section that are not per-layer geometry options
+_SECTION_KEYS = ("layers", "format")
+
+
+class GeometryOptions(NamedTuple):
+    """ Options of one layer. None keeps full precision / does not quantize / does not simplify. """
+    precision: Optional[int] = None
+    quantize_tolerance: Optional[float] = None
+    simplify_tolerance: Optional[float] = None
+
+
+def _settings(section: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in section.items() if not k.endswith(_DOC_SUFFIXES)}
+
+
+def _parse(values: Dict[str, Any], where: str) -> Dict[str, Any]:
+    parsed: Dict[str, Any] = {}
+    for key, value in _settings(values).items():
+        if key not in GeometryOptions._fields:
+            raise ValueError(f"featureCollectionExport{where}: unknown option {key!r} (expected one of {', '.join(GeometryOptions._fields)})")
+        if value is None:
+            parsed[key] = None
+        elif key == "precision":
+            if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+                raise ValueError(f"featureCollectionExport{where}: precision must be a whole number of decimal places, got {value!r}")
+            parsed[key] = value
+        else:
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+                raise ValueError(f"featureCollectionExport{where}: {key} must be a distance of 0 or more, got {value!r}")
+            # 0 switches the option off, so a layer can opt out of a default
+            parsed[key] = float(value) or None
+    return parsed
+
+
+def layer_geometry_options(section: Optional[Dict[str, Any]], layer_name: str) -> GeometryOptions:
+    """ Options of layer_name: the section's top-level values overridden by its "layers" entry, if any. """
+    if not section:
+        return GeometryOptions()
+    defaults = {k: v for k, v in section.items() if k not in _SECTION_KEYS}
+    options = _parse(defaults, "")
+    layers = section.get("layers") or {}
+    if not isinstance(layers, dict):
+        raise ValueError("featureCollectionExport.layers must map layer names to options")
+    overrides = layers.get(layer_name)
+    if overrides is None:
+        # Layer names are matched case-insensitively, as shapefile names are on Windows
+        overrides = next((v for k, v in _settings(layers).items() if k.lower() == layer_name.lower()), None)
+    if overrides:
+        options.update(_parse(overrides, f".layers.{layer_name}"))
+    return GeometryOptions(**options)
+
+
+def validate_geometry_options(section: Optional[Dict[str, Any]]) -> None:
+    """ Raises ValueError if the defaults or any layer entry of the section is invalid. """
+    layer_geometry_options(section, "")
+    for layer_name in _settings((section or {}).get("layers") or {}):
+        layer_geometry_options(section, layer_name)
+
+
+class GeometryEncoder:
+    """
+    Applies a layer's GeometryOptions to each ArcGIS JSON geometry while the layer is streamed.
+
+    Args:
+        options (GeometryOptions): The layer's options.
+        extent (dict): Layer extent (xmin, ymax used); the origin of quantized coordinates.
+    """
+
+    def __init__(self, options: GeometryOptions, extent: Dict[str, Any]) -> None:
+        self.options = options
+        self.precision = options.precision
+        self.tolerance = options.quantize_tolerance
+        self.xmin = _finite(extent.get("xmin"))
+        self.ymax = _finite(extent.get("ymax"))
+
+    @property
+    def transform(self) -> Optional[Dict[str, Any]]:
+        """ featureSet "transform" that decodes quantized coordinates; None when not quantizing. """
+        if self.tolerance is None:
+            return None
+        return {
+            "originPosition": "upperLeft",
+            "scale": [self.tolerance, self.tolerance, 0, 0],
+            "translate": [self.xmin, self.ymax, 0, 0],
+        }
+
+    def simplify(self, shape: Any) -> Any:
+        """ The shape generalized by simplify_tolerance; points and shapes that would collapse are kept as they are. """
+        tolerance = self.options.simplify_tolerance
+        if tolerance is None or not hasattr(shape, "generalize"):
+            return shape
+        simplified = shape.generalize(tolerance)
+        if not simplified or getattr(simplified, "isEmpty", False):
+            return shape
+        return simplified
+
+    def encode(self, geometry: Dict[str, Any]) -> Dict[str, Any]:
+        """ Rounds or quantizes the x/y, paths or rings of geometry in place and returns it. """
+        if self.precision is None and self.tolerance is None:
+            return geometry
+        if "x" in geometry:
+            if self.tolerance is not None:
+                geometry["x"], geometry["y"] = self._quantize(geometry["x"], geometry["y"])
+            elif self.precision is not None:
+                geometry["x"], geometry["y"] = round(geometry["x"], self.precision), round(geometry["y"], self.precision)
+            return geometry
+        encode_part = self._quantize_part if self.tolerance is not None else self._round_part
+        for key in ("paths", "rings"):
+            if key in geometry:
+                geometry[key] = [encode_part(part) for part in geometry[key]]
+        return geometry
+
+    def _quantize(self, x: float, y: float) -> List[int]:
+        return [int(round((x - self.xmin) / self.tolerance)), int(round((self.ymax - y) / self.tolerance))]
+
+    def _extra(self, vertex: Sequence[float]) -> List[Any]:
+        """ z/m values, which are not quantized. """
+        if len(vertex) <= 2:
+            return []
+        if self.precision is None:
+            return list(vertex[2:])
+        return [v if v is None else round(v, self.precision) for v in vertex[2:]]
+
+    def _round_part(self, part: Sequence[Sequence[float]]) -> List[List[float]]:
+        p = self.precision
+        return [[round(v, p) if v is not None else v for v in vertex] for vertex in part]
+
+    def _quantize_part(self, part: Sequence[Sequence[float]]) -> List[List[Any]]:
+        """ First vertex absolute, then deltas; vertices that fall on the same step as the previous one are dropped, the last one is always kept. """
+        out: List[List[Any]] = []
+        prev_x = prev_y = 0
+        last = len(part) - 1
+        for i, vertex in enumerate(part):
+            qx, qy = self._quantize(vertex[0], vertex[1])
+            dx, dy = qx - prev_x, qy - prev_y
+            if out and dx == 0 and dy == 0 and i != last:
+                continue
+            out.append([dx, dy] + self._extra(vertex))
+            prev_x, prev_y = qx, qy
+        return out
+
+
+def _finite(value: Any) -> float:
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return value if math.isfinite(value) else 0.0
@@ -0,0 +1,351 @@
+"""
+Compiles the LUT (lutassettypes) DataFrame into an execution plan for SurveyMapper.
+
+The plan is built and validated once per job, then reused for every Excel sheet:
+- one ClipStep per source feature class row (with its optional pre-clip query),
+- an optional PostClipFilterStep right after a clip,
+- one MergeStep per MERGE_LAYERS row,
+- one ExportStep per output shapefile and one AnnotationPackageStep per annotation output.
+
+Every step has a unique step_id and lists the step_ids it depends on, so independent
+steps can be scheduled concurrently.
+"""
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import pandas as pd
+
+NONE_VALUE = "NONE"
+MERGE_SOURCE_NAME = "MERGE_LAYERS"
+
+LUT_REQUIRED_COLUMNS = (
+    "SourceDataName",
+    "PreClipAttributeQuery",
+    "IntermediateClipFilterName",
+    "IntermediatePostClipFilterName",
+    "PostClipAttributeQuery",
+    "IntermediateMergeClipName",
+    "OutputName",
+    "GeometryType_Corrected",
+    "IsAnnotationLayer",
+    "IncludeInFinalResult",
+)
+
+# Columns where an empty cell means the same as NONE
+_OPTIONAL_COLUMNS = (
+    "PreClipAttributeQuery",
+    "PostClipAttributeQuery",
+    "IntermediatePostClipFilterName",
+    "IntermediateMergeClipName",
+    "OutputName",
+)
+
+
+class LutPlanError(ValueError):
+    """Raised when the LUT cannot be compiled into a plan. .errors lists every problem found."""
+
+    def __init__(self, errors: List[str]):
+        super().__init__("; ".join(errors))
+        self.errors = errors
+
+
+@dataclass(frozen=True)
+class ClipStep:
+    step_id: str
+    row: int                           # 0-based LUT row
+    source_name: str                   # feature class in the source GDB
+    output_name: str                   # IntermediateClipFilterName in the per-sheet GDB
+    final_name: str                    # OutputName; NONE means not exported
+    pre_clip_query: Optional[str]      # selection applied before clipping
+    is_annotation: bool
+    include_in_final_result: bool
+    depends_on: Tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class PostClipFilterStep:
+    step_id: str
+    row: int
+    clip_step_id: str                  # clip this filter runs after
+    output_name: str                   # IntermediatePostClipFilterName
+    id_field: str                      # field whose values build the IN (...) query
+    id_source_layer: str               # per-sheet GDB layer the values are read from
+    id_source_step_id: str = ""        # clip that wrote id_source_layer by this row (a later row may overwrite it)
+    depends_on: Tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class MergeStep:
+    step_id: str
+    row: int
+    key: str                           # raw IntermediateClipFilterName, e.g. "Mains_clip,Proposed_clip"
+    base: str                          # first layer, the merge target schema
+    merge_with: Tuple[str, ...]        # remaining layers
+    output_name: str                   # IntermediateMergeClipName
+    final_name: str                    # OutputName
+    is_annotation: bool
+    include_in_final_result: bool
+    depends_on: Tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class ExportStep:
+    step_id: str
+    source_step_id: str                # clip or merge step producing the feature class
+    final_name: str                    # shapefile base name
+    depends_on: Tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class AnnotationPackageStep:
+    step_id: str
+    final_name: str                    # exported shapefile packaged as <final_name>.lpkx
+    depends_on: Tuple[str, ...] = ()
+
+
+PlanStep = Union[ClipStep, PostClipFilterStep, MergeStep, ExportStep, AnnotationPackageStep]
+
+
+@dataclass(frozen=True)
+class LutPlan:
+    steps: Tuple[PlanStep, ...]
+    warnings: Tuple[str, ...] = ()
+
+    @property
+    def row_steps(self) -> Tuple[Union[ClipStep, MergeStep], ...]:
+        """Clip and merge rows in LUT order (the order counter rows and outputs are recorded in)."""
+        return tuple(s for s in self.steps if isinstance(s, (ClipStep, MergeStep)))
+
+    @property
+    def clips(self) -> Tuple[ClipStep, ...]:
+        return tuple(s for s in self.steps if isinstance(s, ClipStep))
+
+    @property
+    def merges(self) -> Tuple[MergeStep, ...]:
+        return tuple(s for s in self.steps if isinstance(s, MergeStep))
+
+    @property
+    def exports(self) -> Tuple[ExportStep, ...]:
+        return tuple(s for s in self.steps if isinstance(s, ExportStep))
+
+    @property
+    def annotation_packages(self) -> Tuple[AnnotationPackageStep, ...]:
+        return tuple(s for s in self.steps if isinstance(s, AnnotationPackageStep))
+
+    def post_clip_filter_for(self, clip: ClipStep) -> Optional[PostClipFilterStep]:
+        return next(
+            (s for s in self.steps if isinstance(s, PostClipFilterStep) and s.clip_step_id == clip.step_id),
+            None,
+        )
+
+    def step(self, step_id: str) -> PlanStep:
+        for s in self.steps:
+            if s.step_id == step_id:
+                return s
+        raise KeyError(step_id)
+
+
+def _cell(value: Any) -> str:
+    """Excel cell to trimmed string; empty cells become ''."""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    return str(value).strip()
+
+
+def _yes_no(value: str, column: str, row: int, errors: List[str]) -> bool:
+    lowered = value.lower()
+    if lowered not in ("yes", "no"):
+        errors.append(f"LUT row {row + 2}: {column} must be 'yes' or 'no', got '{value}'")
+        return False
+    return lowered == "yes"
+
+
+def compile_lut_plan(df: Optional[pd.DataFrame]) -> LutPlan:
+    """
+    Validates the LUT DataFrame and compiles it into a LutPlan.
+
+    Row numbers in messages are Excel row numbers (header is row 1).
+
+    Raises:
+        LutPlanError: if the LUT is missing, lacks required columns, or has broken rows.
+    """
+    if df is None or df.empty:
+        raise LutPlanError(["LUT (alternate names) is missing or empty"])
+
+    missing = [c for c in LUT_REQUIRED_COLUMNS if c not in df.columns]
+    if missing:
+        raise LutPlanError([f"LUT is missing required columns: {', '.join(missing)}"])
+
+    errors: List[str] = []
+    warnings: List[str] = []
+    row_steps: List[Union[ClipStep, MergeStep]] = []
+    post_filters: List[PostClipFilterStep] = []
+    clip_ids_by_output: Dict[str, str] = {}
+
+    records = df[list(LUT_REQUIRED_COLUMNS)].to_dict("records")
+    for row, rec in enumerate(records):
+        cells = {c: _cell(rec[c]) for c in LUT_REQUIRED_COLUMNS}
+        if not any(cells.values()):
+            continue  # blank spreadsheet row
+        for c in _OPTIONAL_COLUMNS:
+            cells[c] = cells[c] or NONE_VALUE
+
+        excel_row = row + 2
+        source = cells["SourceDataName"]
+        clip_name = cells["IntermediateClipFilterName"]
+        final_name = cells["OutputName"]
+        is_anno = _yes_no(cells["IsAnnotationLayer"], "IsAnnotationLayer", row, errors)
+        include = _yes_no(cells["IncludeInFinalResult"], "IncludeInFinalResult", row, errors)
+
+        if not source:
+            errors.append(f"LUT row {excel_row}: SourceDataName is empty")
+            continue
+        if source == NONE_VALUE:
+            # Older LUTs park merge specs on NONE rows; they never clipped anything
+            warnings.append(f"LUT row {excel_row}: SourceDataName is NONE; row ignored")
+            continue
+
+        if source == MERGE_SOURCE_NAME:
+            if clip_name in ("", NONE_VALUE):
+                warnings.append(f"LUT row {excel_row}: MERGE_LAYERS row lists no layers to merge; row ignored")
+                continue
+            names = [n.strip() for n in clip_name.split(",")]
+            if (
+                len(names) < 2
+                or any(not n or n == NONE_VALUE for n in names)
+                or cells["PreClipAttributeQuery"] != NONE_VALUE
+                or cells["PostClipAttributeQuery"] != NONE_VALUE
+                or cells["IntermediatePostClipFilterName"] != NONE_VALUE
+                or cells["IntermediateMergeClipName"] == NONE_VALUE
+            ):
+                errors.append(
+                    f"LUT row {excel_row}: MERGE_LAYERS rows need two or more comma separated layers in "
+                    f"IntermediateClipFilterName, an IntermediateMergeClipName, and NONE for the clip queries"
+                )
+                continue
+            row_steps.append(MergeStep(
+                step_id=f"merge:{final_name}",
+                row=row,
+                key=clip_name,
+                base=names[0],
+                merge_with=tuple(names[1:]),
+                output_name=cells["IntermediateMergeClipName"],
+                final_name=final_name,
+                is_annotation=is_anno,
+                include_in_final_result=include,
+            ))
+            continue
+
+        if clip_name in ("", NONE_VALUE) or "," in clip_name:
+            errors.append(f"LUT row {excel_row}: IntermediateClipFilterName '{clip_name}' is not a valid layer name")
+            continue
+
+        step_id = f"clip:{clip_name}"
+        if clip_name in clip_ids_by_output:
+            warnings.append(f"LUT row {excel_row}: IntermediateClipFilterName '{clip_name}' is used by an earlier row and will overwrite it")
+            step_id = f"clip:{clip_name}@{row}"
+        clip = ClipStep(
+            step_id=step_id,
+            row=row,
+            source_name=source,
+            output_name=clip_name,
+            final_name=final_name,
+            pre_clip_query=None if cells["PreClipAttributeQuery"] == NONE_VALUE else cells["PreClipAttributeQuery"],
+            is_annotation=is_anno,
+            include_in_final_result=include,
+        )
+        clip_ids_by_output[clip_name] = step_id
+        row_steps.append(clip)
+
+        post_query = cells["PostClipAttributeQuery"]
+        if post_query != NONE_VALUE:
+            parts = [p.strip() for p in post_query.split(",")]
+            post_name = cells["IntermediatePostClipFilterName"]
+            if len(parts) != 2 or not all(parts):
+                errors.append(f"LUT row {excel_row}: PostClipAttributeQuery must look like '<id field>,<layer>', got '{post_query}'")
+            elif post_name == NONE_VALUE:
+                errors.append(f"LUT row {excel_row}: PostClipAttributeQuery is set but IntermediatePostClipFilterName is NONE")
+            else:
+                post_filters.append(PostClipFilterStep(
+                    step_id=f"post:{post_name}",
+                    row=row,
+                    clip_step_id=step_id,
+                    output_name=post_name,
+                    id_field=parts[0],
+                    id_source_layer=parts[1],
+                    # Run in LUT order, the filter reads the layer as written by the rows up to its own
+                    id_source_step_id=clip_ids_by_output.get(parts[1], ""),
+                ))
+
+    # Resolve dependencies now that every clip output is known
+    def _producer(name: str, excel_row: int, what: str) -> Optional[str]:
+        producer = clip_ids_by_output.get(name)
+        if producer is None:
+            errors.append(f"LUT row {excel_row}: {what} '{name}' is not produced by any clip row")
+        return producer
+
+    resolved_rows: List[Union[ClipStep, MergeStep]] = []
+    for step in row_steps:
+        if isinstance(step, MergeStep):
+            deps = [_producer(n, step.row + 2, "layer to merge") for n in (step.base, *step.merge_with)]
+            step = MergeStep(**{**step.__dict__, "depends_on": tuple(d for d in deps if d)})
+        resolved_rows.append(step)
+
+    resolved_filters: List[PostClipFilterStep] = []
+    for pf in post_filters:
+        src = pf.id_source_step_id or _producer(pf.id_source_layer, pf.row + 2, "post-clip id layer")
+        deps = (pf.clip_step_id,) + ((src,) if src and src != pf.clip_step_id else ())
+        resolved_filters.append(PostClipFilterStep(**{**pf.__dict__, "id_source_step_id": src or "", "depends_on": deps}))
+
+    if errors:
+        raise LutPlanError(errors)
+
+    # Exports and annotation packages follow from the row steps. As in the original export loops,
+    # clips merged into another layer and the merge results are exported last, so they win an
+    # OutputName clash; the merge base (first layer) counts as unmerged and exports with the other clips.
+    # depends_on of a merge is its base's producer followed by those of merge_with.
+    merged_inputs = {d for s in resolved_rows if isinstance(s, MergeStep) for d in s.depends_on[1:]}
+    export_order = (
+        [s for s in resolved_rows if isinstance(s, ClipStep) and s.step_id not in merged_inputs]
+        + [s for s in resolved_rows if isinstance(s, ClipStep) and s.step_id in merged_inputs]
+        + [s for s in resolved_rows if isinstance(s, MergeStep)]
+    )
+    exports: List[ExportStep] = []
+    annotations: List[AnnotationPackageStep] = []
+    seen_finals: Dict[str, str] = {}
+    for step in export_order:
+        if step.final_name == NONE_VALUE:
+            continue
+        export = ExportStep(
+            step_id=f"export:{step.step_id}",
+            source_step_id=step.step_id,
+            final_name=step.final_name,
+            depends_on=(step.step_id,),
+        )
+        clash_expected = step.step_id in merged_inputs or isinstance(step, MergeStep)
+        if step.final_name in seen_finals and not clash_expected:
+            warnings.append(
+                f"LUT row {step.row + 2}: OutputName '{step.final_name}' is also written by "
+                f"{seen_finals[step.final_name]}; the later export wins"
+            )
+        seen_finals[step.final_name] = step.step_id
+        exports.append(export)
+        if step.is_annotation and step.include_in_final_result:
+            annotations.append(AnnotationPackageStep(
+                step_id=f"anno:{step.final_name}",
+                final_name=step.final_name,
+                depends_on=(export.step_id,),
+            ))
+
+    # Post-clip filters are placed right after the clip they belong to
+    ordered: List[PlanStep] = []
+    for step in resolved_rows:
+        ordered.append(step)
+        ordered.extend(pf for pf in resolved_filters if pf.clip_step_id == step.step_id)
+    ordered.extend(exports)
+    # One package per output name, in name order like the original annotation loop
+    unique_annos = {a.final_name: a for a in annotations}
+    ordered.extend(unique_annos[name] for name in sorted(unique_annos))
+
+    return LutPlan(steps=tuple(ordered), warnings=tuple(warnings))
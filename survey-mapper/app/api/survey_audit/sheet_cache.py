@@ -0,0 +1,169 @@
+"""
+Persistent cache of per-sheet SurveyMapper outputs.
+
+A sheet is fingerprinted from its gridzone IDs, the source GDB version, the compiled LUT plan and the
+survey config. When a later job has a sheet with the same fingerprint, its <sheet>_clipped.gdb,
+shapefiles, .lpkx packages and clip counter rows are copied from the cache instead of being re-clipped.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+# Bump when a change to the clipping code should invalidate every cached sheet
+SHEET_CACHE_VERSION = "1"
+
+SHEET_META_FILENAME = "sheet.json"
+
+# Files that make up one shapefile on disk
+SHAPEFILE_PART_EXTS = (".shp", ".shx", ".dbf", ".prj", ".cpg", ".sbn", ".sbx", ".shp.xml")
+
+
+def hash_directory(path: str) -> str:
+    """sha256 over the relative names and contents of every file under path (lock files skipped)."""
+    h = hashlib.sha256()
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(".lock"):
+                continue
+            full = os.path.join(root, name)
+            h.update(os.path.relpath(full, path).replace("\\", "/").encode("utf-8"))
+            with open(full, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    h.update(chunk)
+    return h.hexdigest()
+
+
+def sheet_fingerprint(**parts: Any) -> str:
+    """Fingerprint of one sheet run from its inputs (gridzone ids, source version, plan, config, ...)."""
+    payload = json.dumps({"version": SHEET_CACHE_VERSION, **parts}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _output_files(folder: str, outputs: List[str]) -> List[str]:
+    """Expands output names (Mains.shp, Annotation.lpkx) into the files that exist on disk."""
+    files: List[str] = []
+    for output in outputs:
+        if output.lower().endswith(".shp"):
+            base = output[:-4]
+            files.extend(base + ext for ext in SHAPEFILE_PART_EXTS if os.path.exists(os.path.join(folder, base + ext)))
+        elif os.path.exists(os.path.join(folder, output)):
+            files.append(output)
+    return files
+
+
+class SheetCache:
+    """
+    Stores and restores the outputs of one sheet, keyed by its fingerprint.
+
+    Layout: <root>/<fp[:2]>/<fp>/ holding <sheet>_clipped.gdb, the exported files and sheet.json
+    (clip counter rows, warnings, output names).
+
+    Args:
+        root (str): Persistent cache directory shared by all jobs.
+        max_age_seconds (int): Entries created longer ago than this are removed by prune().
+        logger (logging.Logger | None): Logger for cache messages.
+    """
+
+    def __init__(self, root: str, max_age_seconds: int, logger: Optional[logging.Logger] = None) -> None:
+        self.root = root
+        self.max_age_seconds = int(max_age_seconds)
+        self.logger = logger or logging.getLogger("survey_mapper.sheet_cache")
+
+    def _entry_dir(self, fingerprint: str) -> str:
+        return os.path.join(self.root, fingerprint[:2], fingerprint)
+
+    def restore(self, fingerprint: str, export_folder: str) -> Optional[Dict[str, Any]]:
+        """
+        Copies a cached sheet into export_folder. Returns the cached sheet.json
+        ({"gdb_name", "outputs", "rows", "warnings"}) or None on a miss.
+        """
+        entry_dir = self._entry_dir(fingerprint)
+        try:
+            with open(os.path.join(entry_dir, SHEET_META_FILENAME), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - float(meta.get("created_at", 0)) > self.max_age_seconds:
+            return None
+
+        gdb_dest = os.path.join(export_folder, meta["gdb_name"])
+        shutil.rmtree(gdb_dest, ignore_errors=True)
+        shutil.copytree(os.path.join(entry_dir, meta["gdb_name"]), gdb_dest)
+        for name in _output_files(entry_dir, meta["outputs"]):
+            shutil.copy2(os.path.join(entry_dir, name), os.path.join(export_folder, name))
+        return meta
+
+    def store(
+        self,
+        fingerprint: str,
+        export_folder: str,
+        gdb_name: str,
+        outputs: List[str],
+        rows: List[Dict[str, Any]],
+        warnings: List[str],
+    ) -> bool:
+        """
+        Copies a finished sheet's GDB and output files into the cache.
+        The entry is built in a temp folder and renamed into place, so a half-written entry is never restored.
+        """
+        entry_dir = self._entry_dir(fingerprint)
+        if os.path.exists(entry_dir):
+            return True
+        tmp_dir = f"{entry_dir}.{uuid.uuid4().hex}.tmp"
+        try:
+            os.makedirs(tmp_dir)
+            shutil.copytree(
+                os.path.join(export_folder, gdb_name),
+                os.path.join(tmp_dir, gdb_name),
+                ignore=shutil.ignore_patterns("*.lock"),
+            )
+            for name in _output_files(export_folder, outputs):
+                shutil.copy2(os.path.join(export_folder, name), os.path.join(tmp_dir, name))
+            with open(os.path.join(tmp_dir, SHEET_META_FILENAME), "w", encoding="utf-8") as f:
+                json.dump({
+                    "fingerprint": fingerprint,
+                    "created_at": time.time(),
+                    "gdb_name": gdb_name,
+                    "outputs": outputs,
+                    "rows": rows,
+                    "warnings": warnings,
+                }, f, indent=2, default=str)
+            os.replace(tmp_dir, entry_dir)
+            return True
+        except OSError as e:
+            # Another job may have stored the same sheet first
+            if not os.path.exists(entry_dir):
+                self.logger.warning(f"Could not store sheet {gdb_name} in the sheet cache: {e}")
+            return os.path.exists(entry_dir)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def prune(self) -> int:
+        """Removes entries older than max_age_seconds and leftover temp folders. Returns the number removed."""
+        if not os.path.isdir(self.root):
+            return 0
+        removed = 0
+        now = time.time()
+        for prefix in os.listdir(self.root):
+            prefix_dir = os.path.join(self.root, prefix)
+            if not os.path.isdir(prefix_dir):
+                continue
+            for name in os.listdir(prefix_dir):
+                entry_dir = os.path.join(prefix_dir, name)
+                meta_path = os.path.join(entry_dir, SHEET_META_FILENAME)
+                if name.endswith(".tmp"):
+                    expired = now - os.path.getmtime(entry_dir) > 24 * 3600
+                elif os.path.exists(meta_path):
+                    expired = now - os.path.getmtime(meta_path) > self.max_age_seconds
+                else:
+                    expired = True
+                if expired:
+                    shutil.rmtree(entry_dir, ignore_errors=True)
+                    removed += 1
+        return removed
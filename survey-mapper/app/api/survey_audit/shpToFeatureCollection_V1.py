@@ -1,12 +1,68 @@
 import logging
-from typing import Any, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 import arcpy
 import os
-import json
-import datetime
+import multiprocessing
 import tempfile
 import shutil
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from app.utils import helpers
+from app.api.survey_audit.attribute_reader import (
+    AttributeReader,
+    AttributeReaderError,
+    CursorAttributeReader,
+    get_attribute_reader,
+)
+from app.api.survey_audit.export_manifest import MANIFEST_FILENAME, ExportManifest
+from app.api.survey_audit.feature_collection_formats import OutputFormat, get_output_format
+from app.api.survey_audit.geometry_encoding import (
+    GeometryEncoder,
+    GeometryOptions,
+    layer_geometry_options,
+    validate_geometry_options,
+)
+
+
+class _CollectedMessages(logging.Handler):
+    """ Keeps the (msgType, message) pairs logged in an export worker so the parent can replay them. """
+
+    def __init__(self) -> None:
+        super().__init__(level=logging.INFO)
+        self.messages: List[Tuple[str, str]] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        msg_type = "ERROR" if record.levelno >= logging.ERROR else "WARNING" if record.levelno >= logging.WARNING else "INFO"
+        self.messages.append((msg_type, record.getMessage()))
+
+
+def _init_export_worker() -> None:
+    """ Initializer of the export worker processes used by RecursiveExportFeatureCollection.execute. """
+    arcpy.env.overwriteOutput = True
+
+
+def _export_shapefile_in_worker(tool_kwargs: Dict[str, Any], shp_path: str, json_output: str) -> Dict[str, Any]:
+    """
+    Export worker entry point. Converts one shapefile with process_shapefile and returns
+    {"messages": [(msgType, message)], "duration"}; messages are replayed into the job logger by the parent.
+    A failure is raised with the worker's messages attached as `export_messages`.
+    """
+    collected = _CollectedMessages()
+    logger_ = logging.getLogger(f"survey_mapper.export_worker.{os.getpid()}")
+    logger_.propagate = False
+    logger_.setLevel(logging.INFO)
+    logger_.addHandler(collected)
+    started = time.monotonic()
+    try:
+        RecursiveExportFeatureCollection(**tool_kwargs).process_shapefile(shp_path, json_output, logger_)
+    except Exception as e:
+        e.export_messages = collected.messages
+        raise
+    finally:
+        logger_.removeHandler(collected)
+    return {"messages": collected.messages, "duration": round(time.monotonic() - started, 3)}
+
 
 class Toolbox(object):
     def __init__(self):
@@ -15,9 +71,34 @@ class Toolbox(object):
         self.tools = [RecursiveExportFeatureCollection]
 
 class RecursiveExportFeatureCollection(object):
-    def __init__(self):
+    def __init__(
+        self,
+        compact: bool = True,
+        export_workers: int = 1,
+        attribute_reader: str = "numpy",
+        geometry_options: Optional[Dict[str, Any]] = None,
+        output_format: str = "json"
+    ):
+        """
+        Args:
+            compact (bool): Write Feature Collection JSON without indentation. False writes indented JSON.
+            export_workers (int): Worker processes converting shapefiles to JSON side by side (1 = one at a time).
+            attribute_reader (str): "numpy" reads attributes in bulk into NumPy arrays; "cursor" reads them row by row.
+            geometry_options (dict, optional): The survey config's featureCollectionExport section: coordinate
+                precision, quantization and simplification, for all layers or per layer (see geometry_encoding).
+            output_format (str): "json", "json.gz" or "binary" (.fcb); see feature_collection_formats.
+        """
         self.label = "Recursive Export of Feature Collection JSONs"
         self.description = "Recursively scans folders for shapefiles, reprojects to EPSG:3857 if needed, and exports ArcGIS Online-style Feature Collection JSON files."
+        self.compact = compact
+        self.export_workers = max(1, int(export_workers or 1))
+        self.attribute_reader_name = attribute_reader
+        self.attribute_reader: AttributeReader = get_attribute_reader(attribute_reader)
+        validate_geometry_options(geometry_options)
+        self.geometry_options: Dict[str, Any] = geometry_options or {}
+        self.output_format: OutputFormat = get_output_format(output_format)
+        # Set by execute: the one scan of the input folder, plus the files written to the output folder
+        self.manifest: Optional[ExportManifest] = None
 
     def getParameterInfo(self):
         return [
@@ -62,31 +143,45 @@ class RecursiveExportFeatureCollection(object):
         else:
             raise ValueError(f"Invalid msgType: {msgType}")
 
-    def execute(self, parameters: List[Any], logger_: logging.Logger) -> None:
+    def execute(
+        self,
+        parameters: List[Any],
+        logger_: logging.Logger,
+        progress_: Optional[Callable[..., None]] = None
+    ) -> None:
         input_folder = parameters[0].valueAsText
         output_folder = parameters[1].valueAsText
 
         arcpy.env.overwriteOutput = True
         self._logMessage(f"Scanning: {input_folder}", 'INFO', logger_)
 
+        # One walk of the input folder; every step below takes its files from the manifest
+        manifest = ExportManifest.scan(input_folder, results_dir=output_folder)
+        self.manifest = manifest
+        shp_paths = manifest.source_paths("shapefile")
+        lpkx_paths = manifest.source_paths("layer_package")
+        self._logMessage(f"Found {len(shp_paths)} shapefiles and {len(lpkx_paths)} layer packages", 'INFO', logger_)
+
         # Convert all shapefiles into JSON files
-        for root, _, files in os.walk(input_folder):
-            for file in files:
-                if file.lower().endswith(".shp"):
-                    shp_path = os.path.join(root, file)
-                    base_name = os.path.splitext(file)[0]
-                    json_output = f'{output_folder}/{base_name}.json'
-
-                    self._logMessage(f"Exporting: {shp_path}", 'INFO', logger_)
-
-                    try:
-                        self.process_shapefile(shp_path, json_output, logger_)
-                        self._logMessage(f"Saved to: {json_output}", 'INFO', logger_)
-                    except Exception as e:
-                        import traceback
-                        msg = f"Error processing {shp_path}: {e} \n + {traceback.format_exc()}"
-                        self._logMessage(msg, 'ERROR', logger_)
-                    
+        if self.export_workers > 1 and len(shp_paths) > 1:
+            self._export_shapefiles_parallel(shp_paths, output_folder, manifest, logger_, progress_)
+        else:
+            for shp_number, shp_path in enumerate(shp_paths, start=1):
+                base_name = os.path.splitext(os.path.basename(shp_path))[0]
+                json_output = f'{output_folder}/{base_name}{self.output_format.extension}'
+
+                self._logMessage(f"Exporting: {shp_path}", 'INFO', logger_)
+                if progress_ is not None:
+                    progress_("export", shp_number, len(shp_paths), base_name)
+
+                try:
+                    self.process_shapefile(shp_path, json_output, logger_)
+                    manifest.add_result(json_output)
+                    self._logMessage(f"Saved to: {json_output}", 'INFO', logger_)
+                except Exception as e:
+                    msg = f"Error processing {shp_path}: {e} \n + {traceback.format_exc()}"
+                    self._logMessage(msg, 'ERROR', logger_)
+
         # Create mobile geodatabase
         mobile_gdb_path = os.path.join(output_folder, "output_data.geodatabase")
         if not arcpy.Exists(mobile_gdb_path):
@@ -96,58 +191,60 @@ class RecursiveExportFeatureCollection(object):
             self._logMessage(f"Mobile geodatabase already exists at: {mobile_gdb_path}", 'INFO', logger_)
         
         # Add shapefiles to the mobile GDB
-        for root, _, files in os.walk(input_folder):
-            for file in files:
-                if file.lower().endswith(".shp"):
-                    shp_path = os.path.join(root, file)
-                    try:
-                        arcpy.conversion.FeatureClassToGeodatabase(shp_path, mobile_gdb_path)
-                        self._logMessage(f"Added {file} to mobile geodatabase.", 'INFO', logger_)
-                    except Exception as e:
-                        self._logMessage(f"Failed to add {file} to GDB: {e}", "WARNING", logger_)
-
-                        # If initial copy failed, let's try using a copy process
-                        try:
-                            arcpy.management.CopyFeatures(shp_path, mobile_gdb_path)
-                            self._logMessage(f"Copied {file} to mobile geodatabase.", 'INFO', logger_)
-                        except Exception as e:
-                            self._logMessage(f"Failed to copy {file} to mobile GDB: {e}", "WARNING", logger_)
+        for shp_path in shp_paths:
+            file = os.path.basename(shp_path)
+            try:
+                arcpy.conversion.FeatureClassToGeodatabase(shp_path, mobile_gdb_path)
+                self._logMessage(f"Added {file} to mobile geodatabase.", 'INFO', logger_)
+            except Exception as e:
+                self._logMessage(f"Failed to add {file} to GDB: {e}", "WARNING", logger_)
+
+                # If initial copy failed, let's try using a copy process
+                try:
+                    arcpy.management.CopyFeatures(shp_path, mobile_gdb_path)
+                    self._logMessage(f"Copied {file} to mobile geodatabase.", 'INFO', logger_)
+                except Exception as e:
+                    self._logMessage(f"Failed to copy {file} to mobile GDB: {e}", "WARNING", logger_)
         
         # Create disk-based temp folder
         temp_dir = tempfile.mkdtemp()
         self._logMessage(f"Temporary extraction folder created at: {temp_dir}", 'INFO', logger_)
 
-        for root, _, files in os.walk(input_folder):
-            for file in files:
-                if file.lower().endswith(".lpkx"):
-                    source_lpkx = os.path.join(root, file)
-                    
-                    # Save layer packages in same output folder
-                    target_lpkx = os.path.join(output_folder, file)
-
-                    self._logMessage(f"Copying LPKX file to: {target_lpkx}", 'INFO', logger_)
-                    arcpy.management.Copy(source_lpkx, target_lpkx)
-
-                    # Step: Extract and import to mobile geodatabase
-                    try:
-                        extract_path = os.path.join(temp_dir, os.path.splitext(file)[0])
-                        self._logMessage(f"Extracting {file} to: {extract_path}", 'INFO', logger_)
-                        arcpy.management.ExtractPackage(source_lpkx, extract_path)
-
-                        # Look for .gdbs and import feature classes
-                        for dirpath, _, subfiles in os.walk(extract_path):
-                            if dirpath.lower().endswith(".gdb"):
-                                arcpy.env.workspace = dirpath
-                                fcs = arcpy.ListFeatureClasses()
-                                for fc in fcs:
-                                    try:
-                                        self._logMessage(f"Importing {fc} to mobile GDB...", 'INFO', logger_)
-                                        arcpy.conversion.FeatureClassToGeodatabase(fc, mobile_gdb_path)
-                                        self._logMessage(f"Imported {fc} to mobile GDB", 'INFO', logger_)
-                                    except Exception as import_error:
-                                        self._logMessage(f"Could not import {fc}: {import_error}", "WARNING", logger_)
-                    except Exception as e:
-                        self._logMessage(f"Failed to unpack or import LPKX '{file}': {e}", "WARNING", logger_)
+        for source_lpkx in lpkx_paths:
+            file = os.path.basename(source_lpkx)
+
+            # Save layer packages in same output folder
+            target_lpkx = os.path.join(output_folder, file)
+
+            self._logMessage(f"Copying LPKX file to: {target_lpkx}", 'INFO', logger_)
+            arcpy.management.Copy(source_lpkx, target_lpkx)
+            manifest.add_result(target_lpkx)
+
+            # Step: Extract and import to mobile geodatabase
+            try:
+                extract_path = os.path.join(temp_dir, os.path.splitext(file)[0])
+                self._logMessage(f"Extracting {file} to: {extract_path}", 'INFO', logger_)
+                arcpy.management.ExtractPackage(source_lpkx, extract_path)
+
+                # Look for .gdbs and import feature classes
+                for dirpath, _, subfiles in os.walk(extract_path):
+                    if dirpath.lower().endswith(".gdb"):
+                        arcpy.env.workspace = dirpath
+                        fcs = arcpy.ListFeatureClasses()
+                        for fc in fcs:
+                            try:
+                                self._logMessage(f"Importing {fc} to mobile GDB...", 'INFO', logger_)
+                                arcpy.conversion.FeatureClassToGeodatabase(fc, mobile_gdb_path)
+                                self._logMessage(f"Imported {fc} to mobile GDB", 'INFO', logger_)
+                            except Exception as import_error:
+                                self._logMessage(f"Could not import {fc}: {import_error}", "WARNING", logger_)
+            except Exception as e:
+                self._logMessage(f"Failed to unpack or import LPKX '{file}': {e}", "WARNING", logger_)
+
+        # Index of the result set, used by zip_directory and downstream tools
+        manifest.add_result(mobile_gdb_path)
+        manifest_path = manifest.write(os.path.join(output_folder, MANIFEST_FILENAME))
+        self._logMessage(f"Export manifest with {len(manifest.results)} files written to: {manifest_path}", 'INFO', logger_)
 
         # Optional cleanup of temp directory
         try:
@@ -161,17 +258,82 @@ class RecursiveExportFeatureCollection(object):
 
 
 
+    def _export_shapefiles_parallel(
+        self,
+        shp_paths: List[str],
+        output_folder: str,
+        manifest: ExportManifest,
+        logger_: logging.Logger,
+        progress_: Optional[Callable[..., None]] = None
+    ) -> None:
+        """
+        Converts the shapefiles in export_workers worker processes. Each worker logs into a list that is
+        replayed into logger_ when its shapefile is done, so the job log keeps every message and error.
+        """
+        # Shapefiles with the same name in different folders write the same JSON; as in the serial
+        # export the last one wins, and only it is converted so two workers never write one file
+        outputs: Dict[str, str] = {}
+        for shp_path in shp_paths:
+            base_name = os.path.splitext(os.path.basename(shp_path))[0]
+            json_output = f'{output_folder}/{base_name}{self.output_format.extension}'
+            if json_output in outputs:
+                self._logMessage(f"Skipping {outputs[json_output]}: {shp_path} writes the same {json_output}", "WARNING", logger_)
+            outputs[json_output] = shp_path
+
+        n_workers = min(self.export_workers, len(outputs))
+        self._logMessage(f"Exporting {len(outputs)} shapefiles with {n_workers} worker processes", 'INFO', logger_)
+        tool_kwargs = {
+            "compact": self.compact,
+            "attribute_reader": self.attribute_reader_name,
+            "geometry_options": self.geometry_options,
+            "output_format": self.output_format.name,
+        }
+        with ProcessPoolExecutor(
+            max_workers=n_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_export_worker,
+        ) as pool:
+            futures = {}
+            for json_output, shp_path in outputs.items():
+                self._logMessage(f"Exporting: {shp_path}", 'INFO', logger_)
+                futures[pool.submit(_export_shapefile_in_worker, tool_kwargs, shp_path, json_output)] = (shp_path, json_output)
+
+            for shp_number, fut in enumerate(as_completed(futures), start=1):
+                shp_path, json_output = futures[fut]
+                base_name = os.path.splitext(os.path.basename(shp_path))[0]
+                if progress_ is not None:
+                    progress_("export", shp_number, len(futures), base_name)
+                try:
+                    result = fut.result()
+                    for msg_type, message in result["messages"]:
+                        self._logMessage(message, msg_type, logger_)
+                    manifest.add_result(json_output)
+                    logger_.info(
+                        f"Saved to: {json_output}",
+                        extra={"stage": "export", "feature_class": base_name, "duration": result["duration"]},
+                    )
+                except Exception as e:
+                    for msg_type, message in getattr(e, "export_messages", []):
+                        self._logMessage(message, msg_type, logger_)
+                    msg = f"Error processing {shp_path}: {e} \n + {''.join(traceback.format_exception(e))}"
+                    self._logMessage(msg, 'ERROR', logger_)
+
     def process_shapefile(self, input_fc, output_path, logger_: logging.Logger) -> None:
         self._logMessage(f"Processing shapefile: {input_fc}", "INFO", logger_)
         wkid = 102100
         latest_wkid = 3857
         spatial_ref_json = {"wkid": wkid, "latestWkid": latest_wkid}
-        original_name = os.path.splitext(os.path.basename(output_path))[0]
+        original_name = os.path.basename(output_path)
+        if original_name.lower().endswith(self.output_format.extension):
+            original_name = original_name[: -len(self.output_format.extension)]
+        else:
+            original_name = os.path.splitext(original_name)[0]
 
 
         desc = arcpy.Describe(input_fc)
         if desc.spatialReference.factoryCode != latest_wkid:
-            projected_fc = os.path.join("in_memory", "temp_proj")
+            # Named per process so export workers never share an in_memory dataset
+            projected_fc = os.path.join("in_memory", f"temp_proj_{os.getpid()}")
             arcpy.Project_management(input_fc, projected_fc, arcpy.SpatialReference(latest_wkid))
             input_fc = projected_fc
             desc = arcpy.Describe(input_fc)
@@ -212,28 +374,85 @@ class RecursiveExportFeatureCollection(object):
                 "defaultValue": None
             })
 
-        features = []
-        field_names = [f.name for f in fields]
-        with arcpy.da.SearchCursor(input_fc, field_names + ["SHAPE@"]) as cursor:
-            for row in cursor:
-                attr = {}
-                for name, val in zip(field_names, row[:-1]):
-                    if isinstance(val, (datetime.date, datetime.datetime)):
-                        try:
-                            attr[name] = int(val.timestamp() * 1000)
-                        except (OSError, ValueError):
-                            epoch = datetime.datetime(1970, 1, 1)
-                            delta = val - epoch
-                            attr[name] = int(delta.total_seconds() * 1000)
-                    else:
-                        attr[name] = val
-
-                shape = row[-1]
+        layer_definition = {
+            "currentVersion": 11.2,
+            "id": 0,
+            "name": original_name,
+            "type": "Feature Layer",
+            "geometryType": geometry_type,
+            "objectIdField": next((f.name for f in fields if f.type == "OID"), "FID"),
+            "displayField": "",
+            "extent": extent,
+            "fields": field_defs,
+            "drawingInfo": {
+                "renderer": {
+                    "type": "simple",
+                    "symbol": {
+                        "type": "esriSLS" if "Polyline" in geometry_type else "esriSFS",
+                        "style": "esriSLSSolid" if "Polyline" in geometry_type else "esriSFSSolid",
+                        "color": [0, 0, 255, 255],
+                        "width": 1
+                    }
+                }
+            }
+        }
+
+        options = layer_geometry_options(self.geometry_options, original_name)
+        if options != GeometryOptions():
+            self._logMessage(f"Geometry options for {original_name}: {options._asdict()}", "INFO", logger_)
+        encoder = GeometryEncoder(options, extent)
+
+        # Attributes come from the attribute reader in bulk; only geometry is read per feature here
+        field_types = {f.name: f.type for f in fields}
+        try:
+            count = self._write_features(
+                input_fc, output_path, layer_definition, geometry_type, spatial_ref_json, field_types,
+                self.attribute_reader, encoder, logger_
+            )
+        except AttributeReaderError as e:
+            self._logMessage(f"{e}; reading the attributes row by row instead", "WARNING", logger_)
+            count = self._write_features(
+                input_fc, output_path, layer_definition, geometry_type, spatial_ref_json, field_types,
+                CursorAttributeReader(), encoder, logger_
+            )
+
+        if projected_fc and arcpy.Exists(projected_fc):
+            arcpy.Delete_management(projected_fc)
+
+        self._logMessage(f"Feature Collection written to: {output_path} ({count} features)", "INFO", logger_)
+
+    def _write_features(
+        self,
+        input_fc: str,
+        output_path: str,
+        layer_definition: Dict[str, Any],
+        geometry_type: str,
+        spatial_ref_json: Dict[str, Any],
+        field_types: Dict[str, str],
+        attribute_reader: AttributeReader,
+        encoder: GeometryEncoder,
+        logger_: logging.Logger
+    ) -> int:
+        """
+        Streams the features to output_path, pairing each geometry with the attributes of the same OID
+        and applying the layer's geometry options. Returns the number of features written.
+        """
+        # Features go straight from the cursor to the file, so memory use does not grow with the layer
+        writer = self.output_format.writer(
+            output_path, layer_definition, geometry_type, spatial_ref_json, compact=self.compact, transform=encoder.transform
+        )
+        attributes = attribute_reader.iter_attributes(input_fc, field_types)
+        with writer, arcpy.da.SearchCursor(input_fc, ["OID@", "SHAPE@"]) as cursor:
+            for oid, shape in cursor:
+                attr_oid, attr = next(attributes, (None, None))
+                if oid != attr_oid:
+                    raise AttributeReaderError(f"Attribute rows of {input_fc} are out of step with its geometry (OID {attr_oid} != {oid})")
+
                 if not shape or (hasattr(shape, "isEmpty") and shape.isEmpty):
                     self._logMessage("Skipped a feature with null or empty geometry.", "WARNING", logger_)
                     continue
 
-                geom = shape.__geo_interface__
+                geom = encoder.simplify(shape).__geo_interface__
                 arcgis_geom = {"spatialReference": spatial_ref_json}
                 geom_type = geom["type"]
 
@@ -252,48 +471,6 @@ class RecursiveExportFeatureCollection(object):
                     arcpy.AddWarning(f"Skipped unsupported geometry type: {geom_type}")
                     continue
 
-                features.append({
-                    "attributes": attr,
-                    "geometry": arcgis_geom
-                })
-
-        layer = {
-            "layerDefinition": {
-                "currentVersion": 11.2,
-                "id": 0,
-                "name": original_name,
-                "type": "Feature Layer",
-                "geometryType": geometry_type,
-                "objectIdField": next((f.name for f in fields if f.type == "OID"), "FID"),
-                "displayField": "",
-                "extent": extent,
-                "fields": field_defs,
-                "drawingInfo": {
-                    "renderer": {
-                        "type": "simple",
-                        "symbol": {
-                            "type": "esriSLS" if "Polyline" in geometry_type else "esriSFS",
-                            "style": "esriSLSSolid" if "Polyline" in geometry_type else "esriSFSSolid",
-                            "color": [0, 0, 255, 255],
-                            "width": 1
-                        }
-                    }
-                }
-            },
-            "featureSet": {
-                "geometryType": geometry_type,
-                "features": features,
-                "spatialReference": spatial_ref_json
-            }
-        }
-
-        feature_collection = {"layers": [layer]}
-
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(feature_collection, f, indent=2)
-
-        if projected_fc and arcpy.Exists(projected_fc):
-            arcpy.Delete_management(projected_fc)
-
-        self._logMessage(f"Feature Collection JSON written to: {output_path}", "INFO", logger_)
+                writer.write_feature(attr, encoder.encode(arcgis_geom))
+        return writer.count
         
@@ -5,17 +5,126 @@ import arcpy
 import tempfile
 import shutil
 import re
+import multiprocessing
+import time
 import pandas as pd
-from typing import Any, List, Optional, Dict, Set, Tuple, Union
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, List, Optional, Dict, Set, Tuple, Union
 from pathlib import Path
 from app.api.survey_audit.shpToFeatureCollection_V1 import RecursiveExportFeatureCollection  # adjust import path as needed
 from app.api.survey_audit.clip_counter import ClipCounter
+from app.api.survey_audit.feature_collection_formats import survey_output_format
+from app.api.survey_audit.lut_plan import (
+    MERGE_SOURCE_NAME,
+    ClipStep,
+    LutPlan,
+    LutPlanError,
+    MergeStep,
+    PostClipFilterStep,
+    compile_lut_plan,
+)
+from app.api.survey_audit.sheet_cache import SHAPEFILE_PART_EXTS, SheetCache, hash_directory, sheet_fingerprint
+from app.custom_logging.custom_logger import build_job_logger, close_job_logger, flush_job_logger
 from app.utils import helpers
 
 def _safe_run_label(s: str, max_len: int = 80) -> str:
     s = (s or "").strip() or "grid_clip"
     s = re.sub(r"[^A-Za-z0-9._-]+", "_", s).strip("._-")
     return s[:max_len]
+
+
+def _process_sheet_in_worker(
+        init_kwargs: Dict[str, Any],
+        lut_plan: LutPlan,
+        logger_job_id: str,
+        sheet_name: str,
+        sheet_export_folder: str,
+        fingerprint: Optional[str] = None
+    ) -> Dict[str, Any]:
+    """
+    Worker process entry point for SurveyMapper._process_sheets_parallel.
+    Builds its own logger, SurveyMapper and arcpy scratch workspace, processes one sheet
+    (or restores it from the sheet cache) into sheet_export_folder and returns the clip
+    counter rows with the errors and warnings.
+    """
+    safe_name = _safe_run_label(sheet_name)
+    logger = build_job_logger(f"{logger_job_id}.{safe_name}", init_kwargs["parent_dir"], log_label=safe_name)
+    try:
+        os.makedirs(sheet_export_folder, exist_ok=True)
+
+        # Private scratch GDB so concurrent sheets never share intermediate datasets
+        scratch_gdb = os.path.join(sheet_export_folder, "scratch.gdb")
+        if not arcpy.Exists(scratch_gdb):
+            arcpy.management.CreateFileGDB(sheet_export_folder, "scratch.gdb")
+        arcpy.env.scratchWorkspace = scratch_gdb
+
+        mapper = SurveyMapper(logger=logger, **init_kwargs)
+        mapper.lut_plan = lut_plan
+
+        # Rows are only collected here; the parent process writes the CSV
+        counter = ClipCounter(init_kwargs["parent_dir"], logger, save_dir=sheet_export_folder)
+        result = mapper._process_sheet_cached(sheet_name, sheet_export_folder, counter, fingerprint)
+        helpers.clear_locks()
+    finally:
+        # The sheet's log file is complete before the parent collects the logs
+        close_job_logger(logger)
+
+    return {
+        "sheet": sheet_name,
+        "rows": counter.rows,
+        "errors": result["errors"],
+        "warnings": result["warnings"],
+    }
+
+# Per-process scratch GDB of a clip worker, set by _init_clip_worker
+_CLIP_WORKER_GDB: Optional[str] = None
+
+
+def _init_clip_worker(scratch_root: str, gdb_path: str) -> None:
+    """
+    Initializer of the clip worker processes used by SurveyMapper._run_row_steps_concurrently.
+    Every worker clips into its own scratch GDB so concurrent clips never write to the same geodatabase.
+    """
+    global _CLIP_WORKER_GDB
+    os.makedirs(scratch_root, exist_ok=True)
+    gdb_name = f"clip_worker_{os.getpid()}.gdb"
+    worker_gdb = os.path.join(scratch_root, gdb_name)
+    if not arcpy.Exists(worker_gdb):
+        arcpy.management.CreateFileGDB(scratch_root, gdb_name)
+    arcpy.env.workspace = gdb_path
+    arcpy.env.scratchWorkspace = worker_gdb
+    arcpy.env.overwriteOutput = True
+    _CLIP_WORKER_GDB = worker_gdb
+
+
+def _clip_source(step: ClipStep, output_grid: str, out_path: str) -> None:
+    """Pre-clip attribute query (if any) and clip of one source feature class into out_path."""
+    if step.pre_clip_query:
+        lyr = f"{step.output_name}_lyr"
+        arcpy.MakeFeatureLayer_management(step.source_name, lyr)
+        arcpy.SelectLayerByAttribute_management(lyr, "NEW_SELECTION", step.pre_clip_query)
+        arcpy.analysis.Clip(lyr, output_grid, out_path)
+        arcpy.Delete_management(lyr)
+    else:
+        arcpy.analysis.Clip(step.source_name, output_grid, out_path)
+
+
+def _clip_step_in_worker(step: ClipStep, output_grid: str) -> Dict[str, Any]:
+    """
+    Clip worker entry point. Clips one LUT row into this worker's scratch GDB and returns
+    {"path", "clipped_count", "duration"}; the parent copies the result into the per-sheet GDB.
+    """
+    # Row number keeps two rows with the same IntermediateClipFilterName apart
+    out_path = os.path.join(_CLIP_WORKER_GDB, f"{step.output_name}_{step.row}")
+    started = time.monotonic()
+    _clip_source(step, output_grid, out_path)
+    return {
+        "path": out_path,
+        "clipped_count": int(arcpy.management.GetCount(out_path)[0]),
+        "duration": round(time.monotonic() - started, 3),
+    }
+
+
 class SurveyMapper:
     def __init__(self, 
             gdb_path: str, 
@@ -24,7 +133,16 @@ class SurveyMapper:
             logger: logging.Logger,
             alternate_name_df: Optional[Union[pd.DataFrame, None]] = None,
             config_dict: Optional[Dict[str, Any]] = None,
-            division_code: Optional[str] = None 
+            division_code: Optional[str] = None,
+            sheet_workers: int = 1,
+            clip_workers: int = 1,
+            sheet_cache_dir: Optional[str] = None,
+            sheet_cache_max_age_hours: int = 168,
+            source_version: Optional[str] = None,
+            progress: Optional[Callable[..., None]] = None,
+            compact_json: bool = True,
+            export_workers: int = 1,
+            attribute_reader: str = "numpy"
         ) -> None:
         """
         Initializes the RecursiveExportFeatureCollection class with paths to input data and configuration settings.
@@ -34,6 +152,15 @@ class SurveyMapper:
             parent_dir (str): Parent directory where outputs such as feature collections or logs will be written.
             gridzone_excel_path (str): Path to the Excel file containing gridzone data.
             alternate_name_df (Optional[pd.DataFrame]): DataFrame containing alternative names for asset types
+            sheet_workers (int): Number of worker processes used to process Excel sheets in parallel. 1 runs sheets one after another.
+            clip_workers (int): Number of worker processes used to clip the LUT rows of one sheet concurrently. 1 clips one row at a time.
+            sheet_cache_dir (Optional[str]): Persistent folder for per-sheet outputs reused by later jobs. None disables the sheet cache.
+            sheet_cache_max_age_hours (int): Cached sheets older than this are not reused and are pruned.
+            source_version (Optional[str]): Identifies the source GDB content (e.g. hash of its zip). Hashed from gdb_path when not given.
+            progress (Optional[Callable]): Called as progress(stage, current, total, label) as the job moves through sheets, clips and exports.
+            compact_json (bool): Write Feature Collection JSON without indentation.
+            export_workers (int): Number of worker processes converting shapefiles to Feature Collection JSON. 1 converts one at a time.
+            attribute_reader (str): How the export reads attributes: "numpy" (bulk, column-wise) or "cursor" (row by row).
 
         Attributes:
             asset_lookup (dict): A dictionary that will be populated with alternative names or mappings for asset types.
@@ -43,6 +170,22 @@ class SurveyMapper:
         self.gridzone_excel_path: str = gridzone_excel_path
         self.alternate_name_df: pd.DataFrame | None = alternate_name_df
         self.division_code: Optional[str] = division_code
+        self.sheet_workers: int = max(1, int(sheet_workers or 1))
+        self.clip_workers: int = max(1, int(clip_workers or 1))
+        self._clip_pool: Optional[ProcessPoolExecutor] = None
+        self._clip_scratch_root: Optional[str] = None
+
+        self.sheet_cache_dir: Optional[str] = sheet_cache_dir
+        self.sheet_cache_max_age_hours: int = sheet_cache_max_age_hours
+        self.sheet_cache: Optional[SheetCache] = (
+            SheetCache(sheet_cache_dir, sheet_cache_max_age_hours * 3600, logger)
+            if sheet_cache_dir else None
+        )
+        self.source_version: Optional[str] = source_version
+        self.progress: Optional[Callable[..., None]] = progress
+        self.compact_json: bool = compact_json
+        self.export_workers: int = max(1, int(export_workers or 1))
+        self.attribute_reader: str = attribute_reader
 
         if config_dict is not None:
             self._config = config_dict
@@ -55,14 +198,27 @@ class SurveyMapper:
         self.alternate_name_db_name: str = self._config['lutassettypes']['source_sql_db_name']
         self.alternate_names_is_excel: bool = True if self._config['lutassettypes']['source_type'] == 'excel' else False
 
-        # Excel-based alternate names and attribute queries
-        self.alternate_name_map: Dict[str, Any] = {}
+        # Excel-based alternate names and attribute queries, compiled once per job
+        self.lut_plan: Optional[LutPlan] = None
+
+        # Source GDB lookups are the same for every sheet, so they are only asked once
+        self._source_exists_cache: Dict[str, bool] = {}
+        self._source_count_cache: Dict[str, int] = {}
 
         # Logging setup
         log_folder = os.path.join(parent_dir, "logs")
         os.makedirs(log_folder, exist_ok=True)
         self.logger = logger or logging.getLogger(f"survey_mapper_tool.default")
 
+    def _report_progress(self, stage: str, current: int, total: int, label: Optional[str] = None) -> None:
+        """Passes progress to the progress callback, if any. Never raises."""
+        if self.progress is None:
+            return
+        try:
+            self.progress(stage, current, total, label)
+        except Exception as e:
+            self.logger.debug(f"Progress callback failed: {e}")
+
     def _norm_name(self, s: Optional[str]) -> str:
         """Case-insensitive, trimmed name normalization for matching."""
         return (s or "").strip().lower()
@@ -119,51 +275,24 @@ class SurveyMapper:
         )
         return filtered
 
-    def _generate_alternate_name_map(self) -> Dict[str, Any]:
+    def _compile_lut_plan(self) -> LutPlan:
         """
-        Generates a mapping of asset names to their alternative names or geometry types.
+        Validates the LUT (alternate names) DataFrame and compiles it into the plan every sheet runs.
 
-        Args:
-            None
         Returns:
-            dict: A dictionary mapping asset names to their alternative names or geometry types.
-        """
-        self.alternate_name_map = {}
-        if self.alternate_name_df is not None and not self.alternate_name_df.empty:
-
-            if {
-                "SourceDataName",
-                "PreClipAttributeQuery",
-                "IntermediateClipFilterName",
-                "IntermediatePostClipFilterName",
-                "PostClipAttributeQuery",
-                "IntermediateMergeClipName",
-                "OutputName",
-                "GeometryType_Corrected",
-                "IsAnnotationLayer",
-                "IncludeInFinalResult"
-                }.issubset(self.alternate_name_df.columns):
-
-                self.alternate_name_map = dict(
-                        SourceDataName=self.alternate_name_df["SourceDataName"], 
-                        PreClipAttributeQuery=self.alternate_name_df["PreClipAttributeQuery"], 
-                        IntermediateClipFilterName=self.alternate_name_df['IntermediateClipFilterName'],
-                        IntermediatePostClipFilterName=self.alternate_name_df['IntermediatePostClipFilterName'],
-                        PostClipAttributeQuery=self.alternate_name_df['PostClipAttributeQuery'],
-                        IntermediateMergeClipName=self.alternate_name_df['IntermediateMergeClipName'],
-                        OutputName=self.alternate_name_df['OutputName'],
-                        GeometryType_Corrected=self.alternate_name_df['GeometryType_Corrected'],
-                        IsAnnotationLayer=self.alternate_name_df['IsAnnotationLayer'],
-                        IncludeInFinalResult=self.alternate_name_df['IncludeInFinalResult']
-                )
-                self.logger.info(f"Alternate name map built with {len(self.alternate_name_map)} entries.")
-            else:
-                self.logger.warning("self.alternate_name_df does not contain one or more of the required columns: " \
-                "'SourceDataName', 'PreClipAttributeQuery', 'IntermediateClipFilterName', 'IntermediatePostClipFilterName', " \
-                "'PostClipAttributeQuery', 'IntermediateMergeClipName', 'OutputName', 'IsAnnotationLayer', or 'IncludeInFinalResult'")
+            LutPlan: clip, post-clip filter, merge, export and annotation steps with their dependencies.
 
-        return self.alternate_name_map
-  
+        Raises:
+            LutPlanError: if the LUT is missing columns or has rows that cannot run.
+        """
+        plan = compile_lut_plan(self.alternate_name_df)
+        for warning in plan.warnings:
+            self.logger.warning(warning)
+        self.logger.info(
+            f"LUT plan compiled: {len(plan.clips)} clips, {len(plan.merges)} merges, "
+            f"{len(plan.exports)} exports, {len(plan.annotation_packages)} annotation packages."
+        )
+        return plan
 
     def _is_annotation_fc(self, fc_path: str, recorded_as_anno: bool) -> Dict[str, bool]:
         """
@@ -189,11 +318,12 @@ class SurveyMapper:
                 "is_configured_as_annotation": recorded_as_anno
             }
 
-    def _process_post_clip_attribute_query(self, per_sheet_gdb_path, post_clip_attribute_query):
+    def _process_post_clip_attribute_query(self, per_sheet_gdb_path, post_clip_attribute_query, source_path=None):
         # Get ID and Source Layer to Get IDs from
         source_id_field, source_layer = post_clip_attribute_query.split(',')
 
-        output_source_path = os.path.join(per_sheet_gdb_path, source_layer)
+        # source_path overrides the per-sheet GDB layer, e.g. with an earlier row's clip of a reused name
+        output_source_path = source_path or os.path.join(per_sheet_gdb_path, source_layer)
 
         # Get all SERVICEOBJECTSWGUIDs in table InactiveRisers
         lyr = f"{source_layer}_lyr"
@@ -223,6 +353,18 @@ class SurveyMapper:
     def _existsInFileGdb(self, gdb_path, feature_class_name: str) -> bool:
         fc_path = os.path.join(gdb_path, feature_class_name)
         return arcpy.Exists(fc_path)
+
+    def _source_exists(self, feature_class_name: str) -> bool:
+        """Cached _existsInFileGdb for the source GDB, which does not change during a job."""
+        if feature_class_name not in self._source_exists_cache:
+            self._source_exists_cache[feature_class_name] = self._existsInFileGdb(self.gdb_path, feature_class_name)
+        return self._source_exists_cache[feature_class_name]
+
+    def _source_count(self, feature_class_name: str) -> int:
+        """Cached feature count of a source GDB feature class."""
+        if feature_class_name not in self._source_count_cache:
+            self._source_count_cache[feature_class_name] = self._count_fc(os.path.join(self.gdb_path, feature_class_name))
+        return self._source_count_cache[feature_class_name]
     
     def _create_fc_in_gdb(
         self,
@@ -309,6 +451,8 @@ class SurveyMapper:
         results_dir = base / "results"
         results_dir.mkdir(parents=True, exist_ok=True)
 
+        # The job log file is written by the logger's listener thread
+        flush_job_logger(self.logger)
         logs = list(logs_dir.glob("log*.txt")) if logs_dir.exists() else []
         csvs = list(counts_dir.glob("clip_counts_grid_clip_*.csv")) if counts_dir.exists() else []
 
@@ -321,6 +465,615 @@ class SurveyMapper:
         return (len(logs), len(csvs))
 
 
+    def _process_sheet(self, sheet_name: str, export_folder: str, clip_counter: ClipCounter) -> Dict[str, List[str]]:
+        """
+        Joins one Excel sheet with the gridzones, runs the compiled LUT plan (clips, post-clip filters
+        and merges) against the joined grid, exports shapefiles and packages annotation layers into export_folder.
+
+        Returns:
+            dict: {"errors": [list of error strings], "warnings": [list of warning strings],
+                   "outputs": [files written to export_folder, e.g. "Mains.shp", "Annotation.lpkx"]}
+        """
+        errors: List[str] = []
+        warnings: List[str] = []
+        outputs: List[str] = []
+
+        try:
+            safe_name = sheet_name.replace(" ", "_")
+            sheet_path = f"{self.gridzone_excel_path}/{sheet_name}$"
+
+            # Per sheet output gdb
+            per_sheet_gdb_name = f"{safe_name}_clipped.gdb"
+            per_sheet_gdb_path = os.path.join(export_folder, per_sheet_gdb_name)
+            if not arcpy.Exists(per_sheet_gdb_path):
+                arcpy.management.CreateFileGDB(export_folder, per_sheet_gdb_name)
+
+            self.logger.info(
+                f"Processing sheet: {sheet_name} -> GDB: {per_sheet_gdb_name}",
+                extra={"stage": "sheet", "sheet": sheet_name},
+            )
+            arcpy.env.workspace = self.gdb_path
+            arcpy.env.overwriteOutput = True
+
+            joined_layer = arcpy.AddJoin_management(
+                in_layer_or_view=self._config["gridzones"]["feature_class_name_source"],
+                in_field=self._config["gridzones"]["GridZoneId_field"],
+                join_table=sheet_path,
+                join_field=self.join_excel_field_name,
+                join_type="KEEP_COMMON"
+            )[0]
+
+            output_grid = os.path.join(per_sheet_gdb_path, f"{safe_name}_gridzones")
+            arcpy.conversion.ExportFeatures(joined_layer, output_grid)
+            self.logger.info(f"Exported joined gridzones: {output_grid}")
+
+            # -----------------------------------------------------------
+            # TODO - Not sure what to use this filter by division for?
+            # fc_config_filtered = self._filter_by_division(fc_config_all)
+            # -----------------------------------------------------------
+
+            # Feature class path produced by each clip / merge step, keyed by step_id
+            produced: Dict[str, str] = {}
+            # Annotation outputs of the rows that ran, packaged after the exports
+            annotation_fc_candidates: Set[str] = set()
+
+            if self.clip_workers > 1 and len(self.lut_plan.clips) > 1:
+                self._run_row_steps_concurrently(
+                    sheet_name, output_grid, per_sheet_gdb_path, clip_counter,
+                    produced, annotation_fc_candidates, errors, warnings
+                )
+            else:
+                self._run_row_steps(
+                    sheet_name, output_grid, per_sheet_gdb_path, clip_counter,
+                    produced, annotation_fc_candidates, errors, warnings
+                )
+
+            # Export shp as final name; clips feeding a merge and merge results go last so they win name clashes
+            for export in self.lut_plan.exports:
+                in_features = produced.get(export.source_step_id)
+                if in_features is None:
+                    continue
+                try:
+                    arcpy.conversion.FeatureClassToFeatureClass(
+                        in_features=in_features,
+                        out_path=export_folder,
+                        out_name=f"{export.final_name}.shp"
+                    )
+                    self.logger.info(f"Exported {os.path.basename(in_features)} to shapefile: {os.path.join(export_folder, export.final_name + '.shp')}")
+                    if f"{export.final_name}.shp" not in outputs:
+                        outputs.append(f"{export.final_name}.shp")
+                except Exception as shp_err:
+                    msg = f"Failed to export {in_features} to shapefile: {shp_err}"
+                    self.logger.warning(msg)
+                    errors.append(msg)
+
+            # After standard pipeline, handle annotation feature classes with packaging
+            # Use the per sheet joined grid (output_grid) as the AOI polygon
+            for anno in self.lut_plan.annotation_packages:
+                ann_fc = anno.final_name
+                if ann_fc not in annotation_fc_candidates:
+                    continue
+                try:
+                    layer_name = f"{os.path.basename(ann_fc)}"
+                    self.clip_annotation_to_polygon_and_package(
+                        gdb_path=per_sheet_gdb_path,
+                        annotation_fc=os.path.join(export_folder, ann_fc + ".shp"),
+                        polygon_fc=output_grid,
+                        polygon_where="", # TODO: Future option to allow user to select which annotations to select
+                        layer_name=layer_name
+                    )
+                    self.logger.info(f"Packaged annotation to LPKX for: {ann_fc}")
+                    outputs.append(f"{layer_name.replace(' ', '_')}.lpkx")
+                except Exception as ann_err:
+                    msg = f"Annotation packaging failed for {ann_fc}: {ann_err}"
+                    self.logger.warning(msg)
+                    errors.append(msg)
+
+            self.logger.info(f"Completed sheet: {sheet_name}")
+
+        except Exception as sheet_err:
+            msg = f"Error processing sheet '{sheet_name}': {sheet_err}"
+            self.logger.error(msg)
+            errors.append(msg)
+
+        return {"errors": errors, "warnings": warnings, "outputs": outputs}
+
+    def _sheet_fingerprints(self, workbook: Any, sheet_names: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Fingerprints every sheet for the sheet cache from its gridzone ids, the source GDB version,
+        the compiled LUT plan, the survey config and the division. Empty when the sheet cache is off.
+        """
+        if self.sheet_cache is None:
+            return {}
+        try:
+            if self.source_version is None:
+                self.source_version = hash_directory(self.gdb_path)
+            plan_hash = sheet_fingerprint(plan=repr(self.lut_plan.steps))
+            config_hash = sheet_fingerprint(config=self._config)
+        except Exception as e:
+            self.logger.warning(f"Sheet cache disabled for this job; could not fingerprint inputs: {e}")
+            return {}
+
+        fingerprints: Dict[str, Optional[str]] = {}
+        for sheet_name in sheet_names:
+            try:
+                rows = workbook[sheet_name].iter_rows(values_only=True)
+                header = [str(h).strip() if h is not None else "" for h in next(rows, ())]
+                if self.join_excel_field_name in header:
+                    idx = header.index(self.join_excel_field_name)
+                    ids: Any = sorted({str(r[idx]) for r in rows if idx < len(r) and r[idx] is not None})
+                else:
+                    ids = [header] + [[str(v) for v in r] for r in rows]
+                fingerprints[sheet_name] = sheet_fingerprint(
+                    sheet=sheet_name,
+                    gridzone_ids=ids,
+                    source=self.source_version,
+                    plan=plan_hash,
+                    config=config_hash,
+                    division=self.division_code or "",
+                )
+            except Exception as e:
+                self.logger.warning(f"Could not fingerprint sheet '{sheet_name}'; it will be processed in full: {e}")
+                fingerprints[sheet_name] = None
+        return fingerprints
+
+    def _process_sheet_cached(
+            self,
+            sheet_name: str,
+            export_folder: str,
+            clip_counter: ClipCounter,
+            fingerprint: Optional[str] = None
+        ) -> Dict[str, List[str]]:
+        """
+        _process_sheet with the sheet cache in front of it. An unchanged sheet (same fingerprint)
+        gets its GDB, shapefiles, packages and clip counts copied from the cache; any other sheet
+        is processed and, if it finished without errors, stored for the next job.
+        """
+        if self.sheet_cache is None or not fingerprint:
+            return self._process_sheet(sheet_name, export_folder, clip_counter)
+
+        try:
+            cached = self.sheet_cache.restore(fingerprint, export_folder)
+        except Exception as e:
+            self.logger.warning(f"Could not restore sheet '{sheet_name}' from the sheet cache: {e}")
+            cached = None
+        if cached is not None:
+            clip_counter.extend(cached["rows"])
+            self.logger.info(f"Sheet '{sheet_name}' unchanged since an earlier job; reused cached outputs {cached['outputs']}")
+            return {"errors": [], "warnings": list(cached["warnings"]), "outputs": list(cached["outputs"])}
+
+        first_row = len(clip_counter.rows)
+        result = self._process_sheet(sheet_name, export_folder, clip_counter)
+        if not result["errors"]:
+            helpers.clear_locks()
+            if self.sheet_cache.store(
+                fingerprint,
+                export_folder,
+                gdb_name=f"{sheet_name.replace(' ', '_')}_clipped.gdb",
+                outputs=result["outputs"],
+                rows=clip_counter.rows[first_row:],
+                warnings=result["warnings"],
+            ):
+                self.logger.info(f"Sheet '{sheet_name}' stored in the sheet cache")
+        return result
+
+    def _run_row_steps(
+            self,
+            sheet_name: str,
+            output_grid: str,
+            per_sheet_gdb_path: str,
+            clip_counter: ClipCounter,
+            produced: Dict[str, str],
+            annotation_fc_candidates: Set[str],
+            errors: List[str],
+            warnings: List[str]
+        ) -> None:
+        """Runs the clip, post-clip filter and merge steps of the plan one after another, in LUT order."""
+        total_rows = len(self.lut_plan.row_steps)
+        for row_number, step in enumerate(self.lut_plan.row_steps, start=1):
+            if isinstance(step, MergeStep):
+                # Merges run after every clip, like the original MERGE_LAYERS handling
+                self._add_merge_layers_row(step, sheet_name, clip_counter)
+                continue
+            self._report_progress("clips", row_number, total_rows, step.output_name)
+
+            try:
+                if not self._check_source_exists(step, warnings):
+                    continue # skip processing this feature class because it doesn't exist
+
+                output_clip_fc_path = self._run_clip_step(step, output_grid, per_sheet_gdb_path, sheet_name, clip_counter)
+                produced[step.step_id] = output_clip_fc_path
+
+                post_filter = self.lut_plan.post_clip_filter_for(step)
+                if post_filter is not None:
+                    self._run_post_clip_filter_step(post_filter, output_grid, per_sheet_gdb_path)
+
+                if step.is_annotation and step.include_in_final_result:
+                    annotation_fc_candidates.add(step.final_name)
+
+            except Exception as clip_err:
+                msg = f"Could not clip {step.source_name}: {clip_err}"
+                self.logger.error(msg)
+                errors.append(msg)
+
+        # Merging Tasks
+        for step in self.lut_plan.merges:
+            merged_output_fc = self._run_merge_step(step, produced, per_sheet_gdb_path, sheet_name, clip_counter, errors)
+            if merged_output_fc:
+                produced[step.step_id] = merged_output_fc
+                if step.is_annotation and step.include_in_final_result:
+                    annotation_fc_candidates.add(step.final_name)
+
+    def _run_row_steps_concurrently(
+            self,
+            sheet_name: str,
+            output_grid: str,
+            per_sheet_gdb_path: str,
+            clip_counter: ClipCounter,
+            produced: Dict[str, str],
+            annotation_fc_candidates: Set[str],
+            errors: List[str],
+            warnings: List[str]
+        ) -> None:
+        """
+        Same steps as _run_row_steps, with the clips spread over the clip worker pool.
+
+        - Each clip runs in a worker process and writes to that worker's scratch GDB.
+        - As each clip finishes, its result is copied into the per-sheet GDB here in the parent.
+        - A post-clip filter or merge runs as soon as every clip it depends on has finished. A filter
+          reads the clip of its id layer made by the rows up to its own, even if a later row reuses the name.
+        - Clip counter rows are written in LUT order once the sheet is done.
+        """
+        plan = self.lut_plan
+        pool = self._get_clip_pool(os.path.dirname(per_sheet_gdb_path))
+
+        # A later row with the same IntermediateClipFilterName overwrites an earlier one
+        last_writer = {clip.output_name: clip.step_id for clip in plan.clips}
+
+        finished: Set[str] = set()
+        clip_rows: Dict[str, Dict[str, Any]] = {}
+        futures = {}
+        for clip in plan.clips:
+            if self._check_source_exists(clip, warnings):
+                futures[pool.submit(_clip_step_in_worker, clip, output_grid)] = clip
+            else:
+                finished.add(clip.step_id)
+
+        pending_filters = [pf for pf in (plan.post_clip_filter_for(c) for c in futures.values()) if pf is not None]
+        pending_merges = list(plan.merges)
+        merge_counter = ClipCounter(self.parent_dir)  # buffers merge rows until the clip rows are in
+        self.logger.info(f"Clipping {len(futures)} layers with {self.clip_workers} worker processes")
+
+        def run_ready_steps() -> None:
+            for pf in [pf for pf in pending_filters if all(d in finished for d in pf.depends_on)]:
+                pending_filters.remove(pf)
+                if pf.clip_step_id not in produced:
+                    continue
+                # Only the last row writing a name is copied into the sheet GDB; a filter reading an
+                # earlier row's clip of that name reads the clip's scratch copy, as a LUT-order run would
+                id_source_path = None
+                if last_writer.get(pf.id_source_layer) != pf.id_source_step_id and pf.id_source_step_id in clip_rows:
+                    id_source_path = clip_rows[pf.id_source_step_id]["path"]
+                try:
+                    self._run_post_clip_filter_step(pf, output_grid, per_sheet_gdb_path, id_source_path)
+                except Exception as post_err:
+                    msg = f"Could not clip {pf.output_name}: {post_err}"
+                    self.logger.error(msg)
+                    errors.append(msg)
+
+            for merge in [m for m in pending_merges if all(d in finished for d in m.depends_on)]:
+                pending_merges.remove(merge)
+                merged_output_fc = self._run_merge_step(merge, produced, per_sheet_gdb_path, sheet_name, merge_counter, errors)
+                if merged_output_fc:
+                    produced[merge.step_id] = merged_output_fc
+                    if merge.is_annotation and merge.include_in_final_result:
+                        annotation_fc_candidates.add(merge.final_name)
+
+        run_ready_steps()
+        for clips_done, fut in enumerate(as_completed(futures), start=1):
+            clip = futures[fut]
+            self._report_progress("clips", clips_done, len(futures), clip.output_name)
+            try:
+                result = fut.result()
+                output_clip_fc_path = os.path.join(per_sheet_gdb_path, clip.output_name)
+                if last_writer[clip.output_name] == clip.step_id:
+                    arcpy.management.Copy(result["path"], output_clip_fc_path)
+                self.logger.info(
+                    f"Clipped {clip.source_name} to {output_clip_fc_path}",
+                    extra={"stage": "clip", "sheet": sheet_name, "feature_class": clip.output_name,
+                           "tool": "analysis.Clip", "duration": result.get("duration")},
+                )
+
+                produced[clip.step_id] = output_clip_fc_path
+                clip_rows[clip.step_id] = result
+                if clip.is_annotation and clip.include_in_final_result:
+                    annotation_fc_candidates.add(clip.final_name)
+            except Exception as clip_err:
+                msg = f"Could not clip {clip.source_name}: {clip_err}"
+                self.logger.error(msg)
+                errors.append(msg)
+            finished.add(clip.step_id)
+            run_ready_steps()
+
+        for step in plan.row_steps:
+            if isinstance(step, MergeStep):
+                self._add_merge_layers_row(step, sheet_name, clip_counter)
+            elif step.step_id in clip_rows:
+                self._add_clip_row(step, sheet_name, clip_rows[step.step_id]["clipped_count"], clip_counter)
+        clip_counter.extend(merge_counter.rows)
+
+    def _get_clip_pool(self, export_folder: str) -> ProcessPoolExecutor:
+        """Starts the clip worker pool on first use; it is reused by every sheet of the job."""
+        if self._clip_pool is None:
+            self._clip_scratch_root = os.path.join(export_folder, "_clip_workers")
+            self._clip_pool = ProcessPoolExecutor(
+                max_workers=self.clip_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_clip_worker,
+                initargs=(self._clip_scratch_root, self.gdb_path),
+            )
+        return self._clip_pool
+
+    def _shutdown_clip_pool(self) -> None:
+        """Stops the clip workers and removes their scratch GDBs."""
+        pool, self._clip_pool = self._clip_pool, None
+        if pool is None:
+            return
+        pool.shutdown(wait=True, cancel_futures=True)
+        helpers.clear_locks()
+        if self._clip_scratch_root:
+            shutil.rmtree(self._clip_scratch_root, ignore_errors=True)
+
+    def _check_source_exists(self, step: ClipStep, warnings: List[str]) -> bool:
+        if self._source_exists(step.source_name):
+            return True
+        msg = f"Could not clip {step.source_name} because it does not exist in the file geodatabase: {self.gdb_path}. Continuing with execution..."
+        self.logger.warning(msg)
+        warnings.append(msg)
+        return False
+
+    def _add_clip_row(self, step: ClipStep, sheet_name: str, clipped_count: int, clip_counter: ClipCounter) -> None:
+        source_count = self._source_count(step.source_name)
+        clip_counter.add_row(
+            sheet=sheet_name,
+            source_name=step.source_name,
+            output_name=step.final_name,
+            source_count=source_count,
+            selected_count=source_count,
+            clipped_count=clipped_count,
+            note=f"pre={step.pre_clip_query}" if step.pre_clip_query else ""
+        )
+
+    def _add_merge_layers_row(self, step: MergeStep, sheet_name: str, clip_counter: ClipCounter) -> None:
+        clip_counter.add_row(
+            sheet=sheet_name,
+            source_name=MERGE_SOURCE_NAME,
+            output_name=step.final_name,
+            source_count=0,
+            selected_count=0,
+            clipped_count=0,  # No clipping occurs for MERGE_LAYERS rows
+        )
+
+    def _run_clip_step(
+            self,
+            step: ClipStep,
+            output_grid: str,
+            per_sheet_gdb_path: str,
+            sheet_name: str,
+            clip_counter: ClipCounter
+        ) -> str:
+        """Pre-clip attribute query (if any) and clip of one source feature class. Returns the clipped feature class path."""
+        output_clip_fc_path = os.path.join(per_sheet_gdb_path, step.output_name)
+        started = time.monotonic()
+        _clip_source(step, output_grid, output_clip_fc_path)
+        self.logger.info(
+            f"Clipped {step.source_name} to {output_clip_fc_path}",
+            extra={"stage": "clip", "sheet": sheet_name, "feature_class": step.output_name,
+                   "tool": "analysis.Clip", "duration": round(time.monotonic() - started, 3)},
+        )
+
+        self._add_clip_row(step, sheet_name, self._count_fc(output_clip_fc_path), clip_counter)
+        return output_clip_fc_path
+
+    def _run_post_clip_filter_step(
+            self,
+            step: PostClipFilterStep,
+            output_grid: str,
+            per_sheet_gdb_path: str,
+            id_source_path: Optional[str] = None
+        ) -> str:
+        """
+        Selects the post-clip layer by the ids found in another clipped layer and clips the selection.
+        The ids are read from id_source_layer in the per-sheet GDB, or from id_source_path when given.
+        """
+        output_post_clip_fc_path = os.path.join(per_sheet_gdb_path, step.output_name)
+        lyr = f"{step.output_name}_lyr"
+
+        full_post_clip_query = self._process_post_clip_attribute_query(
+            per_sheet_gdb_path, f"{step.id_field},{step.id_source_layer}", id_source_path
+        )
+
+        # Use the post-clipped layer to select the data on
+        arcpy.MakeFeatureLayer_management(step.output_name, lyr)
+        arcpy.SelectLayerByAttribute_management(lyr, "NEW_SELECTION", full_post_clip_query)
+        arcpy.analysis.Clip(lyr, output_grid, output_post_clip_fc_path)
+        arcpy.Delete_management(lyr)
+        return output_post_clip_fc_path
+
+    def _run_merge_step(
+            self,
+            step: MergeStep,
+            produced: Dict[str, str],
+            per_sheet_gdb_path: str,
+            sheet_name: str,
+            clip_counter: ClipCounter,
+            errors: List[str]
+        ) -> Optional[str]:
+        """Merges the clipped layers of one MERGE_LAYERS row. Returns the merged feature class path, or None."""
+        base_fc = produced.get(step.depends_on[0]) if step.depends_on else None
+        if not base_fc:
+            msg = f"Skipping merge for {step.base}; base not clipped."
+            self.logger.warning(msg)
+            errors.append(msg)
+            return None
+
+        merge_inputs = [base_fc]
+        for merge_name, dep in zip(step.merge_with, step.depends_on[1:]):
+            merge_path = produced.get(dep)
+            if merge_path and arcpy.Exists(merge_path):
+                merge_inputs.append(merge_path)
+            else:
+                msg = f"Layer to merge not found or not clipped: {merge_name}"
+                self.logger.warning(msg)
+                errors.append(msg)
+
+        if len(merge_inputs) < 2:
+            return None
+
+        try:
+            merged_output_fc = os.path.join(per_sheet_gdb_path, step.output_name)
+            started = time.monotonic()
+            arcpy.management.Merge(merge_inputs, merged_output_fc)
+            self.logger.info(
+                f"Merged {merge_inputs} into {merged_output_fc}",
+                extra={"stage": "merge", "sheet": sheet_name, "feature_class": step.output_name,
+                       "tool": "management.Merge", "duration": round(time.monotonic() - started, 3)},
+            )
+
+            input_count = sum(self._count_fc(p) for p in merge_inputs)
+            clip_counter.add_row(
+                sheet=sheet_name,
+                source_name="MERGE",
+                output_name=step.final_name,
+                source_count=input_count,
+                selected_count=input_count,
+                clipped_count=0,
+                merged_count=self._count_fc(merged_output_fc),
+                note=" + ".join([os.path.basename(p) for p in merge_inputs])
+            )
+            return merged_output_fc
+        except Exception as merge_err:
+            msg = f"Merge failed for {step.final_name}: {merge_err}"
+            self.logger.warning(msg)
+            errors.append(msg)
+            return None
+
+
+    def _move_sheet_outputs(self, sheet_folder: str, export_folder: str, used_names: Set[str]) -> List[str]:
+        """
+        Moves shapefiles and .lpkx packages produced by one sheet worker into the shared export folder.
+        As in serial mode, an output of a later sheet replaces the one of the same name written by an
+        earlier sheet; used_names holds the names moved so far, so the replacement is logged.
+
+        Returns the list of final output names.
+        """
+        moved: List[str] = []
+        for entry in sorted(os.listdir(sheet_folder)):
+            src = os.path.join(sheet_folder, entry)
+            lower = entry.lower()
+            if lower.endswith(".shp"):
+                base = entry[:-4]
+                exts = SHAPEFILE_PART_EXTS
+            elif lower.endswith(".lpkx"):
+                base = entry[:-5]
+                exts = (".lpkx",)
+            else:
+                continue
+
+            name = base + exts[0]
+            if name.lower() in used_names:
+                self.logger.info(f"'{name}' of an earlier sheet is replaced by the one from {os.path.basename(sheet_folder)}")
+            used_names.add(name.lower())
+
+            for ext in exts:
+                # Drop every part of the earlier output so no stale .prj/.dbf is left beside the new one
+                dest = os.path.join(export_folder, base + ext)
+                if os.path.exists(dest):
+                    os.remove(dest)
+                part_path = src if ext == ".lpkx" else os.path.join(sheet_folder, base + ext)
+                if os.path.exists(part_path):
+                    shutil.move(part_path, dest)
+            moved.append(name)
+        return moved
+
+    def _process_sheets_parallel(
+            self,
+            sheet_names: List[str],
+            export_folder: str,
+            clip_counter: ClipCounter,
+            fingerprints: Optional[Dict[str, Optional[str]]] = None
+        ) -> Dict[str, List[str]]:
+        """
+        Processes each sheet in its own worker process with its own export folder, per-sheet GDB
+        and scratch workspace under <export_folder>/_sheets/<sheet>. When all sheets finish, the
+        clip counter rows are merged in workbook order and the shapefile / .lpkx outputs are moved
+        into export_folder in the same order, so a later sheet's output replaces an earlier one of the
+        same name, as in serial mode.
+
+        Returns:
+            dict: {"errors": [list of error strings], "warnings": [list of warning strings]}
+        """
+        errors: List[str] = []
+        warnings: List[str] = []
+        sheets_root = os.path.join(export_folder, "_sheets")
+        os.makedirs(sheets_root, exist_ok=True)
+
+        init_kwargs = dict(
+            gdb_path=self.gdb_path,
+            parent_dir=self.parent_dir,
+            gridzone_excel_path=self.gridzone_excel_path,
+            alternate_name_df=self.alternate_name_df,
+            config_dict=self._config,
+            division_code=self.division_code,
+            sheet_cache_dir=self.sheet_cache_dir,
+            sheet_cache_max_age_hours=self.sheet_cache_max_age_hours,
+            source_version=self.source_version,
+        )
+        fingerprints = fingerprints or {}
+        # Worker loggers are named after this job logger so their files sit next to it
+        logger_job_id = self.logger.name.removeprefix("survey_mapper.job.")
+        sheet_folders = {name: os.path.join(sheets_root, _safe_run_label(name)) for name in sheet_names}
+
+        n_workers = min(self.sheet_workers, len(sheet_names))
+        self.logger.info(f"Processing {len(sheet_names)} sheets in parallel with {n_workers} worker processes")
+
+        results: Dict[str, Dict[str, Any]] = {}
+        with ProcessPoolExecutor(max_workers=n_workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = {
+                name: pool.submit(
+                    _process_sheet_in_worker, init_kwargs, self.lut_plan, logger_job_id,
+                    name, sheet_folders[name], fingerprints.get(name)
+                )
+                for name in sheet_names
+            }
+            for sheets_done, (name, fut) in enumerate(futures.items(), start=1):
+                try:
+                    results[name] = fut.result()
+                except Exception as worker_err:
+                    msg = f"Error processing sheet '{name}' in worker process: {worker_err}"
+                    self.logger.error(msg)
+                    errors.append(msg)
+                self._report_progress("sheets", sheets_done, len(sheet_names), name)
+
+        # Merge in workbook order so the last sheet wins, as when the sheets run one after another
+        used_names: Set[str] = set()
+        for name in sheet_names:
+            result = results.get(name)
+            if result is None:
+                continue
+            clip_counter.extend(result["rows"])
+            errors.extend(result["errors"])
+            warnings.extend(result["warnings"])
+            try:
+                moved = self._move_sheet_outputs(sheet_folders[name], export_folder, used_names)
+                self.logger.info(f"Sheet '{name}' outputs merged into {export_folder}: {moved}")
+            except Exception as move_err:
+                msg = f"Failed to merge outputs of sheet '{name}': {move_err}"
+                self.logger.error(msg)
+                errors.append(msg)
+
+        return {"errors": errors, "warnings": warnings}
+
     def _process_grid_sheet(self) -> Dict:
         """
         Processes each sheet in the Excel workbook and joins with gridzones from the geodatabase.
@@ -346,9 +1099,13 @@ class SurveyMapper:
         os.makedirs(export_folder, exist_ok=True)
 
         try:
-            self.alternate_name_map = self._generate_alternate_name_map()
+            self.lut_plan = self._compile_lut_plan()
+        except LutPlanError as exc:
+            for err in exc.errors:
+                self.logger.error(err)
+            return {"success": False, "data": None, "errors": exc.errors}
         except Exception as exc:
-            error_msg = f"Failed to populate self.alternate_name_map with Error: {exc}"
+            error_msg = f"Failed to compile the LUT plan with Error: {exc}"
             self.logger.error(error_msg)
             return {"success": False, "data": None, "errors": [error_msg]}
         try:
@@ -361,307 +1118,20 @@ class SurveyMapper:
             return {"success": False, "data": None, "errors": [error_msg]}
 
         try:
-            for sheet_name in sheet_names:
-                try:
-                    safe_name = sheet_name.replace(" ", "_")
-                    sheet_path = f"{self.gridzone_excel_path}/{sheet_name}$"
-
-                    # Per sheet output gdb
-                    per_sheet_gdb_name = f"{safe_name}_clipped.gdb"
-                    per_sheet_gdb_path = os.path.join(export_folder, per_sheet_gdb_name)
-                    if not arcpy.Exists(per_sheet_gdb_path):
-                        arcpy.management.CreateFileGDB(export_folder, per_sheet_gdb_name)
-
-                    self.logger.info(f"Processing sheet: {sheet_name} -> GDB: {per_sheet_gdb_name}")
-                    arcpy.env.workspace = self.gdb_path
-                    arcpy.env.overwriteOutput = True
-
-                    joined_layer = arcpy.AddJoin_management(
-                        in_layer_or_view=self._config["gridzones"]["feature_class_name_source"],
-                        in_field=self._config["gridzones"]["GridZoneId_field"],
-                        join_table=sheet_path,
-                        join_field=self.join_excel_field_name,
-                        join_type="KEEP_COMMON"
-                    )[0]
-
-                    output_grid = os.path.join(per_sheet_gdb_path, f"{safe_name}_gridzones")
-                    arcpy.conversion.ExportFeatures(joined_layer, output_grid)
-                    self.logger.info(f"Exported joined gridzones: {output_grid}")
-
-                    # Gather annotation feature classes from:
-                    # 1) Anything listed in feature_classes_to_clip that is annotation
-                    # 2) Any annotation feature class found anywhere in the source gdb
-                    annotation_fc_candidates = set()
-
-                    clipped_outputs = {}
-                    merge_tasks = []
-
-
-                    fc_config_all = list(self.alternate_name_map["SourceDataName"])
-                    
-                    # -----------------------------------------------------------
-                    # TODO - Not sure what to use this filter by division for?
-                    # fc_config_filtered = self._filter_by_division(fc_config_all)
-                    # -----------------------------------------------------------
-
-                    # Default merge is not used
-                    merge_with = None
-                    output_clip_fc_name = ""
-
-                    # for i, source_data_name in enumerate(fc_config_filtered):
-                    for i, source_data_name in enumerate(fc_config_all):
-                        # Continuing with non-"MERGE_LAYERS" SourceDataNames in config
-                        # Confirm getting the excel-based alternate name for feature class
-                        pre_clip_attribute_query = self.alternate_name_map["PreClipAttributeQuery"][i]
-                        intermediate_clip_filter_name = self.alternate_name_map["IntermediateClipFilterName"][i]                    
-                        post_clip_attribute_query = self.alternate_name_map["PostClipAttributeQuery"][i]
-                        intermediate_post_clip_filter_name = self.alternate_name_map["IntermediatePostClipFilterName"][i]
-                        intermediate_merge_clip_name = self.alternate_name_map["IntermediateMergeClipName"][i]
-                        final_output_name = self.alternate_name_map["OutputName"][i]
-                        
-                        is_anno_layer = self.alternate_name_map["IsAnnotationLayer"][i]
-                        include_in_final_result = self.alternate_name_map["IncludeInFinalResult"][i]
-
-                        # Section for handling merging of layers that were already clipped
-                        if source_data_name == 'MERGE_LAYERS' \
-                            and pre_clip_attribute_query == 'NONE' \
-                            and post_clip_attribute_query == 'NONE' \
-                            and intermediate_post_clip_filter_name == 'NONE' \
-                            and intermediate_merge_clip_name != 'NONE' \
-                            and "," in intermediate_clip_filter_name: 
-
-                            # Track Merge Specs only if a merge result is expected
-                            merge_with = intermediate_clip_filter_name
-                            output_clip_fc_name = f"{intermediate_merge_clip_name}"
-                            output_clip_fc_path = os.path.join(per_sheet_gdb_path, output_clip_fc_name)
-                        
-                        # For non-merging results
-                        else:
-                            output_clip_fc_name = f"{intermediate_clip_filter_name}"
-                            output_clip_fc_path = os.path.join(per_sheet_gdb_path, output_clip_fc_name)
-
-                        try:
-                            # Run through a check that the source_data_name is in the file gdb
-                            if source_data_name != 'MERGE_LAYERS' and not self._existsInFileGdb(self.gdb_path, source_data_name):
-                                msg = f"Could not clip {source_data_name} because it does not exist in the file geodatabase: {self.gdb_path}. Continuing with execution..."
-                                self.logger.warning(msg)
-                                warnings.append(msg)
-                                continue # skip processing this feature class because it doesn't exist
-
-                            # Pre-Clip Attribute Query & Then Clip
-                            if source_data_name != 'MERGE_LAYERS' and self._existsInFileGdb(self.gdb_path, source_data_name):
-                                if pre_clip_attribute_query != 'NONE':
-                                    lyr = f"{intermediate_clip_filter_name}_lyr"
-                                    arcpy.MakeFeatureLayer_management(source_data_name, lyr)
-                                    arcpy.SelectLayerByAttribute_management(lyr, "NEW_SELECTION", pre_clip_attribute_query)
-                                    arcpy.analysis.Clip(lyr, output_grid, output_clip_fc_path)
-                                    arcpy.Delete_management(lyr)
-                                else:
-                                    arcpy.analysis.Clip(source_data_name, output_grid, output_clip_fc_path)
-
-                                self.logger.info(f"Clipped {source_data_name} to {output_clip_fc_path}")
-                                fc_path = os.path.join(self.gdb_path, source_data_name)
-
-                                source_count = self._count_fc(fc_path)
-                                clipped_count = self._count_fc(output_clip_fc_path)
-                                selected_count = source_count 
-
-                                clip_counter.add_row(
-                                    sheet=sheet_name,
-                                    source_name=source_data_name,
-                                    output_name=final_output_name,
-                                    source_count=source_count,
-                                    selected_count=selected_count,
-                                    clipped_count=clipped_count,
-                                    note=f"pre={pre_clip_attribute_query}" if pre_clip_attribute_query != "NONE" else ""
-                                )
-
-                                clipped_outputs[intermediate_clip_filter_name] = {"path": output_clip_fc_path, "was_merged": False, "final_name": final_output_name}
-
-                                # Run Post-Clip Attribute Query
-                                if post_clip_attribute_query != 'NONE':
-                                    # Modify post clip attribute query to run sub-query
-
-                                    output_post_clip_fc_name = f"{intermediate_post_clip_filter_name}"
-                                    output_post_clip_fc_path = os.path.join(per_sheet_gdb_path, output_post_clip_fc_name)
-                                    lyr = f"{intermediate_post_clip_filter_name}_lyr"
-
-                                    full_post_clip_query = self._process_post_clip_attribute_query(per_sheet_gdb_path, post_clip_attribute_query)
-                                    
-                                    # Use the post-clipped layer to select the data on
-                                    arcpy.MakeFeatureLayer_management(output_post_clip_fc_name, lyr)
-                                    arcpy.SelectLayerByAttribute_management(lyr, "NEW_SELECTION", full_post_clip_query)
-                                    arcpy.analysis.Clip(lyr, output_grid, output_post_clip_fc_path)
-                                    arcpy.Delete_management(lyr)
-
-                            # For only those 'MERGE_LAYERS' rows
-                            elif source_data_name == 'MERGE_LAYERS' and not self._existsInFileGdb(self.gdb_path, final_output_name):
-                                if merge_with:
-
-                                    first_feature_class_to_merge_with = intermediate_clip_filter_name.split(",")[0]
-                                    other_feature_classes_to_merge_with = intermediate_clip_filter_name.split(",")[1:]
-                                    if first_feature_class_to_merge_with != 'NONE':
-                                        merge_tasks.append({"final_name": final_output_name, "base": first_feature_class_to_merge_with, "merge_with": other_feature_classes_to_merge_with})
-
-                                    # Get source feature rows count for auditing
-                                    source_count = self._count_fc(source_data_name)
-                                    selected_count = source_count
-                                    clipped_count = 0  # No clipping occurs for MERGE_LAYERS rows
-
-                                    clip_counter.add_row(
-                                        sheet=sheet_name,
-                                        source_name=source_data_name,
-                                        output_name=final_output_name,
-                                        source_count=source_count,
-                                        selected_count=selected_count,
-                                        clipped_count=clipped_count,
-                                        note=f"pre={pre_clip_attribute_query}" if pre_clip_attribute_query != "NONE" else ""
-                                    )
-
-                                clipped_outputs[intermediate_clip_filter_name] = {"path": output_clip_fc_path, "was_merged": False, "final_name": final_output_name}
-
-                            else:
-                                msg = f"Skipping clip for {source_data_name}; another problem occurred. Does this feature class exist?"
-                                self.logger.warning(msg)
-                                errors.append(msg)
-                                continue
-                            
-                            if is_anno_layer.lower() == 'yes' and include_in_final_result.lower() == 'yes':
-                                # annotation_details = self._is_annotation_fc(output_clip_fc_path, is_anno_layer)
-                                # if annotation_details["feature_class_is_annotation"] or annotation_details["is_configured_as_annotation"].lower() == 'yes':
-                                annotation_fc_candidates.add(final_output_name)       
-
-                        except Exception as clip_err:
-                            msg = f"Could not clip {source_data_name}: {clip_err}"
-                            self.logger.error(msg)
-                            errors.append(msg)
-
-                    # Merging Tasks
-                    for task in merge_tasks:
-                        final_fc_name = task["final_name"]
-                        base_name = task["base"]
-                        merge_names = task["merge_with"]
-
-                        base_fc_entry = clipped_outputs.get(base_name)
-                        if not base_fc_entry:
-                            msg = f"Skipping merge for {base_name}; base not clipped."
-                            self.logger.warning(msg)
-                            errors.append(msg)
-                            continue
-                        
-                        
-                        base_fc = base_fc_entry["path"]
-                        merge_inputs = [base_fc]
-
-                        for merge_name in merge_names:
-                            merge_entry = clipped_outputs.get(merge_name)
-                            if merge_entry and arcpy.Exists(merge_entry["path"]):
-                                merge_inputs.append(merge_entry["path"])
-                                clipped_outputs[merge_name]["was_merged"] = True
-                            else:
-                                msg = f"Layer to merge not found or not clipped: {merge_name}"
-                                self.logger.warning(msg)
-                                errors.append(msg)
-
-                        if len(merge_inputs) > 1:
-                            try:
-                                merged_output_fc = os.path.join(per_sheet_gdb_path, f"{final_fc_name}")
-                                arcpy.management.Merge(merge_inputs, merged_output_fc)
-                                self.logger.info(f"Merged {merge_inputs} into {merged_output_fc}")
-
-                                merged_count = self._count_fc(merged_output_fc)
-
-                                clip_counter.add_row(
-                                    sheet=sheet_name,
-                                    source_name="MERGE",
-                                    output_name=final_fc_name,
-                                    source_count=sum(self._count_fc(p) for p in merge_inputs),
-                                    selected_count=sum(self._count_fc(p) for p in merge_inputs),
-                                    clipped_count=0,
-                                    merged_count=merged_count,
-                                    note=" + ".join([os.path.basename(p) for p in merge_inputs])
-                                )
-                                
-                                # Add main layer to clipped_outputs
-                                clipped_outputs[final_fc_name] = {"path": merged_output_fc, "was_merged": True}
-                            except Exception as merge_err:
-                                msg = f"Merge failed for {final_fc_name}: {merge_err}"
-                                self.logger.warning(msg)
-                                errors.append(msg)
-
-                    for output_name, info in clipped_outputs.items():
-                        if not info["was_merged"]:
-                            try:
-                                final_name = info["final_name"]
-
-                                # Skip 'NONE'
-                                if final_name == 'NONE': 
-                                    continue
-
-                                output_shapefile = os.path.join(export_folder, f"{final_name}.shp")
-                                arcpy.conversion.FeatureClassToFeatureClass(
-                                    in_features=info["path"],
-                                    out_path=export_folder,
-                                    out_name=f"{final_name}.shp"
-                                )
-                                self.logger.info(f"Exported unmerged clipped result {output_name} to shapefile: {output_shapefile}")
-                            except Exception as shp_err:
-                                msg = f"Failed to export {info['path']} to shapefile: {shp_err} [in code: `for output_name, info in clipped_outputs.items():`]"
-                                self.logger.warning(msg)
-                                errors.append(msg)
-                                
-                    # Export unmerged standard clipped results to shapefile
-                    for output_name, info in clipped_outputs.items():
-
-                        # Export shp as final name now
-                        
-                        if info["was_merged"]:
-                            try:
-                                if 'final_name' in info:
-                                    final_name = info["final_name"]
-                                else:
-                                    final_name = output_name
-                                out_name = f"{final_name}.shp"
-                                
-                                # Skip 'NONE'
-                                if final_name == 'NONE': 
-                                    continue
-
-                                arcpy.conversion.FeatureClassToFeatureClass(
-                                    in_features=info["path"],
-                                    out_path=export_folder,
-                                    out_name=out_name
-                                )
-                                self.logger.info(f"Exported unmerged clipped result to shapefile: {os.path.join(export_folder, out_name)}")
-                            except Exception as shp_err:
-                                msg = f"Failed to export {info['path']} to shapefile: {shp_err}"
-                                self.logger.warning(msg)
-                                errors.append(msg)
-
-                    # After standard pipeline, handle annotation feature classes with packaging
-                    # Use the per sheet joined grid (output_grid) as the AOI polygon
-                    for ann_fc in sorted(annotation_fc_candidates):
-                        try:
-                            layer_name = f"{os.path.basename(ann_fc)}"
-                            self.clip_annotation_to_polygon_and_package(
-                                gdb_path=per_sheet_gdb_path,
-                                annotation_fc=os.path.join(export_folder, ann_fc + ".shp"),
-                                polygon_fc=output_grid,
-                                polygon_where="", # TODO: Future option to allow user to select which annotations to select
-                                layer_name=layer_name
-                            )
-                            self.logger.info(f"Packaged annotation to LPKX for: {ann_fc}")
-                        except Exception as ann_err:
-                            msg = f"Annotation packaging failed for {ann_fc}: {ann_err}"
-                            self.logger.warning(msg)
-                            errors.append(msg)
-
-                    self.logger.info(f"Completed sheet: {sheet_name}")
-
-                except Exception as sheet_err:
-                    msg = f"Error processing sheet '{sheet_name}': {sheet_err}"
-                    self.logger.error(msg)
-                    errors.append(msg)
+            fingerprints = self._sheet_fingerprints(workbook, sheet_names)
+            if self.sheet_cache is not None:
+                self.sheet_cache.prune()
+
+            if self.sheet_workers > 1 and len(sheet_names) > 1:
+                sheet_result = self._process_sheets_parallel(sheet_names, export_folder, clip_counter, fingerprints)
+                errors.extend(sheet_result["errors"])
+                warnings.extend(sheet_result["warnings"])
+            else:
+                for sheet_number, sheet_name in enumerate(sheet_names, start=1):
+                    self._report_progress("sheets", sheet_number, len(sheet_names), sheet_name)
+                    sheet_result = self._process_sheet_cached(sheet_name, export_folder, clip_counter, fingerprints.get(sheet_name))
+                    errors.extend(sheet_result["errors"])
+                    warnings.extend(sheet_result["warnings"])
 
             self.logger.info(f"All sheets processed. Outputs stored in: {export_folder}")
 
@@ -674,6 +1144,10 @@ class SurveyMapper:
             }
     
         finally:
+            try:
+                self._shutdown_clip_pool()
+            except Exception as e:
+                self.logger.warning(f"Clip worker pool shutdown failed: {e}")
             try:
                 # Finish writing the feature counts to the csv record
                 clip_counter.write()
@@ -927,16 +1401,26 @@ class SurveyMapper:
         out_dir = os.path.join(self.parent_dir, "results")
         os.makedirs(out_dir, exist_ok=True)
 
-        tool = RecursiveExportFeatureCollection()
-
         class MockParam:
             def __init__(self, val): self.valueAsText = val
 
         params = [MockParam(in_dir), MockParam(out_dir)]
 
         try:
-            tool.execute(params, logger_=self.logger)
-            self.logger.info(f"Recursive export completed: {out_dir}")
+            # Inside the try: invalid featureCollectionExport options fail the export with their message
+            tool = RecursiveExportFeatureCollection(
+                compact=self.compact_json,
+                export_workers=self.export_workers,
+                attribute_reader=self.attribute_reader,
+                geometry_options=self._config.get("featureCollectionExport"),
+                output_format=survey_output_format(self._config).name,
+            )
+            started = time.monotonic()
+            tool.execute(params, logger_=self.logger, progress_=self._report_progress)
+            self.logger.info(
+                f"Recursive export completed: {out_dir}",
+                extra={"stage": "export", "duration": round(time.monotonic() - started, 3)},
+            )
             return {"success": True, "data": out_dir, "errors": []}
         except Exception as e:
             msg = f"Error during recursive export: {e}"
@@ -32,6 +32,11 @@ class AppConfig(BaseModel):
         title="Grid zones",
         description="Per-grid configuration. Keys are grid identifiers; values can be a string or a list depending on your process."
     )
+    featureCollectionExport: Dict[str, object] = Field(
+        default_factory=dict,
+        title="Feature Collection export",
+        description="Feature Collection output: format (json, json.gz or binary) and the coordinate options precision (decimal places), quantize_tolerance and simplify_tolerance (output units, metres in Web Mercator), with per-layer overrides under \"layers\". Example: {\"precision\": 2, \"layers\": {\"Mains\": {\"simplify_tolerance\": 0.5}}}."
+    )
 
 _config_cache: Dict[Path, Tuple[float, AppConfig]] = {}
 
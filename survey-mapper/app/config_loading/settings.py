@@ -24,6 +24,64 @@ class Settings(BaseSettings):
     CONDA_DEFAULT_ENV: str = "survey-mapper"
     USE_DATABASE: bool = False
 
+    # Job worker pool: processes running jobs side by side, and how many more may wait
+    JOB_WORKERS: int = 2
+    JOB_QUEUE_SIZE: int = 10
+    # Seconds clients are told to wait (Retry-After) when the job queue is full
+    JOB_RETRY_AFTER_SECONDS: int = 30
+    # Largest gridzone or LUT Excel upload accepted by /process-async/
+    UPLOAD_MAX_MB: int = 50
+    # Also write each job log record as a JSON line (stage, sheet, feature class, duration, tool)
+    JOB_LOG_JSONL: bool = False
+    # Durable queue: a claimed job is re-queued if its lease is not renewed in time
+    JOB_LEASE_SECONDS: int = 60
+    JOB_HEARTBEAT_SECONDS: int = 15
+    # Claims allowed per job before an orphaned or crashed job is marked failed
+    JOB_MAX_ATTEMPTS: int = 2
+
+    # Worker processes used inside one job to process gridzone Excel sheets in parallel (1 = one sheet at a time)
+    SHEET_WORKERS: int = 1
+
+    # Worker processes used inside one sheet to clip independent LUT rows concurrently (1 = one clip at a time).
+    # Only used when sheets run one after another (SHEET_WORKERS=1).
+    CLIP_WORKERS: int = 1
+
+    # Feature Collection JSON export: compact (no indentation) output, streamed feature by feature
+    EXPORT_JSON_COMPACT: bool = True
+    # Worker processes converting a job's shapefiles to Feature Collection JSON side by side (1 = one at a time)
+    EXPORT_WORKERS: int = 1
+    # How the export reads attributes: "numpy" (bulk, converted a column at a time) or "cursor" (row by row)
+    EXPORT_ATTRIBUTE_READER: str = "numpy"
+
+    # Job result cache: identical inputs (zip, gridzone Excel, LUT, config) reuse an earlier results.zip
+    RESULT_CACHE_ENABLED: bool = True
+    RESULT_CACHE_MAX_MB: int = 2048
+    RESULT_CACHE_MAX_AGE_HOURS: int = 168
+
+    # Sheet cache: unchanged sheets reuse their clipped GDB and shapefiles from an earlier job.
+    # SHEET_CACHE_DIR defaults to <OUTPUT_DIR>/_sheet_cache
+    SHEET_CACHE_ENABLED: bool = True
+    SHEET_CACHE_DIR: str = ""
+    SHEET_CACHE_MAX_AGE_HOURS: int = 168
+
+    # Extracted-GDB cache: each SINGLE_ZIP_DIR zip is extracted once and shared by the jobs using it.
+    # GDB_CACHE_DIR defaults to <OUTPUT_DIR>/_gdb_cache
+    GDB_CACHE_ENABLED: bool = True
+    GDB_CACHE_DIR: str = ""
+    GDB_CACHE_MAX_MB: int = 20480
+
+    # Job retention: finished jobs older than JOB_RETENTION_DAYS (0 = keep) are moved to jobs_archive and
+    # their output and temp folders deleted; the oldest are also dropped while outputs exceed JOB_OUTPUT_MAX_MB (0 = no budget)
+    JOB_RETENTION_DAYS: int = 30
+    JOB_OUTPUT_MAX_MB: int = 0
+    JOB_MAINTENANCE_MINUTES: int = 60
+    # Job store: blank keeps jobs in the local SQLite job_status.db; a postgresql:// URL shares one queue between nodes.
+    # With a shared queue, OUTPUT_DIR, JOB_UPLOAD_DIR and SINGLE_ZIP_DIR (and GDB_CACHE_DIR / SHEET_CACHE_DIR when set)
+    # must be absolute paths on one volume mounted at the same path on every node; the API refuses to start otherwise
+    JOB_STORE_URL: str = ""
+    # Folder for the uploads of queued jobs (<JOB_UPLOAD_DIR>/<job_id>); blank = the OS temp folder
+    JOB_UPLOAD_DIR: str = ""
+
 @lru_cache
 def get_settings() -> Settings:
     return Settings()
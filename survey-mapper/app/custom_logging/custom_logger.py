@@ -1,51 +1,50 @@
-import re
-from typing import List, Dict, Tuple, Optional, Union
-import os
-import glob
+import json
+from typing import List, Dict, Optional
 from datetime import datetime
 import logging
+import queue
+import threading
 from pathlib import Path as FSPath
-from logging.handlers import RotatingFileHandler
-
-from app.models.response_models import LogEntry, LogLevelFilter, LogsByLevel
-
-# Regex that matches text like: `2025-08-18 10:24:39,480 | INFO | custom_tool.job.tmpyca4elw6 | Job started`
-# (?P<ts>.+?)           ==> Captures the timestamp at the beginning (2025-08-18 10:24:39,480). .+? means "match one or more characters, but as few as possible" (lazy).
-# \s*\|\s*              ==> Matches spaces, then a pipe |, then spaces. This is the delimiter.
-# (?P<level>DEBUG|INFO|WARNING|ERROR|CRITICAL)  ==> Captures the log level word (one of these 5).
-# (?P<logger>[^|]+)     ==> Captures the logger name (custom_tool.job.tmpyca4elw6).
-# [^|]+                 ==> Means "one or more characters that are not a pipe".
-# (?P<msg>.*)           ==> Captures the message (Job started), which is everything after the last pipe.
-RE_PIPE = re.compile(
-    r"^(?P<ts>.+?)\s*\|\s*(?P<level>DEBUG|INFO|WARNING|ERROR|CRITICAL)\s*\|\s*(?P<logger>[^|]+)\s*\|\s*(?P<msg>.*)$"
-)
-
-# Regex that matches text like: `2025-08-18 10:24:39,480 - INFO - Job started`
-# (?P<ts>.+?)           ==> Matches timestamp again (2025-08-18 10:24:39,480).
-# \s*-\s*               ==> Matches spaces, dash, spaces.
-# (?P<level>DEBUG|INFO|WARNING|ERROR|CRITICAL) ==> Log level word.
-# (?P<msg>.*)           ==> The message text (e.g. "Job started").
-RE_DASH = re.compile(
-    r"^(?P<ts>.+?)\s*-\s*(?P<level>DEBUG|INFO|WARNING|ERROR|CRITICAL)\s*-\s*(?P<msg>.*)$"
-)
-
-def _parse_structured(line: str) -> Optional[LogEntry]:
-    """ Parses each log line to search for matches using Regex. """
-    matched = RE_PIPE.match(line) or RE_DASH.match(line)
-    if not matched:
-        return None
-    ts_str = matched.group("ts")
-    try:
-        # Try parsing as datetime
-        ts = datetime.fromisoformat(ts_str.replace(",", "."))
-    except Exception:
-        ts = ts_str  # fallback: keep raw string if parsing fails
-    return LogEntry(
-        ts=ts, 
-        level=matched.group("level"), 
-        logger=matched.groupdict().get("logger") or "", 
-        msg=matched.group("msg")
-    )
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from app.config_loading.settings import get_settings
+from app.custom_logging.log_index import indexed_log_counts, indexed_log_entries
+from app.models.response_models import LogCounts, LogEntry, LogLevelFilter, LogsByLevel
+
+# Optional fields a job log record can carry through `extra=`; written as keys of the JSON lines sink
+JSONL_LOG_FIELDS = ("stage", "sheet", "feature_class", "duration", "tool")
+
+# Job logger name -> listener thread that runs the logger's handlers (see build_job_logger)
+_JOB_LISTENERS: Dict[str, QueueListener] = {}
+_JOB_LISTENERS_LOCK = threading.Lock()
+
+
+class _JobQueueHandler(QueueHandler):
+    """ Hands records to the job's listener thread untouched; the queue is in-process, so nothing needs pickling. """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """ Formats a record as one JSON object: ts, level, logger, msg and any JSONL_LOG_FIELDS set on it. """
+
+    def format(self, record: logging.LogRecord) -> str:
+        msg = record.getMessage()
+        if record.exc_info:
+            msg = f"{msg}\n{self.formatException(record.exc_info)}"
+        item: Dict[str, object] = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": msg,
+        }
+        for field in JSONL_LOG_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                item[field] = value
+        return json.dumps(item, default=str)
+
 
 def collect_logs_grouped_all(output_dir: str, max_files: int = 50) -> LogsByLevel:
     """
@@ -53,107 +52,85 @@ def collect_logs_grouped_all(output_dir: str, max_files: int = 50) -> LogsByLeve
     * Structured lines (pipe/dash) are parsed normally.
     * Raw lines that contain 'error'/'warning' (case-insensitive) are promoted to ERROR/WARNING entries.
     * Bare lines that don't match anything are appended to the previous entry (multi-line GP messages).
+    When the job wrote JSON lines logs (JOB_LOG_JSONL), those are read instead of the text logs, without regex.
+    Parsed lines are kept in the job's log index, so only lines written since the last call are parsed.
     """
-    # logs_dir = os.path.join(output_dir, "logs")
     logs_dir = FSPath(output_dir) / "logs"
     output_logslevel_list = LogsByLevel(info=[], warning=[], error=[])
 
     if not logs_dir.is_dir():
         return output_logslevel_list
 
-    # Build candidate list as Path objects
-    candidates: List[FSPath] = []
-    candidates += list(logs_dir.glob("*.txt"))
-    candidates += list(logs_dir.glob("*.log"))
-
+    candidates = _log_files(logs_dir, max_files)
     if not candidates:
         return LogsByLevel(info=[], warning=[], error=[], note="No log files found")
 
-    # Sort by mtime (oldest -> newest)
-    candidates.sort(key=lambda p: p.stat().st_mtime)
+    try:
+        entries_by_file = indexed_log_entries(logs_dir, candidates)
+    except Exception as e:
+        entry: LogEntry = LogEntry(
+            ts=datetime.now().isoformat(),
+            level="ERROR",
+            logger="log.reader",
+            msg=f"Failed reading logs in {logs_dir}: {e}",
+        )
+        output_logslevel_list["error"].append(entry)
+        return output_logslevel_list
+
+    for path in candidates:
+        for item in entries_by_file.get(path.name, []):
+            entry = LogEntry(**item)
+            if entry.level in ("ERROR", "CRITICAL"):
+                output_logslevel_list["error"].append(entry)
+            elif entry.level == "WARNING":
+                output_logslevel_list["warning"].append(entry)
+            else:
+                output_logslevel_list["info"].append(entry)
 
-    for path in candidates[:max_files]:
-        last_entry: Optional[LogEntry] = None
-        file_hint_ts = datetime.fromtimestamp(path.stat().st_mtime).isoformat()
-
-        try:
-            with path.open("r", encoding="utf-8", errors="replace") as f:
-                for raw in f:
-                    # Dict olding all entries for meesages
-                    parsed = _parse_structured(raw)
-                    if parsed:
-                        entry: LogEntry = LogEntry(
-                            ts=parsed.ts,
-                            level=parsed.level, 
-                            logger=parsed.logger,
-                            msg=parsed.msg,
-                            file=path.name
-                        )
-                        if parsed.level in ("ERROR", "CRITICAL"):
-                            output_logslevel_list["error"].append(entry)
-                        elif parsed.level == "WARNING":
-                            output_logslevel_list["warning"].append(entry)
-                        else:
-                            output_logslevel_list["info"].append(entry)
-                        last_entry = entry
-                        continue
-
-                    line = raw.rstrip("\r\n")
-                    if not line.strip():
-                        # blank separator
-                        continue
-
-                    lower = line.lower()
-                    if "error" in lower:
-                        entry: LogEntry = LogEntry(
-                            ts=file_hint_ts,
-                            level="ERROR", 
-                            logger="raw",
-                            msg=line,
-                            file=path.name
-                        )
-                        output_logslevel_list["error"].append(entry)
-                        last_entry = entry
-                    elif "warning" in lower:
-                        entry: LogEntry = LogEntry(
-                            ts=file_hint_ts,
-                            level="WARNING", 
-                            logger="raw",
-                            msg=line,
-                            file=path.name
-                        )
-                        output_logslevel_list["warning"].append(entry)
-                        last_entry = entry
-                    else:
-                        # continuation of previous message (e.g., GP dumps after WARNING/ERROR)
-                        if last_entry is not None:
-                            last_entry["msg"] = f"{last_entry['msg']}\n{line}"
-                        else:
-                            entry: LogEntry = LogEntry(
-                                ts=file_hint_ts,
-                                level="INFO", 
-                                logger="raw",
-                                msg=line,
-                                file=path.name
-                            )
-                            output_logslevel_list["info"].append(entry)
-                            last_entry = entry
-        except Exception as e:
-            entry: LogEntry = LogEntry(
-                ts=datetime.now().isoformat(),
-                level="ERROR", 
-                logger="log.reader",
-                msg=f"Failed reading {path.name}: {e}",
-                file=path.name
-            )
-            output_logslevel_list["error"].append(entry)
-
-    # return LogsByLevel(info=by_level["INFO"], warning=by_level["WARNING"], error=by_level["ERROR"], note="Logs found.")
     return output_logslevel_list
 
 
+def count_logs_grouped_all(output_dir: str, max_files: int = 50) -> LogCounts:
+    """
+    Number of entries per level that collect_logs_grouped_all would return for output_dir.
+    Read from the counts kept in the job's log index, so no entry is loaded.
+    """
+    counts = LogCounts(info=0, warning=0, error=0)
+    logs_dir = FSPath(output_dir) / "logs"
+    if not logs_dir.is_dir():
+        return counts
+    candidates = _log_files(logs_dir, max_files)
+    for file_counts in indexed_log_counts(logs_dir, candidates).values():
+        for level, n in file_counts.items():
+            if level in ("ERROR", "CRITICAL"):
+                counts.error += n
+            elif level == "WARNING":
+                counts.warning += n
+            else:
+                counts.info += n
+    return counts
+
+
+def _log_files(logs_dir: FSPath, max_files: int) -> List[FSPath]:
+    """ Log files of a job's logs folder, oldest first. """
+    # Build candidate list as Path objects; the JSON lines sink holds the same records as the text logs
+    candidates: List[FSPath] = list(logs_dir.glob("log_*.jsonl"))
+    if not candidates:
+        candidates += list(logs_dir.glob("*.txt"))
+        candidates += list(logs_dir.glob("*.log"))
+
+    # Sort by mtime (oldest -> newest)
+    candidates.sort(key=lambda p: p.stat().st_mtime)
+    return candidates[:max_files]
+
 
-def build_job_logger(job_id: str, output_dir: str, debug: bool=False) -> logging.Logger:
+def build_job_logger(job_id: str, output_dir: str, debug: bool=False, log_label: Optional[str]=None) -> logging.Logger:
+    """
+    Builds the per-job file logger. log_label is appended to the file name, e.g. for per-sheet worker logs.
+    The logger only queues records; a listener thread formats them and runs the file handlers, so logging
+    in the clip loop never waits on disk. Use add_job_log_handler to attach more handlers, flush_job_logger
+    before reading what was logged, and close_job_logger when the job is done.
+    """
     logs_dir = FSPath(output_dir) / "logs"
     logs_dir.mkdir(parents=True, exist_ok=True)
     logger_name = f"survey_mapper.job.{job_id}"
@@ -163,22 +140,92 @@ def build_job_logger(job_id: str, output_dir: str, debug: bool=False) -> logging
 
     # Avoid duplicate handlers if called again
     if not logger.handlers:
-        log_path = logs_dir / f"log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
+        handlers: List[logging.Handler] = []
+        label = f"_{log_label}" if log_label else ""
+        log_path = logs_dir / f"log_{datetime.now().strftime('%Y%m%d_%H%M%S')}{label}.txt"
         fh = RotatingFileHandler(log_path, maxBytes=10_000_000, backupCount=5, encoding="utf-8")
         fh.setLevel(logging.INFO)
         fh.setFormatter(logging.Formatter("%(asctime)s | %(levelname)s | %(name)s | %(message)s"))
-        logger.addHandler(fh)
+        handlers.append(fh)
+
+        if get_settings().JOB_LOG_JSONL:
+            jh = RotatingFileHandler(log_path.with_suffix(".jsonl"), maxBytes=10_000_000, backupCount=5, encoding="utf-8")
+            jh.setLevel(logging.INFO)
+            jh.setFormatter(JsonLinesFormatter())
+            handlers.append(jh)
 
         if debug:
             # Also echo to console for debugging
             sh = logging.StreamHandler()
             sh.setLevel(logging.INFO)
             sh.setFormatter(logging.Formatter("%(asctime)s | %(levelname)s | %(name)s | %(message)s"))
-            logger.addHandler(sh)
+            handlers.append(sh)
+
+        log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue()
+        listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        listener.start()
+        with _JOB_LISTENERS_LOCK:
+            _JOB_LISTENERS[logger_name] = listener
+        logger.addHandler(_JobQueueHandler(log_queue))
 
     return logger
 
 
+def _job_listener(logger: logging.Logger) -> Optional[QueueListener]:
+    with _JOB_LISTENERS_LOCK:
+        return _JOB_LISTENERS.get(logger.name)
+
+
+def flush_job_logger(logger: logging.Logger) -> None:
+    """ Blocks until every record logged so far has been handled, then flushes the handlers. """
+    listener = _job_listener(logger)
+    if listener is None:
+        return
+    listener.queue.join()
+    for handler in listener.handlers:
+        handler.flush()
+
+
+def add_job_log_handler(logger: logging.Logger, handler: logging.Handler) -> None:
+    """
+    Attaches handler behind the job logger's queue. Records logged before this call are not passed
+    to it, the same as logger.addHandler. Loggers not built by build_job_logger get it directly.
+    """
+    listener = _job_listener(logger)
+    if listener is None:
+        logger.addHandler(handler)
+        return
+    flush_job_logger(logger)
+    listener.handlers = (*listener.handlers, handler)
+
+
+def remove_job_log_handler(logger: logging.Logger, handler: logging.Handler) -> None:
+    """ Detaches a handler added with add_job_log_handler once the records logged so far reached it. """
+    listener = _job_listener(logger)
+    if listener is None:
+        logger.removeHandler(handler)
+        return
+    flush_job_logger(logger)
+    listener.handlers = tuple(h for h in listener.handlers if h is not handler)
+
+
+def close_job_logger(logger: logging.Logger) -> None:
+    """
+    Writes out the queued records, stops the listener thread and closes the file handlers.
+    The next build_job_logger call for the same job starts a new log file.
+    """
+    with _JOB_LISTENERS_LOCK:
+        listener = _JOB_LISTENERS.pop(logger.name, None)
+    for handler in list(logger.handlers):
+        if isinstance(handler, _JobQueueHandler):
+            logger.removeHandler(handler)
+    if listener is None:
+        return
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+
+
 def filter_logs_by_level(all_logs: LogsByLevel, level: LogLevelFilter) -> LogsByLevel:
     if level == LogLevelFilter.all:
         return all_logs
@@ -190,3 +237,34 @@ def filter_logs_by_level(all_logs: LogsByLevel, level: LogLevelFilter) -> LogsBy
         return LogsByLevel(info=[], warning=[], error=all_logs.error, note=all_logs.note)
     return all_logs
 
+
+def filter_log_counts_by_level(counts: LogCounts, level: LogLevelFilter) -> LogCounts:
+    """ Counts of the levels filter_logs_by_level keeps; the others are 0. """
+    if level == LogLevelFilter.all:
+        return counts
+    return LogCounts(**{name: getattr(counts, name) if name == level.value else 0 for name in ("info", "warning", "error")})
+
+
+def filter_logs_by_fields(
+    all_logs: LogsByLevel,
+    stage: Optional[str] = None,
+    feature_class: Optional[str] = None,
+) -> LogsByLevel:
+    """ Keeps entries whose stage / feature_class match. Only JSON lines logs carry these fields. """
+    if not stage and not feature_class:
+        return all_logs
+
+    def keep(entry: LogEntry) -> bool:
+        if stage and entry.stage != stage:
+            return False
+        if feature_class and entry.feature_class != feature_class:
+            return False
+        return True
+
+    return LogsByLevel(
+        info=[e for e in all_logs.info if keep(e)],
+        warning=[e for e in all_logs.warning if keep(e)],
+        error=[e for e in all_logs.error if keep(e)],
+        note=all_logs.note,
+    )
+
@@ -1,6 +1,8 @@
 import logging
+import os
 from pathlib import Path
 import re
+from typing import List, NamedTuple
 
 
 RE_ARCGIS_ERR = re.compile(
@@ -14,10 +16,27 @@ RE_ARCGIS_ERR = re.compile(
 # Will find 'Failed to execute (Tool).' line (often follows an ERROR 000### in Esri tools)
 RE_ARCGIS_FAILED = re.compile(r"^\s*Failed to execute\s*\((?P<tool>[^)]+)\)\.\s*$", re.IGNORECASE)
 
+# 'ERROR 000732: ...' anywhere in a line, e.g. inside a formatted `... | ERROR | job | ERROR 000732: ...` record
+RE_ARCGIS_CODE = re.compile(r"\bERROR\s+(?P<code>\d{3,6})\s*:\s*(?P<msg>.*?)\s*$", re.IGNORECASE)
+
+# Bytes read from the log file per read while scanning
+SCAN_CHUNK_BYTES = 1024 * 1024
+
+
+class ArcgisErrorMatch(NamedTuple):
+    """ An ArcGIS 'ERROR <code>: <message>' line found in a log file. line is 1-based within file. """
+    code: str
+    message: str
+    file: str
+    line: int
+
+
 class FailFastLogWatcher(logging.Handler):
     """
     Watches logger records for errors AND (optionally) scans the active log file
     for any occurrence of 'error' (case-insensitive).
+    The file is tailed: each scan reads only the bytes written since the previous one, and
+    when RotatingFileHandler rolls the file over, the rest of the rolled file is read first.
     """
     ERROR_WORD = re.compile(r"\berror\b", re.IGNORECASE)
 
@@ -26,24 +45,77 @@ class FailFastLogWatcher(logging.Handler):
         self.log_file = Path(log_file) if log_file else None
         self.poll_file = poll_file and self.log_file is not None
         self._error_msg: str | None = None
+        # Tail position in the active file: byte offset, inode and lines seen so far
+        self._offset = 0
+        self._inode: int | None = None
+        self._line_no = 0
+        self._arcgis_errors: List[ArcgisErrorMatch] = []
 
     @property
     def error_message(self) -> str | None:
         return self._error_msg
 
+    @property
+    def arcgis_errors(self) -> List[ArcgisErrorMatch]:
+        """ ArcGIS ERROR codes found by scan_file_once so far, in file order. """
+        return list(self._arcgis_errors)
+
     def emit(self, record):
             msg = record.getMessage()
             if record.levelno >= logging.ERROR or RE_ARCGIS_ERR.search(msg) or self.ERROR_WORD.search(msg):
                 self._error_msg = self._error_msg or msg
 
     def scan_file_once(self) -> None:
-        """Catch raw lines written outside the logger that contain 'error'."""
+        """Catch raw lines written outside the logger that contain 'error'. Reads only new bytes."""
         if not self.poll_file or not self.log_file:
             return
         try:
-            if self.log_file:
-                txt = self.log_file.read_text(encoding="utf-8", errors="ignore")
-                if RE_ARCGIS_ERR.search(txt) or self.ERROR_WORD.search(txt):
-                    self._error_msg = self._error_msg or "Error detected in log file"
+            st = os.stat(self.log_file)
+            if self._inode is not None and (st.st_ino != self._inode or st.st_size < self._offset):
+                # Rotated (renamed to .1 and recreated) or truncated: finish the old file, then start over
+                rolled = self.log_file.with_name(f"{self.log_file.name}.1")
+                try:
+                    if os.stat(rolled).st_ino == self._inode:
+                        self._scan_from(rolled, os.path.getsize(rolled))
+                except OSError:
+                    pass
+                self._offset = 0
+                self._line_no = 0
+            self._inode = st.st_ino
+            self._scan_from(self.log_file, st.st_size)
         except Exception:
-            pass
\ No newline at end of file
+            pass
+
+    def _scan_from(self, path: Path, size: int) -> None:
+        """ Scans the complete lines of path between the stored offset and size. """
+        with open(path, "rb") as f:
+            f.seek(self._offset)
+            while self._offset < size:
+                data = f.read(min(SCAN_CHUNK_BYTES, size - self._offset))
+                if not data:
+                    break
+                # A trailing line without a newline may still be being written; leave it for the next scan
+                end = data.rfind(b"\n") + 1
+                if end == 0:
+                    if len(data) < SCAN_CHUNK_BYTES:
+                        break
+                    # One line longer than a chunk: read it whole
+                    f.seek(self._offset)
+                    data = f.readline()
+                    end = len(data) if data.endswith(b"\n") else 0
+                    if end == 0:
+                        break
+                for line in data[:end].decode("utf-8", errors="ignore").split("\n")[:-1]:
+                    self._line_no += 1
+                    self._check_line(line.rstrip("\r"), path.name)
+                self._offset += end
+                f.seek(self._offset)
+
+    def _check_line(self, line: str, file_name: str) -> None:
+        matched = RE_ARCGIS_CODE.search(line)
+        if matched:
+            self._arcgis_errors.append(
+                ArcgisErrorMatch(matched.group("code"), matched.group("msg"), file_name, self._line_no)
+            )
+        if matched or self.ERROR_WORD.search(line):
+            self._error_msg = self._error_msg or f"Error detected in log file (line {self._line_no}): {line.strip()}"
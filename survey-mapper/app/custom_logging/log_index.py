@@ -0,0 +1,316 @@
+"""
+Incremental index of parsed job log lines.
+
+Each job's <output_dir>/logs folder gets a sidecar .log_index.json holding, per log file, the byte
+offset parsed so far, the size of its entries file and the count of entries per level. The parsed
+entries themselves are appended to .log_index.<log file>.jsonl, one JSON object per line, and read
+back only when they are asked for. A refresh only reads bytes appended to the log since the last one
+and only appends the new entries, so its cost is proportional to new log output instead of the whole
+history, and level counts need no entries at all.
+
+The last entry of a text log stays open in memory until the next entry starts, as later bare lines
+are appended to it; the saved offset is where it starts, so it is parsed again after a restart.
+Recently used indexes (offsets, counts and open entries, not the entries) are kept in memory, so an
+unchanged job costs one stat() per log file. .jsonl logs (one JSON object per record) are loaded as
+they are, without the text-line rules.
+"""
+import json
+import os
+import re
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path as FSPath
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
+
+# Bump when the parsing rules change so existing sidecars are rebuilt
+INDEX_VERSION = 2
+INDEX_FILENAME = ".log_index.json"
+# Parsed entries of one log file, e.g. .log_index.log_1.txt.jsonl
+ENTRIES_FILENAME = ".log_index.{}.jsonl"
+
+# Log folders whose index stays in memory between calls
+MEMORY_INDEX_LIMIT = 256
+
+# Regex that matches text like: `2025-08-18 10:24:39,480 | INFO | custom_tool.job.tmpyca4elw6 | Job started`
+# (?P<ts>.+?)           ==> Captures the timestamp at the beginning (2025-08-18 10:24:39,480). .+? means "match one or more characters, but as few as possible" (lazy).
+# \s*\|\s*              ==> Matches spaces, then a pipe |, then spaces. This is the delimiter.
+# (?P<level>DEBUG|INFO|WARNING|ERROR|CRITICAL)  ==> Captures the log level word (one of these 5).
+# (?P<logger>[^|]+)     ==> Captures the logger name (custom_tool.job.tmpyca4elw6).
+# [^|]+                 ==> Means "one or more characters that are not a pipe".
+# (?P<msg>.*)           ==> Captures the message (Job started), which is everything after the last pipe.
+RE_PIPE = re.compile(
+    r"^(?P<ts>.+?)\s*\|\s*(?P<level>DEBUG|INFO|WARNING|ERROR|CRITICAL)\s*\|\s*(?P<logger>[^|]+)\s*\|\s*(?P<msg>.*)$"
+)
+
+# Regex that matches text like: `2025-08-18 10:24:39,480 - INFO - Job started`
+# (?P<ts>.+?)           ==> Matches timestamp again (2025-08-18 10:24:39,480).
+# \s*-\s*               ==> Matches spaces, dash, spaces.
+# (?P<level>DEBUG|INFO|WARNING|ERROR|CRITICAL) ==> Log level word.
+# (?P<msg>.*)           ==> The message text (e.g. "Job started").
+RE_DASH = re.compile(
+    r"^(?P<ts>.+?)\s*-\s*(?P<level>DEBUG|INFO|WARNING|ERROR|CRITICAL)\s*-\s*(?P<msg>.*)$"
+)
+
+_MEMORY: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_MEMORY_LOCK = Lock()
+_DIR_LOCKS: Dict[str, Lock] = {}
+
+
+def parse_structured_line(line: str) -> Optional[Dict[str, Any]]:
+    """ Parses one pipe or dash formatted log line into {"ts", "level", "logger", "msg"}. """
+    matched = RE_PIPE.match(line) or RE_DASH.match(line)
+    if not matched:
+        return None
+    ts_str = matched.group("ts")
+    try:
+        ts = datetime.fromisoformat(ts_str.replace(",", ".")).isoformat()
+    except Exception:
+        ts = ts_str  # fallback: keep raw string if parsing fails
+    return {
+        "ts": ts,
+        "level": matched.group("level"),
+        "logger": matched.groupdict().get("logger") or "",
+        "msg": matched.group("msg"),
+    }
+
+
+def _new_file_record(inode: int) -> Dict[str, Any]:
+    """
+    In-memory state of one log file:
+    * offset: bytes of the log parsed so far; committed: where the open entry starts (offset if none).
+    * open: the last entry, which later bare lines may still extend.
+    * unsaved: closed entries not yet appended to the entries file.
+    * counts: entries per level, the open one included.
+    * saved: what the sidecar and the entries file hold: {"offset", "entries_bytes", "counts"}.
+    """
+    return {
+        "inode": inode, "offset": 0, "committed": 0, "open": None, "unsaved": [], "counts": {},
+        "saved": {"offset": 0, "entries_bytes": 0, "counts": {}},
+    }
+
+
+def _add_entry(record: Dict[str, Any], entry: Dict[str, Any], start: int, keep_open: bool) -> None:
+    """ Closes the open entry, if any, and adds entry; it stays open when later lines may extend it. """
+    if record["open"] is not None:
+        record["unsaved"].append(record["open"])
+        record["open"] = None
+    counts = record["counts"]
+    counts[entry["level"]] = counts.get(entry["level"], 0) + 1
+    if keep_open:
+        record["open"] = entry
+        record["committed"] = start
+    else:
+        record["unsaved"].append(entry)
+
+
+def _parse_into(record: Dict[str, Any], lines: List[Tuple[int, int, str]], file_name: str, file_hint_ts: str) -> None:
+    """
+    Adds entries parsed from (start, end, text) lines to record.
+    * Structured lines (pipe/dash) are parsed normally.
+    * Raw lines that contain 'error'/'warning' (case-insensitive) are promoted to ERROR/WARNING entries.
+    * Bare lines that don't match anything are appended to the previous entry (multi-line GP messages).
+    """
+    for start, end, raw in lines:
+        line = raw.rstrip("\r")
+        parsed = parse_structured_line(line)
+        if parsed:
+            _add_entry(record, {**parsed, "file": file_name}, start, keep_open=True)
+            continue
+
+        if not line.strip():
+            # blank separator
+            if record["open"] is None:
+                record["committed"] = end
+            continue
+
+        lower = line.lower()
+        if "error" in lower:
+            level = "ERROR"
+        elif "warning" in lower:
+            level = "WARNING"
+        elif record["open"] is not None:
+            # continuation of previous message (e.g., GP dumps after WARNING/ERROR)
+            record["open"]["msg"] = f"{record['open']['msg']}\n{line}"
+            continue
+        else:
+            level = "INFO"
+        _add_entry(record, {"ts": file_hint_ts, "level": level, "logger": "raw", "msg": line, "file": file_name}, start, keep_open=True)
+
+
+def _parse_jsonl_into(record: Dict[str, Any], lines: List[Tuple[int, int, str]], file_name: str, file_hint_ts: str) -> None:
+    """ Adds one entry per JSON line; lines that are not JSON objects are kept as raw INFO entries. """
+    for start, end, raw in lines:
+        line = raw.strip()
+        if line:
+            try:
+                item = json.loads(line)
+            except ValueError:
+                item = None
+            if not isinstance(item, dict):
+                item = {"ts": file_hint_ts, "level": "INFO", "logger": "raw", "msg": line}
+            item.setdefault("ts", file_hint_ts)
+            item.setdefault("level", "INFO")
+            item.setdefault("logger", "")
+            item.setdefault("msg", "")
+            _add_entry(record, {**item, "file": file_name}, start, keep_open=False)
+        record["committed"] = end
+
+
+def _refresh_file(record: Dict[str, Any], path: FSPath, st: os.stat_result) -> bool:
+    """ Parses the complete lines appended to path since record["offset"]. Returns True if anything was read. """
+    if st.st_size <= record["offset"]:
+        return False
+    with path.open("rb") as f:
+        f.seek(record["offset"])
+        data = f.read(st.st_size - record["offset"])
+    # A trailing line without a newline may still be being written; leave it for the next refresh
+    end = data.rfind(b"\n") + 1
+    if end == 0:
+        return False
+    lines: List[Tuple[int, int, str]] = []
+    pos = record["offset"]
+    for raw in data[:end].split(b"\n")[:-1]:
+        lines.append((pos, pos + len(raw) + 1, raw.decode("utf-8", errors="replace")))
+        pos += len(raw) + 1
+    parse = _parse_jsonl_into if path.suffix == ".jsonl" else _parse_into
+    parse(record, lines, path.name, datetime.fromtimestamp(st.st_mtime).isoformat())
+    record["offset"] += end
+    if record["open"] is None:
+        record["committed"] = record["offset"]
+    return True
+
+
+def _entries_path(logs_dir: FSPath, file_name: str) -> FSPath:
+    return logs_dir / ENTRIES_FILENAME.format(file_name)
+
+
+def _save_entries(logs_dir: FSPath, file_name: str, record: Dict[str, Any]) -> None:
+    """ Appends the unsaved entries to the file's entries file and moves record["saved"] up to them. """
+    saved = record["saved"]
+    if record["unsaved"]:
+        data = "".join(json.dumps(entry) + "\n" for entry in record["unsaved"]).encode("utf-8")
+        try:
+            with open(_entries_path(logs_dir, file_name), "ab") as f:
+                # Drop bytes of an append the sidecar never recorded (e.g. the process stopped in between)
+                f.truncate(saved["entries_bytes"])
+                f.write(data)
+        except OSError:
+            # The entries stay in memory and are written with the next ones
+            return
+        saved["entries_bytes"] += len(data)
+        record["unsaved"] = []
+    open_level = record["open"]["level"] if record["open"] is not None else None
+    saved["offset"] = record["committed"]
+    saved["counts"] = {level: n - (level == open_level) for level, n in record["counts"].items() if n - (level == open_level)}
+
+
+def _read_entries(logs_dir: FSPath, file_name: str, record: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """ Saved entries of the file read back from its entries file, then the unsaved and open ones. """
+    entries: List[Dict[str, Any]] = []
+    size = record["saved"]["entries_bytes"]
+    if size:
+        with open(_entries_path(logs_dir, file_name), "rb") as f:
+            data = f.read(size)
+        entries = [json.loads(line) for line in data.decode("utf-8").splitlines()]
+    entries.extend(record["unsaved"])
+    if record["open"] is not None:
+        entries.append(record["open"])
+    return entries
+
+
+def _load_sidecar(logs_dir: FSPath) -> Dict[str, Any]:
+    index: Dict[str, Any] = {"version": INDEX_VERSION, "files": {}}
+    try:
+        with open(logs_dir / INDEX_FILENAME, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        return index
+    if saved.get("version") != INDEX_VERSION:
+        return index
+    for file_name, header in saved.get("files", {}).items():
+        try:
+            if _entries_path(logs_dir, file_name).stat().st_size < header["entries_bytes"]:
+                continue  # entries file lost or cut short: parse the log again
+        except OSError:
+            if header["entries_bytes"]:
+                continue
+        record = _new_file_record(header["inode"])
+        record["offset"] = record["committed"] = header["offset"]
+        record["counts"] = dict(header["counts"])
+        record["saved"] = {"offset": header["offset"], "entries_bytes": header["entries_bytes"], "counts": dict(header["counts"])}
+        index["files"][file_name] = record
+    return index
+
+
+def _save_sidecar(logs_dir: FSPath, index: Dict[str, Any]) -> None:
+    """ Writes the offsets and counts of every file; small, so it is rewritten whole. """
+    header = {
+        "version": INDEX_VERSION,
+        "files": {name: {"inode": record["inode"], **record["saved"]} for name, record in index["files"].items()},
+    }
+    tmp = logs_dir / f"{INDEX_FILENAME}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(header, f)
+        os.replace(tmp, logs_dir / INDEX_FILENAME)
+    except OSError:
+        # The in-memory index still works; the sidecar only saves work after a restart
+        tmp.unlink(missing_ok=True)
+
+
+def _dir_lock(key: str) -> Lock:
+    with _MEMORY_LOCK:
+        return _DIR_LOCKS.setdefault(key, Lock())
+
+
+def _refresh_index(logs_dir: FSPath, paths: List[FSPath]) -> Dict[str, Any]:
+    """
+    Brings the index of logs_dir up to date with the given log files, parsing only new bytes.
+    Files that shrank or were replaced (different inode) are parsed again from the start.
+    Call with the directory's lock held.
+    """
+    key = str(logs_dir.resolve())
+    with _MEMORY_LOCK:
+        index = _MEMORY.get(key)
+    if index is None:
+        index = _load_sidecar(logs_dir)
+
+    changed = False
+    for path in paths:
+        st = path.stat()
+        record = index["files"].get(path.name)
+        if record is None or st.st_size < record["offset"] or (st.st_ino and record.get("inode") != st.st_ino):
+            record = _new_file_record(st.st_ino)
+            index["files"][path.name] = record
+            _entries_path(logs_dir, path.name).unlink(missing_ok=True)
+            changed = True
+        if _refresh_file(record, path, st):
+            _save_entries(logs_dir, path.name, record)
+            changed = True
+
+    if changed:
+        _save_sidecar(logs_dir, index)
+    with _MEMORY_LOCK:
+        _MEMORY[key] = index
+        _MEMORY.move_to_end(key)
+        while len(_MEMORY) > MEMORY_INDEX_LIMIT:
+            _MEMORY.popitem(last=False)
+    return index
+
+
+def indexed_log_entries(logs_dir: FSPath, paths: List[FSPath]) -> Dict[str, List[Dict[str, Any]]]:
+    """ Returns {file name: parsed entries} for the given log files in logs_dir, parsing only new bytes. """
+    logs_dir = FSPath(logs_dir)
+    with _dir_lock(str(logs_dir.resolve())):
+        index = _refresh_index(logs_dir, paths)
+        return {path.name: _read_entries(logs_dir, path.name, index["files"][path.name]) for path in paths}
+
+
+def indexed_log_counts(logs_dir: FSPath, paths: List[FSPath]) -> Dict[str, Dict[str, int]]:
+    """ Returns {file name: {level: number of entries}} for the given log files, without reading any entries. """
+    logs_dir = FSPath(logs_dir)
+    with _dir_lock(str(logs_dir.resolve())):
+        index = _refresh_index(logs_dir, paths)
+        return {path.name: dict(index["files"][path.name]["counts"]) for path in paths}
@@ -0,0 +1,222 @@
+import json
+import logging
+import os
+import re
+import shutil
+import time
+import uuid
+import zipfile
+from threading import Lock
+from typing import Callable, Dict, List, Optional
+
+ENTRY_META_FILENAME = ".entry.json"
+REFS_DIRNAME = ".refs"
+
+# A reference this new is kept even if its job is not in the jobs table yet (still being queued)
+REF_GRACE_SECONDS = 300
+
+
+class NoGdbInZipError(ValueError):
+    """Raised when a source zip does not contain a .gdb folder."""
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def _find_gdb(folder: str) -> Optional[str]:
+    gdb_dirs = sorted(d for d in os.listdir(folder) if d.lower().endswith(".gdb"))
+    return gdb_dirs[0] if gdb_dirs else None
+
+
+class ExtractedGdbCache:
+    """
+    Shared cache of File Geodatabases extracted from the SINGLE_ZIP_DIR zips.
+
+    - A zip is extracted once per (name, size, mtime) into <root>/<key>/ and reused by every job.
+    - Each job checking out an entry leaves a reference file in <root>/<key>/.refs/<job_id>.
+      Entries with live references are never evicted, from this process or any other.
+    - Jobs get a hard-linked copy of the GDB in their own folder, so lock files arcpy writes
+      stay per job. If the filesystem cannot hard link, the job reads the shared copy directly.
+    - evict() removes least recently used entries without live references until the cache fits max_bytes.
+
+    Args:
+        root (str): Cache directory, e.g. <OUTPUT_DIR>/_gdb_cache.
+        max_bytes (int): Disk budget for all extracted GDBs.
+        logger (logging.Logger | None): Logger for cache messages.
+    """
+
+    def __init__(self, root: str, max_bytes: int, logger: Optional[logging.Logger] = None) -> None:
+        self.root = root
+        self.max_bytes = int(max_bytes)
+        self.logger = logger or logging.getLogger("survey_mapper.gdb_cache")
+        self._locks: Dict[str, Lock] = {}
+        self._locks_guard = Lock()
+
+    @staticmethod
+    def entry_key(zip_path: str) -> str:
+        """Cache key from the zip name, size and modification time."""
+        st = os.stat(zip_path)
+        stem = re.sub(r"[^A-Za-z0-9._-]+", "_", os.path.basename(zip_path))
+        return f"{stem}_{st.st_size}_{st.st_mtime_ns}"
+
+    def _entry_dir(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    def _key_lock(self, key: str) -> Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(key, Lock())
+
+    def _read_meta(self, entry_dir: str) -> Optional[Dict]:
+        try:
+            with open(os.path.join(entry_dir, ENTRY_META_FILENAME), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, entry_dir: str, meta: Dict) -> None:
+        tmp = os.path.join(entry_dir, f"{ENTRY_META_FILENAME}.{uuid.uuid4().hex}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp, os.path.join(entry_dir, ENTRY_META_FILENAME))
+
+    def _extract(self, zip_path: str, key: str) -> Dict:
+        """Extracts zip_path into a temp folder and renames it into place. Caller holds the key lock."""
+        entry_dir = self._entry_dir(key)
+        tmp_dir = f"{entry_dir}.{uuid.uuid4().hex}.tmp"
+        started = time.monotonic()
+        try:
+            with zipfile.ZipFile(zip_path, "r") as zf:
+                zf.extractall(tmp_dir)
+            gdb_name = _find_gdb(tmp_dir)
+            if not gdb_name:
+                raise NoGdbInZipError(f"No .gdb found inside {os.path.basename(zip_path)}.")
+            meta = {
+                "zip_name": os.path.basename(zip_path),
+                "gdb_name": gdb_name,
+                "size_bytes": _dir_size(tmp_dir),
+                "created_at": time.time(),
+                "last_used": time.time(),
+            }
+            self._write_meta(tmp_dir, meta)
+            try:
+                os.replace(tmp_dir, entry_dir)
+            except OSError:
+                # Another process finished extracting the same zip first
+                existing = self._read_meta(entry_dir)
+                if existing is None:
+                    raise
+                return existing
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        self.logger.info(
+            f"Extracted {meta['zip_name']} into the GDB cache ({meta['size_bytes'] / 1e6:.0f} MB, "
+            f"{time.monotonic() - started:.1f}s)"
+        )
+        return meta
+
+    def checkout(self, zip_path: str, job_id: str, dest_dir: str) -> str:
+        """
+        Returns a GDB path for job_id, extracting zip_path into the cache on first use.
+        Adds a reference for job_id that keeps the entry from being evicted until release(job_id).
+        """
+        os.makedirs(self.root, exist_ok=True)
+        key = self.entry_key(zip_path)
+        entry_dir = self._entry_dir(key)
+        with self._key_lock(key):
+            meta = self._read_meta(entry_dir)
+            if meta is None:
+                meta = self._extract(zip_path, key)
+            else:
+                self.logger.info(f"Reusing extracted {meta['zip_name']} from the GDB cache for job {job_id}")
+
+            refs_dir = os.path.join(entry_dir, REFS_DIRNAME)
+            os.makedirs(refs_dir, exist_ok=True)
+            with open(os.path.join(refs_dir, job_id), "w", encoding="utf-8") as f:
+                f.write(str(time.time()))
+            meta["last_used"] = time.time()
+            self._write_meta(entry_dir, meta)
+
+        shared_gdb = os.path.join(entry_dir, meta["gdb_name"])
+        job_gdb = os.path.join(dest_dir, meta["gdb_name"])
+        try:
+            shutil.copytree(shared_gdb, job_gdb, copy_function=os.link, ignore=shutil.ignore_patterns("*.lock"))
+            return job_gdb
+        except OSError as e:
+            shutil.rmtree(job_gdb, ignore_errors=True)
+            if not os.path.isdir(shared_gdb):
+                raise
+            self.logger.warning(f"Hard links not available ({e}); job {job_id} reads the shared cached GDB")
+            return shared_gdb
+
+    def release(self, job_id: str) -> None:
+        """Drops every reference job_id holds."""
+        if not os.path.isdir(self.root):
+            return
+        for key in os.listdir(self.root):
+            ref = os.path.join(self.root, key, REFS_DIRNAME, job_id)
+            if os.path.exists(ref):
+                try:
+                    os.remove(ref)
+                except OSError:
+                    pass
+
+    def _live_refs(self, entry_dir: str, is_job_active: Optional[Callable[[str], bool]]) -> List[str]:
+        refs_dir = os.path.join(entry_dir, REFS_DIRNAME)
+        if not os.path.isdir(refs_dir):
+            return []
+        live = []
+        now = time.time()
+        for job_id in os.listdir(refs_dir):
+            ref = os.path.join(refs_dir, job_id)
+            try:
+                fresh = now - os.path.getmtime(ref) < REF_GRACE_SECONDS
+            except OSError:
+                continue
+            if is_job_active is not None and not fresh and not is_job_active(job_id):
+                # Job finished, failed or vanished without releasing
+                try:
+                    os.remove(ref)
+                except OSError:
+                    pass
+                continue
+            live.append(job_id)
+        return live
+
+    def evict(self, is_job_active: Optional[Callable[[str], bool]] = None) -> Dict[str, int]:
+        """
+        Removes least recently used entries nobody references until the cache fits max_bytes.
+        is_job_active(job_id) lets stale references of finished jobs be dropped first.
+        """
+        if not os.path.isdir(self.root):
+            return {"removed": 0, "bytes": 0}
+        entries = []
+        for key in os.listdir(self.root):
+            entry_dir = self._entry_dir(key)
+            if key.endswith(".tmp") or not os.path.isdir(entry_dir):
+                continue
+            meta = self._read_meta(entry_dir)
+            if meta is None:
+                continue
+            entries.append((float(meta.get("last_used", 0)), key, int(meta.get("size_bytes", 0))))
+
+        total = sum(size for _, _, size in entries)
+        removed = 0
+        for _, key, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            with self._key_lock(key):
+                if self._live_refs(self._entry_dir(key), is_job_active):
+                    continue
+                shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+            total -= size
+            removed += 1
+            self.logger.info(f"Evicted {key} from the GDB cache")
+        return {"removed": removed, "bytes": total}
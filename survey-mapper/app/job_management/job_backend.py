@@ -0,0 +1,321 @@
+"""
+Job store backends: where the jobs table (queue, statuses, leases) and its archive live.
+
+JobBackend is the interface used by the API, the dispatcher and job retention. SqliteJobBackend keeps
+everything in a local job_status.db (one API node). PostgresJobBackend (postgres_job_backend.py) lets
+several API/worker nodes share one queue. get_job_backend picks one from JOB_STORE_URL.
+"""
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from app.job_management import job_queue
+from app.job_management.job_store import connection, get_job_store
+
+ARCHIVE_TABLE = "jobs_archive"
+FINISHED_STATUSES = ("complete", "failed", "canceled")
+
+# Columns of a job returned by get_job and list_jobs
+JOB_FIELDS = ("job_id", "status", "created_at", "updated_at", "error", "output_dir")
+
+
+class JobBackend(ABC):
+    """
+    Storage of the jobs table. Timestamps are ISO 8601 strings, as in the original SQLite schema.
+    A job is a dict with JOB_FIELDS; claim_next_job returns {"job_id", "payload", "attempts", "output_dir"}.
+    """
+
+    @abstractmethod
+    def init_schema(self) -> None:
+        """Creates or migrates the jobs table, its indexes and the archive table."""
+
+    # ---- Queue
+    @abstractmethod
+    def enqueue_job(self, job_id: str, output_dir: str, payload: Dict[str, Any], status: str = "queued") -> None: ...
+
+    @abstractmethod
+    def queued_count(self) -> int: ...
+
+    @abstractmethod
+    def active_job_ids(self) -> Set[str]: ...
+
+    @abstractmethod
+    def claim_next_job(self, owner_id: str, lease_seconds: int) -> Optional[Dict[str, Any]]: ...
+
+    @abstractmethod
+    def heartbeat_jobs(self, owner_id: str, job_ids: List[str], lease_seconds: int) -> None: ...
+
+    @abstractmethod
+    def release_job(self, job_id: str, owner_id: str) -> None: ...
+
+    @abstractmethod
+    def requeue_or_fail(self, job_id: str, reason: str, max_attempts: int) -> str: ...
+
+    @abstractmethod
+    def recover_orphaned_jobs(self, max_attempts: int) -> Dict[str, List[str]]: ...
+
+    @abstractmethod
+    def cancel_queued_job(self, job_id: str) -> bool: ...
+
+    @abstractmethod
+    def cancel_all_queued_jobs(self) -> List[str]: ...
+
+    # ---- Status
+    @abstractmethod
+    def update_status(self, job_id: str, status: str, error: Optional[str]) -> None: ...
+
+    @abstractmethod
+    def mark_cancelling(self, job_ids: List[str]) -> None:
+        """Sets 'cancelling' on jobs that are still queued, staging or processing."""
+
+    @abstractmethod
+    def set_result_zip_path(self, job_id: str, zip_path: str) -> None: ...
+
+    @abstractmethod
+    def get_job(self, job_id: str, include_archive: bool = False) -> Optional[Dict[str, Any]]:
+        """The job, or None. With include_archive, archived jobs are returned too (output_dir None)."""
+
+    @abstractmethod
+    def list_jobs(
+        self,
+        statuses: Optional[Sequence[str]] = None,
+        created_from: Optional[str] = None,
+        created_to: Optional[str] = None,
+        before: Optional[Tuple[str, str]] = None,
+        limit: int = 100,
+    ) -> List[Dict[str, Any]]:
+        """Jobs newest first (created_at, job_id), optionally only those after the keyset `before`."""
+
+    # ---- Retention
+    @abstractmethod
+    def finished_jobs(self, updated_before: Optional[str] = None, limit: Optional[int] = None) -> List[Tuple[str, Optional[str]]]:
+        """(job_id, output_dir) of finished jobs, least recently updated first."""
+
+    @abstractmethod
+    def archive_jobs(self, job_ids: List[str]) -> List[Dict[str, Optional[str]]]:
+        """Moves finished jobs to the archive. Returns [{"job_id", "output_dir"}] of those moved."""
+
+    @abstractmethod
+    def finished_or_archived(self, job_ids: List[str]) -> Set[str]:
+        """The job_ids that are finished or archived."""
+
+
+def _job_dict(row: Sequence[Any]) -> Dict[str, Any]:
+    return dict(zip(JOB_FIELDS, row))
+
+
+class SqliteJobBackend(JobBackend):
+    """
+    Jobs in a local SQLite file, through the pooled job store (job_store.py).
+
+    Args:
+        db_path (str): Path of job_status.db.
+    """
+
+    def __init__(self, db_path: str) -> None:
+        self.db_path = db_path
+
+    def init_schema(self) -> None:
+        with connection(self.db_path) as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    status TEXT,
+                    created_at TEXT,
+                    updated_at TEXT,
+                    error TEXT,
+                    output_dir TEXT,
+                    result_zip_path TEXT
+                )
+                """
+            )
+        # Queue columns (payload, attempts, lease, heartbeat) used by the job dispatcher
+        job_queue.migrate_queue_columns(self.db_path)
+        job_queue.migrate_job_indexes(self.db_path)
+        self._migrate_archive_table()
+
+    def _migrate_archive_table(self) -> None:
+        """Creates jobs_archive (the jobs columns plus archived_at) and adds columns jobs gained since."""
+        with connection(self.db_path) as conn:
+            job_columns = conn.execute("PRAGMA table_info(jobs)").fetchall()
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {ARCHIVE_TABLE} (job_id TEXT PRIMARY KEY, archived_at TEXT)")
+            existing = {row[1] for row in conn.execute(f"PRAGMA table_info({ARCHIVE_TABLE})").fetchall()}
+            for _, name, decl, _, _, _ in job_columns:
+                if name not in existing:
+                    conn.execute(f"ALTER TABLE {ARCHIVE_TABLE} ADD COLUMN {name} {decl}")
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{ARCHIVE_TABLE}_created_at ON {ARCHIVE_TABLE} (created_at)")
+
+    # ---- Queue
+    def enqueue_job(self, job_id: str, output_dir: str, payload: Dict[str, Any], status: str = "queued") -> None:
+        job_queue.enqueue_job(self.db_path, job_id, output_dir, payload, status)
+
+    def queued_count(self) -> int:
+        return job_queue.queued_count(self.db_path)
+
+    def active_job_ids(self) -> Set[str]:
+        return job_queue.active_job_ids(self.db_path)
+
+    def claim_next_job(self, owner_id: str, lease_seconds: int) -> Optional[Dict[str, Any]]:
+        return job_queue.claim_next_job(self.db_path, owner_id, lease_seconds)
+
+    def heartbeat_jobs(self, owner_id: str, job_ids: List[str], lease_seconds: int) -> None:
+        job_queue.heartbeat_jobs(self.db_path, owner_id, job_ids, lease_seconds)
+
+    def release_job(self, job_id: str, owner_id: str) -> None:
+        job_queue.release_job(self.db_path, job_id, owner_id)
+
+    def requeue_or_fail(self, job_id: str, reason: str, max_attempts: int) -> str:
+        return job_queue.requeue_or_fail(self.db_path, job_id, reason, max_attempts)
+
+    def recover_orphaned_jobs(self, max_attempts: int) -> Dict[str, List[str]]:
+        return job_queue.recover_orphaned_jobs(self.db_path, max_attempts)
+
+    def cancel_queued_job(self, job_id: str) -> bool:
+        return job_queue.cancel_queued_job(self.db_path, job_id)
+
+    def cancel_all_queued_jobs(self) -> List[str]:
+        return job_queue.cancel_all_queued_jobs(self.db_path)
+
+    # ---- Status
+    def update_status(self, job_id: str, status: str, error: Optional[str]) -> None:
+        get_job_store(self.db_path).write(
+            "UPDATE jobs SET status = ?, updated_at = ?, error = ? WHERE job_id = ?",
+            (status, datetime.now().isoformat(), error, job_id),
+        )
+
+    def mark_cancelling(self, job_ids: List[str]) -> None:
+        now_ = datetime.now().isoformat()
+        get_job_store(self.db_path).write_many(
+            "UPDATE jobs SET status = ?, updated_at = ? WHERE job_id = ? AND status IN ('queued','staging','processing')",
+            [("cancelling", now_, job_id) for job_id in job_ids],
+        )
+
+    def set_result_zip_path(self, job_id: str, zip_path: str) -> None:
+        get_job_store(self.db_path).write(
+            "UPDATE jobs SET result_zip_path = ?, updated_at = ? WHERE job_id = ?",
+            (zip_path, datetime.now().isoformat(), job_id),
+        )
+
+    def get_job(self, job_id: str, include_archive: bool = False) -> Optional[Dict[str, Any]]:
+        with connection(self.db_path) as conn:
+            row = conn.execute(f"SELECT {', '.join(JOB_FIELDS)} FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            if not row and include_archive:
+                row = conn.execute(
+                    f"SELECT job_id, status, created_at, updated_at, error, NULL FROM {ARCHIVE_TABLE} WHERE job_id = ?",
+                    (job_id,),
+                ).fetchone()
+        return _job_dict(row) if row else None
+
+    def list_jobs(
+        self,
+        statuses: Optional[Sequence[str]] = None,
+        created_from: Optional[str] = None,
+        created_to: Optional[str] = None,
+        before: Optional[Tuple[str, str]] = None,
+        limit: int = 100,
+    ) -> List[Dict[str, Any]]:
+        where: List[str] = []
+        params: List[Any] = []
+        if statuses:
+            where.append(f"status IN ({','.join('?' for _ in statuses)})")
+            params.extend(statuses)
+        if created_from:
+            where.append("created_at >= ?")
+            params.append(created_from)
+        if created_to:
+            where.append("created_at < ?")
+            params.append(created_to)
+        if before:
+            where.append("(created_at < ? OR (created_at = ? AND job_id < ?))")
+            params.extend([before[0], before[0], before[1]])
+
+        sql = f"SELECT {', '.join(JOB_FIELDS)} FROM jobs"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY created_at DESC, job_id DESC LIMIT ?"
+        with connection(self.db_path) as conn:
+            rows = conn.execute(sql, (*params, limit)).fetchall()
+        return [_job_dict(row) for row in rows]
+
+    # ---- Retention
+    def finished_jobs(self, updated_before: Optional[str] = None, limit: Optional[int] = None) -> List[Tuple[str, Optional[str]]]:
+        sql = f"SELECT job_id, output_dir FROM jobs WHERE status IN ({','.join('?' for _ in FINISHED_STATUSES)})"
+        params: List[Any] = list(FINISHED_STATUSES)
+        if updated_before:
+            sql += " AND updated_at < ?"
+            params.append(updated_before)
+        sql += " ORDER BY updated_at"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with connection(self.db_path) as conn:
+            return [tuple(row) for row in conn.execute(sql, params).fetchall()]
+
+    def archive_jobs(self, job_ids: List[str]) -> List[Dict[str, Optional[str]]]:
+        if not job_ids:
+            return []
+        placeholders = ",".join("?" for _ in job_ids)
+        finished = ",".join("?" for _ in FINISHED_STATUSES)
+        now_ = datetime.now().isoformat()
+        with connection(self.db_path) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(jobs)").fetchall()]
+            rows = conn.execute(
+                f"SELECT job_id, output_dir FROM jobs WHERE job_id IN ({placeholders}) AND status IN ({finished})",
+                (*job_ids, *FINISHED_STATUSES),
+            ).fetchall()
+            if not rows:
+                conn.commit()
+                return []
+            ids = [r[0] for r in rows]
+            id_marks = ",".join("?" for _ in ids)
+            column_list = ", ".join(columns)
+            conn.execute(
+                f"INSERT OR REPLACE INTO {ARCHIVE_TABLE} ({column_list}, archived_at) "
+                f"SELECT {column_list}, ? FROM jobs WHERE job_id IN ({id_marks})",
+                (now_, *ids),
+            )
+            conn.execute(f"DELETE FROM jobs WHERE job_id IN ({id_marks})", ids)
+        return [{"job_id": job_id, "output_dir": output_dir} for job_id, output_dir in rows]
+
+    def finished_or_archived(self, job_ids: List[str]) -> Set[str]:
+        if not job_ids:
+            return set()
+        marks = ",".join("?" for _ in job_ids)
+        finished = ",".join("?" for _ in FINISHED_STATUSES)
+        with connection(self.db_path) as conn:
+            rows = conn.execute(
+                f"SELECT job_id FROM jobs WHERE job_id IN ({marks}) AND status IN ({finished}) "
+                f"UNION SELECT job_id FROM {ARCHIVE_TABLE} WHERE job_id IN ({marks})",
+                (*job_ids, *FINISHED_STATUSES, *job_ids),
+            ).fetchall()
+        return {row[0] for row in rows}
+
+
+_BACKENDS: Dict[str, JobBackend] = {}
+_BACKENDS_LOCK = threading.Lock()
+
+
+def is_postgres_url(target: str) -> bool:
+    """True when target is a Postgres URL rather than a SQLite file path."""
+    return target.startswith(("postgresql://", "postgresql+", "postgres://"))
+
+
+def get_job_backend(target: str) -> JobBackend:
+    """
+    The job backend for target: a postgresql:// URL, or the path of a SQLite file.
+    Backends are created once per process.
+    """
+    with _BACKENDS_LOCK:
+        backend = _BACKENDS.get(target)
+        if backend is None:
+            if is_postgres_url(target):
+                # Imported here so SQLite deployments do not need a Postgres driver
+                from app.job_management.postgres_job_backend import PostgresJobBackend
+                backend = PostgresJobBackend(target)
+            else:
+                backend = SqliteJobBackend(target)
+            _BACKENDS[target] = backend
+        return backend
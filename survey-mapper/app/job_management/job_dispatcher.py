@@ -0,0 +1,106 @@
+import logging
+import time
+from threading import Event, Thread
+from typing import Any, Callable, Dict, Optional
+
+from app.job_management.job_backend import JobBackend
+from app.job_management.job_executor import JobExecutor
+from app.job_management.job_queue import new_owner_id
+
+
+class JobDispatcher:
+    """
+    Background thread that feeds the durable jobs-table queue into the JobExecutor.
+
+    - On start, sweeps jobs orphaned by a previous run (expired leases) back onto the queue.
+    - Claims a queued job only when a worker process is free, so other API nodes
+      sharing the same database can pick up the rest.
+    - Renews the lease of every job this process is running (heartbeat), and keeps
+      sweeping expired leases left behind by other processes.
+
+    Args:
+        backend (JobBackend): Job store holding the queue (SQLite or Postgres).
+        executor (JobExecutor): Worker pool that runs claimed jobs.
+        start_job (Callable): Called with the claimed job dict; must submit it to the executor.
+        lease_seconds (int): How long a claim stays valid without a heartbeat.
+        heartbeat_seconds (int): How often leases are renewed and orphans are swept.
+        max_attempts (int): Claims allowed per job before an orphaned job is failed.
+        poll_seconds (float): Longest idle wait between queue checks when not notified.
+    """
+
+    def __init__(
+        self,
+        backend: JobBackend,
+        executor: JobExecutor,
+        start_job: Callable[[Dict[str, Any]], None],
+        lease_seconds: int = 60,
+        heartbeat_seconds: int = 15,
+        max_attempts: int = 2,
+        poll_seconds: float = 2.0,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        self.backend = backend
+        self.executor = executor
+        self.start_job = start_job
+        self.lease_seconds = int(lease_seconds)
+        self.heartbeat_seconds = int(heartbeat_seconds)
+        self.max_attempts = int(max_attempts)
+        self.poll_seconds = float(poll_seconds)
+        self.logger = logger or logging.getLogger("survey_mapper.dispatcher")
+        self.owner_id = new_owner_id()
+
+        self._wake = Event()
+        self._stop = Event()
+        self._thread: Optional[Thread] = None
+
+    def start(self) -> None:
+        """Recover orphaned jobs and start the dispatch thread (no-op if already running)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._sweep()
+        self._stop.clear()
+        self._thread = Thread(target=self._run, name="job-dispatcher", daemon=True)
+        self._thread.start()
+        self.logger.info(f"Job dispatcher started as lease owner {self.owner_id}")
+
+    def notify(self) -> None:
+        """Wake the dispatcher now, e.g. after a job was queued or a worker became free."""
+        self._wake.set()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def _sweep(self) -> None:
+        try:
+            recovered = self.backend.recover_orphaned_jobs(self.max_attempts)
+            if any(recovered.values()):
+                self.logger.warning(f"Recovered orphaned jobs: {recovered}")
+        except Exception as e:
+            self.logger.warning(f"Orphaned job sweep failed: {e}")
+
+    def _dispatch_available(self) -> None:
+        while not self._stop.is_set() and self.executor.idle_worker_count() > 0:
+            job = self.backend.claim_next_job(self.owner_id, self.lease_seconds)
+            if job is None:
+                return
+            self.logger.info(f"Claimed job {job['job_id']} (attempt {job['attempts']})")
+            self.start_job(job)
+
+    def _run(self) -> None:
+        last_beat = 0.0
+        while not self._stop.is_set():
+            try:
+                if time.monotonic() - last_beat >= self.heartbeat_seconds:
+                    self.backend.heartbeat_jobs(self.owner_id, self.executor.active_job_ids(), self.lease_seconds)
+                    self._sweep()
+                    last_beat = time.monotonic()
+                self._dispatch_available()
+            except Exception as e:
+                # Keep the dispatcher alive; a locked or missing DB is retried on the next loop
+                self.logger.warning(f"Job dispatcher loop error: {e}")
+            self._wake.wait(timeout=self.poll_seconds)
+            self._wake.clear()
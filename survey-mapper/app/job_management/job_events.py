@@ -0,0 +1,110 @@
+"""
+Per-job event log read by the /events/{job_id} stream.
+
+The process running a job appends one JSON object per line to <output_dir>/logs/events.jsonl:
+progress updates ("sheets" 2 of 5, "clips" 14 of 40, "export" 3 of 12) and every record of the
+job logger. Readers resume from a byte offset, which doubles as the event id.
+"""
+import json
+import logging
+import os
+import time
+from pathlib import Path as FSPath
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
+
+EVENTS_FILENAME = "events.jsonl"
+
+# Most bytes handed to one reader per read, so a resume from offset 0 is streamed in pieces
+EVENTS_READ_MAX_BYTES = 256 * 1024
+
+
+def events_path(output_dir: str) -> FSPath:
+    return FSPath(output_dir) / "logs" / EVENTS_FILENAME
+
+
+class JobEventWriter:
+    """
+    Appends events to a job's events.jsonl. Safe to share between threads of one process.
+
+    Args:
+        output_dir (str): The job's output folder.
+    """
+
+    def __init__(self, output_dir: str) -> None:
+        self.path = events_path(output_dir)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = Lock()
+        # Binary append so byte offsets match what readers see on every platform
+        self._file = open(self.path, "ab")
+
+    def emit(self, event_type: str, **fields: Any) -> None:
+        line = json.dumps({"type": event_type, "ts": time.time(), **fields}, default=str)
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(line.encode("utf-8") + b"\n")
+            self._file.flush()
+
+    def progress(self, stage: str, current: int, total: int, label: Optional[str] = None) -> None:
+        """Progress of one stage of the job, e.g. progress("sheets", 2, 5, "Sheet2")."""
+        self.emit("progress", stage=stage, current=current, total=total, label=label)
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class JobEventLogHandler(logging.Handler):
+    """Logging handler that mirrors job logger records into the job's event log."""
+
+    def __init__(self, writer: JobEventWriter, level: int = logging.INFO) -> None:
+        super().__init__(level)
+        self.writer = writer
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.writer.emit("log", level=record.levelname, logger=record.name, msg=record.getMessage())
+        except Exception:
+            self.handleError(record)
+
+
+def read_events(
+    path: FSPath,
+    offset: int,
+    max_bytes: int = EVENTS_READ_MAX_BYTES,
+) -> Tuple[List[Tuple[int, Dict[str, Any]]], int]:
+    """
+    Reads complete event lines after offset, up to about max_bytes.
+    Returns ([(offset after the event, event), ...], new offset). A partly written last line is left for the next read.
+    """
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return [], offset
+    if size <= offset:
+        return [], offset
+
+    with open(path, "rb") as f:
+        f.seek(offset)
+        data = f.read(min(size - offset, max_bytes))
+    end = data.rfind(b"\n") + 1
+    if end == 0:
+        if size - offset > max_bytes:
+            # One line longer than max_bytes: read it whole
+            with open(path, "rb") as f:
+                f.seek(offset)
+                data = f.readline()
+            end = len(data) if data.endswith(b"\n") else 0
+        if end == 0:
+            return [], offset
+
+    events: List[Tuple[int, Dict[str, Any]]] = []
+    position = offset
+    for raw in data[:end].split(b"\n")[:-1]:
+        position += len(raw) + 1
+        try:
+            events.append((position, json.loads(raw)))
+        except ValueError:
+            continue
+    return events, offset + end
@@ -0,0 +1,164 @@
+import logging
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional
+
+
+class QueueFullError(RuntimeError):
+    """Raised when every worker is busy and the wait queue is already full."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Job queue is full, try again later")
+        self.retry_after = retry_after
+
+
+class JobExecutor:
+    """
+    Runs survey jobs in a pool of worker processes instead of the API process.
+
+    - At most `max_workers` jobs run at the same time, one per process.
+    - At most `max_queued` more jobs wait for a free worker. Past that, submit()
+      raises QueueFullError so the API can answer with HTTP 429.
+    - If a worker process dies (arcpy crash, killed by the OS), the pool is
+      replaced on the next submit and the affected jobs are reported to on_done.
+
+    Args:
+        max_workers (int): Number of worker processes.
+        max_queued (int): Number of jobs allowed to wait for a worker.
+        retry_after (int): Seconds suggested to clients when the queue is full.
+        logger (logging.Logger | None): Logger for pool level messages.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        max_queued: int = 10,
+        retry_after: int = 30,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        self.max_workers = max(1, int(max_workers))
+        self.max_queued = max(0, int(max_queued))
+        self.retry_after = int(retry_after)
+        self.logger = logger or logging.getLogger("survey_mapper.executor")
+
+        # Spawn keeps workers clean of the API process state on every platform
+        self._ctx = multiprocessing.get_context("spawn")
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._manager = None
+        self._futures: Dict[str, Future] = {}
+        self._lock = Lock()
+
+    @property
+    def pending_count(self) -> int:
+        """Number of jobs submitted and not yet finished (running + waiting)."""
+        with self._lock:
+            return len(self._futures)
+
+    def has_capacity(self) -> bool:
+        """True if a new job would be accepted right now."""
+        return self.pending_count < self.max_workers + self.max_queued
+
+    def idle_worker_count(self) -> int:
+        """Number of worker processes with nothing to do."""
+        return max(0, self.max_workers - self.pending_count)
+
+    def active_job_ids(self) -> List[str]:
+        """Ids of jobs submitted and not yet finished."""
+        with self._lock:
+            return list(self._futures)
+
+    def new_cancel_event(self) -> Any:
+        """Return an Event that can be set in the API process and read inside a worker."""
+        with self._lock:
+            if self._manager is None:
+                self._manager = self._ctx.Manager()
+            return self._manager.Event()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        # Caller must hold self._lock
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=self._ctx)
+            self.logger.info(f"Started job worker pool with {self.max_workers} processes")
+        return self._pool
+
+    def submit(
+        self,
+        job_id: str,
+        fn: Callable[..., Any],
+        *args: Any,
+        on_done: Optional[Callable[[str, Optional[BaseException]], None]] = None,
+    ) -> Future:
+        """
+        Queue fn(*args) on the worker pool.
+
+        on_done(job_id, exc) is called in the API process when the job leaves the pool.
+        exc is None on a normal return, otherwise the exception that ended the job,
+        e.g. BrokenProcessPool when the worker process died.
+        """
+        with self._lock:
+            if len(self._futures) >= self.max_workers + self.max_queued:
+                raise QueueFullError(self.retry_after)
+            pool = self._get_pool()
+            try:
+                fut = pool.submit(fn, *args)
+            except BrokenProcessPool:
+                # Pool broke between jobs; replace it and try once more
+                self._discard_pool(pool)
+                pool = self._get_pool()
+                fut = pool.submit(fn, *args)
+            self._futures[job_id] = fut
+
+        fut.add_done_callback(lambda f: self._on_future_done(job_id, pool, f, on_done))
+        return fut
+
+    def _discard_pool(self, pool: ProcessPoolExecutor) -> None:
+        # Caller must hold self._lock
+        if self._pool is pool:
+            self._pool = None
+            self.logger.warning("Job worker pool is broken; a new pool will be started for the next job")
+        try:
+            pool.shutdown(wait=False, cancel_futures=True)
+        except Exception:
+            pass
+
+    def _on_future_done(
+        self,
+        job_id: str,
+        pool: ProcessPoolExecutor,
+        fut: Future,
+        on_done: Optional[Callable[[str, Optional[BaseException]], None]],
+    ) -> None:
+        exc: Optional[BaseException] = None
+        if fut.cancelled():
+            exc = RuntimeError("Job was cancelled before a worker picked it up")
+        else:
+            exc = fut.exception()
+
+        with self._lock:
+            self._futures.pop(job_id, None)
+            if isinstance(exc, BrokenProcessPool):
+                self._discard_pool(pool)
+
+        if exc is not None:
+            self.logger.error(f"Job {job_id} ended with worker error: {exc!r}")
+
+        if on_done is not None:
+            try:
+                on_done(job_id, exc)
+            except Exception:
+                self.logger.exception(f"on_done callback failed for job {job_id}")
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Stop the worker pool and the shared cancel-event manager."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+            manager, self._manager = self._manager, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=not wait)
+        if manager is not None:
+            try:
+                manager.shutdown()
+            except Exception:
+                pass
@@ -0,0 +1,260 @@
+import json
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set
+
+from app.job_management.job_store import connection, get_job_store
+
+# Statuses a job can be in while it still needs a worker or is held by one
+ACTIVE_STATUSES = ("queued", "staging", "processing", "cancelling")
+
+# Extra columns that turn the jobs table into a durable queue.
+# Added on top of the original schema so existing job_status.db files keep working.
+QUEUE_COLUMNS = {
+    "payload": "TEXT",                     # JSON arguments needed to (re)run the job
+    "attempts": "INTEGER DEFAULT 0",       # how many times a worker has claimed the job
+    "lease_owner": "TEXT",                 # node/process currently holding the job
+    "lease_expires_at": "TEXT",            # lease is free to take over after this time
+    "heartbeat_at": "TEXT",                # last time the owner confirmed it is alive
+}
+
+
+def new_owner_id() -> str:
+    """Unique id for this API process, used as the lease owner of claimed jobs."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def _now() -> datetime:
+    return datetime.now()
+
+
+def migrate_queue_columns(db_path: str) -> None:
+    """Adds the queue columns to the jobs table if they are missing."""
+    with connection(db_path) as conn:
+        existing = {row[1] for row in conn.execute("PRAGMA table_info(jobs)").fetchall()}
+        for name, decl in QUEUE_COLUMNS.items():
+            if name not in existing:
+                conn.execute(f"ALTER TABLE jobs ADD COLUMN {name} {decl}")
+        conn.commit()
+
+
+# Indexes for /status-all (newest first) and the status filters of the queue and cancel queries
+JOB_INDEXES = {
+    "idx_jobs_created_at": "jobs (created_at, job_id)",
+    "idx_jobs_status": "jobs (status, created_at)",
+}
+
+
+def migrate_job_indexes(db_path: str) -> None:
+    """Creates the jobs table indexes if they are missing."""
+    with connection(db_path) as conn:
+        for name, target in JOB_INDEXES.items():
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+
+
+def enqueue_job(db_path: str, job_id: str, output_dir: str, payload: Dict[str, Any], status: str = "queued") -> None:
+    """
+    Records a new queued job along with everything a worker needs to run it.
+    A job the API finishes itself (served from the result cache) is recorded with status "staging" instead,
+    so no worker claims it.
+    """
+    now_ = _now().isoformat()
+    with connection(db_path) as conn:
+        conn.execute(
+            """
+            INSERT INTO jobs (job_id, status, created_at, updated_at, error, output_dir, payload, attempts)
+            VALUES (?, ?, ?, ?, NULL, ?, ?, 0)
+            """,
+            (job_id, status, now_, now_, output_dir, json.dumps(payload)),
+        )
+        conn.commit()
+
+
+def queued_count(db_path: str) -> int:
+    """Number of jobs waiting for a worker (not yet claimed)."""
+    with connection(db_path) as conn:
+        row = conn.execute(
+            "SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND lease_owner IS NULL"
+        ).fetchone()
+    return int(row[0]) if row else 0
+
+
+def active_job_ids(db_path: str) -> Set[str]:
+    """Ids of jobs that are queued, staging, processing or cancelling."""
+    placeholders = ",".join("?" for _ in ACTIVE_STATUSES)
+    with connection(db_path) as conn:
+        rows = conn.execute(f"SELECT job_id FROM jobs WHERE status IN ({placeholders})", ACTIVE_STATUSES).fetchall()
+    return {row[0] for row in rows}
+
+
+def claim_next_job(db_path: str, owner_id: str, lease_seconds: int) -> Optional[Dict[str, Any]]:
+    """
+    Atomically takes the oldest unclaimed queued job and leases it to owner_id.
+
+    Returns {"job_id", "payload", "attempts", "output_dir"} or None when the queue is empty.
+    The job keeps status 'queued' until the worker marks it 'processing'.
+    """
+    now = _now()
+    expires = (now + timedelta(seconds=lease_seconds)).isoformat()
+    with connection(db_path) as conn:
+        # BEGIN IMMEDIATE takes the write lock up front so two nodes never claim the same row
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute(
+            """
+            SELECT job_id, payload, attempts, output_dir FROM jobs
+             WHERE status = 'queued' AND lease_owner IS NULL AND payload IS NOT NULL
+             ORDER BY created_at
+             LIMIT 1
+            """
+        ).fetchone()
+        if not row:
+            conn.commit()
+            return None
+        job_id, payload, attempts, output_dir = row
+        conn.execute(
+            """
+            UPDATE jobs
+               SET lease_owner = ?, lease_expires_at = ?, heartbeat_at = ?,
+                   attempts = COALESCE(attempts, 0) + 1, updated_at = ?
+             WHERE job_id = ?
+            """,
+            (owner_id, expires, now.isoformat(), now.isoformat(), job_id),
+        )
+
+    return {
+        "job_id": job_id,
+        "payload": json.loads(payload),
+        "attempts": int(attempts or 0) + 1,
+        "output_dir": output_dir,
+    }
+
+
+def heartbeat_jobs(db_path: str, owner_id: str, job_ids: List[str], lease_seconds: int) -> None:
+    """Extends the lease on every job this owner is still running, in the job store's next write batch."""
+    if not job_ids:
+        return
+    now = _now()
+    expires = (now + timedelta(seconds=lease_seconds)).isoformat()
+    get_job_store(db_path).write_many(
+        "UPDATE jobs SET heartbeat_at = ?, lease_expires_at = ? WHERE job_id = ? AND lease_owner = ?",
+        [(now.isoformat(), expires, jid, owner_id) for jid in job_ids],
+    )
+
+
+def release_job(db_path: str, job_id: str, owner_id: str) -> None:
+    """Drops the lease once a job has left the worker pool."""
+    with connection(db_path) as conn:
+        conn.execute(
+            "UPDATE jobs SET lease_owner = NULL, lease_expires_at = NULL WHERE job_id = ? AND lease_owner = ?",
+            (job_id, owner_id),
+        )
+        conn.commit()
+
+
+def requeue_or_fail(db_path: str, job_id: str, reason: str, max_attempts: int) -> str:
+    """
+    Puts a job whose worker died back on the queue, or fails it once it has used up max_attempts.
+    Returns the new status.
+    """
+    now_ = _now().isoformat()
+    with connection(db_path) as conn:
+        row = conn.execute("SELECT status, attempts FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if not row:
+            return "unknown"
+        status, attempts = row[0], int(row[1] or 0)
+        if status == "cancelling":
+            new_status, error = "canceled", f"Canceled; worker stopped: {reason}"
+        elif status in ("queued", "staging", "processing") and attempts < max_attempts:
+            new_status, error = "queued", f"Re-queued after attempt {attempts}: {reason}"
+        elif status in ("queued", "staging", "processing"):
+            new_status, error = "failed", f"Failed after {attempts} attempts: {reason}"
+        else:
+            # Already finished (complete/failed/canceled); only drop the lease
+            new_status, error = status, None
+        conn.execute(
+            """
+            UPDATE jobs
+               SET status = ?, error = COALESCE(?, error), updated_at = ?,
+                   lease_owner = NULL, lease_expires_at = NULL
+             WHERE job_id = ?
+            """,
+            (new_status, error, now_, job_id),
+        )
+        conn.commit()
+    return new_status
+
+
+def recover_orphaned_jobs(db_path: str, max_attempts: int) -> Dict[str, List[str]]:
+    """
+    Startup and periodic sweep for jobs whose owner is gone.
+
+    - Active jobs whose lease has expired are re-queued, or failed after max_attempts.
+    - Active jobs that never had a lease but cannot be re-run (no payload, e.g. created
+      before the queue columns existed) are failed instead of staying 'processing' forever.
+
+    Returns {"requeued": [...], "failed": [...], "canceled": [...]}.
+    """
+    now_ = _now().isoformat()
+    result: Dict[str, List[str]] = {"requeued": [], "failed": [], "canceled": []}
+    placeholders = ",".join("?" for _ in ACTIVE_STATUSES)
+    with connection(db_path) as conn:
+        expired = conn.execute(
+            f"""
+            SELECT job_id FROM jobs
+             WHERE status IN ({placeholders})
+               AND lease_owner IS NOT NULL AND lease_expires_at < ?
+            """,
+            (*ACTIVE_STATUSES, now_),
+        ).fetchall()
+        legacy = conn.execute(
+            f"""
+            SELECT job_id FROM jobs
+             WHERE status IN ({placeholders}) AND lease_owner IS NULL AND payload IS NULL
+            """,
+            ACTIVE_STATUSES,
+        ).fetchall()
+        for (job_id,) in legacy:
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, updated_at = ? WHERE job_id = ?",
+                ("Orphaned by a server restart and cannot be re-run", now_, job_id),
+            )
+            result["failed"].append(job_id)
+        conn.commit()
+
+    for (job_id,) in expired:
+        new_status = requeue_or_fail(db_path, job_id, "lease expired (worker or server stopped)", max_attempts)
+        key = {"queued": "requeued", "failed": "failed", "canceled": "canceled"}.get(new_status)
+        if key:
+            result[key].append(job_id)
+    return result
+
+
+def cancel_queued_job(db_path: str, job_id: str) -> bool:
+    """Cancels a job that is still waiting in the queue. Returns True if it was cancelled."""
+    now_ = _now().isoformat()
+    with connection(db_path) as conn:
+        cur = conn.execute(
+            "UPDATE jobs SET status = 'canceled', error = 'Canceled while queued', updated_at = ? "
+            "WHERE job_id = ? AND status = 'queued' AND lease_owner IS NULL",
+            (now_, job_id),
+        )
+        conn.commit()
+        return cur.rowcount > 0
+
+
+def cancel_all_queued_jobs(db_path: str) -> List[str]:
+    """Cancels every job still waiting in the queue and returns their ids."""
+    now_ = _now().isoformat()
+    with connection(db_path) as conn:
+        ids = [r[0] for r in conn.execute(
+            "SELECT job_id FROM jobs WHERE status = 'queued' AND lease_owner IS NULL"
+        ).fetchall()]
+        conn.executemany(
+            "UPDATE jobs SET status = 'canceled', error = 'Canceled while queued', updated_at = ? "
+            "WHERE job_id = ? AND status = 'queued' AND lease_owner IS NULL",
+            [(now_, jid) for jid in ids],
+        )
+        conn.commit()
+    return ids
@@ -0,0 +1,137 @@
+"""
+Retention for finished jobs.
+
+Old finished jobs are moved from the jobs table to jobs_archive, and their output/<job_id> folder and
+temp folder are deleted. Jobs whose outputs push the output folders over a disk budget are treated the
+same way, oldest first. Temp folders of finished jobs are removed once they have sat unchanged for a
+grace period. Run it periodically with JobRetention.run_once.
+"""
+import logging
+import os
+import re
+import shutil
+import time
+from datetime import datetime, timedelta
+from pathlib import Path as FSPath
+from typing import Dict, List, Optional
+
+from app.job_management.job_backend import JobBackend
+
+# Jobs moved to the archive per transaction
+ARCHIVE_BATCH = 500
+# Temp folders younger than this are left alone; a job may still be writing to them
+TEMP_GRACE_SECONDS = 3600
+
+_JOB_ID = re.compile(r"^[0-9a-f]{8}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{12}$")
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+class JobRetention:
+    """
+    Archives old finished jobs and deletes their folders.
+
+    Args:
+        backend (JobBackend): Job store holding the jobs and jobs_archive tables.
+        temp_root (str): Folder holding the per-job temp folders (<temp_root>/<job_id>).
+        max_age_days (int): Finished jobs older than this are archived. 0 keeps them.
+        max_output_bytes (int): Disk budget for the output folders of finished jobs. 0 means no budget.
+        logger (logging.Logger, optional): Logger for what was removed.
+    """
+
+    def __init__(
+        self,
+        backend: JobBackend,
+        temp_root: str,
+        max_age_days: int = 30,
+        max_output_bytes: int = 0,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        self.backend = backend
+        self.temp_root = FSPath(temp_root)
+        self.max_age_days = int(max_age_days)
+        self.max_output_bytes = int(max_output_bytes)
+        self.logger = logger or logging.getLogger("survey_mapper.job_retention")
+
+    def run_once(self) -> Dict[str, int]:
+        """ One maintenance pass. Returns {"archived", "removed_dirs", "bytes"}. """
+        stats = {"archived": 0, "removed_dirs": 0, "bytes": 0}
+
+        if self.max_age_days > 0:
+            cutoff = (datetime.now() - timedelta(days=self.max_age_days)).isoformat()
+            while True:
+                ids = [job_id for job_id, _ in self.backend.finished_jobs(updated_before=cutoff, limit=ARCHIVE_BATCH)]
+                if not ids:
+                    break
+                self._archive_and_remove(ids, stats)
+                if len(ids) < ARCHIVE_BATCH:
+                    break
+
+        if self.max_output_bytes > 0:
+            self._enforce_output_budget(stats)
+
+        self._remove_stale_temp_dirs(stats)
+        if stats["archived"] or stats["removed_dirs"]:
+            self.logger.info(
+                f"Job retention: archived {stats['archived']} jobs, removed {stats['removed_dirs']} folders "
+                f"({stats['bytes'] / (1024 * 1024):.1f} MB)"
+            )
+        return stats
+
+    def _archive_and_remove(self, job_ids: List[str], stats: Dict[str, int]) -> None:
+        for job in self.backend.archive_jobs(job_ids):
+            stats["archived"] += 1
+            if job["output_dir"] and FSPath(job["output_dir"]).name == job["job_id"]:
+                self._remove_dir(FSPath(job["output_dir"]), stats)
+            self._remove_dir(self.temp_root / job["job_id"], stats)
+
+    def _enforce_output_budget(self, stats: Dict[str, int]) -> None:
+        """ Archives the oldest finished jobs until their output folders fit in max_output_bytes. """
+        sizes = [
+            (job_id, _dir_size(output_dir) if output_dir else 0)
+            for job_id, output_dir in self.backend.finished_jobs()
+        ]
+        total = sum(size for _, size in sizes)
+        over_budget: List[str] = []
+        for job_id, size in sizes:
+            if total <= self.max_output_bytes:
+                break
+            over_budget.append(job_id)
+            total -= size
+        for start in range(0, len(over_budget), ARCHIVE_BATCH):
+            self._archive_and_remove(over_budget[start:start + ARCHIVE_BATCH], stats)
+
+    def _remove_stale_temp_dirs(self, stats: Dict[str, int]) -> None:
+        """
+        Temp folders of finished or archived jobs, untouched for TEMP_GRACE_SECONDS.
+        The temp root is shared with other programs, so folders of unknown jobs are never touched.
+        """
+        cutoff = time.time() - TEMP_GRACE_SECONDS
+        try:
+            names = [
+                e.name for e in os.scandir(self.temp_root)
+                if e.is_dir() and _JOB_ID.match(e.name) and e.stat().st_mtime <= cutoff
+            ]
+        except OSError:
+            return
+        for start in range(0, len(names), ARCHIVE_BATCH):
+            for job_id in self.backend.finished_or_archived(names[start:start + ARCHIVE_BATCH]):
+                self._remove_dir(self.temp_root / job_id, stats)
+
+    def _remove_dir(self, path: FSPath, stats: Dict[str, int]) -> None:
+        if not path.is_dir():
+            return
+        size = _dir_size(str(path))
+        shutil.rmtree(path, ignore_errors=True)
+        if not path.exists():
+            stats["removed_dirs"] += 1
+            stats["bytes"] += size
@@ -0,0 +1,241 @@
+"""
+Shared access to the SQLite job tracking database (job_status.db).
+
+Every process keeps one JobStore per database file:
+* a small pool of long-lived connections in WAL mode with synchronous=NORMAL and a busy timeout,
+  so status reads never wait on writers and each connection reuses its compiled (prepared) statements;
+* one writer thread that commits status and heartbeat writes. Writes submitted while a transaction
+  is being committed are grouped into the next transaction, so a burst of updates costs one commit.
+"""
+import atexit
+import logging
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Connections kept open per process and database file
+POOL_SIZE = 4
+# How long a statement waits for a lock held by another process before "database is locked"
+BUSY_TIMEOUT_MS = 30_000
+# Compiled statements cached per connection; the job store uses a few dozen distinct queries
+CACHED_STATEMENTS = 256
+# Most writes grouped into one writer transaction
+WRITER_BATCH_MAX = 200
+
+_STORES: Dict[Tuple[int, str], "JobStore"] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def _open_connection(db_path: str, busy_timeout_ms: int) -> sqlite3.Connection:
+    conn = sqlite3.connect(
+        db_path,
+        timeout=busy_timeout_ms / 1000,
+        check_same_thread=False,
+        cached_statements=CACHED_STATEMENTS,
+    )
+    conn.execute(f"PRAGMA busy_timeout = {int(busy_timeout_ms)}")
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    return conn
+
+
+class _Write:
+    """ One statement (or executemany batch) waiting for the writer thread. """
+
+    def __init__(self, sql: str, params: Any, many: bool) -> None:
+        self.sql = sql
+        self.params = params
+        self.many = many
+        self.rowcount = 0
+        self.error: Optional[BaseException] = None
+        self.done = threading.Event()
+
+
+class JobStore:
+    """
+    Connection pool and batching writer for one job database file.
+
+    Args:
+        db_path (str): Path of the SQLite database.
+        pool_size (int): Connections kept open for connection().
+        busy_timeout_ms (int): SQLite busy timeout of every connection.
+        logger (logging.Logger, optional): Logger for writer errors.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        pool_size: int = POOL_SIZE,
+        busy_timeout_ms: int = BUSY_TIMEOUT_MS,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        self.db_path = db_path
+        self.busy_timeout_ms = busy_timeout_ms
+        self.logger = logger or logging.getLogger("survey_mapper.job_store")
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._writes: "queue.Queue[Optional[_Write]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Checks out a pooled connection. Like `with sqlite3.connect(...) as conn`, an open transaction
+        is committed when the block ends and rolled back if it raises.
+        """
+        self._slots.acquire()
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = _open_connection(self.db_path, self.busy_timeout_ms)
+            try:
+                yield conn
+                if conn.in_transaction:
+                    conn.commit()
+            except BaseException:
+                try:
+                    conn.rollback()
+                except sqlite3.Error:
+                    pass
+                raise
+            finally:
+                conn.row_factory = None
+                self._idle.put(conn)
+        finally:
+            self._slots.release()
+
+    def write(self, sql: str, params: Sequence[Any] = (), wait: bool = True) -> int:
+        """
+        Runs one write statement on the writer thread. With wait=True, blocks until it is committed
+        and returns its rowcount; errors are raised to the caller.
+        """
+        return self._submit(_Write(sql, params, many=False), wait)
+
+    def write_many(self, sql: str, seq_of_params: List[Sequence[Any]], wait: bool = True) -> int:
+        """ executemany() counterpart of write(). """
+        return self._submit(_Write(sql, seq_of_params, many=True), wait)
+
+    def flush(self) -> None:
+        """ Blocks until every write submitted so far is committed. """
+        if self._writer is not None:
+            self._submit(_Write("", (), many=False), wait=True)
+
+    def close(self) -> None:
+        """ Commits pending writes, stops the writer thread and closes the pooled connections. """
+        with self._writer_lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            self._writes.put(None)
+            writer.join()
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def _submit(self, write: _Write, wait: bool) -> int:
+        self._ensure_writer()
+        self._writes.put(write)
+        if not wait:
+            return 0
+        write.done.wait()
+        if write.error is not None:
+            raise write.error
+        return write.rowcount
+
+    def _ensure_writer(self) -> None:
+        if self._writer is not None:
+            return
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._writer_loop, name="job-store-writer", daemon=True)
+                self._writer.start()
+
+    def _writer_loop(self) -> None:
+        conn = _open_connection(self.db_path, self.busy_timeout_ms)
+        try:
+            while True:
+                first = self._writes.get()
+                if first is None:
+                    return
+                batch = [first]
+                stop = False
+                while len(batch) < WRITER_BATCH_MAX:
+                    try:
+                        item = self._writes.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        stop = True
+                        break
+                    batch.append(item)
+                self._commit_batch(conn, batch)
+                if stop:
+                    return
+        finally:
+            conn.close()
+
+    def _commit_batch(self, conn: sqlite3.Connection, batch: List[_Write]) -> None:
+        """ Commits the batch in one transaction; if that fails, each write gets its own so one bad statement cannot fail the rest. """
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for write in batch:
+                self._execute(conn, write)
+            conn.commit()
+        except Exception:
+            if conn.in_transaction:
+                conn.rollback()
+            for write in batch:
+                try:
+                    conn.execute("BEGIN IMMEDIATE")
+                    self._execute(conn, write)
+                    conn.commit()
+                except Exception as e:
+                    if conn.in_transaction:
+                        conn.rollback()
+                    write.error = e
+                    self.logger.warning(f"Job store write failed: {write.sql.split()[:3]} -> {e}")
+        for write in batch:
+            write.done.set()
+
+    @staticmethod
+    def _execute(conn: sqlite3.Connection, write: _Write) -> None:
+        if not write.sql:
+            return  # flush marker
+        cur = conn.executemany(write.sql, write.params) if write.many else conn.execute(write.sql, write.params)
+        write.rowcount = cur.rowcount
+
+
+def get_job_store(db_path: str) -> JobStore:
+    """ The JobStore of db_path for this process. Pools are not shared with child processes. """
+    key = (os.getpid(), os.path.abspath(db_path))
+    with _STORES_LOCK:
+        store = _STORES.get(key)
+        if store is None:
+            store = JobStore(key[1])
+            _STORES[key] = store
+        return store
+
+
+@contextmanager
+def connection(db_path: str) -> Iterator[sqlite3.Connection]:
+    """ Shortcut for get_job_store(db_path).connection(). """
+    with get_job_store(db_path).connection() as conn:
+        yield conn
+
+
+@atexit.register
+def _close_stores() -> None:
+    # Commit writes submitted with wait=False before the process exits
+    with _STORES_LOCK:
+        stores = [s for (pid, _), s in _STORES.items() if pid == os.getpid()]
+    for store in stores:
+        try:
+            store.close()
+        except Exception:
+            pass
@@ -0,0 +1,196 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path as FSPath
+from threading import Lock
+from typing import Any, Dict, Optional, Tuple
+
+import pandas as pd
+
+# Bump when a change to the processing code should invalidate every cached result
+CACHE_FORMAT_VERSION = "1"
+
+CACHED_ZIP_FILENAME = "results.zip"
+CACHE_META_FILENAME = "meta.json"
+
+_HASH_CHUNK_BYTES = 1024 * 1024
+
+# File hashes keyed by (path, size, mtime_ns) so an unchanged source zip is only read once per process
+_FILE_HASH_MEMO: Dict[Tuple[str, int, int], str] = {}
+_FILE_HASH_LOCK = Lock()
+
+
+def hash_file(path: str) -> str:
+    """sha256 of a file's content, read in chunks."""
+    st = os.stat(path)
+    memo_key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    with _FILE_HASH_LOCK:
+        cached = _FILE_HASH_MEMO.get(memo_key)
+    if cached:
+        return cached
+
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_BYTES), b""):
+            h.update(chunk)
+    digest = h.hexdigest()
+    with _FILE_HASH_LOCK:
+        _FILE_HASH_MEMO[memo_key] = digest
+    return digest
+
+
+def hash_dataframe(df: Optional[pd.DataFrame]) -> str:
+    """sha256 of a DataFrame's column names and cell values. None hashes to 'none'."""
+    if df is None:
+        return "none"
+    h = hashlib.sha256()
+    h.update(json.dumps([str(c) for c in df.columns]).encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    return h.hexdigest()
+
+
+def hash_config(config: Dict[str, Any]) -> str:
+    """sha256 of a resolved config dict, independent of key order."""
+    return hashlib.sha256(json.dumps(config, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def compute_cache_key(**parts: str) -> str:
+    """Combines the input hashes (and CACHE_FORMAT_VERSION) into one cache key."""
+    payload = json.dumps({"version": CACHE_FORMAT_VERSION, **parts}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    Content-addressed cache of finished job results (results.zip) on disk.
+
+    Layout: <root>/<key[:2]>/<key>/results.zip plus meta.json with the source job and last use time.
+
+    - Entries older than max_age_seconds are treated as misses and removed by evict().
+    - evict() then removes least recently used entries until the cache fits in max_bytes.
+
+    Args:
+        root (str | Path): Cache directory, e.g. <OUTPUT_DIR>/_result_cache.
+        max_bytes (int): Disk budget for all cached zips.
+        max_age_seconds (int): Entries not created within this many seconds are dropped.
+        logger (logging.Logger | None): Logger for cache messages.
+    """
+
+    def __init__(
+        self,
+        root: Any,
+        max_bytes: int,
+        max_age_seconds: int,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        self.root = FSPath(root)
+        self.max_bytes = int(max_bytes)
+        self.max_age_seconds = int(max_age_seconds)
+        self.logger = logger or logging.getLogger("survey_mapper.result_cache")
+
+    def _entry_dir(self, key: str) -> FSPath:
+        return self.root / key[:2] / key
+
+    def _read_meta(self, entry_dir: FSPath) -> Optional[Dict[str, Any]]:
+        try:
+            with open(entry_dir / CACHE_META_FILENAME, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, entry_dir: FSPath, meta: Dict[str, Any]) -> None:
+        tmp = entry_dir / f"{CACHE_META_FILENAME}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp, entry_dir / CACHE_META_FILENAME)
+
+    def _is_expired(self, meta: Dict[str, Any], now: float) -> bool:
+        return now - float(meta.get("created_at", 0)) > self.max_age_seconds
+
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the entry meta with "zip_path" set, or None on a miss.
+        A hit refreshes the entry's last_used time.
+        """
+        entry_dir = self._entry_dir(key)
+        zip_path = entry_dir / CACHED_ZIP_FILENAME
+        meta = self._read_meta(entry_dir)
+        if meta is None or not zip_path.exists():
+            return None
+        now = time.time()
+        if self._is_expired(meta, now):
+            return None
+
+        meta["last_used"] = now
+        meta["hits"] = int(meta.get("hits", 0)) + 1
+        try:
+            self._write_meta(entry_dir, meta)
+        except OSError:
+            pass  # a stale last_used only affects eviction order
+        return {**meta, "zip_path": str(zip_path)}
+
+    def store(self, key: str, zip_path: str, source_job_id: str) -> Optional[str]:
+        """
+        Copies a finished results.zip into the cache. Returns the cached zip path, or None if it failed.
+        The copy is written under a temp name and renamed, so readers never see a partial zip.
+        """
+        entry_dir = self._entry_dir(key)
+        try:
+            entry_dir.mkdir(parents=True, exist_ok=True)
+            tmp_zip = entry_dir / f"{CACHED_ZIP_FILENAME}.{uuid.uuid4().hex}.tmp"
+            shutil.copy2(zip_path, tmp_zip)
+            os.replace(tmp_zip, entry_dir / CACHED_ZIP_FILENAME)
+            now = time.time()
+            self._write_meta(entry_dir, {
+                "key": key,
+                "source_job_id": source_job_id,
+                "created_at": now,
+                "last_used": now,
+                "hits": 0,
+                "size_bytes": os.path.getsize(entry_dir / CACHED_ZIP_FILENAME),
+            })
+        except OSError as e:
+            self.logger.warning(f"Could not store job {source_job_id} in the result cache: {e}")
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            return None
+        self.logger.info(f"Stored result of job {source_job_id} in the result cache as {key}")
+        return str(entry_dir / CACHED_ZIP_FILENAME)
+
+    def evict(self) -> Dict[str, int]:
+        """Removes expired entries, then least recently used ones until the cache fits max_bytes."""
+        now = time.time()
+        removed_expired = removed_lru = 0
+        entries = []
+        if not self.root.exists():
+            return {"expired": 0, "lru": 0, "bytes": 0}
+
+        for prefix_dir in self.root.iterdir():
+            if not prefix_dir.is_dir():
+                continue
+            for entry_dir in prefix_dir.iterdir():
+                meta = self._read_meta(entry_dir)
+                zip_path = entry_dir / CACHED_ZIP_FILENAME
+                if meta is None or not zip_path.exists() or self._is_expired(meta, now):
+                    # Skip entries still being written by store()
+                    if meta is None and any(p.suffix == ".tmp" for p in entry_dir.iterdir()):
+                        continue
+                    shutil.rmtree(entry_dir, ignore_errors=True)
+                    removed_expired += 1
+                    continue
+                entries.append((float(meta.get("last_used", 0)), entry_dir, zip_path.stat().st_size))
+
+        total = sum(size for _, _, size in entries)
+        for _, entry_dir, size in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total -= size
+            removed_lru += 1
+
+        if removed_expired or removed_lru:
+            self.logger.info(f"Result cache eviction removed {removed_expired} expired and {removed_lru} least recently used entries")
+        return {"expired": removed_expired, "lru": removed_lru, "bytes": total}
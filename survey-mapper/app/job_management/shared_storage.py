@@ -0,0 +1,52 @@
+"""
+Storage checks for a job store shared between nodes (JOB_STORE_URL set to a Postgres URL).
+
+Any node may claim a job that another node accepted, and any node may answer /status, /events and
+/download for it. The paths recorded with the job (uploads, output folder, source zip) and the caches
+must therefore be absolute paths on one shared volume, mounted at the same path on every node.
+"""
+import os
+from typing import List
+
+from app.config_loading.settings import Settings
+from app.job_management.job_backend import is_postgres_url
+
+# Folders every node must see at the same absolute path; they must already exist
+SHARED_DIR_SETTINGS = ("OUTPUT_DIR", "JOB_UPLOAD_DIR", "SINGLE_ZIP_DIR")
+# Optional folders (blank = a folder under OUTPUT_DIR); when set they must be absolute as well
+SHARED_OPTIONAL_DIR_SETTINGS = ("GDB_CACHE_DIR", "SHEET_CACHE_DIR")
+
+
+def uses_shared_job_store(settings: Settings) -> bool:
+    """True when the job queue is shared with other nodes."""
+    return is_postgres_url(settings.JOB_STORE_URL or "")
+
+
+def shared_storage_errors(settings: Settings) -> List[str]:
+    """Problems with the storage settings of a shared job store; empty when they are fine or the store is local."""
+    if not uses_shared_job_store(settings):
+        return []
+    errors: List[str] = []
+    for name in SHARED_DIR_SETTINGS:
+        path = getattr(settings, name)
+        if not path:
+            errors.append(f"{name} is blank")
+        elif not os.path.isabs(path):
+            errors.append(f"{name} is not an absolute path: {path}")
+        elif not os.path.isdir(path):
+            errors.append(f"{name} does not exist: {path}")
+    for name in SHARED_OPTIONAL_DIR_SETTINGS:
+        path = getattr(settings, name)
+        if path and not os.path.isabs(path):
+            errors.append(f"{name} is not an absolute path: {path}")
+    return errors
+
+
+def check_shared_storage(settings: Settings) -> None:
+    """Raises RuntimeError at startup when a shared job store is used without shared storage."""
+    errors = shared_storage_errors(settings)
+    if errors:
+        raise RuntimeError(
+            "JOB_STORE_URL shares the job queue between nodes, so job files must be on a volume every node "
+            "mounts at the same path: " + "; ".join(errors)
+        )
@@ -10,6 +10,12 @@ class LogEntry(BaseModel):
     logger: str
     msg: str
     file: Optional[str] = None  # which log file it came from
+    # Set only for entries read from JSON lines logs (JOB_LOG_JSONL)
+    stage: Optional[str] = None
+    sheet: Optional[str] = None
+    feature_class: Optional[str] = None
+    duration: Optional[float] = None  # seconds
+    tool: Optional[str] = None  # arcpy tool, e.g. "analysis.Clip"
 
     def __getitem__(self, key: str) -> Any:
         if not hasattr(self, key):
@@ -46,6 +52,12 @@ class LogLevelFilter(str, Enum):
     error = "error"
 
 
+class LogCounts(BaseModel):
+    info: int = 0
+    warning: int = 0
+    error: int = 0
+
+
 class JobStatus(BaseModel):
     job_id: str
     status: str
@@ -54,6 +66,7 @@ class JobStatus(BaseModel):
     error: Optional[Union[str, None]] = None
     download_url: Union[str, None] = None
     logs_summary: Optional[Union[LogsByLevel, None]] = None
+    logs_counts: Optional[LogCounts] = None  # set instead of logs_summary in summary mode
 
 
 class JobListResponse(BaseModel):
@@ -21,6 +21,8 @@ os.environ.setdefault("USE_DATABASE", "false")   # prevents DB lookups in worker
 # ArcPy is huge; stub it so imports don't load ArcGIS runtime.
 if "arcpy" not in sys.modules:
     sys.modules["arcpy"] = types.ModuleType("arcpy")
+    # Used in SurveyMapper's annotations, so needed to import survey_mapper_class
+    sys.modules["arcpy"].SpatialReference = type("SpatialReference", (), {})
 
 # If your CustomToolClass (or others) import arcpy submodules, stub those too:
 for name in [
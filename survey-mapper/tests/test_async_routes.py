@@ -2,9 +2,11 @@
 import io
 import os
 import json
+import hashlib
 import zipfile
-import sqlite3
 import tempfile
+import threading
+from concurrent.futures import Future
 from pathlib import Path
 from datetime import datetime
 
@@ -16,6 +18,11 @@ from fastapi.testclient import TestClient
 # IMPORTANT: change this import if your app file has a different module name
 #
 import app.api.async_routes as script_under_test  # <-- your file from the prompt
+from app.api.file_access.file_access import SavedUpload
+from app.config_loading.settings import get_settings
+from app.job_management.job_backend import SqliteJobBackend
+
+SURVEY_TYPE = "test"
 
 # ---------- helpers ----------
 
@@ -23,18 +30,39 @@ import app.api.async_routes as script_under_test  # <-- your file from the promp
 def _isolate_tmp_env(tmp_path, monkeypatch):
     """
     Isolate filesystem + DB for every test:
-      - new OUTPUT_DIR
-      - new job_status.db
-    Re-initialize DB after patching.
+      - new OUTPUT_DIR, upload folder and SINGLE_ZIP_DIR holding one source zip
+      - new job_status.db behind a fresh SqliteJobBackend
+    The job backend is bound when the module is imported, so it is swapped everywhere it is held.
     """
     outdir = tmp_path / "outputs"
     outdir.mkdir(parents=True, exist_ok=True)
     monkeypatch.setenv("OUTPUT_DIR", str(outdir))
-
-    # swap DB file and re-init table
-    monkeypatch.setattr(script_under_test, "DB_PATH", str(tmp_path / "job_status.db"), raising=True)
-    script_under_test.drop_jobs_table()
-    script_under_test.init_db()
+    monkeypatch.setattr(script_under_test, "OUTPUT_BASE_DIR", outdir, raising=True)
+    monkeypatch.setattr(script_under_test, "UPLOAD_ROOT", str(tmp_path / "uploads"), raising=True)
+    # Jobs write their relative output/<job_id> folders here
+    monkeypatch.chdir(tmp_path)
+
+    zip_dir = tmp_path / "zips"
+    zip_dir.mkdir()
+    (zip_dir / "ABC_20250818.gdb.zip").write_bytes(_make_gdb_zip_bytes().getvalue())
+    settings = get_settings()
+    for name, value in {
+        "SINGLE_ZIP_DIR": str(zip_dir),
+        "SURVEY_TYPES": [SURVEY_TYPE],
+        "RESULT_CACHE_ENABLED": False,
+        "SHEET_CACHE_ENABLED": False,
+        "GDB_CACHE_ENABLED": False,
+    }.items():
+        monkeypatch.setattr(settings, name, value, raising=True)
+
+    # swap the job backend for one on a fresh DB file
+    db_path = str(tmp_path / "job_status.db")
+    backend = SqliteJobBackend(db_path)
+    backend.init_schema()
+    monkeypatch.setattr(script_under_test, "DB_PATH", db_path, raising=True)
+    monkeypatch.setattr(script_under_test, "JOB_BACKEND", backend, raising=True)
+    monkeypatch.setattr(script_under_test.JOB_DISPATCHER, "backend", backend, raising=True)
+    monkeypatch.setattr(script_under_test.JOB_RETENTION, "backend", backend, raising=True)
 
     # clear global running-jobs registry
     script_under_test.RUNNING_JOBS.clear()
@@ -43,7 +71,7 @@ def _isolate_tmp_env(tmp_path, monkeypatch):
 
 @pytest.fixture()
 def client():
-    return TestClient(script_under_test.async_app)
+    return TestClient(script_under_test.app)
 
 def _fake_excel_bytes():
     # Any bytes work—tool doesn’t parse; we just need a filename with .xlsx
@@ -57,38 +85,35 @@ def _make_gdb_zip_bytes():
     buf.seek(0)
     return buf
 
-def test_process_async_queues_and_completes(client, tmp_path, monkeypatch):
-    import pandas as pd
-    import async_routes as m  # adjust if your module path differs
-
-    # 1) Stub pandas.read_excel so fake bytes don't blow up
-    monkeypatch.setattr(m.pd, "read_excel",
-        lambda *a, **k: pd.DataFrame({"name":[1], "alternativename":["x"]}),
-        raising=True)
-
 # ---------- monkeypatches for heavy helpers ----------
 
 @pytest.fixture(autouse=True)
 def _patch_helpers(monkeypatch, tmp_path):
     """
-    - save_upload_to_temp_excel: write to disk and return a real path
+    - stream_upload_to_file: write to disk and return a real SavedUpload
     - zip_directory: create a tiny zip
     - build_job_logger/collect_logs/filter: we keep defaults (they're light)
-    - run_custom_tool: replaced with a tiny worker that:
+    - the worker pool: queued jobs are claimed and run in the test process as soon as they are queued
+    - run_survey_mapper: replaced with a tiny worker that:
         * logs a few lines in the expected "pipe" format
         * marks job COMPLETE in the DB
         * creates an output zip so /download works (optional)
     """
-    # save_upload_to_temp_excel -> write file and return path
-    def fake_save(uploadfile):
-        suffix = Path(uploadfile.filename).suffix or ".xlsx"
-        dest_dir = tmp_path / "uploaded"
-        dest_dir.mkdir(parents=True, exist_ok=True)
-        dest = dest_dir / f"grid{suffix}"
-        content = uploadfile.file.read()
-        dest.write_bytes(content)
-        return dest
-    monkeypatch.setattr(script_under_test, "save_upload_to_temp_excel", fake_save, raising=True)
+    # stream_upload_to_file -> write file and return its SavedUpload
+    async def fake_stream(upload, dest_path, max_bytes=None):
+        content = upload.file.read()
+        dest_path = Path(dest_path)
+        dest_path.parent.mkdir(parents=True, exist_ok=True)
+        dest_path.write_bytes(content)
+        return SavedUpload(dest_path, hashlib.sha256(content).hexdigest(), len(content))
+    monkeypatch.setattr(script_under_test, "stream_upload_to_file", fake_stream, raising=True)
+
+    # worker pool -> run each job inline; notify() claims queued jobs right away
+    monkeypatch.setattr(script_under_test.JOB_EXECUTOR, "submit", _run_inline, raising=True)
+    monkeypatch.setattr(script_under_test.JOB_EXECUTOR, "new_cancel_event", threading.Event, raising=True)
+    monkeypatch.setattr(
+        script_under_test.JOB_DISPATCHER, "notify", script_under_test.JOB_DISPATCHER._dispatch_available, raising=True
+    )
 
     # zip_directory -> minimal no-op zip creator
     def fake_zip(src_dir, dest_zip):
@@ -99,14 +124,10 @@ def _patch_helpers(monkeypatch, tmp_path):
         return dest_zip
     monkeypatch.setattr(script_under_test, "zip_directory", fake_zip, raising=True)
 
-    # run_custom_tool -> short fake worker that sets COMPLETE + writes logs
-    def fake_worker(job_id, alternate_name_df, gridzone_excel_path, gdb_path, output_dir, config_path, cancel_event):
+    # run_survey_mapper -> short fake worker that sets COMPLETE + writes logs
+    def fake_worker(job_id, alternate_name_df, gridzone_excel_path, gdb_path, output_dir, survey_type, cancel_event, *args):
         # mark processing
-        now_ = datetime.now().isoformat()
-        with sqlite3.connect(script_under_test.DB_PATH) as c:
-            c.execute("UPDATE jobs SET status=?, updated_at=? WHERE job_id=?",
-                      ("processing", now_, job_id))
-            c.commit()
+        script_under_test.JOB_BACKEND.update_status(job_id, "processing", None)
 
         # per-job logs
         logs_dir = Path(output_dir) / "logs"
@@ -133,12 +154,21 @@ def _patch_helpers(monkeypatch, tmp_path):
         with zipfile.ZipFile(dest_zip, "w", zipfile.ZIP_DEFLATED) as z:
             z.writestr("ok.txt", "ok")
 
-        with sqlite3.connect(script_under_test.DB_PATH) as c:
-            c.execute("UPDATE jobs SET status=?, updated_at=? WHERE job_id=?",
-                      ("complete", datetime.now().isoformat(), job_id))
-            c.commit()
+        script_under_test.JOB_BACKEND.update_status(job_id, "complete", None)
+
+    monkeypatch.setattr(script_under_test, "run_survey_mapper", fake_worker, raising=True)
 
-    monkeypatch.setattr(script_under_test, "run_custom_tool", fake_worker, raising=True)
+
+def _run_inline(job_id, fn, *args, on_done=None):
+    """ JOB_EXECUTOR.submit stand-in: runs the job now and reports it to on_done like the pool does. """
+    fut = Future()
+    try:
+        fut.set_result(fn(*args))
+    except Exception as e:
+        fut.set_exception(e)
+    if on_done is not None:
+        on_done(job_id, fut.exception())
+    return fut
 
 # ---------- tests ----------
 
@@ -152,7 +182,6 @@ def test_status_all_starts_empty(client):
     assert r.status_code == 200
     assert r.json() == []
 
-@pytest.fixture(autouse=True)
 def test_process_async_queues_and_completes(client, tmp_path, monkeypatch):
     # build request files
     config = ("config.json", io.BytesIO(b'{"ok": true}'), "application/json")
@@ -165,15 +194,9 @@ def test_process_async_queues_and_completes(client, tmp_path, monkeypatch):
     monkeypatch.setattr(script_under_test.pd, "read_excel", lambda *a, **k: pd.DataFrame({"Name":[1], "AlternativeName":["x"]}),
                         raising=True)
     
-    # (2) Stub save_upload_to_temp_excel to write a real file and return its path
-    def fake_save(upload):
-        dest = tmp_path / "grid.xlsx"
-        dest.write_bytes(upload.file.read())
-        return dest
-    monkeypatch.setattr(script_under_test, "save_upload_to_temp_excel", fake_save, raising=True)
-
     r = client.post(
         "/process-async/",
+        params={"survey_type": SURVEY_TYPE},
         files={
             "config_file": config,
             "alternate_name_excel_file": lut_assettypes,
@@ -204,6 +227,7 @@ def test_log_level_filter(client):
     # Reuse a quick job
     r = client.post(
         "/process-async/",
+        params={"survey_type": SURVEY_TYPE},
         files={
             "config_file": ("c.json", io.BytesIO(b"{}"), "application/json"),
             "gridzone_excel_file": ("g.xlsx", _fake_excel_bytes(), "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
@@ -231,6 +255,7 @@ def test_status_all_includes_logs(client):
     # Ensure at least one job exists
     r = client.post(
         "/process-async/",
+        params={"survey_type": SURVEY_TYPE},
         files={
             "config_file": ("c.json", io.BytesIO(b"{}"), "application/json"),
             "gridzone_excel_file": ("g.xlsx", _fake_excel_bytes(), "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
@@ -248,6 +273,7 @@ def test_cancel_endpoints(client):
     # Start a job (the fake worker completes fast, but RUNNING_JOBS gets set)
     r = client.post(
         "/process-async/",
+        params={"survey_type": SURVEY_TYPE},
         files={
             "config_file": ("c.json", io.BytesIO(b"{}"), "application/json"),
             "gridzone_excel_file": ("g.xlsx", _fake_excel_bytes(), "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
@@ -270,3 +296,45 @@ def test_cancel_endpoints(client):
 def test_download_404(client):
     r = client.get("/download/does-not-exist")
     assert r.status_code == 404
+
+def test_cancel_between_claim_and_worker_start(client, monkeypatch):
+    # The cancel request lands after the dispatcher claimed the job, before the worker runs it
+    def cancel_then_run(job_id, fn, *args, on_done=None):
+        assert client.post(f"/cancel/{job_id}").json()["status"] == "cancelling"
+        return _run_inline(job_id, fn, *args, on_done=on_done)
+    monkeypatch.setattr(script_under_test.JOB_EXECUTOR, "submit", cancel_then_run, raising=True)
+    ran = []
+    monkeypatch.setattr(script_under_test, "run_survey_mapper", lambda job_id, *a: ran.append(job_id), raising=True)
+
+    r = client.post(
+        "/process-async/",
+        params={"survey_type": SURVEY_TYPE},
+        files={"gridzone_excel_file": ("g.xlsx", _fake_excel_bytes(), "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")},
+    )
+    job_id = r.json()["job_id"]
+
+    assert ran == []
+    job = script_under_test.JOB_BACKEND.get_job(job_id)
+    assert job["status"] == "canceled"
+    assert job_id not in [j["job_id"] for j in script_under_test.JOB_BACKEND.list_jobs(statuses=["cancelling"])]
+
+def test_full_queue_answers_429_with_retry_after(client, monkeypatch):
+    # No worker picks anything up, so queued jobs stay queued
+    monkeypatch.setattr(script_under_test.JOB_DISPATCHER, "notify", lambda: None, raising=True)
+    monkeypatch.setattr(get_settings(), "JOB_QUEUE_SIZE", 1, raising=True)
+    monkeypatch.setattr(get_settings(), "JOB_RETRY_AFTER_SECONDS", 7, raising=True)
+
+    def submit():
+        return client.post(
+            "/process-async/",
+            params={"survey_type": SURVEY_TYPE},
+            files={"gridzone_excel_file": ("g.xlsx", _fake_excel_bytes(), "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")},
+        )
+
+    assert submit().json()["status"] == "queued"
+    r = submit()
+    assert r.status_code == 429
+    assert r.headers["Retry-After"] == "7"
+    assert r.json()["status"] == "error"
+    # The rejected job's uploads are not left behind
+    assert len(os.listdir(script_under_test.UPLOAD_ROOT)) == 1
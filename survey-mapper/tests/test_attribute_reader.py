@@ -0,0 +1,96 @@
+# tests/test_attribute_reader.py
+import datetime
+import re
+
+import arcpy
+import numpy as np
+import pytest
+
+from app.api.survey_audit.attribute_reader import (
+    AttributeReaderError,
+    CursorAttributeReader,
+    NumPyAttributeReader,
+    epoch_millis,
+    get_attribute_reader,
+)
+
+FIELD_TYPES = {"FID": "OID", "NAME": "String", "LEN": "Double", "INSTALLED": "Date", "CNT": "Integer"}
+DTYPES = {"OID": "i4", "String": "U16", "Double": "f8", "Date": "M8[us]", "Integer": "i4"}
+INSTALLED = datetime.datetime(2021, 3, 4, 5, 6, 7)
+
+# OIDs out of order, as a layer can return them after edits
+ROWS = [
+    (oid, f"pipe {oid}", oid / 3, None if oid % 4 == 0 else INSTALLED, None if oid % 3 == 0 else oid * 10)
+    for oid in (5, 1, 2, 9, 3, 4, 8, 7)
+]
+
+
+@pytest.fixture(autouse=True)
+def field_delimiters(monkeypatch):
+    monkeypatch.setattr(arcpy, "AddFieldDelimiters", lambda fc, name: name, raising=False)
+
+
+class FakeCursor:
+    def __init__(self, input_fc, names):
+        assert names == ["OID@"] + list(FIELD_TYPES)
+        self.rows = sorted(ROWS)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __iter__(self):
+        return iter((row[0],) + row for row in self.rows)
+
+
+class FakeToNumPy:
+    """ FeatureClassToNumPyArray over ROWS: nulls become the null_value sentinels, where_clause is an OID range. """
+
+    def __init__(self, fail_on_attributes=False):
+        self.calls = []
+        self.fail_on_attributes = fail_on_attributes
+
+    def __call__(self, input_fc, names, where_clause=None, null_value=None):
+        self.calls.append(where_clause)
+        if names != ["OID@"] and self.fail_on_attributes:
+            raise RuntimeError("unsupported field type")
+        rows = ROWS
+        if where_clause:
+            low, high = map(int, re.findall(r"\d+", where_clause))
+            rows = [row for row in rows if low <= row[0] <= high]
+        if names == ["OID@"]:
+            return np.array([(row[0],) for row in rows], dtype=[("OID@", "i4")])
+        dtype = [("OID@", "i4")] + [(name, DTYPES[kind]) for name, kind in FIELD_TYPES.items()]
+        records = [
+            (row[0],) + tuple(null_value[name] if value is None else value for name, value in zip(FIELD_TYPES, (row[0],) + row[1:]))
+            for row in rows
+        ]
+        return np.array(records, dtype=dtype)[names]
+
+
+def test_numpy_reader_matches_cursor_reader():
+    expected = list(CursorAttributeReader(search_cursor=FakeCursor).iter_attributes("Mains.shp", FIELD_TYPES))
+    to_numpy = FakeToNumPy()
+    actual = list(NumPyAttributeReader(to_numpy=to_numpy, chunk_rows=3).iter_attributes("Mains.shp", FIELD_TYPES))
+
+    assert actual == expected
+    assert [oid for oid, _ in actual] == [1, 2, 3, 4, 5, 7, 8, 9]
+    assert actual[3][1] == {"FID": 4, "NAME": "pipe 4", "LEN": 4 / 3, "INSTALLED": None, "CNT": 40}
+    assert actual[0][1]["INSTALLED"] == epoch_millis(INSTALLED) and actual[2][1]["CNT"] is None
+    # One call for the OIDs, then chunks of 3 rows by OID range
+    assert to_numpy.calls == [None, "FID >= 1 AND FID <= 3", "FID >= 4 AND FID <= 7", "FID >= 8 AND FID <= 9"]
+
+
+def test_numpy_reader_raises_attribute_reader_error():
+    reader = NumPyAttributeReader(to_numpy=FakeToNumPy(fail_on_attributes=True))
+    with pytest.raises(AttributeReaderError):
+        list(reader.iter_attributes("Mains.shp", FIELD_TYPES))
+
+
+def test_get_attribute_reader():
+    assert isinstance(get_attribute_reader("numpy"), NumPyAttributeReader)
+    assert isinstance(get_attribute_reader("cursor"), CursorAttributeReader)
+    with pytest.raises(ValueError):
+        get_attribute_reader("arrow")
@@ -0,0 +1,75 @@
+# tests/test_binary_feature_collection.py
+import json
+
+import pytest
+
+from app.api.survey_audit.binary_feature_collection import BinaryFeatureCollectionWriter, read_binary_feature_collection
+from app.api.survey_audit.feature_collection_writer import FeatureCollectionWriter
+
+SPATIAL_REF = {"wkid": 102100, "latestWkid": 3857}
+FIELDS = [{"name": name} for name in ("FID", "NAME", "LEN", "CNT", "ACTIVE")]
+LAYER_DEFINITION = {"name": "Mains", "geometryType": "esriGeometryPolyline", "fields": FIELDS}
+TRANSFORM = {"originPosition": "upperLeft", "scale": [0.01, 0.01, 0, 0], "translate": [100.0, 50.0, 0, 0]}
+
+FEATURES = [
+    ({"FID": 1, "NAME": "pipe é", "LEN": 12.5, "CNT": -3, "ACTIVE": True},
+     {"paths": [[[100.123456789, 49.5], [101.0, 48.25]], [[1.5, 2.5], [4.5, 5.5]]], "spatialReference": SPATIAL_REF}),
+    ({"FID": 2, "NAME": None, "LEN": None, "CNT": 2 ** 40, "ACTIVE": False},
+     {"rings": [[[0, 0], [1200, -3], [0, 5], [-1200, -2]]], "spatialReference": SPATIAL_REF}),
+    ({"FID": 3, "NAME": "", "LEN": 0.0, "CNT": None, "ACTIVE": None}, {"x": -5.25, "y": 7.0}),
+    ({"FID": 4, "NAME": "empty", "LEN": 1.0, "CNT": 0, "ACTIVE": True}, {"paths": []}),
+    ({"FID": 5, "NAME": "z", "LEN": 1.0, "CNT": 0, "ACTIVE": True}, {"paths": [[[1.5, 2.5, 3.5], [4.5, 5.5, 6.5]]]}),
+]
+
+
+def _write(writer_cls, path, features, **kwargs):
+    with writer_cls(str(path), LAYER_DEFINITION, "esriGeometryPolyline", SPATIAL_REF, **kwargs) as writer:
+        for attributes, geometry in features:
+            writer.write_feature(attributes, geometry)
+    return writer
+
+
+def test_binary_file_reads_back_as_the_feature_collection(tmp_path):
+    writer = _write(BinaryFeatureCollectionWriter, tmp_path / "Mains.fcb", FEATURES, transform=TRANSFORM)
+    _write(FeatureCollectionWriter, tmp_path / "Mains.json", FEATURES, transform=TRANSFORM)
+
+    assert writer.count == len(FEATURES)
+    assert read_binary_feature_collection(str(tmp_path / "Mains.fcb")) == json.loads((tmp_path / "Mains.json").read_text(encoding="utf-8"))
+
+
+def test_binary_file_is_smaller_than_json(tmp_path):
+    features = [
+        ({"FID": i, "NAME": f"pipe {i}", "LEN": i / 7, "CNT": i, "ACTIVE": True},
+         {"paths": [[[1000000.0 + i + j * 0.37, 2000000.0 - j * 0.91] for j in range(20)]], "spatialReference": SPATIAL_REF})
+        for i in range(200)
+    ]
+    _write(BinaryFeatureCollectionWriter, tmp_path / "Mains.fcb", features)
+    _write(FeatureCollectionWriter, tmp_path / "Mains.json", features)
+    assert (tmp_path / "Mains.fcb").stat().st_size * 3 < (tmp_path / "Mains.json").stat().st_size * 2
+
+
+@pytest.mark.parametrize("attributes, geometry", [
+    ({"FID": 1, "OTHER": 1}, {"x": 0.0, "y": 0.0}),
+    ({"FID": 1}, {"x": 0.0, "y": 0.0, "z": 1.0}),
+    ({"FID": 1}, {"x": 0.0, "y": 0.0, "spatialReference": {"wkid": 4326}}),
+    ({"FID": 1}, {"paths": [[[0.0, 0.0], [1.0, 1.0, 1.0]]]}),
+])
+def test_features_the_format_cannot_hold_are_rejected(tmp_path, attributes, geometry):
+    with pytest.raises(ValueError):
+        _write(BinaryFeatureCollectionWriter, tmp_path / "Mains.fcb", [(attributes, geometry)])
+
+
+def test_other_files_are_rejected(tmp_path):
+    (tmp_path / "Mains.json").write_text("{}")
+    with pytest.raises(ValueError):
+        read_binary_feature_collection(str(tmp_path / "Mains.json"))
+
+
+def test_failed_write_keeps_the_previous_file(tmp_path):
+    path = tmp_path / "Mains.fcb"
+    path.write_bytes(b"previous")
+    with pytest.raises(ValueError):
+        _write(BinaryFeatureCollectionWriter, path, FEATURES[:1] + [({"FID": 9, "OTHER": 1}, {"x": 0.0, "y": 0.0})])
+
+    assert path.read_bytes() == b"previous"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["Mains.fcb"]
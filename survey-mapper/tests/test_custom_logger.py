@@ -0,0 +1,51 @@
+# tests/test_custom_logger.py
+import logging
+import threading
+
+from app.custom_logging.custom_logger import (
+    add_job_log_handler,
+    build_job_logger,
+    close_job_logger,
+    flush_job_logger,
+)
+from app.custom_logging.fail_fast_logger import FailFastLogWatcher
+
+
+class _ThreadRecorder(logging.Handler):
+    def __init__(self):
+        super().__init__(logging.INFO)
+        self.threads = set()
+
+    def emit(self, record):
+        self.threads.add(threading.get_ident())
+
+
+def test_records_are_handled_off_the_logging_thread(tmp_path):
+    logger = build_job_logger("queue_test", str(tmp_path))
+    recorder = _ThreadRecorder()
+    add_job_log_handler(logger, recorder)
+    try:
+        for i in range(200):
+            logger.info("Clipped %s", i)
+        flush_job_logger(logger)
+        assert recorder.threads and threading.get_ident() not in recorder.threads
+        log_file = next((tmp_path / "logs").glob("log_*.txt"))
+        assert log_file.read_text(encoding="utf-8").count("Clipped") == 200
+    finally:
+        close_job_logger(logger)
+    assert not logger.handlers
+
+
+def test_fail_fast_watcher_sees_errors_after_flush(tmp_path):
+    logger = build_job_logger("queue_watch", str(tmp_path))
+    watcher = FailFastLogWatcher(None, poll_file=False)
+    logger.info("before the watcher: error")
+    add_job_log_handler(logger, watcher)
+    try:
+        flush_job_logger(logger)
+        assert watcher.error_message is None  # earlier records never reach a new handler
+        logger.info("ERROR 000732: Dataset does not exist")
+        flush_job_logger(logger)
+        assert watcher.error_message == "ERROR 000732: Dataset does not exist"
+    finally:
+        close_job_logger(logger)
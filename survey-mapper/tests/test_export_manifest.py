@@ -0,0 +1,83 @@
+# tests/test_export_manifest.py
+import zipfile
+
+import pytest
+
+from app.api.file_access.file_access import zip_directory
+from app.api.survey_audit.export_manifest import MANIFEST_FILENAME, ExportManifest
+from app.api.survey_audit.feature_collection_formats import result_extensions, survey_output_format
+
+
+def _job_folder(tmp_path):
+    job = tmp_path / "job"
+    for rel, content in {
+        "_export_temp/sheetB/Valves.shp": b"s" * 10,
+        "_export_temp/sheetB/Valves.dbf": b"d" * 5,
+        "_export_temp/sheetA/Mains.shp": b"s" * 20,
+        "_export_temp/sheetA/Mains.lpkx": b"p",
+        "_export_temp/sheetA/Mains_clipped.gdb/a00000001.gdbtable": b"g",
+        "_export_temp/sheetA/notes.xml": b"x",
+        "results/log_1.txt": b"log",
+    }.items():
+        path = job / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+    return job
+
+
+def test_scan_splits_sources_and_results(tmp_path):
+    job = _job_folder(tmp_path)
+    manifest = ExportManifest.scan(str(job), results_dir=str(job / "results"))
+
+    assert [(e.path, e.type, e.size) for e in manifest.sources] == [
+        ("_export_temp/sheetA/Mains.lpkx", "layer_package", 1),
+        ("_export_temp/sheetA/Mains.shp", "shapefile", 20),
+        ("_export_temp/sheetB/Valves.shp", "shapefile", 15),  # .shp plus .dbf
+    ]
+    assert manifest.source_paths("shapefile")[0] == str(job / "_export_temp" / "sheetA" / "Mains.shp")
+    assert [(e.path, e.type, e.layer_name) for e in manifest.results] == [("results/log_1.txt", "log", "log_1")]
+
+
+def test_written_manifest_drives_the_zip(tmp_path):
+    job = _job_folder(tmp_path)
+    results = job / "results"
+    manifest = ExportManifest.scan(str(job), results_dir=str(results))
+    (results / "Mains.json").write_text("{}")
+    assert manifest.add_result(str(results / "Mains.json")).layer_name == "Mains"
+    assert manifest.add_result(str(results / "missing.json")) is None
+    manifest.write(str(results / MANIFEST_FILENAME))
+    # Left in the folder but not part of the export
+    (results / "stale.json").write_text("{}")
+
+    loaded = ExportManifest.load(str(results / MANIFEST_FILENAME))
+    assert loaded.results == manifest.results
+    files = list(loaded.iter_results(str(results)))
+    assert files == ["log_1.txt", "Mains.json", MANIFEST_FILENAME]
+
+    zip_directory(str(results), tmp_path / "results.zip", files=files)
+    with zipfile.ZipFile(tmp_path / "results.zip") as zf:
+        assert sorted(zf.namelist()) == sorted(files)
+
+    zip_directory(str(results), tmp_path / "walked.zip")
+    with zipfile.ZipFile(tmp_path / "walked.zip") as zf:
+        assert "stale.json" in zf.namelist()
+
+
+def test_zip_follows_the_feature_collection_format(tmp_path):
+    results = tmp_path / "results"
+    results.mkdir()
+    for name in ("Mains.json.gz", "NullRiser.json.gz", "Mains.json", "Mains.lpkx", "log_1.txt"):
+        (results / name).write_bytes(b"x" * 100)
+    manifest = ExportManifest(str(results))
+    assert manifest.add_result(str(results / "Mains.json.gz")) == manifest.results[0]
+    assert (manifest.results[0].type, manifest.results[0].layer_name) == ("feature_collection", "Mains")
+    manifest.write(str(results / MANIFEST_FILENAME))
+
+    output_format = survey_output_format({"featureCollectionExport": {"format": "json.gz"}})
+    zip_directory(str(results), tmp_path / "results.zip", include_exts=result_extensions(output_format))
+    with zipfile.ZipFile(tmp_path / "results.zip") as zf:
+        assert sorted(zf.namelist()) == sorted(["Mains.json.gz", "Mains.lpkx", "log_1.txt", MANIFEST_FILENAME])
+        assert zf.getinfo("Mains.json.gz").compress_type == zipfile.ZIP_STORED
+
+    with pytest.raises(ValueError):
+        survey_output_format({"featureCollectionExport": {"format": "geojson"}})
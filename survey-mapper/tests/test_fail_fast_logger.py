@@ -0,0 +1,45 @@
+# tests/test_fail_fast_logger.py
+from app.custom_logging.fail_fast_logger import FailFastLogWatcher
+
+
+def _append(path, text):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(text)
+
+
+def test_scan_reads_only_new_lines_and_reports_codes(tmp_path):
+    log = tmp_path / "log_1.txt"
+    _append(log, "2025-08-18 10:24:39,480 | INFO | job | Job started\n")
+    watcher = FailFastLogWatcher(log)
+    watcher.scan_file_once()
+    assert watcher.error_message is None and watcher._offset == log.stat().st_size
+
+    # The unfinished line is only checked once its newline is written
+    _append(log, "ERROR 000732: Dataset Mains does")
+    watcher.scan_file_once()
+    assert watcher.error_message is None
+
+    _append(log, " not exist\nFailed to execute (Clip).\n")
+    watcher.scan_file_once()
+    assert [(e.code, e.message, e.line) for e in watcher.arcgis_errors] == [
+        ("000732", "Dataset Mains does not exist", 2)
+    ]
+    assert watcher.error_message.startswith("Error detected in log file (line 2)")
+
+
+def test_scan_follows_rotation(tmp_path):
+    log = tmp_path / "log_1.txt"
+    _append(log, "line one\n")
+    watcher = FailFastLogWatcher(log)
+    watcher.scan_file_once()
+
+    # RotatingFileHandler renames the full file to .1 and starts a new one
+    _append(log, "ERROR 000210: Cannot create output\n")
+    log.rename(tmp_path / "log_1.txt.1")
+    _append(log, "ERROR 999999: Something else\n")
+    watcher.scan_file_once()
+
+    assert [(e.code, e.file, e.line) for e in watcher.arcgis_errors] == [
+        ("000210", "log_1.txt.1", 2),
+        ("999999", "log_1.txt", 1),
+    ]
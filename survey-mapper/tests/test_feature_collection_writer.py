@@ -0,0 +1,97 @@
+# tests/test_feature_collection_writer.py
+import gzip
+import json
+
+import pytest
+
+from app.api.survey_audit import feature_collection_writer
+from app.api.survey_audit.feature_collection_writer import FeatureCollectionWriter, GzipFeatureCollectionWriter
+
+SPATIAL_REF = {"wkid": 102100, "latestWkid": 3857}
+LAYER_DEFINITION = {"name": "Mains", "geometryType": "esriGeometryPolyline", "fields": [{"name": "NAME"}]}
+
+
+def _write(path, features, compact):
+    with FeatureCollectionWriter(str(path), LAYER_DEFINITION, "esriGeometryPolyline", SPATIAL_REF, compact=compact) as writer:
+        for attributes, geometry in features:
+            writer.write_feature(attributes, geometry)
+    return writer
+
+
+@pytest.mark.parametrize("compact", [True, False])
+def test_streamed_file_matches_the_feature_collection(tmp_path, compact):
+    features = [
+        ({"NAME": f"pipe {i} é", "LEN": i / 3, "CNT": None}, {"paths": [[[i, 0.5], [i + 1, 1.25]]], "spatialReference": SPATIAL_REF})
+        for i in range(5)
+    ]
+    writer = _write(tmp_path / "Mains.json", features, compact)
+
+    layer = json.loads((tmp_path / "Mains.json").read_text(encoding="utf-8"))["layers"][0]
+    assert writer.count == 5
+    assert layer["layerDefinition"] == LAYER_DEFINITION
+    assert layer["featureSet"]["spatialReference"] == SPATIAL_REF
+    assert layer["featureSet"]["features"] == [{"attributes": a, "geometry": g} for a, g in features]
+
+
+@pytest.mark.parametrize("compact", [True, False])
+def test_empty_layer_is_valid_json(tmp_path, compact):
+    _write(tmp_path / "Empty.json", [], compact)
+    assert json.loads((tmp_path / "Empty.json").read_text())["layers"][0]["featureSet"]["features"] == []
+
+
+def test_compact_output_is_smaller_and_flushed_in_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(feature_collection_writer, "WRITE_BUFFER_CHARS", 64)
+    features = [({"NAME": "x"}, {"x": i, "y": i}) for i in range(50)]
+    _write(tmp_path / "compact.json", features, compact=True)
+    _write(tmp_path / "indented.json", features, compact=False)
+
+    compact_text = (tmp_path / "compact.json").read_text()
+    assert "\n" not in compact_text and ": " not in compact_text
+    assert len(compact_text) * 2 < len((tmp_path / "indented.json").read_text())
+    assert len(json.loads(compact_text)["layers"][0]["featureSet"]["features"]) == 50
+
+
+@pytest.mark.parametrize("compact", [True, False])
+def test_transform_is_written_to_the_feature_set(tmp_path, compact):
+    transform = {"originPosition": "upperLeft", "scale": [0.01, 0.01, 0, 0], "translate": [100.0, 50.0, 0, 0]}
+    with FeatureCollectionWriter(
+        str(tmp_path / "Mains.json"), LAYER_DEFINITION, "esriGeometryPolyline", SPATIAL_REF, compact=compact, transform=transform
+    ) as writer:
+        writer.write_feature({"NAME": "x"}, {"paths": [[[0, 0], [5, -3]]]})
+
+    feature_set = json.loads((tmp_path / "Mains.json").read_text())["layers"][0]["featureSet"]
+    assert feature_set["transform"] == transform
+    assert feature_set["features"][0]["geometry"] == {"paths": [[[0, 0], [5, -3]]]}
+
+
+def test_gzip_writer_writes_the_same_json_compressed(tmp_path):
+    features = [({"NAME": f"pipe {i}"}, {"x": i, "y": i}) for i in range(200)]
+    _write(tmp_path / "Mains.json", features, compact=True)
+    with GzipFeatureCollectionWriter(str(tmp_path / "Mains.json.gz"), LAYER_DEFINITION, "esriGeometryPolyline", SPATIAL_REF) as writer:
+        for attributes, geometry in features:
+            writer.write_feature(attributes, geometry)
+
+    with gzip.open(tmp_path / "Mains.json.gz", "rt", encoding="utf-8") as f:
+        assert f.read() == (tmp_path / "Mains.json").read_text(encoding="utf-8")
+    assert (tmp_path / "Mains.json.gz").stat().st_size * 4 < (tmp_path / "Mains.json").stat().st_size
+
+
+@pytest.mark.parametrize("writer_cls, name", [(FeatureCollectionWriter, "Mains.json"), (GzipFeatureCollectionWriter, "Mains.json.gz")])
+def test_failed_write_keeps_the_previous_file(tmp_path, writer_cls, name):
+    (tmp_path / name).write_bytes(b"previous")
+    with pytest.raises(RuntimeError):
+        with writer_cls(str(tmp_path / name), LAYER_DEFINITION, "esriGeometryPolyline", SPATIAL_REF) as writer:
+            writer.write_feature({"NAME": "x"}, {"x": 0, "y": 0})
+            raise RuntimeError("cursor failed")
+
+    assert (tmp_path / name).read_bytes() == b"previous"
+    assert sorted(p.name for p in tmp_path.iterdir()) == [name]
+
+
+def test_file_appears_only_when_the_write_completes(tmp_path):
+    path = tmp_path / "Mains.json"
+    with FeatureCollectionWriter(str(path), LAYER_DEFINITION, "esriGeometryPolyline", SPATIAL_REF) as writer:
+        writer.write_feature({"NAME": "x"}, {"x": 0, "y": 0})
+        assert not path.exists()
+    assert json.loads(path.read_text())["layers"][0]["featureSet"]["features"][0]["attributes"] == {"NAME": "x"}
+    assert not (tmp_path / "Mains.json.tmp").exists()
@@ -0,0 +1,32 @@
+# tests/test_file_access.py
+import asyncio
+import hashlib
+import os
+from io import BytesIO
+
+import pytest
+from fastapi import UploadFile
+
+from app.api.file_access.file_access import UploadTooLargeError, stream_upload_to_file
+
+
+def _upload(content: bytes, name: str = "gridzones.xlsx") -> UploadFile:
+    return UploadFile(file=BytesIO(content), filename=name)
+
+
+def test_stream_upload_writes_and_hashes(tmp_path):
+    content = os.urandom(300_000)
+    dest = tmp_path / "job" / "gridzones.xlsx"
+
+    saved = asyncio.run(stream_upload_to_file(_upload(content), dest, max_bytes=1_000_000, chunk_size=64 * 1024))
+
+    assert saved.path == dest and dest.read_bytes() == content
+    assert saved.size == len(content)
+    assert saved.sha256 == hashlib.sha256(content).hexdigest()
+
+
+def test_stream_upload_rejects_oversized_file(tmp_path):
+    dest = tmp_path / "lut.xlsx"
+    with pytest.raises(UploadTooLargeError):
+        asyncio.run(stream_upload_to_file(_upload(b"x" * 5000), dest, max_bytes=4096, chunk_size=1024))
+    assert not dest.exists()
@@ -0,0 +1,72 @@
+# tests/test_gdb_cache.py
+import json
+import os
+import zipfile
+
+import pytest
+
+from app.job_management.gdb_cache import ENTRY_META_FILENAME, ExtractedGdbCache, NoGdbInZipError
+
+
+def _gdb_zip(tmp_path, name, payload=b"table", gdb_name="Source.gdb"):
+    path = tmp_path / name
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr(f"{gdb_name}/a00000001.gdbtable", payload)
+    return str(path)
+
+
+def _age_entry(cache, zip_path, seconds):
+    meta_path = os.path.join(cache.root, cache.entry_key(zip_path), ENTRY_META_FILENAME)
+    with open(meta_path) as f:
+        meta = json.load(f)
+    meta["last_used"] -= seconds
+    with open(meta_path, "w") as f:
+        json.dump(meta, f)
+
+
+def test_zip_is_extracted_once_and_linked_per_job(tmp_path):
+    cache = ExtractedGdbCache(str(tmp_path / "cache"), max_bytes=10_000)
+    zip_path = _gdb_zip(tmp_path, "Survey_SAZ_20250101.gdb.zip")
+
+    first = cache.checkout(zip_path, "job-1", str(tmp_path / "job1"))
+    os.remove(zip_path)  # the job copy does not depend on the zip
+    assert first == str(tmp_path / "job1" / "Source.gdb")
+    with open(os.path.join(first, "a00000001.gdbtable"), "rb") as f:
+        assert f.read() == b"table"
+
+
+def test_second_checkout_reuses_entry(tmp_path):
+    cache = ExtractedGdbCache(str(tmp_path / "cache"), max_bytes=10_000)
+    zip_path = _gdb_zip(tmp_path, "Survey_SAZ_20250101.gdb.zip")
+    cache.checkout(zip_path, "job-1", str(tmp_path / "job1"))
+    cache.checkout(zip_path, "job-2", str(tmp_path / "job2"))
+
+    assert len([d for d in os.listdir(cache.root)]) == 1
+    shared = os.path.join(cache.root, cache.entry_key(zip_path), "Source.gdb", "a00000001.gdbtable")
+    assert os.stat(shared).st_nlink == 3
+
+
+def test_zip_without_gdb_is_rejected(tmp_path):
+    cache = ExtractedGdbCache(str(tmp_path / "cache"), max_bytes=10_000)
+    path = tmp_path / "empty.gdb.zip"
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("readme.txt", "no gdb")
+    with pytest.raises(NoGdbInZipError):
+        cache.checkout(str(path), "job-1", str(tmp_path / "job1"))
+    assert os.listdir(cache.root) == []
+
+
+def test_eviction_skips_referenced_entries(tmp_path):
+    cache = ExtractedGdbCache(str(tmp_path / "cache"), max_bytes=150)
+    zips = [_gdb_zip(tmp_path, f"Survey_{i}.gdb.zip", payload=b"x" * 100) for i in range(3)]
+    for i, zip_path in enumerate(zips):
+        cache.checkout(zip_path, f"job-{i}", str(tmp_path / f"job{i}"))
+        _age_entry(cache, zip_path, 30 - i)  # oldest first
+
+    # job-0 is still running, job-1 and job-2 released their entries
+    cache.release("job-1")
+    cache.release("job-2")
+    result = cache.evict(is_job_active=lambda job_id: job_id == "job-0")
+
+    assert result["removed"] == 2
+    assert os.listdir(cache.root) == [cache.entry_key(zips[0])]
@@ -0,0 +1,80 @@
+# tests/test_geometry_encoding.py
+import pytest
+
+from app.api.survey_audit.geometry_encoding import (
+    GeometryEncoder,
+    GeometryOptions,
+    layer_geometry_options,
+    validate_geometry_options,
+)
+
+EXTENT = {"xmin": 100.0, "ymin": 0.0, "xmax": 200.0, "ymax": 50.0}
+SECTION = {
+    "precision_DESCRIPTION": "Decimal places",
+    "precision": 2,
+    "layers": {"Mains": {"simplify_tolerance": 0.5, "precision": None}, "Valves": {"precision": 0}},
+}
+
+
+def test_layer_options_override_the_defaults():
+    assert layer_geometry_options(SECTION, "Mains") == GeometryOptions(precision=None, simplify_tolerance=0.5)
+    assert layer_geometry_options(SECTION, "VALVES") == GeometryOptions(precision=0)
+    assert layer_geometry_options(SECTION, "Zones") == GeometryOptions(precision=2)
+    assert layer_geometry_options(None, "Zones") == GeometryOptions()
+
+
+@pytest.mark.parametrize("section", [
+    {"precison": 2},
+    {"precision": 1.5},
+    {"quantize_tolerance": -1},
+    {"layers": {"Mains": {"simplify_tolerance": "far"}}},
+])
+def test_invalid_options_are_rejected(section):
+    with pytest.raises(ValueError):
+        validate_geometry_options(section)
+
+
+def test_precision_rounds_every_coordinate():
+    encoder = GeometryEncoder(GeometryOptions(precision=2), EXTENT)
+    assert encoder.transform is None
+    assert encoder.encode({"x": 123.45678, "y": 9.87654}) == {"x": 123.46, "y": 9.88}
+    assert encoder.encode({"paths": [[[1.23456, 2.34567, 3.45678]]]}) == {"paths": [[[1.23, 2.35, 3.46]]]}
+
+
+def test_quantized_paths_decode_within_the_tolerance():
+    encoder = GeometryEncoder(GeometryOptions(quantize_tolerance=0.01), EXTENT)
+    path = [[100.004, 49.996], [100.0041, 49.9961], [101.234, 48.766], [101.2341, 48.7661]]
+    geometry = encoder.encode({"paths": [path]})
+
+    transform = encoder.transform
+    assert transform["originPosition"] == "upperLeft" and transform["translate"][:2] == [100.0, 50.0]
+    x = y = 0
+    decoded = []
+    for dx, dy in geometry["paths"][0]:
+        x, y = x + dx, y + dy
+        decoded.append((transform["translate"][0] + x * transform["scale"][0], transform["translate"][1] - y * transform["scale"][1]))
+    # The repeated second vertex is dropped, the last one is kept although it repeats the third
+    assert geometry["paths"][0] == [[0, 0], [123, 123], [0, 0]]
+    for (x, y), vertex in zip(decoded, [path[0], path[2], path[3]]):
+        assert abs(x - vertex[0]) <= 0.005 and abs(y - vertex[1]) <= 0.005
+
+
+class FakeShape:
+    def __init__(self, coordinates, collapse=False):
+        self.__geo_interface__ = {"type": "LineString", "coordinates": coordinates}
+        self.isEmpty = False
+        self.collapse = collapse
+
+    def generalize(self, tolerance):
+        simplified = FakeShape([self.__geo_interface__["coordinates"][0], self.__geo_interface__["coordinates"][-1]])
+        simplified.isEmpty = self.collapse
+        return simplified
+
+
+def test_simplify_keeps_shapes_that_would_collapse():
+    encoder = GeometryEncoder(GeometryOptions(simplify_tolerance=1.0), EXTENT)
+    line = FakeShape([[0, 0], [1, 0.1], [2, 0]])
+    assert encoder.simplify(line).__geo_interface__["coordinates"] == [[0, 0], [2, 0]]
+    collapsed = FakeShape([[0, 0], [0, 0.1]], collapse=True)
+    assert encoder.simplify(collapsed) is collapsed
+    assert GeometryEncoder(GeometryOptions(), EXTENT).simplify(line) is line
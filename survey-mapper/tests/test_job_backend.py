@@ -0,0 +1,97 @@
+# tests/test_job_backend.py
+import os
+import uuid
+
+import pytest
+
+from app.job_management.job_backend import SqliteJobBackend, get_job_backend
+
+
+def _backends():
+    yield "sqlite"
+    # Postgres runs only against a throwaway database, e.g. the one in docker-runner/docker-compose.yaml
+    if os.getenv("JOB_STORE_TEST_URL"):
+        yield "postgres"
+
+
+@pytest.fixture(params=list(_backends()))
+def backend(request, tmp_path):
+    if request.param == "sqlite":
+        backend = SqliteJobBackend(str(tmp_path / "job_status.db"))
+    else:
+        pytest.importorskip("psycopg2")
+        backend = get_job_backend(os.environ["JOB_STORE_TEST_URL"])
+    backend.init_schema()
+    return backend
+
+
+def _enqueue(backend, n):
+    job_ids = [str(uuid.uuid4()) for _ in range(n)]
+    for job_id in job_ids:
+        backend.enqueue_job(job_id, f"output/{job_id}", {"zip_path": "x.zip"})
+    return job_ids
+
+
+def test_claim_and_finish_job(backend):
+    job_id, = _enqueue(backend, 1)
+    assert job_id in backend.active_job_ids()
+
+    job = backend.claim_next_job("node-a", lease_seconds=60)
+    assert job["job_id"] == job_id and job["payload"] == {"zip_path": "x.zip"}
+    assert backend.claim_next_job("node-b", lease_seconds=60) is None
+
+    backend.update_status(job_id, "complete", None)
+    backend.release_job(job_id, "node-a")
+    assert backend.get_job(job_id)["status"] == "complete"
+    assert job_id not in backend.active_job_ids()
+
+
+def test_job_recorded_as_staging_is_not_claimed(backend):
+    # A job served from the result cache at submission is recorded as staging and completed by the API
+    job_id = str(uuid.uuid4())
+    backend.enqueue_job(job_id, f"output/{job_id}", {"zip_path": "x.zip"}, status="staging")
+    assert backend.queued_count() == 0
+    assert backend.claim_next_job("node-a", lease_seconds=60) is None
+    assert backend.get_job(job_id)["status"] == "staging"
+
+
+def test_list_jobs_pages_by_keyset(backend):
+    job_ids = _enqueue(backend, 5)
+    backend.update_status(job_ids[0], "complete", None)
+
+    first = backend.list_jobs(statuses=["queued"], limit=2)
+    rest = backend.list_jobs(statuses=["queued"], before=(first[-1]["created_at"], first[-1]["job_id"]), limit=10)
+    seen = [job["job_id"] for job in first + rest]
+    assert set(job_ids[1:]) <= set(seen) and len(seen) == len(set(seen))
+    assert job_ids[0] not in seen
+    assert [(job["created_at"], job["job_id"]) for job in first + rest] == sorted(
+        ((job["created_at"], job["job_id"]) for job in first + rest), reverse=True
+    )
+
+
+def test_archived_job_is_still_found(backend):
+    job_id, queued_id = _enqueue(backend, 2)
+    backend.update_status(job_id, "failed", "boom")
+
+    moved = backend.archive_jobs([job_id, queued_id])
+    assert [job["job_id"] for job in moved] == [job_id]
+    assert backend.get_job(job_id) is None
+    archived = backend.get_job(job_id, include_archive=True)
+    assert archived["status"] == "failed" and archived["output_dir"] is None
+    assert backend.finished_or_archived([job_id, queued_id]) == {job_id}
+
+
+def test_archiving_a_job_id_again_replaces_its_archive_row(backend):
+    job_id, = _enqueue(backend, 1)
+    backend.update_status(job_id, "failed", "boom")
+    backend.archive_jobs([job_id])
+
+    # Same id queued again (e.g. restored from a backup) and archived once more
+    backend.enqueue_job(job_id, f"output/{job_id}", {"zip_path": "x.zip"})
+    backend.update_status(job_id, "complete", None)
+    moved = backend.archive_jobs([job_id])
+
+    assert moved == [{"job_id": job_id, "output_dir": f"output/{job_id}"}]
+    assert backend.get_job(job_id) is None
+    archived = backend.get_job(job_id, include_archive=True)
+    assert archived["status"] == "complete" and archived["error"] is None
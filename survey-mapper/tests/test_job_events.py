@@ -0,0 +1,51 @@
+# tests/test_job_events.py
+import logging
+
+from app.job_management.job_events import JobEventLogHandler, JobEventWriter, events_path, read_events
+
+
+def test_events_resume_from_offset(tmp_path):
+    writer = JobEventWriter(str(tmp_path))
+    logger = logging.getLogger("survey_mapper.job.test_events")
+    logger.setLevel(logging.INFO)
+    handler = JobEventLogHandler(writer)
+    logger.addHandler(handler)
+    try:
+        writer.progress("sheets", 1, 2, "Sheet1")
+        logger.info("Clipped Mains")
+        writer.progress("sheets", 2, 2, "Sheet2")
+    finally:
+        logger.removeHandler(handler)
+        writer.close()
+
+    path = events_path(str(tmp_path))
+    events, end = read_events(path, 0)
+    assert [e["type"] for _, e in events] == ["progress", "log", "progress"]
+    assert events[1][1]["msg"] == "Clipped Mains" and end == path.stat().st_size
+
+    # Resuming after the first event id skips it
+    resumed, _ = read_events(path, events[0][0])
+    assert [e.get("label") or e.get("msg") for _, e in resumed] == ["Clipped Mains", "Sheet2"]
+
+
+def test_partial_line_waits_for_next_read(tmp_path):
+    path = events_path(str(tmp_path))
+    path.parent.mkdir(parents=True)
+    path.write_bytes(b'{"type": "log", "msg": "a"}\n{"type": "lo')
+
+    events, offset = read_events(path, 0)
+    assert len(events) == 1 and offset == len(b'{"type": "log", "msg": "a"}\n')
+
+    with open(path, "ab") as f:
+        f.write(b'g", "msg": "b"}\n')
+    events, _ = read_events(path, offset)
+    assert events[0][1]["msg"] == "b"
+
+
+def test_reads_are_bounded(tmp_path):
+    path = events_path(str(tmp_path))
+    path.parent.mkdir(parents=True)
+    path.write_bytes(b'{"type": "log"}\n' * 100)
+
+    events, offset = read_events(path, 0, max_bytes=160)
+    assert len(events) == 10 and offset == 160
@@ -0,0 +1,89 @@
+# tests/test_job_executor.py
+import os
+import threading
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from app.job_management.job_executor import JobExecutor, QueueFullError
+
+
+# Job functions run in spawned worker processes, so they live at module level
+def _double(x):
+    return x * 2
+
+
+def _fail(message):
+    raise ValueError(message)
+
+
+def _wait_for(event):
+    event.wait(30)
+
+
+def _crash():
+    os._exit(1)
+
+
+class DoneRecorder:
+    """ on_done callback that remembers each (job_id, exc) and lets the test wait for it. """
+
+    def __init__(self):
+        self.calls = {}
+        self._done = threading.Condition()
+
+    def __call__(self, job_id, exc):
+        with self._done:
+            self.calls[job_id] = exc
+            self._done.notify_all()
+
+    def wait(self, job_id, timeout=60):
+        with self._done:
+            assert self._done.wait_for(lambda: job_id in self.calls, timeout)
+        return self.calls[job_id]
+
+
+@pytest.fixture()
+def executor():
+    executor = JobExecutor(max_workers=1, max_queued=1, retry_after=7)
+    yield executor
+    executor.shutdown(wait=False)
+
+
+def test_on_done_is_told_about_success_and_failure(executor):
+    done = DoneRecorder()
+    ok = executor.submit("ok", _double, 21, on_done=done)
+    assert ok.result(timeout=60) == 42
+    assert done.wait("ok") is None
+
+    executor.submit("bad", _fail, "boom", on_done=done)
+    exc = done.wait("bad")
+    assert isinstance(exc, ValueError) and str(exc) == "boom"
+    assert executor.pending_count == 0
+
+
+def test_full_queue_raises_queue_full(executor):
+    release = executor.new_cancel_event()
+    done = DoneRecorder()
+    executor.submit("running", _wait_for, release, on_done=done)
+    executor.submit("waiting", _wait_for, release, on_done=done)
+    assert not executor.has_capacity()
+
+    with pytest.raises(QueueFullError) as e:
+        executor.submit("rejected", _double, 1)
+    assert e.value.retry_after == 7
+    assert sorted(executor.active_job_ids()) == ["running", "waiting"]
+
+    release.set()
+    assert done.wait("running") is None and done.wait("waiting") is None
+    assert executor.has_capacity()
+
+
+def test_broken_pool_is_replaced(executor):
+    done = DoneRecorder()
+    executor.submit("crash", _crash, on_done=done)
+    assert isinstance(done.wait("crash"), BrokenProcessPool)
+
+    # The next job gets a new pool
+    assert executor.submit("after", _double, 2, on_done=done).result(timeout=60) == 4
+    assert done.wait("after") is None
@@ -0,0 +1,110 @@
+# tests/test_job_queue.py
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.job_management import job_queue
+
+
+@pytest.fixture()
+def db_path(tmp_path):
+    """A job_status.db with the original jobs schema, migrated to the queue columns."""
+    path = str(tmp_path / "job_status.db")
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                status TEXT,
+                created_at TEXT,
+                updated_at TEXT,
+                error TEXT,
+                output_dir TEXT,
+                result_zip_path TEXT
+            )
+            """
+        )
+        conn.commit()
+    job_queue.migrate_queue_columns(path)
+    return path
+
+
+def _status(db_path, job_id):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute("SELECT status, lease_owner, attempts FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+
+
+def _expire_lease(db_path, job_id):
+    past = (datetime.now() - timedelta(minutes=5)).isoformat()
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("UPDATE jobs SET lease_expires_at = ? WHERE job_id = ?", (past, job_id))
+        conn.commit()
+
+
+def test_migrate_is_idempotent(db_path):
+    job_queue.migrate_queue_columns(db_path)
+    with sqlite3.connect(db_path) as conn:
+        cols = {r[1] for r in conn.execute("PRAGMA table_info(jobs)")}
+    assert set(job_queue.QUEUE_COLUMNS).issubset(cols)
+
+
+def test_claim_in_order_and_only_once(db_path):
+    job_queue.enqueue_job(db_path, "a", "output/a", {"n": 1})
+    job_queue.enqueue_job(db_path, "b", "output/b", {"n": 2})
+    assert job_queue.queued_count(db_path) == 2
+
+    first = job_queue.claim_next_job(db_path, "owner-1", lease_seconds=60)
+    second = job_queue.claim_next_job(db_path, "owner-2", lease_seconds=60)
+    assert first["job_id"] == "a" and first["payload"] == {"n": 1} and first["attempts"] == 1
+    assert second["job_id"] == "b"
+    assert job_queue.claim_next_job(db_path, "owner-1", lease_seconds=60) is None
+    assert job_queue.queued_count(db_path) == 0
+
+
+def test_expired_lease_is_requeued_then_failed(db_path):
+    job_queue.enqueue_job(db_path, "a", "output/a", {})
+    job_queue.claim_next_job(db_path, "dead-owner", lease_seconds=60)
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("UPDATE jobs SET status = 'processing' WHERE job_id = 'a'")
+        conn.commit()
+
+    _expire_lease(db_path, "a")
+    recovered = job_queue.recover_orphaned_jobs(db_path, max_attempts=2)
+    assert recovered["requeued"] == ["a"]
+    assert _status(db_path, "a")[:2] == ("queued", None)
+
+    # Second claim uses up the last attempt
+    job_queue.claim_next_job(db_path, "dead-owner", lease_seconds=60)
+    _expire_lease(db_path, "a")
+    recovered = job_queue.recover_orphaned_jobs(db_path, max_attempts=2)
+    assert recovered["failed"] == ["a"]
+    assert _status(db_path, "a")[0] == "failed"
+
+
+def test_live_lease_is_not_swept(db_path):
+    job_queue.enqueue_job(db_path, "a", "output/a", {})
+    job_queue.claim_next_job(db_path, "owner-1", lease_seconds=60)
+    job_queue.heartbeat_jobs(db_path, "owner-1", ["a"], lease_seconds=60)
+    assert job_queue.recover_orphaned_jobs(db_path, max_attempts=2) == {"requeued": [], "failed": [], "canceled": []}
+
+
+def test_legacy_rows_without_payload_are_failed(db_path):
+    now_ = datetime.now().isoformat()
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            "INSERT INTO jobs (job_id, status, created_at, updated_at) VALUES ('old', 'processing', ?, ?)",
+            (now_, now_),
+        )
+        conn.commit()
+    recovered = job_queue.recover_orphaned_jobs(db_path, max_attempts=2)
+    assert recovered["failed"] == ["old"]
+
+
+def test_cancel_queued(db_path):
+    job_queue.enqueue_job(db_path, "a", "output/a", {})
+    job_queue.enqueue_job(db_path, "b", "output/b", {})
+    assert job_queue.cancel_queued_job(db_path, "a") is True
+    assert job_queue.cancel_queued_job(db_path, "a") is False
+    assert job_queue.cancel_all_queued_jobs(db_path) == ["b"]
+    assert job_queue.claim_next_job(db_path, "owner-1", lease_seconds=60) is None
@@ -0,0 +1,89 @@
+# tests/test_job_retention.py
+import os
+import sqlite3
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.job_management import job_retention
+from app.job_management.job_backend import ARCHIVE_TABLE, SqliteJobBackend
+from app.job_management.job_retention import JobRetention
+
+
+@pytest.fixture()
+def db_path(tmp_path):
+    path = str(tmp_path / "job_status.db")
+    SqliteJobBackend(path).init_schema()
+    return path
+
+
+def _add_job(db_path, tmp_path, status, days_old, size=0):
+    job_id = str(uuid.uuid4())
+    output_dir = tmp_path / "output" / job_id
+    output_dir.mkdir(parents=True)
+    (output_dir / "results.zip").write_bytes(b"x" * size)
+    stamp = (datetime.now() - timedelta(days=days_old)).isoformat()
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            "INSERT INTO jobs (job_id, status, created_at, updated_at, output_dir) VALUES (?, ?, ?, ?, ?)",
+            (job_id, status, stamp, stamp, str(output_dir)),
+        )
+    return job_id, output_dir
+
+
+def _ids(db_path, table):
+    with sqlite3.connect(db_path) as conn:
+        return {r[0] for r in conn.execute(f"SELECT job_id FROM {table}")}
+
+
+def test_indexes_are_used(db_path):
+    with sqlite3.connect(db_path) as conn:
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT job_id FROM jobs ORDER BY created_at DESC, job_id DESC LIMIT 10"
+        ).fetchall()
+    assert any("idx_jobs_created_at" in row[-1] for row in plan)
+
+
+def test_old_finished_jobs_are_archived_with_their_folders(db_path, tmp_path):
+    temp_root = tmp_path / "tmp"
+    old, old_dir = _add_job(db_path, tmp_path, "complete", days_old=40)
+    (temp_root / old / "gdb").mkdir(parents=True)
+    running, running_dir = _add_job(db_path, tmp_path, "processing", days_old=40)
+    recent, recent_dir = _add_job(db_path, tmp_path, "failed", days_old=1)
+
+    stats = JobRetention(SqliteJobBackend(db_path), str(temp_root), max_age_days=30).run_once()
+
+    assert stats["archived"] == 1
+    assert _ids(db_path, "jobs") == {running, recent} and _ids(db_path, ARCHIVE_TABLE) == {old}
+    assert not old_dir.exists() and not (temp_root / old).exists()
+    assert running_dir.exists() and recent_dir.exists()
+
+
+def test_output_budget_archives_oldest_first(db_path, tmp_path):
+    oldest, oldest_dir = _add_job(db_path, tmp_path, "complete", days_old=3, size=600)
+    newest, newest_dir = _add_job(db_path, tmp_path, "complete", days_old=1, size=600)
+
+    JobRetention(SqliteJobBackend(db_path), str(tmp_path / "tmp"), max_age_days=0, max_output_bytes=1000).run_once()
+
+    assert _ids(db_path, ARCHIVE_TABLE) == {oldest}
+    assert not oldest_dir.exists() and newest_dir.exists()
+
+
+def test_stale_temp_dirs_of_finished_jobs_are_removed(tmp_path, db_path):
+    temp_root = tmp_path / "tmp"
+    finished, _ = _add_job(db_path, tmp_path, "canceled", days_old=0)
+    fresh, _ = _add_job(db_path, tmp_path, "complete", days_old=0)
+    active, _ = _add_job(db_path, tmp_path, "queued", days_old=0)
+    unknown = str(uuid.uuid4())
+    past = time.time() - job_retention.TEMP_GRACE_SECONDS - 60
+    for job_id in (finished, fresh, active, unknown):
+        (temp_root / job_id).mkdir(parents=True)
+        if job_id != fresh:
+            os.utime(temp_root / job_id, (past, past))
+
+    JobRetention(SqliteJobBackend(db_path), str(temp_root), max_age_days=0).run_once()
+
+    assert not (temp_root / finished).exists()
+    assert all((temp_root / job_id).exists() for job_id in (fresh, active, unknown))
@@ -0,0 +1,57 @@
+# tests/test_job_store.py
+import sqlite3
+import threading
+
+import pytest
+
+from app.job_management.job_store import JobStore
+
+
+@pytest.fixture()
+def store(tmp_path):
+    store = JobStore(str(tmp_path / "job_status.db"), pool_size=2)
+    with store.connection() as conn:
+        conn.execute("CREATE TABLE jobs (job_id TEXT PRIMARY KEY, status TEXT)")
+        conn.executemany("INSERT INTO jobs VALUES (?, 'queued')", [(f"j{i}",) for i in range(50)])
+    yield store
+    store.close()
+
+
+def test_connections_use_wal_and_are_reused(store):
+    with store.connection() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        first = conn
+    with store.connection() as conn:
+        assert conn is first
+
+
+def test_concurrent_writes_are_committed_and_batched(store):
+    commits = []
+    original = store._commit_batch
+    store._commit_batch = lambda conn, batch: (commits.append(len(batch)), original(conn, batch))
+
+    threads = [
+        threading.Thread(target=store.write, args=("UPDATE jobs SET status = 'processing' WHERE job_id = ?", (f"j{i}",)))
+        for i in range(50)
+    ]
+    for t in threads:
+        t.start()
+    # Reads are not blocked by the writer
+    with store.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0] == 50
+    for t in threads:
+        t.join()
+
+    with store.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'processing'").fetchone()[0] == 50
+    assert sum(commits) == 50
+
+
+def test_failed_write_does_not_fail_its_batch(store):
+    store.write("UPDATE jobs SET status = 'x' WHERE job_id = 'j1'", wait=False)
+    with pytest.raises(sqlite3.OperationalError):
+        store.write("UPDATE missing_table SET a = 1")
+    store.flush()
+    with store.connection() as conn:
+        assert conn.execute("SELECT status FROM jobs WHERE job_id = 'j1'").fetchone()[0] == "x"
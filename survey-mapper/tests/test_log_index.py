@@ -0,0 +1,149 @@
+# tests/test_log_index.py
+import json
+import logging
+
+from app.custom_logging.custom_logger import (
+    JsonLinesFormatter,
+    collect_logs_grouped_all,
+    count_logs_grouped_all,
+    filter_log_counts_by_level,
+    filter_logs_by_fields,
+)
+from app.models.response_models import LogCounts, LogLevelFilter
+from app.custom_logging import log_index
+from app.custom_logging.log_index import ENTRIES_FILENAME, INDEX_FILENAME, indexed_log_counts, indexed_log_entries
+
+
+def _write(path, text, mode="a"):
+    with open(path, mode, encoding="utf-8") as f:
+        f.write(text)
+
+
+def test_collect_groups_structured_and_raw_lines(tmp_path):
+    logs = tmp_path / "logs"
+    logs.mkdir()
+    _write(logs / "log_1.txt", (
+        "2025-08-18 10:24:39,480 | INFO | survey_mapper.job.1 | Job started\n"
+        "2025-08-18 10:24:40,000 | WARNING | survey_mapper.job.1 | Layer empty\n"
+        "  arcpy detail line\n"
+        "ERROR 000732: Dataset does not exist\n"
+    ))
+
+    grouped = collect_logs_grouped_all(str(tmp_path))
+    assert [e.msg for e in grouped.info] == ["Job started"]
+    assert grouped.warning[0].msg == "Layer empty\n  arcpy detail line"
+    assert grouped.error[0].logger == "raw" and grouped.error[0].file == "log_1.txt"
+
+
+def test_counts_match_the_grouped_entries(tmp_path):
+    logs = tmp_path / "logs"
+    logs.mkdir()
+    _write(logs / "log_1.txt", (
+        "2025-08-18 10:24:39,480 | INFO | job | Job started\n"
+        "2025-08-18 10:24:40,000 | CRITICAL | job | Out of disk\n"
+        "Warning: layer empty\n"
+        "  detail\n"
+    ))
+    _write(logs / "log_2.txt", "2025-08-18 10:25:00,000 | ERROR | job | failed\n")
+
+    grouped = collect_logs_grouped_all(str(tmp_path))
+    counts = count_logs_grouped_all(str(tmp_path))
+    assert counts == LogCounts(info=len(grouped.info), warning=len(grouped.warning), error=len(grouped.error))
+    assert counts == LogCounts(info=1, warning=1, error=2)
+    assert filter_log_counts_by_level(counts, LogLevelFilter.error) == LogCounts(info=0, warning=0, error=2)
+    assert count_logs_grouped_all(str(tmp_path / "missing")) == LogCounts()
+
+
+def test_only_appended_lines_are_parsed(tmp_path):
+    logs = tmp_path / "logs"
+    logs.mkdir()
+    log = logs / "log_1.txt"
+    _write(log, "2025-08-18 10:24:39,480 | INFO | job | first\n2025-08-18 10:24:40,480 | INFO | job | part")
+
+    # The unfinished last line is left for the next refresh
+    assert [e["msg"] for e in indexed_log_entries(logs, [log])["log_1.txt"]] == ["first"]
+    offset = json.loads((logs / INDEX_FILENAME).read_text())["files"]["log_1.txt"]["offset"]
+
+    _write(log, "ial\n  continued\n")
+    entries = indexed_log_entries(logs, [log])["log_1.txt"]
+    assert [e["msg"] for e in entries] == ["first", "partial\n  continued"]
+    assert json.loads((logs / INDEX_FILENAME).read_text())["files"]["log_1.txt"]["offset"] > offset
+
+
+def test_sidecar_only_appends_new_entries(tmp_path):
+    logs = tmp_path / "logs"
+    logs.mkdir()
+    log = logs / "log_1.txt"
+    entries_file = logs / ENTRIES_FILENAME.format("log_1.txt")
+    _write(log, "".join(f"2025-08-18 10:24:39,480 | INFO | job | line {i}\n" for i in range(50)))
+    indexed_log_entries(logs, [log])
+    saved = entries_file.read_bytes()
+
+    _write(log, "2025-08-18 10:24:40,480 | ERROR | job | failed\n  detail\n")
+    indexed_log_entries(logs, [log])
+    # Earlier entries are not written again; the open last entry is not written yet
+    assert entries_file.read_bytes().startswith(saved)
+    assert [json.loads(line)["msg"] for line in entries_file.read_text().splitlines()[len(saved.splitlines()):]] == ["line 49"]
+    header = json.loads((logs / INDEX_FILENAME).read_text())["files"]["log_1.txt"]
+    assert header["counts"] == {"INFO": 50} and "entries" not in header
+
+    # After a restart the open entry is parsed again from its first line
+    log_index._MEMORY.clear()
+    _write(log, "  more detail\n")
+    entries = indexed_log_entries(logs, [log])["log_1.txt"]
+    assert len(entries) == 51 and entries[-1]["msg"] == "failed\n  detail\n  more detail"
+    assert indexed_log_counts(logs, [log]) == {"log_1.txt": {"INFO": 50, "ERROR": 1}}
+
+
+def test_unrecorded_append_is_dropped(tmp_path):
+    logs = tmp_path / "logs"
+    logs.mkdir()
+    log = logs / "log_1.jsonl"
+    _write(log, '{"level": "INFO", "msg": "a"}\n{"level": "WARNING", "msg": "b"}\n')
+    indexed_log_entries(logs, [log])
+
+    # Bytes appended to the entries file that the sidecar never recorded are discarded
+    _write(logs / ENTRIES_FILENAME.format("log_1.jsonl"), '{"level": "INFO", "msg": "stray"}\n')
+    log_index._MEMORY.clear()
+    _write(log, '{"level": "ERROR", "msg": "c"}\n')
+    assert [e["msg"] for e in indexed_log_entries(logs, [log])["log_1.jsonl"]] == ["a", "b", "c"]
+
+
+def test_truncated_file_is_reparsed(tmp_path):
+    logs = tmp_path / "logs"
+    logs.mkdir()
+    log = logs / "log_1.txt"
+    _write(log, "2025-08-18 10:24:39,480 | INFO | job | old line that is long\n")
+    indexed_log_entries(logs, [log])
+
+    _write(log, "2025-08-18 10:24:39,480 | INFO | job | new\n", mode="w")
+    assert [e["msg"] for e in indexed_log_entries(logs, [log])["log_1.txt"]] == ["new"]
+
+
+def test_jsonl_logs_are_read_without_regex_and_filterable(tmp_path):
+    logs = tmp_path / "logs"
+    logs.mkdir()
+    _write(logs / "log_1.txt", "2025-08-18 10:24:39,480 | INFO | job | Clipped Mains\n")
+    _write(logs / "log_1.jsonl", (
+        '{"ts": "2025-08-18T10:24:39", "level": "INFO", "logger": "job", "msg": "Clipped Mains",'
+        ' "stage": "clip", "sheet": "S1", "feature_class": "Mains", "tool": "analysis.Clip", "duration": 1.5}\n'
+        '{"ts": "2025-08-18T10:24:40", "level": "ERROR", "logger": "job", "msg": "Merge failed | x",'
+        ' "stage": "merge", "feature_class": "Services"}\n'
+    ))
+
+    grouped = collect_logs_grouped_all(str(tmp_path))
+    assert [e.msg for e in grouped.info] == ["Clipped Mains"]  # text log is not read twice
+    assert grouped.info[0].tool == "analysis.Clip" and grouped.info[0].duration == 1.5
+    assert grouped.error[0].msg == "Merge failed | x"
+
+    clip_only = filter_logs_by_fields(grouped, stage="clip")
+    assert len(clip_only.info) == 1 and clip_only.error == []
+    assert filter_logs_by_fields(grouped, feature_class="Services").error[0].stage == "merge"
+
+
+def test_json_lines_formatter_writes_extra_fields():
+    record = logging.LogRecord("job", logging.INFO, __file__, 1, "Merged %s", ("a",), None)
+    record.stage, record.feature_class, record.duration = "merge", "Mains", 0.25
+    item = json.loads(JsonLinesFormatter().format(record))
+    assert item["msg"] == "Merged a" and item["stage"] == "merge" and item["duration"] == 0.25
+    assert "sheet" not in item
@@ -0,0 +1,104 @@
+# tests/test_lut_plan.py
+import os
+
+import pandas as pd
+import pytest
+
+from app.api.survey_audit.lut_plan import (
+    LUT_REQUIRED_COLUMNS,
+    ClipStep,
+    LutPlanError,
+    MergeStep,
+    compile_lut_plan,
+)
+
+EXAMPLE_LUT = os.path.join(
+    os.path.dirname(__file__), "..", "source-data", "spreadsheets", "lutassettypes_Mobile_Patrol_Example.xlsx"
+)
+
+
+def _row(source, clip, output, pre="NONE", post="NONE", post_name="NONE", merge_name="NONE", anno="no", include="yes"):
+    return dict(
+        SourceDataName=source,
+        PreClipAttributeQuery=pre,
+        IntermediateClipFilterName=clip,
+        IntermediatePostClipFilterName=post_name,
+        PostClipAttributeQuery=post,
+        IntermediateMergeClipName=merge_name,
+        OutputName=output,
+        GeometryType_Corrected="Point",
+        IsAnnotationLayer=anno,
+        IncludeInFinalResult=include,
+    )
+
+
+def _df(*rows):
+    return pd.DataFrame(list(rows), columns=list(LUT_REQUIRED_COLUMNS))
+
+
+def test_clip_post_filter_and_merge_dependencies():
+    plan = compile_lut_plan(_df(
+        _row("Riser", "Riser_clip", "NONE", pre="STATUS = 1"),
+        _row("InactiveRiser", "InactiveRiser_clip", "NONE", post="GUID,Riser_clip", post_name="InactiveRiser_post"),
+        _row("MERGE_LAYERS", "Riser_clip,InactiveRiser_clip", "NIPoints", merge_name="NIPoints", anno="yes"),
+    ))
+
+    riser, inactive = plan.clips
+    assert riser.pre_clip_query == "STATUS = 1" and inactive.pre_clip_query is None
+
+    post = plan.post_clip_filter_for(inactive)
+    assert post.depends_on == (inactive.step_id, riser.step_id)
+    assert (post.id_field, post.id_source_layer) == ("GUID", "Riser_clip")
+
+    (merge,) = plan.merges
+    assert merge.base == "Riser_clip" and merge.merge_with == ("InactiveRiser_clip",)
+    assert merge.depends_on == (riser.step_id, inactive.step_id)
+
+    # NONE outputs are not exported; the merge result is, and is packaged as annotation
+    assert [e.final_name for e in plan.exports] == ["NIPoints"]
+    assert [a.final_name for a in plan.annotation_packages] == ["NIPoints"]
+    assert [type(s) for s in plan.row_steps] == [ClipStep, ClipStep, MergeStep]
+
+
+def test_merge_base_exports_with_the_unmerged_clips():
+    plan = compile_lut_plan(_df(
+        _row("Mains", "Mains_clip", "Mains"),
+        _row("Proposed", "Proposed_clip", "Proposed"),
+        _row("Services", "Services_clip", "Services"),
+        _row("MERGE_LAYERS", "Mains_clip,Proposed_clip", "AllMains", merge_name="AllMains"),
+    ))
+
+    # Only the layers merged into the base move to the end, ahead of the merge result
+    assert [e.final_name for e in plan.exports] == ["Mains", "Services", "Proposed", "AllMains"]
+
+
+def test_all_row_errors_are_reported_together():
+    with pytest.raises(LutPlanError) as exc:
+        compile_lut_plan(_df(
+            _row("Mains", "Mains_clip", "Mains", anno="maybe"),
+            _row("Services", "Services_clip", "Services", post="GUID", post_name="Svc_post"),
+            _row("MERGE_LAYERS", "Mains_clip", "Mains", merge_name="Mains"),
+            _row("MERGE_LAYERS", "Mains_clip,Missing_clip", "AllMains", merge_name="AllMains"),
+        ))
+    errors = exc.value.errors
+    assert len(errors) == 4
+    assert "IsAnnotationLayer" in errors[0]
+    assert "PostClipAttributeQuery" in errors[1]
+    assert "MERGE_LAYERS" in errors[2]
+    assert "Missing_clip" in errors[3]
+
+
+def test_missing_columns_and_blank_rows():
+    with pytest.raises(LutPlanError, match="missing required columns"):
+        compile_lut_plan(pd.DataFrame({"SourceDataName": ["Mains"]}))
+
+    blank = {c: None for c in LUT_REQUIRED_COLUMNS}
+    plan = compile_lut_plan(_df(_row("Mains", "Mains_clip", None), blank))
+    assert len(plan.clips) == 1 and plan.clips[0].final_name == "NONE"
+
+
+@pytest.mark.skipif(not os.path.exists(EXAMPLE_LUT), reason="example LUT not available")
+def test_example_lut_compiles():
+    plan = compile_lut_plan(pd.read_excel(EXAMPLE_LUT))
+    assert plan.clips and plan.merges
+    assert {"Mains", "NIPoints"}.issubset({e.final_name for e in plan.exports})
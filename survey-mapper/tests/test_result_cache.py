@@ -0,0 +1,79 @@
+# tests/test_result_cache.py
+import json
+import os
+import time
+
+import pandas as pd
+
+from app.job_management.result_cache import (
+    CACHE_META_FILENAME,
+    ResultCache,
+    compute_cache_key,
+    hash_config,
+    hash_dataframe,
+    hash_file,
+)
+
+
+def _zip(tmp_path, name, size):
+    path = tmp_path / name
+    path.write_bytes(os.urandom(size))
+    return str(path)
+
+
+def _age_entry(cache, key, seconds):
+    meta_path = cache._entry_dir(key) / CACHE_META_FILENAME
+    meta = json.loads(meta_path.read_text())
+    meta["created_at"] -= seconds
+    meta["last_used"] -= seconds
+    meta_path.write_text(json.dumps(meta))
+
+
+def test_hashes_follow_content_only(tmp_path):
+    a = tmp_path / "a.xlsx"
+    b = tmp_path / "b.xlsx"
+    a.write_bytes(b"same")
+    b.write_bytes(b"same")
+    assert hash_file(str(a)) == hash_file(str(b))
+
+    df = pd.DataFrame({"SourceDataName": ["Mains"], "OutputName": ["Mains"]})
+    assert hash_dataframe(df) == hash_dataframe(df.copy())
+    assert hash_dataframe(df) != hash_dataframe(df.assign(OutputName=["Main"]))
+    assert hash_dataframe(None) == "none"
+
+    assert hash_config({"a": 1, "b": [1, 2]}) == hash_config({"b": [1, 2], "a": 1})
+    assert compute_cache_key(zip="1", lut="2") != compute_cache_key(zip="1", lut="3")
+
+
+def test_store_and_lookup(tmp_path):
+    cache = ResultCache(tmp_path / "cache", max_bytes=10_000, max_age_seconds=3600)
+    assert cache.lookup("ab" * 32) is None
+
+    cached = cache.store("ab" * 32, _zip(tmp_path, "results.zip", 100), source_job_id="job-1")
+    hit = cache.lookup("ab" * 32)
+    assert hit["zip_path"] == cached and hit["source_job_id"] == "job-1" and hit["hits"] == 1
+
+
+def test_expired_entries_miss_and_are_evicted(tmp_path):
+    cache = ResultCache(tmp_path / "cache", max_bytes=10_000, max_age_seconds=60)
+    cache.store("aa" * 32, _zip(tmp_path, "results.zip", 100), source_job_id="job-1")
+    _age_entry(cache, "aa" * 32, 120)
+
+    assert cache.lookup("aa" * 32) is None
+    assert cache.evict()["expired"] == 1
+    assert not cache._entry_dir("aa" * 32).exists()
+
+
+def test_lru_eviction_keeps_recently_used(tmp_path):
+    cache = ResultCache(tmp_path / "cache", max_bytes=250, max_age_seconds=3600)
+    for i, key in enumerate(("11" * 32, "22" * 32, "33" * 32)):
+        cache.store(key, _zip(tmp_path, f"r{i}.zip", 100), source_job_id=f"job-{i}")
+        _age_entry(cache, key, 30 - i)  # oldest first
+
+    time.sleep(0.01)
+    cache.lookup("11" * 32)  # most recently used now
+
+    result = cache.evict()
+    assert result["lru"] == 1 and result["bytes"] == 200
+    assert cache.lookup("22" * 32) is None
+    assert cache.lookup("11" * 32) and cache.lookup("33" * 32)
@@ -0,0 +1,64 @@
+# tests/test_sheet_cache.py
+import os
+
+from app.api.survey_audit.sheet_cache import SheetCache, hash_directory, sheet_fingerprint
+
+
+def _sheet_outputs(folder, gdb_name="S1_clipped.gdb"):
+    os.makedirs(os.path.join(folder, gdb_name))
+    with open(os.path.join(folder, gdb_name, "a00000001.gdbtable"), "w") as f:
+        f.write("table")
+    with open(os.path.join(folder, gdb_name, "a00000001.sr.lock"), "w") as f:
+        f.write("lock")
+    for ext in (".shp", ".shx", ".dbf"):
+        with open(os.path.join(folder, f"Mains{ext}"), "w") as f:
+            f.write(ext)
+    with open(os.path.join(folder, "Annotation.lpkx"), "w") as f:
+        f.write("pkg")
+
+
+def test_fingerprint_changes_with_any_input():
+    base = dict(sheet="S1", gridzone_ids=["A1", "A2"], source="v1", plan="p", config="c", division="SAZ")
+    assert sheet_fingerprint(**base) == sheet_fingerprint(**dict(base))
+    for key, value in (("gridzone_ids", ["A1"]), ("source", "v2"), ("plan", "p2"), ("sheet", "S2")):
+        assert sheet_fingerprint(**{**base, key: value}) != sheet_fingerprint(**base)
+
+
+def test_hash_directory_ignores_locks(tmp_path):
+    gdb = tmp_path / "src.gdb"
+    gdb.mkdir()
+    (gdb / "a.gdbtable").write_text("v1")
+    before = hash_directory(str(gdb))
+    (gdb / "a.sr.lock").write_text("lock")
+    assert hash_directory(str(gdb)) == before
+    (gdb / "a.gdbtable").write_text("v2")
+    assert hash_directory(str(gdb)) != before
+
+
+def test_store_then_restore(tmp_path):
+    cache = SheetCache(str(tmp_path / "cache"), max_age_seconds=3600)
+    first = tmp_path / "job1"
+    first.mkdir()
+    _sheet_outputs(str(first))
+    rows = [{"sheet": "S1", "source_name": "Main", "clipped_count": 3}]
+
+    assert cache.restore("ab" * 32, str(tmp_path)) is None
+    assert cache.store("ab" * 32, str(first), "S1_clipped.gdb", ["Mains.shp", "Annotation.lpkx"], rows, ["w"])
+
+    second = tmp_path / "job2"
+    second.mkdir()
+    meta = cache.restore("ab" * 32, str(second))
+    assert meta["rows"] == rows and meta["warnings"] == ["w"]
+    assert sorted(os.listdir(second)) == ["Annotation.lpkx", "Mains.dbf", "Mains.shp", "Mains.shx", "S1_clipped.gdb"]
+    # Lock files are never cached
+    assert os.listdir(second / "S1_clipped.gdb") == ["a00000001.gdbtable"]
+
+
+def test_expired_entries_are_not_restored(tmp_path):
+    cache = SheetCache(str(tmp_path / "cache"), max_age_seconds=-1)
+    folder = tmp_path / "job1"
+    folder.mkdir()
+    _sheet_outputs(str(folder))
+    cache.store("cd" * 32, str(folder), "S1_clipped.gdb", ["Mains.shp"], [], [])
+    assert cache.restore("cd" * 32, str(tmp_path)) is None
+    assert cache.prune() == 1
@@ -0,0 +1,94 @@
+# tests/test_shp_to_feature_collection.py
+import logging
+import types
+from concurrent.futures import Future
+
+import arcpy
+import pytest
+
+from app.api.survey_audit import shpToFeatureCollection_V1
+from app.api.survey_audit.shpToFeatureCollection_V1 import RecursiveExportFeatureCollection
+
+
+class InlinePool:
+    """ ProcessPoolExecutor stand-in that runs each task when it is submitted. """
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def submit(self, fn, *args):
+        fut = Future()
+        try:
+            fut.set_result(fn(*args))
+        except Exception as e:
+            fut.set_exception(e)
+        return fut
+
+
+class FakeManifest:
+    def __init__(self):
+        self.results = []
+
+    def add_result(self, path):
+        self.results.append(path)
+
+
+def _process_shapefile(self, shp_path, json_output, logger_):
+    logger_.info(f"Read {shp_path}")
+    if "broken" in shp_path:
+        logger_.warning(f"Bad geometry in {shp_path}")
+        raise RuntimeError("cursor failed")
+
+
+@pytest.fixture
+def export(monkeypatch):
+    monkeypatch.setattr(shpToFeatureCollection_V1, "ProcessPoolExecutor", InlinePool)
+    monkeypatch.setattr(RecursiveExportFeatureCollection, "process_shapefile", _process_shapefile)
+    for name in ("AddMessage", "AddWarning", "AddError"):
+        monkeypatch.setattr(arcpy, name, lambda message: None, raising=False)
+    monkeypatch.setattr(arcpy, "env", types.SimpleNamespace(), raising=False)
+    return RecursiveExportFeatureCollection(export_workers=2)
+
+
+def _messages(caplog):
+    """ What reached the job logger; the inline worker's own logger is captured too and left out. """
+    return [(r.levelname, r.getMessage()) for r in caplog.records if r.name == "test_export"]
+
+
+def test_duplicate_outputs_are_exported_once_last_one_wins(export, caplog):
+    manifest = FakeManifest()
+    with caplog.at_level(logging.INFO, logger="test_export"):
+        export._export_shapefiles_parallel(
+            ["a/Mains.shp", "a/Valves.shp", "b/Mains.shp"], "out", manifest, logging.getLogger("test_export")
+        )
+
+    messages = _messages(caplog)
+    assert ("WARNING", "Skipping a/Mains.shp: b/Mains.shp writes the same out/Mains.json") in messages
+    assert ("INFO", "Read b/Mains.shp") in messages
+    assert ("INFO", "Read a/Mains.shp") not in messages
+    assert sorted(manifest.results) == ["out/Mains.json", "out/Valves.json"]
+
+
+def test_worker_messages_are_replayed_on_success_and_failure(export, caplog):
+    manifest = FakeManifest()
+    with caplog.at_level(logging.INFO, logger="test_export"):
+        export._export_shapefiles_parallel(["a/Mains.shp", "a/broken.shp"], "out", manifest, logging.getLogger("test_export"))
+
+    messages = _messages(caplog)
+    assert ("INFO", "Read a/Mains.shp") in messages
+    assert ("INFO", "Saved to: out/Mains.json") in messages
+    # The failed worker's messages come before the error that ends its shapefile
+    failed = [m for m in messages if "broken" in m[1]]
+    assert failed[:3] == [
+        ("INFO", "Exporting: a/broken.shp"),
+        ("INFO", "Read a/broken.shp"),
+        ("WARNING", "Bad geometry in a/broken.shp"),
+    ]
+    assert failed[3][0] == "ERROR" and failed[3][1].startswith("Error processing a/broken.shp: cursor failed")
+    assert manifest.results == ["out/Mains.json"]
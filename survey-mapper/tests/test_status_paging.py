@@ -0,0 +1,80 @@
+# tests/test_status_paging.py
+import sqlite3
+from datetime import datetime
+
+import pytest
+from fastapi import Response
+from fastapi.responses import JSONResponse
+
+from app.api.status_paging import decode_status_cursor, encode_status_cursor, list_jobs_page
+from app.job_management.job_backend import SqliteJobBackend
+
+
+@pytest.fixture
+def backend(tmp_path):
+    backend = SqliteJobBackend(str(tmp_path / "job_status.db"))
+    backend.init_schema()
+    jobs = [
+        ("a", "complete", "2025-01-01T09:00:00"),
+        ("b", "failed", "2025-01-02T09:00:00"),
+        ("c", "complete", "2025-01-03T09:00:00"),
+        ("d", "queued", "2025-01-03T09:00:00"),
+        ("e", "complete", "2025-01-04T09:00:00"),
+    ]
+    for job_id, status, _ in jobs:
+        backend.enqueue_job(job_id, f"output/{job_id}", {})
+        backend.update_status(job_id, status, None)
+    with sqlite3.connect(backend.db_path) as conn:
+        conn.executemany("UPDATE jobs SET created_at = ? WHERE job_id = ?", [(created, job_id) for job_id, _, created in jobs])
+    return backend
+
+
+def _ids(rows):
+    return [row["job_id"] for row in rows]
+
+
+def test_cursor_round_trip():
+    cursor = encode_status_cursor("2025-01-03T09:00:00", "c")
+    assert decode_status_cursor(cursor) == ("2025-01-03T09:00:00", "c")
+
+
+@pytest.mark.parametrize("cursor", ["not a cursor", encode_status_cursor("x", "y")[:-4], "WyJvbmx5Il0="])
+def test_bad_cursor_is_a_400(backend, cursor):
+    with pytest.raises(ValueError):
+        decode_status_cursor(cursor)
+    result = list_jobs_page(backend, Response(), limit=2, cursor=cursor)
+    assert isinstance(result, JSONResponse) and result.status_code == 400
+
+
+def test_pages_follow_the_next_cursor(backend):
+    response = Response()
+    first = list_jobs_page(backend, response, limit=2)
+    assert _ids(first) == ["e", "d"]
+    cursor = response.headers["X-Next-Cursor"]
+    assert decode_status_cursor(cursor) == ("2025-01-03T09:00:00", "d")
+
+    response = Response()
+    second = list_jobs_page(backend, response, limit=2, cursor=cursor)
+    assert _ids(second) == ["c", "b"]
+
+    # The last page holds exactly limit rows: the limit+1 read finds nothing more, so no cursor
+    cursor = response.headers["X-Next-Cursor"]
+    response = Response()
+    assert _ids(list_jobs_page(backend, response, limit=1, cursor=cursor)) == ["a"]
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_status_and_time_filters(backend):
+    assert _ids(list_jobs_page(backend, Response(), limit=10, statuses=["complete"])) == ["e", "c", "a"]
+    assert _ids(list_jobs_page(backend, Response(), limit=10, statuses=["failed", "queued"])) == ["d", "b"]
+    # created_from is inclusive, created_to exclusive
+    window = list_jobs_page(
+        backend, Response(), limit=10,
+        created_from=datetime(2025, 1, 2, 9), created_to=datetime(2025, 1, 4, 9),
+    )
+    assert _ids(window) == ["d", "c", "b"]
+
+    response = Response()
+    page = list_jobs_page(backend, response, limit=1, statuses=["complete"], created_to=datetime(2025, 1, 4))
+    assert _ids(page) == ["c"]
+    assert _ids(list_jobs_page(backend, Response(), limit=5, cursor=response.headers["X-Next-Cursor"], statuses=["complete"])) == ["a"]
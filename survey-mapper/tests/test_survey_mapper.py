@@ -0,0 +1,150 @@
+# tests/test_survey_mapper.py
+import logging
+import os
+import types
+from concurrent.futures import Future
+
+import arcpy
+import pandas as pd
+
+from app.api.survey_audit import survey_mapper_class
+from app.api.survey_audit.clip_counter import ClipCounter
+from app.api.survey_audit.lut_plan import LUT_REQUIRED_COLUMNS, compile_lut_plan
+from app.api.survey_audit.survey_mapper_class import SurveyMapper
+
+
+def _mapper():
+    mapper = SurveyMapper.__new__(SurveyMapper)
+    mapper.logger = logging.getLogger("test_survey_mapper")
+    return mapper
+
+
+def _write_sheet(folder, files):
+    folder.mkdir(parents=True)
+    for name in files:
+        (folder / name).write_text(folder.name)
+
+
+def test_later_sheet_outputs_replace_earlier_ones(tmp_path):
+    export = tmp_path / "export"
+    export.mkdir()
+    _write_sheet(tmp_path / "North", ["Mains.shp", "Mains.dbf", "Mains.prj", "Valves.shp", "Annotation.lpkx"])
+    _write_sheet(tmp_path / "South", ["Mains.shp", "Mains.dbf", "Annotation.lpkx"])
+    mapper, used_names = _mapper(), set()
+
+    assert mapper._move_sheet_outputs(str(tmp_path / "North"), str(export), used_names) == ["Annotation.lpkx", "Mains.shp", "Valves.shp"]
+    assert mapper._move_sheet_outputs(str(tmp_path / "South"), str(export), used_names) == ["Annotation.lpkx", "Mains.shp"]
+
+    # Same names as serial mode: no sheet suffix, the last sheet wins, and no part of the earlier Mains is left
+    assert sorted(p.name for p in export.iterdir()) == ["Annotation.lpkx", "Mains.dbf", "Mains.shp", "Valves.shp"]
+    assert (export / "Mains.shp").read_text() == "South"
+    assert (export / "Mains.dbf").read_text() == "South"
+    assert (export / "Annotation.lpkx").read_text() == "South"
+    assert (export / "Valves.shp").read_text() == "North"
+    assert list((tmp_path / "South").iterdir()) == []
+
+
+def _row(source, clip, output, post="NONE", post_name="NONE", merge_name="NONE"):
+    return dict(
+        SourceDataName=source,
+        PreClipAttributeQuery="NONE",
+        IntermediateClipFilterName=clip,
+        IntermediatePostClipFilterName=post_name,
+        PostClipAttributeQuery=post,
+        IntermediateMergeClipName=merge_name,
+        OutputName=output,
+        GeometryType_Corrected="Point",
+        IsAnnotationLayer="no",
+        IncludeInFinalResult="yes",
+    )
+
+
+class FakeClipPool:
+    """ Stands in for the clip worker pool: each clip is already finished when submitted. """
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+
+    def submit(self, fn, step, output_grid):
+        future = Future()
+        if step.step_id in self.failing:
+            future.set_exception(RuntimeError("clip failed"))
+        else:
+            future.set_result({"path": f"scratch/{step.step_id}", "clipped_count": 1, "duration": 0.0})
+        return future
+
+
+def _run_concurrently(tmp_path, monkeypatch, failing=()):
+    plan = compile_lut_plan(pd.DataFrame([
+        _row("Riser", "Riser_clip", "Risers"),
+        _row("InactiveRiser", "Inactive_clip", "NONE", post="GUID,Riser_clip", post_name="Inactive_post"),
+        _row("OldRiser", "Riser_clip", "Risers"),
+        _row("MERGE_LAYERS", "Riser_clip,Inactive_clip", "NIPoints", merge_name="NIPoints"),
+    ], columns=list(LUT_REQUIRED_COLUMNS)))
+
+    events, finished = [], []
+    mapper = _mapper()
+    mapper.parent_dir = str(tmp_path)
+    mapper.lut_plan = plan
+    mapper.clip_workers = 2
+    mapper.progress = None
+    mapper._clip_pool = FakeClipPool(failing)
+    mapper._source_exists = lambda name: True
+    mapper._source_count = lambda name: 1
+
+    def copy(src, dest):
+        events.append(("copy", src))
+        finished.append(src.split("/", 1)[1])
+
+    def post_filter(step, output_grid, gdb, id_source_path=None):
+        events.append(("filter", step.step_id, set(finished), id_source_path))
+
+    def merge(step, produced, gdb, sheet_name, counter, errors):
+        events.append(("merge", step.step_id, set(finished)))
+        return f"{gdb}/{step.output_name}"
+
+    monkeypatch.setattr(arcpy, "management", types.SimpleNamespace(Copy=copy), raising=False)
+    # Clips finish in the reverse of LUT order, so every dependency arrives late
+    monkeypatch.setattr(survey_mapper_class, "as_completed", lambda futures: list(futures)[::-1])
+    mapper._run_post_clip_filter_step = post_filter
+    mapper._run_merge_step = merge
+
+    produced, errors = {}, []
+    mapper._run_row_steps_concurrently("North", "grid", "sheet.gdb", ClipCounter(str(tmp_path)), produced, set(), errors, [])
+    return plan, events, produced, errors
+
+
+def test_concurrent_steps_wait_for_their_clips(tmp_path, monkeypatch):
+    plan, events, produced, errors = _run_concurrently(tmp_path, monkeypatch)
+    riser, inactive, old_riser = plan.clips
+    post = plan.post_clip_filter_for(inactive)
+    (merge,) = plan.merges
+
+    assert errors == []
+    # Only the last row writing Riser_clip is copied into the sheet GDB, and the filter and the merge
+    # run once, right after the last clip they depend on. The merge reads the sheet GDB's Riser_clip
+    # (OldRiser); the filter's row comes before OldRiser, so it waits for the first Riser clip instead
+    assert post.id_source_step_id == riser.step_id
+    assert [e[:2] for e in events] == [
+        ("copy", f"scratch/{old_riser.step_id}"),
+        ("copy", f"scratch/{inactive.step_id}"),
+        ("merge", merge.step_id),
+        ("filter", post.step_id),
+    ]
+    assert set(merge.depends_on) <= events[2][2]
+    # The filter runs after the first Riser clip, which is not copied, and reads that clip's own output
+    # rather than the sheet GDB layer OldRiser overwrote
+    assert events[3][3] == f"scratch/{riser.step_id}"
+    assert produced[riser.step_id] == produced[old_riser.step_id] == os.path.join("sheet.gdb", "Riser_clip")
+    assert produced[merge.step_id] == "sheet.gdb/NIPoints"
+
+
+def test_failed_clip_skips_its_filter(tmp_path, monkeypatch):
+    plan, events, produced, errors = _run_concurrently(tmp_path, monkeypatch, failing={"clip:Inactive_clip"})
+    (merge,) = plan.merges
+
+    assert [e[0] for e in events] == ["copy", "merge"]
+    assert errors == ["Could not clip InactiveRiser: clip failed"]
+    assert "clip:Inactive_clip" not in produced
+    # The merge still runs once its clips are done; it reports the missing layer itself
+    assert events[1][1] == merge.step_id